@@ -7,6 +7,17 @@ import cv2
 import numpy as np
 from typing import List, Dict
 
+# Uma instância por arquivo de pesos, compartilhada entre os detectores do processo
+_modelos: Dict[str, YOLO] = {}
+
+
+def obter_modelo(model_path: str) -> YOLO:
+    """Retorna o modelo YOLO do arquivo, carregando só na primeira vez"""
+    if model_path not in _modelos:
+        _modelos[model_path] = YOLO(model_path)
+    return _modelos[model_path]
+
+
 class ObjectDetector:
     """Detector de objetos usando YOLOv8"""
     
@@ -17,7 +28,7 @@ class ObjectDetector:
         Args:
             model_path: Caminho para o modelo YOLO
         """
-        self.model = YOLO(model_path)
+        self.model = obter_modelo(model_path)
         self.confidence_threshold = 0.75
     
     def detect(self, frame: np.ndarray) -> List[Dict]:
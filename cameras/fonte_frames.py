@@ -0,0 +1,405 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║             FONTE DE FRAMES - CÂMERAS INTELBRAS                  ║
+║   Stream contínuo (RTSP/MJPEG) ou snapshot com sessão keep-alive ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. Uma thread de captura mantém a conexão com a câmera e decodifica
+   os frames; quem consome só pega o mais recente (nunca espera rede)
+2. Ordem de preferência das fontes:
+   a) RTSP  (rtsp://.../cam/realmonitor) via OpenCV/FFmpeg
+   b) MJPEG (/cgi-bin/mjpg/video.cgi) via HTTP contínuo
+   c) Snapshot (/cgi-bin/snapshot.cgi) em loop, com requests.Session
+      (keep-alive + Digest Auth reaproveitado)
+3. A fonte/URL que funcionou é lembrada e tentada primeiro na reconexão
+4. Buffer circular pequeno: se o consumidor atrasar, os frames antigos
+   são descartados (contados em `descartados`), nunca acumulam
+5. Falhou? reconecta com espera exponencial (0.5s → 30s)
+
+Sem dependência do Django: os scripts de streaming (tkinter) importam
+direto; FonteFramesIntelbras.de_camera() monta a partir de cameras.Camera.
+
+🎯 USO:
+-------
+from cameras.fonte_frames import FonteFramesIntelbras
+
+fonte = FonteFramesIntelbras('192.168.68.108', 'admin', 'senha')
+fonte.iniciar()
+
+seq = 0
+while True:
+    frame = fonte.ler(apos=seq, timeout=2)   # o mais recente, mais novo que seq
+    if frame is None:
+        continue                              # sem frame novo (câmera caiu?)
+    seq = frame.seq
+    processar(frame.imagem)                   # numpy BGR (frame.jpeg = bytes)
+
+print(fonte.estatisticas())   # fps, recebidos, descartados, reconexões, modo...
+fonte.parar()
+"""
+
+import threading
+import time
+from collections import deque
+from urllib.parse import quote
+
+import cv2
+import numpy as np
+import requests
+from requests.auth import HTTPDigestAuth
+
+
+# ============================================================
+# 🔧 CONFIGURAÇÕES
+# ============================================================
+
+ESPERA_INICIAL = 0.5      # segundos antes da 1ª reconexão
+ESPERA_MAXIMA = 30.0      # teto da espera exponencial
+INTERVALO_SNAPSHOT = 0.0  # pausa entre snapshots (0 = o mais rápido possível)
+TAMANHO_MINIMO_JPEG = 5000  # respostas menores são páginas de erro, não fotos
+
+
+class Frame:
+    """Um frame capturado: imagem decodificada + JPEG original (quando houver)"""
+
+    __slots__ = ('imagem', '_jpeg', 'seq', 'instante')
+
+    def __init__(self, imagem, jpeg, seq, instante):
+        self.imagem = imagem
+        self._jpeg = jpeg
+        self.seq = seq
+        self.instante = instante
+
+    @property
+    def jpeg(self):
+        """Bytes JPEG do frame (RTSP não traz JPEG: codifica só quando pedido)"""
+        if self._jpeg is None:
+            ok, buf = cv2.imencode('.jpg', self.imagem)
+            self._jpeg = buf.tobytes() if ok else b''
+        return self._jpeg
+
+
+class BufferFrames:
+    """Buffer circular que sempre guarda o frame mais recente"""
+
+    def __init__(self, tamanho=2):
+        self._frames = deque(maxlen=tamanho)
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._seq_lido = 0
+        self.recebidos = 0
+        self.descartados = 0
+
+    def colocar(self, imagem, jpeg=None):
+        with self._cond:
+            self._seq += 1
+            self.recebidos += 1
+            if len(self._frames) == self._frames.maxlen and self._frames[0].seq > self._seq_lido:
+                self.descartados += 1  # o mais antigo sai sem nunca ter sido lido
+            self._frames.append(Frame(imagem, jpeg, self._seq, time.time()))
+            self._cond.notify_all()
+
+    def ler(self, apos=0, timeout=None):
+        """Frame mais recente com seq > apos (espera até timeout); None se não chegou"""
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._frames and self._frames[-1].seq > apos, timeout=timeout
+            ):
+                return None
+            frame = self._frames[-1]
+            self._seq_lido = max(self._seq_lido, frame.seq)
+            return frame
+
+
+class FonteFramesIntelbras:
+    """
+    Fonte de frames de uma câmera Intelbras (thread de captura + buffer circular)
+
+    Args:
+        ip (str): IP da câmera
+        usuario, senha (str): credenciais (Digest Auth)
+        porta_rtsp (int): porta RTSP (padrão 554)
+        canal (int): canal do DVR/câmera
+        subtipo (int): 0 = stream principal, 1 = substream (mais leve)
+        usar_stream (bool): tenta RTSP/MJPEG antes do snapshot
+        tamanho_buffer (int): frames guardados no buffer circular
+        timeout (float): timeout de conexão/leitura em segundos
+    """
+
+    def __init__(self, ip, usuario, senha, porta_rtsp=554, canal=1, subtipo=0,
+                 usar_stream=True, tamanho_buffer=2, timeout=8):
+        self.ip = ip
+        self.usuario = usuario
+        self.senha = senha
+        self.porta_rtsp = porta_rtsp
+        self.canal = canal
+        self.subtipo = subtipo
+        self.usar_stream = usar_stream
+        self.timeout = timeout
+
+        self.buffer = BufferFrames(tamanho_buffer)
+
+        self.sessao = requests.Session()
+        self.sessao.auth = HTTPDigestAuth(usuario, senha)
+
+        self._rodando = False
+        self._thread = None
+        self._trava_thread = threading.Lock()
+        self._fonte_ok = None  # (modo, url) que funcionou por último
+
+        # Estatísticas
+        self.modo = None
+        self.url_ativa = None
+        self.reconexoes = 0
+        self.espera_atual = 0.0
+        self.ultimo_erro = None
+        self._fps = 0.0
+        self._ultimo_instante = None
+
+    @classmethod
+    def de_camera(cls, camera, **kwargs):
+        """Monta a partir de um cameras.models.Camera"""
+        return cls(
+            camera.ip_address, camera.username, camera.password,
+            porta_rtsp=camera.port or 554, **kwargs
+        )
+
+    # ------------------------------------------------------------
+    # URLs Intelbras
+    # ------------------------------------------------------------
+
+    def _credenciais_url(self):
+        """'usuario:senha@' com @ : / # etc. escapados"""
+        return f"{quote(self.usuario or '', safe='')}:{quote(self.senha or '', safe='')}@"
+
+    def urls_rtsp(self):
+        return [
+            f"rtsp://{self._credenciais_url()}{self.ip}:{self.porta_rtsp}"
+            f"/cam/realmonitor?channel={self.canal}&subtype={self.subtipo}",
+        ]
+
+    def urls_mjpeg(self):
+        return [
+            f"http://{self.ip}/cgi-bin/mjpg/video.cgi?channel={self.canal}&subtype={self.subtipo}",
+            f"http://{self.ip}/cgi-bin/mjpg/video.cgi?channel={self.canal}&subtype=1",
+        ]
+
+    def urls_snapshot(self):
+        return [
+            f"http://{self.ip}/cgi-bin/snapshot.cgi",
+            f"http://{self.ip}/cgi-bin/snapshot.cgi?channel={self.canal}&subtype=0",
+            f"http://{self.ip}/cgi-bin/snapshot.cgi?channel={self.canal}&subtype=1",
+        ]
+
+    def _fontes(self):
+        """(modo, url) em ordem de preferência; a última que funcionou vem primeiro"""
+        fontes = []
+        if self.usar_stream:
+            fontes += [('rtsp', u) for u in self.urls_rtsp()]
+            fontes += [('mjpeg', u) for u in self.urls_mjpeg()]
+        fontes += [('snapshot', u) for u in self.urls_snapshot()]
+        if self._fonte_ok in fontes:
+            fontes.remove(self._fonte_ok)
+            fontes.insert(0, self._fonte_ok)
+        return fontes
+
+    # ------------------------------------------------------------
+    # Captura (thread de fundo)
+    # ------------------------------------------------------------
+
+    def iniciar(self):
+        with self._trava_thread:
+            if self._rodando:
+                return
+            self._rodando = True
+            if self._thread is not None:
+                return  # a thread anterior ainda não saiu do loop: ela continua capturando
+            self._thread = threading.Thread(
+                target=self._loop, name=f'fonte-frames-{self.ip}', daemon=True
+            )
+            self._thread.start()
+
+    def parar(self):
+        """
+        Para a captura (pode ser reiniciada com iniciar()). A referência
+        à thread só é solta por ela mesma ao sair do loop, então um join
+        que estourou o timeout não permite duas threads de captura
+        """
+        self._rodando = False
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=self.timeout)
+
+    @property
+    def ativa(self):
+        return self._rodando
+
+    def _entregar(self, imagem, jpeg=None):
+        agora = time.monotonic()
+        if self._ultimo_instante is not None:
+            intervalo = agora - self._ultimo_instante
+            if intervalo > 0:
+                # Média móvel exponencial do FPS recebido
+                self._fps = 0.9 * self._fps + 0.1 * (1.0 / intervalo) if self._fps else 1.0 / intervalo
+        self._ultimo_instante = agora
+        self.espera_atual = 0.0
+        self.buffer.colocar(imagem, jpeg)
+
+    def _loop(self):
+        consumidores = {
+            'rtsp': self._consumir_rtsp,
+            'mjpeg': self._consumir_mjpeg,
+            'snapshot': self._consumir_snapshot,
+        }
+        espera = ESPERA_INICIAL
+
+        while True:
+            if not self._rodando:
+                with self._trava_thread:
+                    if not self._rodando:
+                        # Sai sem corrida com iniciar(): a thread só some daqui
+                        self._thread = None
+                        self.espera_atual = 0.0
+                        return
+
+            for modo, url in self._fontes():
+                if not self._rodando:
+                    break
+                self.modo, self.url_ativa = modo, url
+                try:
+                    # Só retorna quando a fonte para de entregar frames
+                    if consumidores[modo](url):
+                        self._fonte_ok = (modo, url)
+                        espera = ESPERA_INICIAL
+                        break
+                except Exception as e:
+                    self.ultimo_erro = f"{modo}: {e}"
+
+            if not self._rodando:
+                continue
+
+            # Caiu ou nenhuma fonte respondeu: espera exponencial e tenta de novo
+            self.reconexoes += 1
+            self.modo = self.url_ativa = None
+            self.espera_atual = espera
+            time.sleep(espera)
+            espera = min(espera * 2, ESPERA_MAXIMA)
+
+    def _consumir_rtsp(self, url):
+        """Lê o RTSP até cair. Retorna True se chegou a entregar frames."""
+        parametros = []
+        for nome in ('CAP_PROP_OPEN_TIMEOUT_MSEC', 'CAP_PROP_READ_TIMEOUT_MSEC'):
+            if hasattr(cv2, nome):
+                parametros += [getattr(cv2, nome), int(self.timeout * 1000)]
+
+        captura = cv2.VideoCapture(url, cv2.CAP_FFMPEG, parametros)
+        entregou = False
+        try:
+            if not captura.isOpened():
+                raise ConnectionError("RTSP não abriu")
+            captura.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            while self._rodando:
+                ok, imagem = captura.read()
+                if not ok:
+                    raise ConnectionError("RTSP parou de entregar frames")
+                self._entregar(imagem)
+                entregou = True
+        except Exception as e:
+            self.ultimo_erro = f"rtsp: {e}"
+        finally:
+            captura.release()
+        return entregou
+
+    def _consumir_mjpeg(self, url):
+        """HTTP multipart contínuo: recorta os JPEGs pelos marcadores SOI/EOI"""
+        entregou = False
+        try:
+            with self.sessao.get(url, stream=True, timeout=self.timeout) as resposta:
+                if resposta.status_code != 200:
+                    raise ConnectionError(f"HTTP {resposta.status_code}")
+                dados = bytearray()
+                for bloco in resposta.iter_content(chunk_size=16384):
+                    if not self._rodando:
+                        break
+                    dados += bloco
+                    inicio = dados.find(b'\xff\xd8')
+                    fim = dados.find(b'\xff\xd9', inicio + 2) if inicio >= 0 else -1
+                    while inicio >= 0 and fim >= 0:
+                        jpeg = bytes(dados[inicio:fim + 2])
+                        del dados[:fim + 2]
+                        imagem = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+                        if imagem is not None:
+                            self._entregar(imagem, jpeg)
+                            entregou = True
+                        inicio = dados.find(b'\xff\xd8')
+                        fim = dados.find(b'\xff\xd9', inicio + 2) if inicio >= 0 else -1
+                    if inicio < 0:
+                        dados.clear()
+        except Exception as e:
+            self.ultimo_erro = f"mjpeg: {e}"
+        return entregou
+
+    def _consumir_snapshot(self, url):
+        """Snapshot em loop na mesma sessão (keep-alive, Digest reaproveitado)"""
+        entregou = False
+        while self._rodando:
+            jpeg = self._buscar_snapshot(url)
+            if jpeg is None:
+                break
+            imagem = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+            if imagem is None:
+                break
+            self._entregar(imagem, jpeg)
+            entregou = True
+            if INTERVALO_SNAPSHOT:
+                time.sleep(INTERVALO_SNAPSHOT)
+        return entregou
+
+    def _buscar_snapshot(self, url):
+        try:
+            resposta = self.sessao.get(url, timeout=self.timeout)
+            if resposta.status_code == 200 and len(resposta.content) > TAMANHO_MINIMO_JPEG:
+                return resposta.content
+            self.ultimo_erro = f"snapshot: HTTP {resposta.status_code}"
+        except requests.RequestException as e:
+            self.ultimo_erro = f"snapshot: {e}"
+        return None
+
+    # ------------------------------------------------------------
+    # Consumo
+    # ------------------------------------------------------------
+
+    def ler(self, apos=0, timeout=None):
+        """Frame mais recente (mais novo que `apos`), ou None se não chegou a tempo"""
+        return self.buffer.ler(apos=apos, timeout=timeout)
+
+    def capturar_snapshot(self):
+        """Um snapshot avulso (JPEG), usando a URL que funcionou por último"""
+        urls = self.urls_snapshot()
+        if self._fonte_ok and self._fonte_ok[0] == 'snapshot':
+            urls.remove(self._fonte_ok[1])
+            urls.insert(0, self._fonte_ok[1])
+        for url in urls:
+            jpeg = self._buscar_snapshot(url)
+            if jpeg is not None:
+                if self._fonte_ok is None:
+                    self._fonte_ok = ('snapshot', url)
+                return jpeg
+        return None
+
+    def estatisticas(self):
+        parado_ha = (
+            time.monotonic() - self._ultimo_instante if self._ultimo_instante is not None else None
+        )
+        return {
+            'modo': self.modo,
+            'url_ativa': self.url_ativa.replace(self._credenciais_url(), '') if self.url_ativa else None,
+            'fps': round(self._fps, 1) if parado_ha is not None and parado_ha < 2 else 0.0,
+            'recebidos': self.buffer.recebidos,
+            'descartados': self.buffer.descartados,
+            'reconexoes': self.reconexoes,
+            'espera_reconexao': self.espera_atual,
+            'ultimo_erro': self.ultimo_erro,
+        }
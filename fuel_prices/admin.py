@@ -6,13 +6,14 @@
 
 📚 O QUE É ESTE ARQUIVO:
 ------------------------
-Configura como os modelos PostoVibra e PrecoVibra aparecem no Django Admin (/admin/)
+Configura como os modelos PostoVibra, PrecoVibra e PrecoVibraSnapshot aparecem no Django Admin (/admin/)
 Acesso via: http://localhost:8000/admin/
 """
 
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import PostoVibra, PrecoVibra
+from .models import PostoVibra, PrecoVibra, PrecoVibraSnapshot
+from .snapshot_precos import recalcular_snapshot
 
 
 # ============================================================
@@ -142,6 +143,25 @@ class PrecoVibraAdmin(admin.ModelAdmin):
             '<span style="background: #dc3545; color: white; padding: 2px 8px; border-radius: 3px;">❌ Indisponível</span>'
         )
     
+    # ──────────────────────────────────────────────────────────
+    # 📸 SNAPSHOT: toda alteração/exclusão refaz as chaves afetadas
+    # ──────────────────────────────────────────────────────────
+    
+    def save_model(self, request, obj, form, change):
+        # Dia/posto/produto podem ter mudado: recalcula a chave antiga também
+        anterior = PrecoVibra.objects.filter(pk=obj.pk).first() if change else None
+        super().save_model(request, obj, form, change)
+        recalcular_snapshot([preco for preco in (anterior, obj) if preco is not None])
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        recalcular_snapshot([obj])
+    
+    def delete_queryset(self, request, queryset):
+        precos = list(queryset)
+        super().delete_queryset(request, queryset)
+        recalcular_snapshot(precos)
+    
     # ──────────────────────────────────────────────────────────
     # ⚙️ AÇÕES EM LOTE
     # ──────────────────────────────────────────────────────────
@@ -152,12 +172,14 @@ class PrecoVibraAdmin(admin.ModelAdmin):
     def marcar_disponivel(self, request, queryset):
         """Marca preços selecionados como disponíveis"""
         updated = queryset.update(disponivel=True)
+        recalcular_snapshot(queryset)
         self.message_user(request, f'✅ {updated} preço(s) marcado(s) como disponível!')
     
     @admin.action(description='❌ Marcar como indisponível')
     def marcar_indisponivel(self, request, queryset):
         """Marca preços selecionados como indisponíveis"""
         updated = queryset.update(disponivel=False)
+        recalcular_snapshot(queryset)
         self.message_user(request, f'❌ {updated} preço(s) marcado(s) como indisponível!')
     
     @admin.action(description='🗑️ Deletar preços > 90 dias')
@@ -166,5 +188,30 @@ class PrecoVibraAdmin(admin.ModelAdmin):
         from datetime import timedelta
         from django.utils import timezone
         cutoff = timezone.now() - timedelta(days=90)
+        antigos = list(queryset.filter(data_coleta__lt=cutoff))
         deleted = queryset.filter(data_coleta__lt=cutoff).delete()
+        recalcular_snapshot(antigos)
         self.message_user(request, f'🗑️ {deleted[0]} preço(s) antigo(s) deletado(s)!')
+
+
+# ============================================================
+# 📸 ADMIN: SNAPSHOT DIÁRIO
+# ============================================================
+
+@admin.register(PrecoVibraSnapshot)
+class PrecoVibraSnapshotAdmin(admin.ModelAdmin):
+    """
+    Último preço do dia por posto/produto (somente leitura)
+    
+    Mantido pelas coletas; para reconstruir: python manage.py snapshot_precos_vibra
+    """
+    list_display = ['data', 'produto_nome', 'posto', 'preco', 'prazo_pagamento', 'data_coleta', 'disponivel']
+    list_filter = ['data', 'posto', 'disponivel']
+    search_fields = ['produto_nome', 'posto__nome_fantasia', 'posto__cnpj']
+    date_hierarchy = 'data'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,561 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║               ANÁLISE DE PREÇOS - FUEL_PRICES                    ║
+║     Histórico em DataFrames → PriceAlert em lote, numa passada   ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. carregar_precos() / carregar_compras(): UMA query cada, direto para
+   DataFrame (ScrapedPrice válidos e PurchasePrice do período)
+2. Cálculos em bloco (pandas/numpy), sem loop por linha:
+   - estatisticas_moveis(): média e desvio móveis por (posto,
+     combustível) na janela de dias ANTERIOR a cada coleta, z-score
+   - anomalias(): última coleta de cada (posto, combustível) com
+     |z| acima do limiar → 📈 aumento / 📉 redução
+   - oportunidades_preco(): última compra × melhor preço coletado
+     atual do mesmo posto/combustível → 💡 preço melhor
+   - divergencias_internas(): spread entre postos da organização na
+     última compra (mesmo combustível e fornecedor) → ⚠️ divergência
+   - economia_antecipada(): mesma conta de
+     PurchasePrice.price_with_early_discount/savings_with_early_payment,
+     para todas as compras a prazo ainda não vencidas → 💰 antecipado
+3. gerar_alertas(): junta tudo, descarta o que já tem alerta ativo
+   (uma query) e grava com UM bulk_create
+
+Chamado pelo worker da fila depois de cada coleta e pelo comando
+python manage.py analisar_precos [--benchmark].
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+FUEL_ANALISE_HISTORICO_DIAS = 365     # histórico carregado
+FUEL_ANALISE_JANELA_DIAS = 30         # janela da média/desvio móveis
+FUEL_ANALISE_MIN_AMOSTRAS = 5         # coletas mínimas na janela para z-score
+FUEL_ALERTA_LIMIAR_Z = 2.5            # |z| para alerta de variação
+FUEL_ALERTA_DIFERENCA_MIN = 0.02      # R$/L mínimo para alertar
+FUEL_ALERTA_ECONOMIA_MIN = 50         # R$ mínimo para desconto antecipado
+FUEL_ALERTA_VALIDADE_DIAS = 7         # expires_at dos alertas
+"""
+
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+try:
+    import pandas as pd
+    PANDAS_DISPONIVEL = True
+except ImportError:
+    PANDAS_DISPONIVEL = False
+
+from .models import (
+    AlertPriority, AlertType, Fuel, PaymentTermType, PriceAlert, PurchasePrice, ScrapedPrice,
+)
+
+
+COLUNAS_PRECOS = ['id', 'organization_id', 'store_id', 'fuel_id', 'supplier_id', 'unit_price', 'scraped_at']
+COLUNAS_COMPRAS = [
+    'id', 'organization_id', 'store_id', 'fuel_id', 'supplier_id', 'final_unit_cost',
+    'volume_liters', 'early_payment_discount_percent', 'payment_term_type',
+    'payment_due_date', 'invoice_date',
+]
+COLUNAS_ALERTAS = [
+    'alert_type', 'organization_id', 'purchase_price_id', 'scraped_price_id',
+    'compared_purchase_id', 'fuel_id', 'store_id', 'current_price', 'better_price',
+    'price_difference', 'potential_savings',
+]
+
+POSTO_COMBUSTIVEL = ['store_id', 'fuel_id']
+
+
+def _config(nome, padrao):
+    return getattr(settings, nome, padrao)
+
+
+def _alertas_vazios():
+    return pd.DataFrame(columns=COLUNAS_ALERTAS)
+
+
+def prioridade(diferenca):
+    """
+    Prioridade pela diferença em R$/L (mesmas faixas do AlertPriority)
+
+    Args:
+        diferenca: array de diferenças (R$/L)
+
+    Returns:
+        np.ndarray de 'high'/'medium'/'low'
+    """
+    diferenca = np.abs(np.asarray(diferenca, dtype=float))
+    return np.select(
+        [diferenca > 0.10, diferenca >= 0.05],
+        [AlertPriority.HIGH.value, AlertPriority.MEDIUM.value],
+        default=AlertPriority.LOW.value,
+    )
+
+
+# ============================================================
+# 📥 CARGA (uma query por tabela)
+# ============================================================
+
+def carregar_precos(desde):
+    """ScrapedPrice válidos desde `desde` → DataFrame (unit_price em float)"""
+    linhas = ScrapedPrice.objects.filter(is_valid=True, scraped_at__gte=desde).order_by().values_list(
+        'id', 'store__organization_id', 'store_id', 'fuel_id', 'supplier_id', 'unit_price', 'scraped_at'
+    )
+    precos = pd.DataFrame.from_records(list(linhas), columns=COLUNAS_PRECOS)
+    precos['unit_price'] = precos['unit_price'].astype(float)
+    precos['scraped_at'] = pd.to_datetime(precos['scraped_at'], utc=True)
+    return precos
+
+
+def carregar_compras(desde):
+    """PurchasePrice com nota desde `desde` → DataFrame (valores em float)"""
+    linhas = PurchasePrice.objects.filter(invoice_date__gte=desde.date()).order_by().values_list(*COLUNAS_COMPRAS)
+    compras = pd.DataFrame.from_records(list(linhas), columns=COLUNAS_COMPRAS)
+    for coluna in ('final_unit_cost', 'volume_liters', 'early_payment_discount_percent'):
+        compras[coluna] = compras[coluna].astype(float)
+    for coluna in ('payment_due_date', 'invoice_date'):
+        compras[coluna] = pd.to_datetime(compras[coluna])
+    return compras
+
+
+# ============================================================
+# 📊 CÁLCULOS EM BLOCO
+# ============================================================
+
+def estatisticas_moveis(precos, janela_dias=None, min_amostras=None):
+    """
+    Média e desvio móveis por (posto, combustível) e z-score de cada coleta
+
+    A janela olha só para as coletas ANTERIORES (closed='left'): a coleta
+    avaliada não entra na própria média.
+
+    Returns:
+        DataFrame: precos ordenado + media_movel, desvio_movel, variacao, zscore
+    """
+    janela_dias = janela_dias or _config('FUEL_ANALISE_JANELA_DIAS', 30)
+    min_amostras = min_amostras or _config('FUEL_ANALISE_MIN_AMOSTRAS', 5)
+
+    precos = precos.sort_values(POSTO_COMBUSTIVEL + ['scraped_at', 'id'], kind='stable').reset_index(drop=True)
+    if precos.empty:
+        return precos.assign(media_movel=[], desvio_movel=[], variacao=[], zscore=[])
+
+    rolagem = precos.set_index('scraped_at').groupby(POSTO_COMBUSTIVEL, sort=False)['unit_price'].rolling(
+        f'{janela_dias}D', closed='left', min_periods=min_amostras
+    )
+    precos['media_movel'] = rolagem.mean().to_numpy()
+    precos['desvio_movel'] = rolagem.std().to_numpy()
+    precos['variacao'] = precos['unit_price'] - precos['media_movel']
+
+    desvio = precos['desvio_movel'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precos['zscore'] = np.where(desvio > 0, precos['variacao'].to_numpy() / desvio, np.nan)
+    return precos
+
+
+def ultimas_coletas(precos):
+    """Última coleta de cada (posto, combustível) - `precos` já ordenado"""
+    return precos.groupby(POSTO_COMBUSTIVEL, sort=False).tail(1)
+
+
+def anomalias(estatisticas, limiar_z=None, diferenca_min=None):
+    """
+    Variações fora do normal na última coleta de cada (posto, combustível)
+
+    Returns:
+        DataFrame no formato COLUNAS_ALERTAS (price_increase/price_decrease)
+    """
+    limiar_z = limiar_z or _config('FUEL_ALERTA_LIMIAR_Z', 2.5)
+    diferenca_min = diferenca_min if diferenca_min is not None else _config('FUEL_ALERTA_DIFERENCA_MIN', 0.02)
+
+    atuais = ultimas_coletas(estatisticas)
+    atuais = atuais[(atuais['zscore'].abs() >= limiar_z) & (atuais['variacao'].abs() >= diferenca_min)]
+    if atuais.empty:
+        return _alertas_vazios()
+
+    return pd.DataFrame({
+        'alert_type': np.where(
+            atuais['variacao'] > 0, AlertType.PRICE_INCREASE.value, AlertType.PRICE_DECREASE.value
+        ),
+        'organization_id': atuais['organization_id'].to_numpy(),
+        'purchase_price_id': None,
+        'scraped_price_id': atuais['id'].to_numpy(),
+        'compared_purchase_id': None,
+        'fuel_id': atuais['fuel_id'].to_numpy(),
+        'store_id': atuais['store_id'].to_numpy(),
+        'current_price': atuais['unit_price'].to_numpy(),
+        'better_price': atuais['media_movel'].to_numpy(),
+        'price_difference': atuais['variacao'].to_numpy(),
+        'potential_savings': np.nan,
+    })
+
+
+def _ultimas_compras(compras, chaves):
+    return compras.sort_values(['invoice_date', 'id'], kind='stable').groupby(chaves, sort=False).tail(1)
+
+
+def oportunidades_preco(estatisticas, compras, diferenca_min=None):
+    """
+    Última compra de cada (posto, combustível) × menor preço coletado
+    atual (última coleta de cada fornecedor) para o mesmo posto
+
+    potential_savings = diferença × volume médio comprado pelo posto
+
+    Returns:
+        DataFrame no formato COLUNAS_ALERTAS (better_price)
+    """
+    diferenca_min = diferenca_min if diferenca_min is not None else _config('FUEL_ALERTA_DIFERENCA_MIN', 0.02)
+    if estatisticas.empty or compras.empty:
+        return _alertas_vazios()
+
+    ofertas = estatisticas.groupby(POSTO_COMBUSTIVEL + ['supplier_id'], sort=False).tail(1)
+    melhores = ofertas.loc[ofertas.groupby(POSTO_COMBUSTIVEL, sort=False)['unit_price'].idxmin()]
+
+    ultimas = _ultimas_compras(compras, POSTO_COMBUSTIVEL)
+    volume_medio = compras.groupby(POSTO_COMBUSTIVEL)['volume_liters'].mean().rename('volume_medio')
+
+    cruzado = ultimas.merge(
+        melhores[POSTO_COMBUSTIVEL + ['id', 'unit_price']].rename(
+            columns={'id': 'scraped_price_id', 'unit_price': 'melhor_preco'}
+        ),
+        on=POSTO_COMBUSTIVEL,
+    ).join(volume_medio, on=POSTO_COMBUSTIVEL)
+    cruzado['diferenca'] = cruzado['final_unit_cost'] - cruzado['melhor_preco']
+    cruzado = cruzado[cruzado['diferenca'] >= diferenca_min]
+    if cruzado.empty:
+        return _alertas_vazios()
+
+    return pd.DataFrame({
+        'alert_type': AlertType.BETTER_PRICE.value,
+        'organization_id': cruzado['organization_id'].to_numpy(),
+        'purchase_price_id': cruzado['id'].to_numpy(),
+        'scraped_price_id': cruzado['scraped_price_id'].to_numpy(),
+        'compared_purchase_id': None,
+        'fuel_id': cruzado['fuel_id'].to_numpy(),
+        'store_id': cruzado['store_id'].to_numpy(),
+        'current_price': cruzado['final_unit_cost'].to_numpy(),
+        'better_price': cruzado['melhor_preco'].to_numpy(),
+        'price_difference': cruzado['diferenca'].to_numpy(),
+        'potential_savings': (cruzado['diferenca'] * cruzado['volume_medio']).to_numpy(),
+    })
+
+
+def divergencias_internas(compras, diferenca_min=None):
+    """
+    Spread entre postos da mesma organização: última compra de cada posto
+    (mesmo combustível e fornecedor) comparada com a mais barata
+
+    Returns:
+        DataFrame no formato COLUNAS_ALERTAS (internal_divergence)
+    """
+    diferenca_min = diferenca_min if diferenca_min is not None else _config('FUEL_ALERTA_DIFERENCA_MIN', 0.02)
+    if compras.empty:
+        return _alertas_vazios()
+
+    grupo = ['organization_id', 'fuel_id', 'supplier_id']
+    ultimas = _ultimas_compras(compras, grupo + ['store_id']).reset_index(drop=True)
+
+    por_grupo = ultimas.groupby(grupo, sort=False)['final_unit_cost']
+    indice_min = por_grupo.transform('idxmin').to_numpy()
+    ultimas['menor_custo'] = por_grupo.transform('min').to_numpy()
+    ultimas['compra_menor'] = ultimas['id'].to_numpy()[indice_min]
+    ultimas['spread'] = ultimas['final_unit_cost'] - ultimas['menor_custo']
+
+    caras = ultimas[(ultimas['spread'] >= diferenca_min) & (ultimas['id'] != ultimas['compra_menor'])]
+    if caras.empty:
+        return _alertas_vazios()
+
+    return pd.DataFrame({
+        'alert_type': AlertType.INTERNAL_DIVERGENCE.value,
+        'organization_id': caras['organization_id'].to_numpy(),
+        'purchase_price_id': caras['id'].to_numpy(),
+        'scraped_price_id': None,
+        'compared_purchase_id': caras['compra_menor'].to_numpy(),
+        'fuel_id': caras['fuel_id'].to_numpy(),
+        'store_id': caras['store_id'].to_numpy(),
+        'current_price': caras['final_unit_cost'].to_numpy(),
+        'better_price': caras['menor_custo'].to_numpy(),
+        'price_difference': caras['spread'].to_numpy(),
+        'potential_savings': (caras['spread'] * caras['volume_liters']).to_numpy(),
+    })
+
+
+def economia_antecipada(compras, hoje=None, economia_min=None):
+    """
+    Compras a prazo com desconto antecipado ainda não vencidas
+
+    Mesma conta de PurchasePrice.price_with_early_discount e
+    savings_with_early_payment, para todas as compras de uma vez.
+
+    Returns:
+        DataFrame no formato COLUNAS_ALERTAS (early_payment)
+    """
+    economia_min = economia_min if economia_min is not None else _config('FUEL_ALERTA_ECONOMIA_MIN', 50)
+    if compras.empty:
+        return _alertas_vazios()
+    hoje = pd.Timestamp(hoje or timezone.localdate())
+
+    desconto = compras['early_payment_discount_percent'].to_numpy()
+    custo = compras['final_unit_cost'].to_numpy()
+    preco_antecipado = custo * (100 - desconto) / 100
+    economia = (custo - preco_antecipado) * compras['volume_liters'].to_numpy()
+
+    elegivel = (
+        (desconto > 0)
+        & (compras['payment_term_type'].to_numpy() == PaymentTermType.PRAZO.value)
+        & (compras['payment_due_date'] >= hoje).to_numpy()
+        & (economia >= economia_min)
+    )
+    if not elegivel.any():
+        return _alertas_vazios()
+
+    selecionadas = compras[elegivel]
+    return pd.DataFrame({
+        'alert_type': AlertType.EARLY_PAYMENT_DISCOUNT.value,
+        'organization_id': selecionadas['organization_id'].to_numpy(),
+        'purchase_price_id': selecionadas['id'].to_numpy(),
+        'scraped_price_id': None,
+        'compared_purchase_id': None,
+        'fuel_id': selecionadas['fuel_id'].to_numpy(),
+        'store_id': selecionadas['store_id'].to_numpy(),
+        'current_price': custo[elegivel],
+        'better_price': preco_antecipado[elegivel],
+        'price_difference': (custo - preco_antecipado)[elegivel],
+        'potential_savings': economia[elegivel],
+    })
+
+
+def calcular_alertas(precos, compras, hoje=None):
+    """Todos os cálculos sobre os DataFrames já carregados (sem banco)"""
+    estatisticas = estatisticas_moveis(precos)
+    partes = [
+        anomalias(estatisticas),
+        oportunidades_preco(estatisticas, compras),
+        divergencias_internas(compras),
+        economia_antecipada(compras, hoje=hoje),
+    ]
+    partes = [parte for parte in partes if not parte.empty]
+    if not partes:
+        return _alertas_vazios()
+    return pd.concat(partes, ignore_index=True)
+
+
+# ============================================================
+# 🔔 GERAÇÃO DOS ALERTAS
+# ============================================================
+
+def _decimal(valor, casas):
+    if valor is None or pd.isna(valor):
+        return None
+    return Decimal(f'{valor:.{casas}f}')
+
+
+def _id(valor):
+    return None if valor is None or pd.isna(valor) else int(valor)
+
+
+def _texto(alerta, combustivel, posto):
+    atual = f"R$ {alerta.current_price:.3f}".replace('.', ',')
+    melhor = f"R$ {alerta.better_price:.3f}".replace('.', ',')
+    diferenca = f"R$ {abs(alerta.price_difference):.3f}".replace('.', ',')
+    economia = '' if pd.isna(alerta.potential_savings) else \
+        f" Economia potencial: R$ {alerta.potential_savings:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+
+    if alerta.alert_type == AlertType.PRICE_INCREASE:
+        return (f"📈 {combustivel} subiu em {posto}",
+                f"Preço coletado {atual}/L está {diferenca} acima da média recente ({melhor}).")
+    if alerta.alert_type == AlertType.PRICE_DECREASE:
+        return (f"📉 {combustivel} caiu em {posto}",
+                f"Preço coletado {atual}/L está {diferenca} abaixo da média recente ({melhor}).")
+    if alerta.alert_type == AlertType.BETTER_PRICE:
+        return (f"💡 {combustivel}: preço melhor para {posto}",
+                f"Última compra a {atual}/L; há oferta a {melhor}/L ({diferenca} a menos).{economia}")
+    if alerta.alert_type == AlertType.INTERNAL_DIVERGENCE:
+        return (f"⚠️ {posto} pagou {diferenca} a mais em {combustivel}",
+                f"Última compra a {atual}/L; outro posto da rede pagou {melhor}/L.{economia}")
+    return (f"💰 Desconto antecipado: {combustivel} em {posto}",
+            f"Pagando à vista o custo cai de {atual}/L para {melhor}/L.{economia}")
+
+
+def gerar_alertas(agora=None, historico_dias=None, gravar=True):
+    """
+    Carrega o histórico, calcula e grava os PriceAlert novos em lote
+
+    Alertas que já existem ativos (mesmo tipo e mesmas compras/coletas,
+    não dispensados e dentro da validade) não são repetidos.
+
+    Returns:
+        dict: total por tipo, criados, ignorados e tempos (segundos)
+    """
+    if not PANDAS_DISPONIVEL:
+        print("⚠️  pandas não instalado - análise de preços desativada")
+        return {'criados': 0, 'ignorados': 0, 'por_tipo': {}, 'tempos': {}}
+
+    agora = agora or timezone.now()
+    historico_dias = historico_dias or _config('FUEL_ANALISE_HISTORICO_DIAS', 365)
+    validade = timedelta(days=_config('FUEL_ALERTA_VALIDADE_DIAS', 7))
+    desde = agora - timedelta(days=historico_dias)
+
+    inicio = time.perf_counter()
+    precos = carregar_precos(desde)
+    compras = carregar_compras(desde)
+    carga = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    alertas = calcular_alertas(precos, compras, hoje=timezone.localdate(agora))
+    calculo = time.perf_counter() - inicio
+
+    ativos = set(
+        PriceAlert.objects.filter(is_dismissed=False, created_at__gte=agora - validade).order_by().values_list(
+            'alert_type', 'purchase_price_id', 'scraped_price_id', 'compared_purchase_id'
+        )
+    )
+
+    combustiveis = dict(Fuel.objects.values_list('id', 'name'))
+    from erp_hub.models import Store
+    postos = dict(Store.objects.filter(id__in=set(alertas['store_id'].tolist())).values_list('id', 'name'))
+
+    novos = []
+    for alerta in alertas.itertuples(index=False):
+        chave = (
+            alerta.alert_type, _id(alerta.purchase_price_id),
+            _id(alerta.scraped_price_id), _id(alerta.compared_purchase_id),
+        )
+        if chave in ativos:
+            continue
+        ativos.add(chave)
+
+        titulo, mensagem = _texto(alerta, combustiveis.get(alerta.fuel_id, 'Combustível'),
+                                  postos.get(alerta.store_id, 'Posto'))
+        novos.append(PriceAlert(
+            organization_id=int(alerta.organization_id),
+            purchase_price_id=chave[1],
+            scraped_price_id=chave[2],
+            compared_purchase_id=chave[3],
+            alert_type=alerta.alert_type,
+            priority=prioridade([alerta.price_difference])[0],
+            current_price=_decimal(alerta.current_price, 3),
+            better_price=_decimal(alerta.better_price, 3),
+            price_difference=_decimal(alerta.price_difference, 3),
+            potential_savings=_decimal(alerta.potential_savings, 2),
+            title=titulo[:200],
+            message=mensagem,
+            expires_at=agora + validade,
+        ))
+
+    if gravar:
+        PriceAlert.objects.bulk_create(novos)
+
+    por_tipo = {}
+    for alerta in novos:
+        por_tipo[alerta.alert_type] = por_tipo.get(alerta.alert_type, 0) + 1
+
+    return {
+        'precos': len(precos),
+        'compras': len(compras),
+        'criados': len(novos),
+        'ignorados': len(alertas) - len(novos),
+        'por_tipo': por_tipo,
+        'tempos': {'carga': carga, 'calculo': calculo},
+    }
+
+
+# ============================================================
+# ⏱️ BENCHMARK (dados sintéticos, sem banco)
+# ============================================================
+
+def dados_sinteticos(postos=50, combustiveis=6, fornecedores=3, dias=3 * 365, coletas_por_dia=4, semente=0):
+    """
+    Histórico sintético: passeio aleatório por (posto, combustível,
+    fornecedor) com alguns saltos, e uma compra por semana por posto
+
+    Returns:
+        tuple: (precos, compras) no formato de carregar_precos/carregar_compras
+    """
+    rng = np.random.default_rng(semente)
+    series = postos * combustiveis * fornecedores
+    pontos = dias * coletas_por_dia
+
+    inicio = pd.Timestamp('2023-01-01', tz='UTC')
+    instantes = inicio + pd.to_timedelta(np.arange(pontos) * (24 / coletas_por_dia), unit='h')
+
+    base = rng.uniform(4.0, 6.5, size=series)
+    passos = rng.normal(0, 0.004, size=(series, pontos))
+    saltos = (rng.random((series, pontos)) < 0.001) * rng.normal(0, 0.15, size=(series, pontos))
+    valores = base[:, None] + np.cumsum(passos + saltos, axis=1)
+
+    serie = np.repeat(np.arange(series), pontos)
+    precos = pd.DataFrame({
+        'id': np.arange(1, series * pontos + 1),
+        'organization_id': 1,
+        'store_id': serie // (combustiveis * fornecedores),
+        'fuel_id': (serie // fornecedores) % combustiveis,
+        'supplier_id': serie % fornecedores,
+        'unit_price': valores.ravel().round(3),
+        'scraped_at': np.tile(instantes, series),
+    })
+
+    semanas = dias // 7
+    total = postos * combustiveis * semanas
+    compras = pd.DataFrame({
+        'id': np.arange(1, total + 1),
+        'organization_id': 1,
+        'store_id': np.repeat(np.arange(postos), combustiveis * semanas),
+        'fuel_id': np.tile(np.repeat(np.arange(combustiveis), semanas), postos),
+        'supplier_id': rng.integers(0, fornecedores, size=total),
+        'final_unit_cost': rng.uniform(4.0, 6.8, size=total).round(3),
+        'volume_liters': rng.uniform(5000, 30000, size=total).round(2),
+        'early_payment_discount_percent': rng.choice([0, 0, 1.0, 1.5, 2.0], size=total),
+        'payment_term_type': rng.choice([PaymentTermType.PRAZO.value, PaymentTermType.ANTECIPADO.value], size=total),
+        'invoice_date': np.tile(pd.Timestamp('2023-01-01') + pd.to_timedelta(np.arange(semanas) * 7, unit='D'),
+                                postos * combustiveis),
+    })
+    compras['payment_due_date'] = compras['invoice_date'] + pd.Timedelta(days=30)
+    return precos, compras
+
+
+def benchmark(**parametros):
+    """
+    Mede calcular_alertas() em dados sintéticos
+
+    Returns:
+        dict: linhas, alertas e segundos de cada etapa
+    """
+    if not PANDAS_DISPONIVEL:
+        raise RuntimeError('pandas não instalado')
+
+    inicio = time.perf_counter()
+    precos, compras = dados_sinteticos(**parametros)
+    geracao = time.perf_counter() - inicio
+
+    hoje = (compras['invoice_date'].max() - pd.Timedelta(days=7)).date()
+    tempos = {}
+
+    inicio = time.perf_counter()
+    estatisticas = estatisticas_moveis(precos)
+    tempos['estatisticas_moveis'] = time.perf_counter() - inicio
+
+    etapas = [
+        ('anomalias', lambda: anomalias(estatisticas)),
+        ('oportunidades_preco', lambda: oportunidades_preco(estatisticas, compras)),
+        ('divergencias_internas', lambda: divergencias_internas(compras)),
+        ('economia_antecipada', lambda: economia_antecipada(compras, hoje=hoje)),
+    ]
+    alertas = {}
+    for nome, etapa in etapas:
+        inicio = time.perf_counter()
+        alertas[nome] = len(etapa())
+        tempos[nome] = time.perf_counter() - inicio
+
+    return {
+        'precos': len(precos),
+        'compras': len(compras),
+        'alertas': alertas,
+        'geracao_dados': geracao,
+        'tempos': tempos,
+        'total': sum(tempos.values()),
+    }
@@ -6,6 +6,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 import json
+from .ingestao_precos import PayloadInvalido, ingerir_precos
 from .models import PostoVibra, PrecoVibra
 
 
@@ -46,89 +47,36 @@ def receber_dados_scraper(request):
                 'message': 'Dados obrigatórios ausentes: posto, produtos'
             }, status=400)
         
-        posto_info = data['posto']
-        produtos_lista = data['produtos']
-        modalidade = data.get('modalidade', 'FOB')
-        
-        # Validar posto
-        required_posto_fields = ['codigo_vibra', 'cnpj', 'razao_social', 'nome_fantasia']
-        for field in required_posto_fields:
-            if field not in posto_info:
-                return JsonResponse({
-                    'status': 'error',
-                    'message': f'Campo obrigatório do posto ausente: {field}'
-                }, status=400)
-        
-        # Criar ou atualizar posto
-        posto, created = PostoVibra.objects.get_or_create(
-            cnpj=posto_info['cnpj'],
-            defaults={
-                'codigo_vibra': posto_info['codigo_vibra'],
-                'razao_social': posto_info['razao_social'],
-                'nome_fantasia': posto_info['nome_fantasia'],
-                'ativo': True
-            }
-        )
-        
-        if not created:
-            # Atualizar informações se já existe
-            posto.codigo_vibra = posto_info['codigo_vibra']
-            posto.razao_social = posto_info['razao_social']
-            posto.nome_fantasia = posto_info['nome_fantasia']
-            posto.ativo = True
-            posto.save()
-        
-        # Processar produtos
-        precos_salvos = 0
-        precos_erros = 0
+        # Validar o payload inteiro e gravar em lote (leituras repetidas na
+        # janela de coleta são ignoradas)
+        try:
+            resultado = ingerir_precos(
+                data['posto'],
+                data['produtos'],
+                modalidade=data.get('modalidade', 'FOB'),
+                ativar_posto=True
+            )
+        except PayloadInvalido as e:
+            return JsonResponse({
+                'status': 'error',
+                'message': str(e)
+            }, status=400)
         
-        for produto in produtos_lista:
-            try:
-                # Converter preço de string para decimal
-                # Formato: "Preço: R$ 3,6377" -> 3.6377
-                preco_str = produto.get('preco', '')
-                if not preco_str:
-                    precos_erros += 1
-                    continue
-                
-                # Limpar e converter preço
-                preco_limpo = preco_str.replace('Preço:', '').replace('R$', '').replace('.', '').replace(',', '.').strip()
-                try:
-                    preco_decimal = float(preco_limpo)
-                except ValueError:
-                    print(f"Erro ao converter preço: {preco_str} -> {preco_limpo}")
-                    precos_erros += 1
-                    continue
-                
-                # Criar registro de preço
-                PrecoVibra.objects.create(
-                    posto=posto,
-                    produto_nome=produto.get('nome', ''),
-                    produto_codigo='',  # Scraper não coleta código
-                    preco=preco_decimal,
-                    prazo_pagamento=produto.get('prazo', ''),
-                    base_distribuicao=produto.get('base', ''),
-                    modalidade=modalidade,
-                    data_coleta=timezone.now(),
-                    disponivel=True
-                )
-                precos_salvos += 1
-                
-            except Exception as e:
-                print(f"Erro ao processar produto {produto.get('nome', 'N/A')}: {e}")
-                precos_erros += 1
-                continue
+        for erro in resultado['erros']:
+            print(f"Erro ao processar produto {erro['produto'] or 'N/A'}: {erro['erro']}")
         
+        posto = resultado['posto']
         return JsonResponse({
             'status': 'success',
             'message': 'Dados recebidos e salvos com sucesso',
             'detalhes': {
                 'posto_codigo': posto.codigo_vibra,
                 'posto_nome': posto.nome_fantasia,
-                'posto_criado': created,
-                'precos_salvos': precos_salvos,
-                'precos_erros': precos_erros,
-                'total_produtos': len(produtos_lista)
+                'posto_criado': resultado['posto_criado'],
+                'precos_salvos': resultado['inseridos'],
+                'precos_ignorados': resultado['ignorados'],
+                'precos_erros': len(resultado['erros']),
+                'total_produtos': resultado['total_produtos']
             }
         })
         
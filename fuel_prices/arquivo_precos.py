@@ -0,0 +1,265 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║              ARQUIVO DE PREÇOS VIBRA - FUEL_PRICES               ║
+║    Histórico antigo em arquivos colunares por dia (fora do banco)║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. arquivar(dias=90) move os PrecoVibra de dias inteiros mais antigos
+   que N dias para arquivos colunares comprimidos, um por dia:
+       FUEL_ARQUIVO_DIR/2025/01/precos_2025-01-15.npz
+   - uma coluna por campo (numpy, zlib): preço em décimos de milésimo
+     (inteiro, sem perda) e datas em microssegundos UTC
+   - grava num arquivo temporário, troca atomicamente, relê e confere
+     os ids; só então apaga as linhas do banco
+   - se o dia já tinha arquivo (execução interrompida), junta por id
+2. historico_precos(inicio, fim) devolve o período inteiro juntando
+   arquivo + tabela viva, no mesmo formato - os gráficos não precisam
+   saber onde a linha está
+3. O snapshot diário (PrecoVibraSnapshot) continua no banco: dashboards
+   por dia funcionam para datas arquivadas; reconstruir/verificar o
+   snapshot só mexe em dias ainda não arquivados
+
+Sem dependência nova: só numpy (np.savez_compressed).
+
+Comando: python manage.py arquivar_precos_vibra [--dias 90] [--simular]
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+FUEL_ARQUIVO_DIR = BASE_DIR / 'arquivo' / 'precos_vibra'
+FUEL_ARQUIVO_DIAS = 90     # dias mantidos na tabela viva
+"""
+
+import io
+import os
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import PrecoVibra
+
+
+CAMPOS_TEXTO = ['produto_nome', 'produto_codigo', 'prazo_pagamento', 'base_distribuicao', 'modalidade', 'hash_conteudo']
+CAMPOS_ARQUIVO = (
+    ['id', 'posto_id'] + CAMPOS_TEXTO + ['preco', 'data_coleta', 'disponivel', 'created_at']
+)
+
+ESCALA_PRECO = 10000  # preco tem 4 casas decimais
+EPOCA = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+TAMANHO_LOTE_EXCLUSAO = 2000
+
+
+def pasta_arquivo():
+    return Path(getattr(settings, 'FUEL_ARQUIVO_DIR', Path(settings.BASE_DIR) / 'arquivo' / 'precos_vibra'))
+
+
+def _caminho(dia):
+    return pasta_arquivo() / f'{dia:%Y}' / f'{dia:%m}' / f'precos_{dia:%Y-%m-%d}.npz'
+
+
+def _limites_dia(dia):
+    """[início, início do dia seguinte) no fuso local"""
+    inicio = timezone.make_aware(datetime.combine(dia, time.min))
+    return inicio, timezone.make_aware(datetime.combine(dia + timedelta(days=1), time.min))
+
+
+def dias_arquivados():
+    """Dias com arquivo, em ordem"""
+    dias = []
+    for caminho in pasta_arquivo().glob('*/*/precos_*.npz'):
+        try:
+            dias.append(date.fromisoformat(caminho.stem.removeprefix('precos_')))
+        except ValueError:
+            continue
+    return sorted(dias)
+
+
+def ultimo_dia_arquivado():
+    dias = dias_arquivados()
+    return dias[-1] if dias else None
+
+
+# ============================================================
+# 🗜️ CONVERSÃO LINHAS ↔ COLUNAS
+# ============================================================
+
+def _microssegundos(momento):
+    return (momento - EPOCA) // timedelta(microseconds=1)
+
+
+def _para_colunas(linhas):
+    """Linhas (values_list na ordem de CAMPOS_ARQUIVO) → dict de arrays numpy"""
+    colunas = dict(zip(CAMPOS_ARQUIVO, zip(*linhas))) if linhas else {campo: () for campo in CAMPOS_ARQUIVO}
+    return {
+        'id': np.asarray(colunas['id'], dtype=np.int64),
+        'posto_id': np.asarray(colunas['posto_id'], dtype=np.int64),
+        **{campo: np.asarray([valor or '' for valor in colunas[campo]], dtype=str) for campo in CAMPOS_TEXTO},
+        'preco': np.asarray([int(valor * ESCALA_PRECO) for valor in colunas['preco']], dtype=np.int64),
+        'data_coleta': np.asarray([_microssegundos(valor) for valor in colunas['data_coleta']], dtype=np.int64),
+        'disponivel': np.asarray(colunas['disponivel'], dtype=bool),
+        'created_at': np.asarray([_microssegundos(valor) for valor in colunas['created_at']], dtype=np.int64),
+    }
+
+
+def _juntar(antigas, novas):
+    """Une duas partições por id (as novas prevalecem)"""
+    manter = ~np.isin(antigas['id'], novas['id'])
+    juntas = {campo: np.concatenate([antigas[campo][manter], novas[campo]]) for campo in CAMPOS_ARQUIVO}
+    ordem = np.argsort(juntas['id'], kind='stable')
+    return {campo: valores[ordem] for campo, valores in juntas.items()}
+
+
+def ler_particao(dia):
+    """Colunas do arquivo do dia (dict de arrays) ou None"""
+    caminho = _caminho(dia)
+    if not caminho.exists():
+        return None
+    with np.load(caminho, allow_pickle=False) as arquivo:
+        return {campo: arquivo[campo] for campo in CAMPOS_ARQUIVO}
+
+
+def _gravar_particao(dia, colunas):
+    caminho = _caminho(dia)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **colunas)
+    temporario = caminho.with_suffix('.npz.tmp')
+    temporario.write_bytes(buffer.getvalue())
+    os.replace(temporario, caminho)
+    return caminho.stat().st_size
+
+
+# ============================================================
+# 📦 ARQUIVAMENTO
+# ============================================================
+
+def arquivar(dias=None, simular=False):
+    """
+    Move para arquivo os dias inteiros mais antigos que `dias`
+
+    Returns:
+        dict: dias (lista de {'dia', 'linhas', 'bytes'}), linhas, bytes
+    """
+    dias = dias if dias is not None else getattr(settings, 'FUEL_ARQUIVO_DIAS', 90)
+    limite, _ = _limites_dia(timezone.localdate() - timedelta(days=dias))
+
+    candidatos = PrecoVibra.objects.filter(data_coleta__lt=limite).dates('data_coleta', 'day', order='ASC')
+
+    resultado = {'dias': [], 'linhas': 0, 'bytes': 0}
+    for dia in candidatos:
+        inicio, fim = _limites_dia(dia)
+        linhas = list(
+            PrecoVibra.objects.filter(data_coleta__gte=inicio, data_coleta__lt=fim)
+            .order_by('id').values_list(*CAMPOS_ARQUIVO)
+        )
+        if not linhas:
+            continue
+        if simular:
+            resultado['dias'].append({'dia': dia, 'linhas': len(linhas), 'bytes': 0})
+            resultado['linhas'] += len(linhas)
+            continue
+
+        colunas = _para_colunas(linhas)
+        existentes = ler_particao(dia)
+        if existentes is not None:
+            colunas = _juntar(existentes, colunas)
+        tamanho = _gravar_particao(dia, colunas)
+
+        # Só apaga o que está comprovadamente no arquivo
+        ids = [linha[0] for linha in linhas]
+        gravados = ler_particao(dia)
+        if not np.isin(np.asarray(ids, dtype=np.int64), gravados['id']).all():
+            raise RuntimeError(f'Arquivo de {dia} não confere com o banco - nada foi apagado')
+
+        with transaction.atomic():
+            for posicao in range(0, len(ids), TAMANHO_LOTE_EXCLUSAO):
+                PrecoVibra.objects.filter(id__in=ids[posicao:posicao + TAMANHO_LOTE_EXCLUSAO]).delete()
+
+        resultado['dias'].append({'dia': dia, 'linhas': len(linhas), 'bytes': tamanho})
+        resultado['linhas'] += len(linhas)
+        resultado['bytes'] += tamanho
+
+    return resultado
+
+
+# ============================================================
+# 📖 CONSULTA (arquivo + tabela viva)
+# ============================================================
+
+def _linhas_arquivo(dia, inicio_us, fim_us, posto_ids, produtos):
+    colunas = ler_particao(dia)
+    if colunas is None:
+        return []
+
+    mascara = (colunas['data_coleta'] >= inicio_us) & (colunas['data_coleta'] <= fim_us)
+    if posto_ids is not None:
+        mascara &= np.isin(colunas['posto_id'], np.asarray(list(posto_ids), dtype=np.int64))
+    if produtos is not None:
+        mascara &= np.isin(colunas['produto_nome'], np.asarray(list(produtos), dtype=str))
+
+    selecionadas = {campo: valores[mascara].tolist() for campo, valores in colunas.items()}
+    fuso = timezone.get_current_timezone()
+    return [
+        {
+            'id': selecionadas['id'][i],
+            'posto_id': selecionadas['posto_id'][i],
+            'produto_nome': selecionadas['produto_nome'][i],
+            'produto_codigo': selecionadas['produto_codigo'][i],
+            'preco': Decimal(selecionadas['preco'][i]) / ESCALA_PRECO,
+            'prazo_pagamento': selecionadas['prazo_pagamento'][i],
+            'base_distribuicao': selecionadas['base_distribuicao'][i],
+            'modalidade': selecionadas['modalidade'][i],
+            'data_coleta': (EPOCA + timedelta(microseconds=selecionadas['data_coleta'][i])).astimezone(fuso),
+            'disponivel': selecionadas['disponivel'][i],
+        }
+        for i in range(int(mascara.sum()))
+    ]
+
+
+def historico_precos(inicio, fim=None, posto_ids=None, produtos=None):
+    """
+    Preços coletados entre `inicio` e `fim`, do arquivo e da tabela viva
+
+    Args:
+        inicio, fim (datetime): período (fim padrão agora)
+        posto_ids (iterável): filtra postos (PostoVibra.id)
+        produtos (iterável): filtra produto_nome
+
+    Returns:
+        list[dict]: id, posto_id, produto_nome, produto_codigo, preco,
+                    prazo_pagamento, base_distribuicao, modalidade,
+                    data_coleta, disponivel - por data_coleta
+    """
+    fim = fim or timezone.now()
+    arquivados = [
+        dia for dia in dias_arquivados()
+        if timezone.localdate(inicio) <= dia <= timezone.localdate(fim)
+    ]
+
+    linhas = []
+    for dia in arquivados:
+        linhas.extend(_linhas_arquivo(dia, _microssegundos(inicio), _microssegundos(fim), posto_ids, produtos))
+
+    vivas = PrecoVibra.objects.filter(data_coleta__gte=inicio, data_coleta__lte=fim).order_by()
+    if posto_ids is not None:
+        vivas = vivas.filter(posto_id__in=posto_ids)
+    if produtos is not None:
+        vivas = vivas.filter(produto_nome__in=produtos)
+    vistos = {linha['id'] for linha in linhas}
+    linhas.extend(
+        linha for linha in vivas.values(
+            'id', 'posto_id', 'produto_nome', 'produto_codigo', 'preco', 'prazo_pagamento',
+            'base_distribuicao', 'modalidade', 'data_coleta', 'disponivel',
+        )
+        if linha['id'] not in vistos
+    )
+
+    linhas.sort(key=lambda linha: (linha['data_coleta'], linha['id']))
+    return linhas
@@ -0,0 +1,152 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║               CACHE DOS FEEDS LOGUS - FUEL_PRICES                ║
+║      ETag / 304 e corpo JSON pronto no cache do Django           ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. versao_precos() identifica o estado dos preços pela última
+   atualização do snapshot diário (atualizado_em + id da leitura de
+   origem) - uma query, guardada no cache por poucos segundos
+2. resposta_em_cache(request, nome, construir):
+   - procura o corpo JSON (compacto e, se ligado, já em gzip) no cache,
+     sob a chave (feed, versão); só chama construir() se não achar
+   - ETag = hash do conteúdo sem os campos de horário de geração, então
+     reconstruir o mesmo conteúdo não muda o ETag
+   - If-None-Match / If-Modified-Since batendo → 304 sem corpo
+3. A ingestão (atualizar_snapshot) chama invalidar_feeds() depois do
+   commit: a próxima consulta recalcula a versão e remonta o feed
+
+♻️ VÁRIOS PROCESSOS:
+--------------------
+Com o cache padrão (memória local) a invalidação vale só no processo
+que gravou; os outros percebem a nova versão em até
+FUEL_FEED_VERSAO_TTL segundos. Com cache compartilhado é imediato.
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+FUEL_FEED_CACHE_SEGUNDOS = 60   # validade do corpo (janelas de 6h/24h andam)
+FUEL_FEED_VERSAO_TTL = 10       # quanto a versão fica em cache sem invalidação
+FUEL_FEED_GZIP = True           # guarda e serve o corpo já comprimido
+"""
+
+import gzip
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from .models import PrecoVibraSnapshot
+
+
+CHAVE_VERSAO = 'fuel_prices:feeds:versao'
+
+# Horário de geração da resposta - não entra no ETag
+CAMPOS_VOLATEIS = ('timestamp', 'timestamp_geracao')
+
+TAMANHO_MIN_GZIP = 512
+
+
+# ============================================================
+# 🏷️ VERSÃO DOS PREÇOS
+# ============================================================
+
+def versao_precos():
+    """Versão atual dos preços (muda a cada coleta gravada no snapshot)"""
+    versao = cache.get(CHAVE_VERSAO)
+    if versao is None:
+        ultima = PrecoVibraSnapshot.objects.order_by().aggregate(
+            atualizado_em=Max('atualizado_em'),
+            origem=Max('preco_origem_id'),
+        )
+        atualizado_em = ultima['atualizado_em']
+        versao = f"{int(atualizado_em.timestamp() * 1000) if atualizado_em else 0}-{ultima['origem'] or 0}"
+        cache.set(CHAVE_VERSAO, versao, getattr(settings, 'FUEL_FEED_VERSAO_TTL', 10))
+    return versao
+
+
+def invalidar_feeds():
+    """Descarta a versão em cache - a próxima consulta remonta os feeds"""
+    cache.delete(CHAVE_VERSAO)
+
+
+# ============================================================
+# 📦 RESPOSTA
+# ============================================================
+
+def _montar_entrada(nome, construir):
+    dados = construir()
+    corpo = json.dumps(dados, cls=DjangoJSONEncoder, separators=(',', ':')).encode('utf-8')
+
+    estavel = {chave: valor for chave, valor in dados.items() if chave not in CAMPOS_VOLATEIS}
+    conteudo = json.dumps(estavel, cls=DjangoJSONEncoder, sort_keys=True).encode('utf-8')
+    etag = hashlib.sha1(conteudo).hexdigest()[:32]
+
+    # Last-Modified: desde quando este conteúdo é servido (não muda se
+    # o feed for remontado igual)
+    chave_etag = f'fuel_prices:feeds:{nome}:etag'
+    anterior = cache.get(chave_etag)
+    desde = anterior[1] if anterior and anterior[0] == etag else int(timezone.now().timestamp())
+    cache.set(chave_etag, (etag, desde), None)
+
+    entrada = {'etag': etag, 'desde': desde, 'corpo': corpo, 'corpo_gzip': None}
+    if getattr(settings, 'FUEL_FEED_GZIP', True) and len(corpo) >= TAMANHO_MIN_GZIP:
+        entrada['corpo_gzip'] = gzip.compress(corpo, compresslevel=6, mtime=0)
+    return entrada
+
+
+def _nao_modificado(request, etag, desde):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = {tag.removeprefix('W/').strip('"').removesuffix('-gzip') for tag in parse_etags(if_none_match)}
+        return '*' in etags or etag in etags
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE') or '')
+    return if_modified_since is not None and desde <= if_modified_since
+
+
+def resposta_em_cache(request, nome, construir):
+    """
+    Responde um feed JSON a partir do cache, com ETag e 304
+
+    Args:
+        request: HttpRequest (GET/HEAD)
+        nome (str): identificador do feed na chave do cache
+        construir (callable): monta o dict da resposta (só em cache miss)
+
+    Returns:
+        HttpResponse
+    """
+    chave = f'fuel_prices:feeds:{nome}:{versao_precos()}'
+    entrada = cache.get(chave)
+    if entrada is None:
+        entrada = _montar_entrada(nome, construir)
+        cache.set(chave, entrada, getattr(settings, 'FUEL_FEED_CACHE_SEGUNDOS', 60))
+
+    usar_gzip = entrada['corpo_gzip'] is not None and 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    etag = f"\"{entrada['etag']}{'-gzip' if usar_gzip else ''}\""
+
+    if _nao_modificado(request, entrada['etag'], entrada['desde']):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(
+            entrada['corpo_gzip'] if usar_gzip else entrada['corpo'],
+            content_type='application/json',
+        )
+        if usar_gzip:
+            response['Content-Encoding'] = 'gzip'
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(entrada['desde'])
+    response['Cache-Control'] = 'no-cache'
+    if entrada['corpo_gzip'] is not None:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -0,0 +1,159 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║                 DELTA DE PREÇOS - FUEL_PRICES                    ║
+║     Só os PrecoVibra gravados depois do cursor do cliente        ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. O cursor é o id do último PrecoVibra que o cliente recebeu (o id
+   cresce a cada gravação). Na primeira chamada o cliente pode mandar
+   `desde` (data/hora): vira o cursor logo antes do primeiro preço
+   coletado a partir dali
+2. precos_desde(cursor): WHERE id > cursor ORDER BY id LIMIT n
+   (paginação por chave - custo igual na página 1 e na página 1000)
+3. A resposta traz o novo cursor; o cliente repete até tem_mais=False
+4. aguardar_precos() segura a requisição (long-polling) até chegar
+   preço novo ou o tempo acabar - o cliente não precisa ficar batendo
+5. Margem: preços gravados há menos de FUEL_DELTA_MARGEM_SEGUNDOS
+   ainda não são entregues, para que uma transação mais lenta com id
+   menor não fique para trás do cursor
+
+Só inserções: mudanças em preços já entregues (ex.: disponível no
+admin) não entram no delta.
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+FUEL_DELTA_LIMITE_MAX = 5000         # itens por página
+FUEL_DELTA_ESPERA_MAX = 25           # long-polling máximo (segundos)
+FUEL_DELTA_INTERVALO_SEGUNDOS = 1.0  # intervalo entre consultas na espera
+FUEL_DELTA_MARGEM_SEGUNDOS = 2       # idade mínima do preço para entrar no delta
+"""
+
+import math
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import PrecoVibra
+
+
+CAMPOS_DELTA = [
+    'id', 'posto__codigo_vibra', 'posto__cnpj', 'posto__nome_fantasia',
+    'produto_nome', 'produto_codigo', 'preco', 'prazo_pagamento',
+    'base_distribuicao', 'modalidade', 'data_coleta', 'disponivel', 'created_at',
+]
+
+
+def resolver_cursor(cursor=None, desde=None):
+    """
+    Converte os parâmetros do cliente em cursor (id)
+
+    Args:
+        cursor (str|int): id do último preço recebido
+        desde (str): data ou data/hora ISO - usado só se não houver cursor
+
+    Returns:
+        int
+
+    Raises:
+        ValueError: cursor ou data inválidos
+    """
+    if cursor not in (None, ''):
+        cursor = int(cursor)
+        if cursor < 0:
+            raise ValueError('cursor deve ser >= 0')
+        return cursor
+
+    if not desde:
+        return 0
+
+    momento = parse_datetime(desde)
+    if momento is None:
+        dia = parse_date(desde)
+        if dia is None:
+            raise ValueError(f'Data inválida: {desde!r}')
+        momento = datetime.combine(dia, datetime.min.time())
+    if timezone.is_naive(momento):
+        momento = timezone.make_aware(momento)
+
+    primeiro = PrecoVibra.objects.filter(data_coleta__gte=momento).aggregate(id=Min('id'))['id']
+    if primeiro is None:
+        # Nada coletado desde então: começa do último id existente
+        ultimo = PrecoVibra.objects.order_by('-id').values_list('id', flat=True).first()
+        return ultimo or 0
+    return primeiro - 1
+
+
+def _serializar(linha):
+    return {
+        'id': linha['id'],
+        'posto': {
+            'codigo': linha['posto__codigo_vibra'],
+            'cnpj': linha['posto__cnpj'],
+            'nome': linha['posto__nome_fantasia'],
+        },
+        'produto': linha['produto_nome'],
+        'codigo_produto': linha['produto_codigo'],
+        'preco': float(linha['preco']),
+        'prazo_pagamento': linha['prazo_pagamento'],
+        'base_distribuicao': linha['base_distribuicao'],
+        'modalidade': linha['modalidade'],
+        'data_coleta': linha['data_coleta'].isoformat(),
+        'disponivel': linha['disponivel'],
+    }
+
+
+def precos_desde(cursor, limite=500, margem_segundos=None):
+    """
+    Uma página do delta
+
+    Returns:
+        dict: cursor (id do último item entregue), tem_mais, dados
+    """
+    if margem_segundos is None:
+        margem_segundos = getattr(settings, 'FUEL_DELTA_MARGEM_SEGUNDOS', 2)
+    limite_margem = timezone.now() - timedelta(seconds=margem_segundos)
+
+    linhas = list(
+        PrecoVibra.objects.filter(id__gt=cursor).order_by('id').values(*CAMPOS_DELTA)[:limite + 1]
+    )
+
+    dados = []
+    retidos = False
+    for linha in linhas[:limite]:
+        if margem_segundos and linha['created_at'] > limite_margem:
+            # Daqui em diante pode haver transação ainda não commitada
+            retidos = True
+            break
+        dados.append(_serializar(linha))
+
+    return {
+        'cursor': dados[-1]['id'] if dados else cursor,
+        'tem_mais': len(linhas) > limite or retidos,
+        'dados': dados,
+    }
+
+
+def aguardar_precos(cursor, limite=500, espera_segundos=0):
+    """
+    precos_desde() com long-polling: se não houver nada novo, consulta de
+    novo a cada FUEL_DELTA_INTERVALO_SEGUNDOS até `espera_segundos`
+    (NaN/infinito = sem espera)
+    """
+    if not math.isfinite(espera_segundos):
+        espera_segundos = 0
+    espera_segundos = min(max(espera_segundos, 0), getattr(settings, 'FUEL_DELTA_ESPERA_MAX', 25))
+    intervalo = getattr(settings, 'FUEL_DELTA_INTERVALO_SEGUNDOS', 1.0)
+    prazo = time.monotonic() + espera_segundos
+
+    while True:
+        pagina = precos_desde(cursor, limite)
+        restante = prazo - time.monotonic()
+        if pagina['dados'] or restante <= 0:
+            return pagina
+        time.sleep(min(intervalo, restante))
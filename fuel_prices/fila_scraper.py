@@ -0,0 +1,274 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║                  FILA DO SCRAPER - FUEL_PRICES                   ║
+║     Execuções do scraper Vibra numa fila no banco (sem broker)   ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. enfileirar(postos) - chamado pela view, responde na hora:
+   - já existe tarefa NA FILA para a credencial → os postos são somados
+     a ela (pedidos repetidos viram uma execução só)
+   - a tarefa EM EXECUÇÃO já cobre os postos → devolve ela mesma
+   - senão cria uma tarefa nova ('pendente')
+2. O worker (python manage.py worker_scraper) pega a próxima tarefa com
+   reservar_proxima(): UPDATE condicional pendente → executando, e só de
+   credenciais sem tarefa executando (uma sessão do portal por vez)
+3. executar_tarefa() roda a coleta paralela (ColetorParaleloVibra) no
+   próprio worker; a cada posto concluído o progresso vai para a tarefa
+   e para o ScrapingLog, e um heartbeat marca que o worker está vivo
+   Ao final, gerar_alertas() (analise_precos) recalcula os PriceAlert
+4. recuperar_travadas() encerra tarefas cujo worker parou de responder
+5. status_tarefa() é uma leitura de uma linha - o dashboard consulta
+   em polling sem custo
+
+Sem worker rodando, as tarefas ficam 'pendente' para sempre: em produção
+ele é o processo `worker` do Procfile (no servidor, o serviço
+logos-worker do DEPLOY.md). Precisa de VIBRA_PORTAL_USUARIO/SENHA.
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+VIBRA_FILA_HEARTBEAT_SEGUNDOS = 15    # intervalo do heartbeat do worker
+VIBRA_FILA_TIMEOUT_SEGUNDOS = 300     # sem heartbeat por mais que isso = travada
+"""
+
+import os
+import socket
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .analise_precos import gerar_alertas
+from .models import PriceSource, ScrapingLog, TarefaScraper
+
+
+CREDENCIAL_PADRAO = '95406'  # Usuário master do portal (VibraScraper)
+
+CAMPOS_STATUS = [
+    'id', 'status', 'credencial', 'postos', 'solicitacoes', 'progresso', 'erro',
+    'scraping_log_id', 'criada_em', 'iniciada_em', 'finalizada_em',
+]
+
+
+def identificador_worker():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# ============================================================
+# 📥 ENFILEIRAR (web)
+# ============================================================
+
+def enfileirar(postos, credencial=CREDENCIAL_PADRAO):
+    """
+    Pede uma execução do scraper, agrupando com a tarefa ativa se houver
+
+    Returns:
+        tuple: (TarefaScraper, agrupada) - agrupada=True quando o pedido
+               entrou numa tarefa que já existia
+    """
+    postos = sorted({str(codigo) for codigo in postos})
+
+    for _ in range(3):
+        try:
+            with transaction.atomic():
+                ativas = {
+                    tarefa.status: tarefa
+                    for tarefa in TarefaScraper.objects.select_for_update().filter(
+                        credencial=credencial, status__in=['pendente', 'executando']
+                    )
+                }
+                pendente = ativas.get('pendente')
+                executando = ativas.get('executando')
+
+                if pendente is not None:
+                    pendente.postos = sorted(set(pendente.postos) | set(postos))
+                    pendente.solicitacoes = F('solicitacoes') + 1
+                    pendente.save(update_fields=['postos', 'solicitacoes', 'atualizada_em'])
+                    pendente.refresh_from_db()
+                    return pendente, True
+
+                if executando is not None and set(postos) <= set(executando.postos):
+                    TarefaScraper.objects.filter(pk=executando.pk).update(solicitacoes=F('solicitacoes') + 1)
+                    executando.refresh_from_db()
+                    return executando, True
+
+                return TarefaScraper.objects.create(credencial=credencial, postos=postos), False
+        except IntegrityError:
+            # Outro pedido criou a tarefa pendente ao mesmo tempo: agrupar nela
+            continue
+
+    raise RuntimeError('Não foi possível enfileirar a tarefa do scraper')
+
+
+def status_tarefa(tarefa_id=None):
+    """
+    Estado de uma tarefa (ou da mais recente) - uma query, mais uma só
+    quando a tarefa ainda está na fila (posição)
+
+    Returns:
+        dict ou None
+    """
+    tarefas = TarefaScraper.objects.values(*CAMPOS_STATUS)
+    dados = (tarefas.filter(pk=tarefa_id) if tarefa_id else tarefas.order_by('-criada_em'))[:1]
+    dados = dados[0] if dados else None
+    if dados is None:
+        return None
+
+    if dados['status'] == 'pendente':
+        dados['posicao_fila'] = TarefaScraper.objects.filter(
+            status='pendente', criada_em__lt=dados['criada_em']
+        ).count() + 1
+    for campo in ('criada_em', 'iniciada_em', 'finalizada_em'):
+        dados[campo] = dados[campo].isoformat() if dados[campo] else None
+    return dados
+
+
+# ============================================================
+# ⚙️ WORKER
+# ============================================================
+
+def reservar_proxima(worker=None):
+    """
+    Pega a tarefa pendente mais antiga de uma credencial livre
+
+    O UPDATE condicional (status='pendente') garante que dois workers
+    nunca peguem a mesma tarefa.
+
+    Returns:
+        TarefaScraper ou None
+    """
+    worker = worker or identificador_worker()
+    ocupadas = TarefaScraper.objects.filter(status='executando').values('credencial')
+
+    candidatas = TarefaScraper.objects.filter(status='pendente').exclude(
+        credencial__in=ocupadas
+    ).order_by('criada_em').values_list('pk', flat=True)[:10]
+
+    for pk in candidatas:
+        agora = timezone.now()
+        reservada = TarefaScraper.objects.filter(pk=pk, status='pendente').update(
+            status='executando', worker=worker, iniciada_em=agora, heartbeat=agora, atualizada_em=agora
+        )
+        if reservada:
+            return TarefaScraper.objects.get(pk=pk)
+    return None
+
+
+def recuperar_travadas(timeout_segundos=None):
+    """
+    Encerra tarefas 'executando' sem heartbeat recente (worker morreu)
+
+    Returns:
+        int: tarefas encerradas
+    """
+    if timeout_segundos is None:
+        timeout_segundos = getattr(settings, 'VIBRA_FILA_TIMEOUT_SEGUNDOS', 300)
+    limite = timezone.now() - timedelta(seconds=timeout_segundos)
+
+    travadas = list(TarefaScraper.objects.filter(status='executando', heartbeat__lt=limite))
+    for tarefa in travadas:
+        _finalizar(tarefa, 'falhou', erro=f'Worker {tarefa.worker} parou de responder')
+        if tarefa.scraping_log_id and tarefa.scraping_log.status == 'running':
+            tarefa.scraping_log.finish('failed', error_message='Worker parou de responder')
+    return len(travadas)
+
+
+def _finalizar(tarefa, status, erro=''):
+    tarefa.status = status
+    tarefa.erro = erro
+    tarefa.finalizada_em = timezone.now()
+    tarefa.save(update_fields=['status', 'erro', 'finalizada_em', 'progresso', 'atualizada_em'])
+
+
+class _Heartbeat(threading.Thread):
+    """Atualiza tarefa.heartbeat periodicamente enquanto a coleta roda"""
+
+    def __init__(self, tarefa_id, intervalo):
+        super().__init__(daemon=True)
+        self.tarefa_id = tarefa_id
+        self.intervalo = intervalo
+        self.parar = threading.Event()
+
+    def run(self):
+        try:
+            while not self.parar.wait(self.intervalo):
+                TarefaScraper.objects.filter(pk=self.tarefa_id).update(heartbeat=timezone.now())
+        finally:
+            connection.close()
+
+
+def executar_tarefa(tarefa, contextos=None):
+    """
+    Roda a coleta de uma tarefa reservada e registra progresso e resultado
+
+    Returns:
+        dict: relatório da coleta (None se falhou antes de coletar)
+    """
+    from fuel_prices.scrapers.vibra_paralelo import main_paralelo
+
+    log = ScrapingLog.objects.create(
+        source=PriceSource.VIBRA_PORTAL,
+        started_at=timezone.now(),
+        log_details={'tarefa': tarefa.pk, 'postos': tarefa.postos},
+    )
+    tarefa.scraping_log = log
+    tarefa.progresso = {
+        'total': len(tarefa.postos), 'concluidos': 0, 'sucesso': 0, 'falha': 0,
+        'precos_salvos': 0, 'ultimo_posto': None,
+    }
+    tarefa.save(update_fields=['scraping_log', 'progresso', 'atualizada_em'])
+
+    def ao_concluir_posto(resultado):
+        progresso = tarefa.progresso
+        progresso['concluidos'] += 1
+        progresso['sucesso' if resultado['status'] == 'sucesso' else 'falha'] += 1
+        progresso['precos_salvos'] += resultado.get('inseridos', 0)
+        progresso['ultimo_posto'] = resultado['nome']
+
+        agora = timezone.now()
+        TarefaScraper.objects.filter(pk=tarefa.pk).update(progresso=progresso, heartbeat=agora, atualizada_em=agora)
+        ScrapingLog.objects.filter(pk=log.pk).update(
+            prices_collected=progresso['precos_salvos'],
+            errors_count=progresso['falha'],
+            log_details={'tarefa': tarefa.pk, 'postos': tarefa.postos, 'progresso': progresso},
+        )
+
+    heartbeat = _Heartbeat(tarefa.pk, getattr(settings, 'VIBRA_FILA_HEARTBEAT_SEGUNDOS', 15))
+    heartbeat.start()
+    try:
+        relatorio = main_paralelo(
+            tarefa.postos, contextos=contextos, pasta_saida=None,
+            log=log, ao_concluir_posto=ao_concluir_posto,
+        )
+    except KeyboardInterrupt:
+        # Ctrl+C no worker: encerra a tarefa como as outras saídas e repassa
+        log.refresh_from_db()
+        if log.status == 'running':
+            log.finish('failed', error_message='Worker interrompido')
+        _finalizar(tarefa, 'falhou', erro='Worker interrompido')
+        raise
+    except Exception as e:
+        log.refresh_from_db()
+        if log.status == 'running':
+            log.finish('failed', error_message=str(e))
+        _finalizar(tarefa, 'falhou', erro=str(e))
+        return None
+    finally:
+        heartbeat.parar.set()
+        heartbeat.join()
+        close_old_connections()
+
+    status = 'concluida' if relatorio['postos_sucesso'] else 'falhou'
+    erros = [f"{p['nome']}: {p['erros'][-1]}" for p in relatorio['postos'] if p['status'] != 'sucesso']
+    _finalizar(tarefa, status, erro='\n'.join(erros))
+
+    # Alertas de preço (PriceAlert) com o histórico já atualizado
+    try:
+        gerar_alertas()
+    except Exception as e:
+        print(f"⚠️  Falha ao gerar alertas de preço: {e}")
+    return relatorio
@@ -13,6 +13,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'logos.settings')
 django.setup()
 
 from fuel_prices.models import PostoVibra, PrecoVibra
+from fuel_prices.snapshot_precos import recalcular_snapshot
 from django.utils import timezone as django_tz
 
 print("\n" + "="*60)
@@ -50,6 +51,8 @@ for dados in dados_postos:
         continue
     
     # Limpar preços antigos deste posto
+    # Guardados para refazer o snapshot depois (recalcular_snapshot)
+    afetados = list(PrecoVibra.objects.filter(posto=posto))
     deletados = PrecoVibra.objects.filter(posto=posto).delete()
     print(f"  🗑️  Removidos {deletados[0]} preços antigos")
     
@@ -67,7 +70,7 @@ for dados in dados_postos:
             continue
         
         # Criar preço
-        PrecoVibra.objects.create(
+        afetados.append(PrecoVibra.objects.create(
             posto=posto,
             produto_nome=produto.get('nome', ''),
             produto_codigo=produto.get('codigo', ''),
@@ -77,9 +80,10 @@ for dados in dados_postos:
             modalidade=dados.get('modalidade') or 'NÃO COLETADO',  # Default se null
             data_coleta=django_tz.now(),
             disponivel=True
-        )
+        ))
         precos_salvos += 1
     
+    recalcular_snapshot(afetados)
     print(f"  ✅ Salvos {precos_salvos} preços")
     total_precos += precos_salvos
 
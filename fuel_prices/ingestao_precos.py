@@ -0,0 +1,231 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║               INGESTÃO DE PREÇOS - FUEL_PRICES                   ║
+║      Payload do scraper → PrecoVibra em lote, sem duplicatas     ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. validar_payload() confere o posto e converte TODOS os produtos antes
+   de gravar qualquer coisa ("Preço: R$ 3,6377" → Decimal('3.6377'));
+   produtos inválidos viram erros no resultado, o resto segue
+2. Cada leitura ganha um hash de conteúdo (posto, produto, preço, prazo)
+3. ingerir_precos(), numa única transação:
+   - cria/atualiza o PostoVibra (só grava se algo mudou)
+   - ignora a leitura cujo hash é igual ao da leitura mais recente do
+     mesmo produto/prazo na janela de coleta (re-execução do scraper,
+     payload reenviado) ou repetida no payload. Preço que volta a um
+     valor anterior (5,00 → 5,10 → 5,00) é mudança e é gravado
+   - grava o resto com UM bulk_create e atualiza o snapshot diário
+4. Devolve quantos preços foram inseridos, ignorados e com erro
+
+Usado por VibraScraper.salvar_no_banco e api_scraper.receber_dados_scraper.
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+VIBRA_JANELA_DEDUP_MINUTOS = 60   # igual à última leitura dentro da janela = duplicata
+"""
+
+import hashlib
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import PostoVibra, PrecoVibra
+from .snapshot_precos import atualizar_snapshot
+
+
+class PayloadInvalido(ValueError):
+    """Payload sem os dados mínimos do posto"""
+
+
+# Nomes aceitos para os campos do posto (API standalone × VibraScraper)
+CAMPOS_POSTO = {
+    'codigo_vibra': ('codigo_vibra', 'codigo'),
+    'cnpj': ('cnpj',),
+    'razao_social': ('razao_social', 'razao'),
+    'nome_fantasia': ('nome_fantasia', 'nome'),
+}
+
+
+# ============================================================
+# 🔎 VALIDAÇÃO
+# ============================================================
+
+def converter_preco(valor):
+    """
+    Converte o preço do portal para Decimal
+
+    Aceita "Preço: R$ 3,6377", "R$ 1.234,5678", "3,6377", 3.6377
+
+    Raises:
+        ValueError: vazio, não numérico, NaN/infinito ou <= 0
+    """
+    if isinstance(valor, (int, float, Decimal)):
+        texto = str(valor)
+    else:
+        texto = (valor or '').replace('Preço:', '').replace('Preco:', '').replace('R$', '').strip()
+        if ',' in texto:
+            texto = texto.replace('.', '').replace(',', '.')
+    try:
+        preco = Decimal(texto)
+        if not preco.is_finite() or preco <= 0:
+            raise ValueError
+        preco = preco.quantize(Decimal('0.0001'))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f'Preço inválido: {valor!r}')
+    return preco
+
+
+def _normalizar_posto(posto_info):
+    posto = {}
+    for campo, nomes in CAMPOS_POSTO.items():
+        valor = next((posto_info[nome] for nome in nomes if posto_info.get(nome)), None)
+        if not valor:
+            raise PayloadInvalido(f'Campo obrigatório do posto ausente: {campo}')
+        posto[campo] = str(valor).strip()
+    return posto
+
+
+def _chave_produto(produto_nome, prazo):
+    """Produto/prazo com a mesma normalização do hash"""
+    return produto_nome.strip().upper(), (prazo or '').strip().lower()
+
+
+def hash_leitura(posto_id, produto_nome, preco, prazo):
+    """Hash de conteúdo de uma leitura (posto, produto, preço, prazo)"""
+    chave = f"{posto_id}|{produto_nome.strip().upper()}|{preco:.4f}|{(prazo or '').strip().lower()}"
+    return hashlib.sha1(chave.encode('utf-8')).hexdigest()
+
+
+def validar_payload(posto_info, produtos):
+    """
+    Valida o payload inteiro antes de qualquer escrita
+
+    Returns:
+        tuple: (posto normalizado, leituras válidas, erros)
+
+    Raises:
+        PayloadInvalido: posto sem os campos obrigatórios
+    """
+    posto = _normalizar_posto(posto_info)
+
+    leituras = []
+    erros = []
+    for indice, produto in enumerate(produtos or []):
+        nome = (produto.get('nome') or '').strip()
+        if not nome:
+            erros.append({'indice': indice, 'produto': None, 'erro': 'Produto sem nome'})
+            continue
+        try:
+            preco = converter_preco(produto.get('preco'))
+        except ValueError as e:
+            erros.append({'indice': indice, 'produto': nome, 'erro': str(e)})
+            continue
+        leituras.append({
+            'produto_nome': nome[:200],
+            'produto_codigo': (produto.get('codigo') or '')[:50],
+            'preco': preco,
+            'prazo_pagamento': (produto.get('prazo') or '')[:50],
+            'base_distribuicao': (produto.get('base') or '')[:100],
+        })
+    return posto, leituras, erros
+
+
+# ============================================================
+# 💾 GRAVAÇÃO
+# ============================================================
+
+def _salvar_posto(dados, ativar):
+    """Cria ou atualiza o posto - só faz UPDATE quando algum campo mudou"""
+    posto = PostoVibra.objects.select_for_update().filter(cnpj=dados['cnpj']).first()
+    if posto is None:
+        return PostoVibra.objects.create(ativo=True, **dados), True
+
+    alterados = [campo for campo, valor in dados.items() if getattr(posto, campo) != valor]
+    if ativar and not posto.ativo:
+        alterados.append('ativo')
+        posto.ativo = True
+    if alterados:
+        for campo in alterados:
+            if campo != 'ativo':
+                setattr(posto, campo, dados[campo])
+        posto.save(update_fields=alterados + ['updated_at'])
+    return posto, False
+
+
+def ingerir_precos(posto_info, produtos, modalidade='', data_coleta=None, janela_minutos=None,
+                   ativar_posto=False):
+    """
+    Grava um payload de coleta em lote, ignorando leituras repetidas
+
+    Args:
+        posto_info (dict): codigo_vibra/codigo, cnpj, razao_social/razao, nome_fantasia/nome
+        produtos (list): [{'nome', 'preco', 'prazo', 'base', 'codigo'}]
+        modalidade (str): FOB, CIF...
+        data_coleta (datetime): padrão agora
+        janela_minutos (int): janela de deduplicação (padrão VIBRA_JANELA_DEDUP_MINUTOS)
+        ativar_posto (bool): reativa o posto se estiver inativo
+
+    Returns:
+        dict: posto, posto_criado, inseridos, ignorados, erros, total_produtos
+
+    Raises:
+        PayloadInvalido: posto sem os campos obrigatórios
+    """
+    dados_posto, leituras, erros = validar_payload(posto_info, produtos)
+    data_coleta = data_coleta or timezone.now()
+    if janela_minutos is None:
+        janela_minutos = getattr(settings, 'VIBRA_JANELA_DEDUP_MINUTOS', 60)
+
+    with transaction.atomic():
+        posto, posto_criado = _salvar_posto(dados_posto, ativar_posto)
+
+        for leitura in leituras:
+            leitura['hash_conteudo'] = hash_leitura(
+                posto.id, leitura['produto_nome'], leitura['preco'], leitura['prazo_pagamento']
+            )
+
+        # Hash da leitura mais recente de cada produto/prazo na janela (uma
+        # query); só repetir a última é duplicata - voltar a um preço
+        # anterior é mudança
+        ultimos = {}
+        if leituras:
+            recentes = PrecoVibra.objects.filter(
+                posto=posto,
+                data_coleta__gte=data_coleta - timedelta(minutes=janela_minutos),
+                data_coleta__lte=data_coleta,
+            ).order_by('-data_coleta', '-id').values_list('produto_nome', 'prazo_pagamento', 'hash_conteudo')
+            for produto_nome, prazo, hash_conteudo in recentes:
+                ultimos.setdefault(_chave_produto(produto_nome, prazo), hash_conteudo)
+
+        novos = []
+        for leitura in leituras:
+            chave = _chave_produto(leitura['produto_nome'], leitura['prazo_pagamento'])
+            if ultimos.get(chave) == leitura['hash_conteudo']:
+                continue
+            ultimos[chave] = leitura['hash_conteudo']
+            novos.append(PrecoVibra(
+                posto=posto,
+                modalidade=modalidade or '',
+                data_coleta=data_coleta,
+                disponivel=True,
+                **leitura
+            ))
+
+        PrecoVibra.objects.bulk_create(novos)
+
+        # Último preço do dia por produto (leitura rápida dos dashboards)
+        atualizar_snapshot(novos)
+
+    return {
+        'posto': posto,
+        'posto_criado': posto_criado,
+        'inseridos': len(novos),
+        'ignorados': len(leituras) - len(novos),
+        'erros': erros,
+        'total_produtos': len(produtos or []),
+    }
@@ -0,0 +1,65 @@
+"""
+Comando Django para gerar os alertas de preço (PriceAlert) em lote
+Uso:
+    python manage.py analisar_precos                   # calcula e grava os alertas
+    python manage.py analisar_precos --simular         # calcula sem gravar
+    python manage.py analisar_precos --benchmark       # mede em dados sintéticos
+    python manage.py analisar_precos --benchmark --postos 200 --dias 1825
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from fuel_prices.analise_precos import PANDAS_DISPONIVEL, benchmark, gerar_alertas
+
+
+class Command(BaseCommand):
+    help = 'Analisa o histórico de preços e gera PriceAlert em lote'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--historico', type=int, help='Dias de histórico (padrão: FUEL_ANALISE_HISTORICO_DIAS)')
+        parser.add_argument('--simular', action='store_true', help='Calcula sem gravar os alertas')
+        parser.add_argument('--benchmark', action='store_true', help='Mede os cálculos em dados sintéticos')
+        parser.add_argument('--postos', type=int, default=50, help='Benchmark: postos')
+        parser.add_argument('--combustiveis', type=int, default=6, help='Benchmark: combustíveis')
+        parser.add_argument('--fornecedores', type=int, default=3, help='Benchmark: fornecedores')
+        parser.add_argument('--dias', type=int, default=3 * 365, help='Benchmark: dias de histórico')
+        parser.add_argument('--coletas-por-dia', type=int, default=4, help='Benchmark: coletas por dia')
+
+    def handle(self, *args, **options):
+        if not PANDAS_DISPONIVEL:
+            raise CommandError('pandas não instalado (pip install pandas)')
+
+        if options['benchmark']:
+            return self._benchmark(options)
+
+        resultado = gerar_alertas(historico_dias=options['historico'], gravar=not options['simular'])
+
+        self.stdout.write(f"📥 {resultado['precos']} preços coletados e {resultado['compras']} compras carregados")
+        self.stdout.write(
+            f"⏱️  Carga {resultado['tempos']['carga']:.2f}s | cálculo {resultado['tempos']['calculo']:.2f}s"
+        )
+        for tipo, total in sorted(resultado['por_tipo'].items()):
+            self.stdout.write(f"   {tipo}: {total}")
+
+        verbo = 'seriam criados' if options['simular'] else 'criados'
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {resultado['criados']} alerta(s) {verbo} ({resultado['ignorados']} já ativos)"
+        ))
+
+    def _benchmark(self, options):
+        resultado = benchmark(
+            postos=options['postos'],
+            combustiveis=options['combustiveis'],
+            fornecedores=options['fornecedores'],
+            dias=options['dias'],
+            coletas_por_dia=options['coletas_por_dia'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n⏱️  Benchmark: {resultado['precos']:,} preços coletados, {resultado['compras']:,} compras"
+        ))
+        self.stdout.write(f"   (dados gerados em {resultado['geracao_dados']:.2f}s)")
+        for etapa, segundos in resultado['tempos'].items():
+            alertas = resultado['alertas'].get(etapa)
+            extra = f" → {alertas} alerta(s)" if alertas is not None else ''
+            self.stdout.write(f"   {etapa:<24} {segundos:7.3f}s{extra}")
+        self.stdout.write(self.style.SUCCESS(f"✅ Total: {resultado['total']:.2f}s"))
@@ -0,0 +1,37 @@
+"""
+Comando Django para arquivar o histórico antigo de PrecoVibra
+Uso:
+    python manage.py arquivar_precos_vibra              # arquiva dias com mais de FUEL_ARQUIVO_DIAS
+    python manage.py arquivar_precos_vibra --dias 30    # mantém só 30 dias no banco
+    python manage.py arquivar_precos_vibra --simular    # só mostra o que seria arquivado
+"""
+from django.core.management.base import BaseCommand
+
+from fuel_prices.arquivo_precos import arquivar, pasta_arquivo
+
+
+class Command(BaseCommand):
+    help = 'Move PrecoVibra antigos para arquivos colunares por dia'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, help='Dias mantidos na tabela (padrão: FUEL_ARQUIVO_DIAS)')
+        parser.add_argument('--simular', action='store_true', help='Não grava nem apaga nada')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f'\n🗄️  Arquivando preços Vibra em {pasta_arquivo()}\n'))
+
+        resultado = arquivar(dias=options['dias'], simular=options['simular'])
+
+        for item in resultado['dias']:
+            tamanho = f" ({item['bytes'] / 1024:.1f} KB)" if item['bytes'] else ''
+            self.stdout.write(f"   {item['dia']:%d/%m/%Y}: {item['linhas']} preço(s){tamanho}")
+
+        if options['simular']:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️  Simulação: {resultado['linhas']} preço(s) em {len(resultado['dias'])} dia(s) seriam arquivados"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {resultado['linhas']} preço(s) de {len(resultado['dias'])} dia(s) arquivados "
+                f"({resultado['bytes'] / 1024:.1f} KB)"
+            ))
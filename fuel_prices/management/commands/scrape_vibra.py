@@ -2,7 +2,9 @@
 Comando Django para executar scraping da Vibra Energia
 Uso: python manage.py scrape_vibra
 """
-from django.core.management.base import BaseCommand
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from fuel_prices.scrapers.vibra_paralelo import credenciais_portal
 from fuel_prices.scrapers.vibra_scraper import VibraScraper
 
 
@@ -20,6 +22,12 @@ class Command(BaseCommand):
             action='store_true',
             help='Processar todos os 11 postos (padrão: apenas 3 de teste)',
         )
+        parser.add_argument(
+            '--paralelo',
+            type=int,
+            metavar='N',
+            help='Coleta paralela com N contextos do navegador (login único, headless)',
+        )
 
     def handle(self, *args, **options):
         headless = options['headless']
@@ -27,10 +35,14 @@ class Command(BaseCommand):
         
         self.stdout.write(self.style.SUCCESS('\n🚀 Iniciando scraping da Vibra Energia...\n'))
         
-        # Credenciais do Grupo Lisboa
+        # Credenciais do Grupo Lisboa (VIBRA_PORTAL_USUARIO / VIBRA_PORTAL_SENHA)
+        try:
+            usuario, senha = credenciais_portal()
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
         scraper = VibraScraper(
-            username='95406',
-            password='Apcc2350',
+            username=usuario,
+            password=senha,
             headless=headless
         )
         
@@ -61,6 +73,18 @@ class Command(BaseCommand):
             ]
             self.stdout.write(f'📊 Processando {len(postos)} postos de teste\n')
         
+        if options['paralelo']:
+            from fuel_prices.scrapers.vibra_paralelo import ColetorParaleloVibra
+            
+            scraper.headless = True
+            relatorio = ColetorParaleloVibra(scraper, contextos=options['paralelo']).executar(postos)
+            estilo = self.style.SUCCESS if not relatorio['postos_falha'] else self.style.WARNING
+            self.stdout.write(estilo(
+                f"\n✅ Coleta paralela: {relatorio['postos_sucesso']}/{relatorio['postos_total']} postos, "
+                f"{relatorio['precos_salvos']} preços em {relatorio['duracao_total']}s"
+            ))
+            return
+        
         try:
             todos_dados = scraper.run_scraping_multiplos_postos(postos)
             
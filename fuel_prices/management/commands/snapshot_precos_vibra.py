@@ -0,0 +1,70 @@
+"""
+Comando Django para reconstruir/conferir o snapshot diário de preços Vibra
+Uso:
+    python manage.py snapshot_precos_vibra                 # reconstrói todo o histórico
+    python manage.py snapshot_precos_vibra --dias 7        # só os últimos 7 dias
+    python manage.py snapshot_precos_vibra --verificar     # só compara, não grava
+"""
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from fuel_prices.snapshot_precos import reconstruir_snapshot, verificar_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói (backfill) e confere o snapshot diário PrecoVibraSnapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, help='Apenas os últimos N dias (inclui hoje)')
+        parser.add_argument('--inicio', help='Data inicial (YYYY-MM-DD)')
+        parser.add_argument('--fim', help='Data final (YYYY-MM-DD)')
+        parser.add_argument('--verificar', action='store_true', help='Apenas conferir, sem gravar')
+        parser.add_argument('--lote', type=int, default=5000, help='Preços por lote no backfill')
+
+    def _data(self, valor):
+        try:
+            return datetime.strptime(valor, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Data inválida: {valor} (use YYYY-MM-DD)')
+
+    def _periodo(self, options):
+        data_inicio = self._data(options['inicio']) if options['inicio'] else None
+        data_fim = self._data(options['fim']) if options['fim'] else None
+        if options['dias']:
+            data_inicio = timezone.localdate() - timedelta(days=options['dias'] - 1)
+        return data_inicio, data_fim
+
+    def _conferir(self, data_inicio, data_fim):
+        resultado = verificar_snapshot(data_inicio, data_fim)
+        problemas = len(resultado['faltando']) + len(resultado['sobrando']) + len(resultado['divergentes'])
+
+        self.stdout.write(f"🔎 Chaves (dia, posto, produto) no histórico: {resultado['conferidos']}")
+        for rotulo, chave in [('Faltando', 'faltando'), ('Sobrando', 'sobrando'), ('Divergentes', 'divergentes')]:
+            self.stdout.write(f"   {rotulo}: {len(resultado[chave])}")
+            for data, posto_id, produto in resultado[chave][:10]:
+                self.stdout.write(f"      - {data} posto={posto_id} {produto}")
+
+        if problemas:
+            self.stdout.write(self.style.ERROR(f'❌ Snapshot inconsistente ({problemas} diferenças)'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✅ Snapshot confere com o histórico'))
+        return problemas
+
+    def handle(self, *args, **options):
+        data_inicio, data_fim = self._periodo(options)
+        descricao = f"{data_inicio or 'início'} → {data_fim or 'hoje'}"
+
+        if options['verificar']:
+            self.stdout.write(self.style.SUCCESS(f'\n📸 Conferindo snapshot de preços ({descricao})\n'))
+            if self._conferir(data_inicio, data_fim):
+                raise CommandError('Rode sem --verificar para reconstruir o período')
+            return
+
+        self.stdout.write(self.style.SUCCESS(f'\n📸 Reconstruindo snapshot de preços ({descricao})\n'))
+        resultado = reconstruir_snapshot(data_inicio, data_fim, tamanho_lote=options['lote'])
+        self.stdout.write(
+            f"💾 {resultado['precos_lidos']} preços lidos → {resultado['linhas']} linhas no snapshot"
+        )
+        self._conferir(data_inicio, data_fim)
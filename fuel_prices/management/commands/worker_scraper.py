@@ -0,0 +1,53 @@
+"""
+Comando Django - Worker da fila do scraper Vibra
+Executa as tarefas enfileiradas pelo dashboard (fuel_prices.fila_scraper)
+
+Uso:
+    python manage.py worker_scraper              # roda continuamente
+    python manage.py worker_scraper --uma-vez    # processa a fila e sai
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from fuel_prices.fila_scraper import (
+    identificador_worker, executar_tarefa, recuperar_travadas, reservar_proxima,
+)
+
+
+class Command(BaseCommand):
+    help = 'Executa as tarefas do scraper Vibra enfileiradas no banco'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--uma-vez', action='store_true', help='Sai quando a fila estiver vazia')
+        parser.add_argument('--intervalo', type=float, default=5, help='Segundos entre consultas à fila')
+        parser.add_argument('--contextos', type=int, help='Contextos do navegador (padrão: VIBRA_SCRAPER_CONTEXTOS)')
+
+    def handle(self, *args, **options):
+        worker = identificador_worker()
+        self.stdout.write(self.style.SUCCESS(f'\n📬 Worker do scraper iniciado ({worker})'))
+
+        while True:
+            travadas = recuperar_travadas()
+            if travadas:
+                self.stdout.write(self.style.WARNING(f'⚠️  {travadas} tarefa(s) travada(s) encerrada(s)'))
+
+            tarefa = reservar_proxima(worker)
+            if tarefa is None:
+                if options['uma_vez']:
+                    break
+                time.sleep(options['intervalo'])
+                continue
+
+            self.stdout.write(
+                f"\n🚀 Tarefa #{tarefa.pk}: {len(tarefa.postos)} posto(s) "
+                f"({tarefa.solicitacoes} pedido(s) agrupado(s))"
+            )
+            # Ctrl+C: executar_tarefa encerra a tarefa (falhou) e repassa a interrupção
+            executar_tarefa(tarefa, contextos=options['contextos'])
+
+            tarefa.refresh_from_db()
+            estilo = self.style.SUCCESS if tarefa.status == 'concluida' else self.style.ERROR
+            self.stdout.write(estilo(f"{'✅' if tarefa.status == 'concluida' else '❌'} Tarefa #{tarefa.pk}: {tarefa.get_status_display()}"))
+
+        self.stdout.write('📭 Fila vazia')
@@ -0,0 +1,181 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║                MATRIZ DE PREÇOS - FUEL_PRICES                    ║
+║       Último preço por (posto, produto) em UMA query             ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. ultimos_precos(inicio, fim) busca o preço MAIS RECENTE de cada
+   (posto, produto_nome) no período com uma única query:
+   - PostgreSQL: SELECT DISTINCT ON (posto_id, produto_nome) ...
+   - SQLite/outros com window functions: ROW_NUMBER() OVER (PARTITION BY ...) = 1
+   - sem window functions: uma query ordenada, o 1º de cada par fica
+2. montar_matriz_precos() organiza em memória a matriz
+   PRODUTO (linhas) × POSTO (colunas), com mín/máx/média, variação
+   e a classe CSS de cada célula (faixas em relação à média)
+3. resumo_periodo() traz total de preços e última coleta em uma query
+
+Usado por dashboard_consolidado, dashboard_por_posto e api_precos_por_data.
+"""
+
+from django.db import connection
+from django.db.models import Count, F, Max, Window
+from django.db.models.functions import RowNumber
+
+from .models import PrecoVibra
+
+
+# ============================================================
+# 🔎 CONSULTA
+# ============================================================
+
+def _precos_periodo(inicio, fim, apenas_postos_ativos=True):
+    filtros = {'disponivel': True, 'data_coleta__gte': inicio}
+    if apenas_postos_ativos:
+        filtros['posto__ativo'] = True
+    if fim is not None:
+        filtros['data_coleta__lte'] = fim
+    return PrecoVibra.objects.filter(**filtros)
+
+
+def ultimos_precos(inicio, fim=None):
+    """
+    Preço mais recente de cada (posto, produto_nome) entre `inicio` e `fim`
+
+    Returns:
+        list[PrecoVibra]: com o posto já carregado (select_related)
+    """
+    precos = _precos_periodo(inicio, fim).select_related('posto')
+
+    if connection.features.can_distinct_on_fields:
+        return list(
+            precos.order_by('posto_id', 'produto_nome', '-data_coleta', '-id')
+            .distinct('posto_id', 'produto_nome')
+        )
+
+    if connection.features.supports_over_clause:
+        return list(
+            precos.annotate(
+                ordem=Window(
+                    RowNumber(),
+                    partition_by=[F('posto_id'), F('produto_nome')],
+                    order_by=[F('data_coleta').desc(), F('id').desc()],
+                )
+            ).filter(ordem=1)
+        )
+
+    ultimos = {}
+    for preco in precos.order_by('-data_coleta', '-id'):
+        ultimos.setdefault((preco.posto_id, preco.produto_nome), preco)
+    return list(ultimos.values())
+
+
+def resumo_periodo(inicio, fim=None):
+    """Total de preços coletados e última coleta do período, todos os postos (uma query)"""
+    return _precos_periodo(inicio, fim, apenas_postos_ativos=False).aggregate(
+        total_precos=Count('id'),
+        ultima_coleta=Max('data_coleta'),
+    )
+
+
+# ============================================================
+# 🧮 MATRIZ PRODUTO × POSTO
+# ============================================================
+
+def classe_css_preco(preco, preco_min, preco_max, media):
+    """
+    Faixa de cor da célula, usando a MÉDIA como referência
+
+    Returns:
+        tuple: (classe_css, diferenca_percentual_da_media)
+    """
+    diff_media = ((preco - media) / media) * 100 if media > 0 else 0
+
+    if preco == preco_min:
+        css = 'preco-min'            # Verde forte (melhor preço)
+    elif preco == preco_max:
+        css = 'preco-max'            # Vermelho forte (pior preço)
+    elif diff_media <= -2:           # 2% abaixo da média
+        css = 'preco-baixo'          # Verde claro
+    elif diff_media <= -0.5:         # Até 0.5% abaixo da média
+        css = 'preco-medio-baixo'    # Amarelo claro
+    elif diff_media <= 0.5:          # Próximo da média (±0.5%)
+        css = 'preco-medio'          # Neutro
+    elif diff_media <= 2:            # Até 2% acima da média
+        css = 'preco-medio-alto'     # Laranja claro
+    else:                            # Mais de 2% acima da média
+        css = 'preco-alto'           # Vermelho claro
+    return css, diff_media
+
+
+def montar_matriz_precos(inicio, fim=None, precos=None):
+    """
+    Matriz de preços do período (sem queries por célula)
+
+    Args:
+        inicio, fim (datetime): período
+        precos (list): resultado de ultimos_precos() já buscado (opcional)
+
+    Returns:
+        dict:
+            postos: PostoVibra com preço no período (ordem do código Vibra),
+                    cada um com `ultima_coleta` e `precos_periodo` (PrecoVibra por produto)
+            matriz: linhas {produto, postos: {cnpj: {...}}, preco_min, preco_max,
+                    preco_medio, variacao_percentual}
+    """
+    if precos is None:
+        precos = ultimos_precos(inicio, fim)
+
+    postos = {}
+    linhas = {}
+    for preco in precos:
+        posto = postos.get(preco.posto_id)
+        if posto is None:
+            posto = postos[preco.posto_id] = preco.posto
+            posto.ultima_coleta = preco.data_coleta
+            posto.precos_periodo = []
+        posto.ultima_coleta = max(posto.ultima_coleta, preco.data_coleta)
+        posto.precos_periodo.append(preco)
+
+        linha = linhas.setdefault(preco.produto_nome, {
+            'produto': preco.produto_nome,
+            'postos': {},  # {cnpj: {preco, prazo, data}}
+            'preco_min': None,
+            'preco_max': None,
+            'preco_medio': None,
+            'variacao_percentual': 0,
+        })
+        linha['postos'][posto.cnpj] = {
+            'preco': float(preco.preco),
+            'prazo': preco.prazo_pagamento,
+            'base': preco.base_distribuicao,
+            'data': preco.data_coleta,
+            'posto_id': posto.id,
+            'posto_nome': posto.nome_fantasia or posto.razao_social,
+        }
+
+    # Mín/máx/média/variação e classes CSS em memória
+    for linha in linhas.values():
+        valores = [info['preco'] for info in linha['postos'].values()]
+        linha['preco_min'] = min(valores)
+        linha['preco_max'] = max(valores)
+        linha['preco_medio'] = sum(valores) / len(valores)
+        if linha['preco_min'] > 0:
+            linha['variacao_percentual'] = (
+                (linha['preco_max'] - linha['preco_min']) / linha['preco_min']
+            ) * 100
+
+        for info in linha['postos'].values():
+            info['css_class'], info['diff_media'] = classe_css_preco(
+                info['preco'], linha['preco_min'], linha['preco_max'], linha['preco_medio']
+            )
+
+    postos_ordenados = sorted(postos.values(), key=lambda p: p.codigo_vibra)
+    for posto in postos_ordenados:
+        posto.precos_periodo.sort(key=lambda p: p.produto_nome)
+
+    return {
+        'postos': postos_ordenados,
+        'matriz': [linhas[nome] for nome in sorted(linhas)],
+    }
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fuel_prices', '0002_postovibra_precovibra'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrecoVibraSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField(verbose_name='Data')),
+                ('produto_nome', models.CharField(max_length=200, verbose_name='Nome do Produto')),
+                ('produto_codigo', models.CharField(blank=True, max_length=50, verbose_name='Código do Produto')),
+                ('preco', models.DecimalField(decimal_places=4, max_digits=10, verbose_name='Preço')),
+                ('prazo_pagamento', models.CharField(blank=True, max_length=50, verbose_name='Prazo de Pagamento')),
+                ('base_distribuicao', models.CharField(blank=True, max_length=100, verbose_name='Base de Distribuição')),
+                ('modalidade', models.CharField(blank=True, max_length=50, verbose_name='Modalidade')),
+                ('data_coleta', models.DateTimeField(verbose_name='Data da Coleta')),
+                ('disponivel', models.BooleanField(default=True, verbose_name='Disponível')),
+                ('atualizado_em', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('posto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='fuel_prices.postovibra')),
+                ('preco_origem', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='fuel_prices.precovibra', verbose_name='Preço de origem')),
+            ],
+            options={
+                'verbose_name': 'Snapshot de Preço Vibra',
+                'verbose_name_plural': 'Snapshots de Preços Vibra',
+                'ordering': ['-data', 'produto_nome', 'posto'],
+                'indexes': [models.Index(fields=['data', 'produto_nome'], name='fuel_prices_data_9e3d35_idx'), models.Index(fields=['posto', '-data_coleta'], name='fuel_prices_posto_i_b9003a_idx')],
+                'constraints': [models.UniqueConstraint(fields=('data', 'posto', 'produto_nome'), name='snapshot_vibra_dia_posto_produto')],
+            },
+        ),
+    ]
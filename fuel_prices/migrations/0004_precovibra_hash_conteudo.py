@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fuel_prices', '0003_precovibrasnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='precovibra',
+            name='hash_conteudo',
+            field=models.CharField(blank=True, editable=False, max_length=40, verbose_name='Hash do Conteúdo'),
+        ),
+        migrations.AddIndex(
+            model_name='precovibra',
+            index=models.Index(fields=['hash_conteudo', '-data_coleta'], name='fuel_prices_hash_co_9fc552_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fuel_prices', '0004_precovibra_hash_conteudo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TarefaScraper',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('credencial', models.CharField(help_text='Usuário do portal usado na coleta', max_length=50, verbose_name='Credencial')),
+                ('postos', models.JSONField(default=list, help_text='Códigos Vibra a coletar', verbose_name='Postos')),
+                ('status', models.CharField(choices=[('pendente', '⏳ Na fila'), ('executando', '🔄 Executando'), ('concluida', '✅ Concluída'), ('falhou', '❌ Falhou')], default='pendente', max_length=20, verbose_name='Status')),
+                ('solicitacoes', models.PositiveIntegerField(default=1, help_text='Pedidos agrupados nesta tarefa', verbose_name='Solicitações')),
+                ('progresso', models.JSONField(blank=True, default=dict, verbose_name='Progresso')),
+                ('erro', models.TextField(blank=True, verbose_name='Erro')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('heartbeat', models.DateTimeField(blank=True, null=True, verbose_name='Último sinal do worker')),
+                ('criada_em', models.DateTimeField(auto_now_add=True, verbose_name='Criada em')),
+                ('iniciada_em', models.DateTimeField(blank=True, null=True, verbose_name='Iniciada em')),
+                ('finalizada_em', models.DateTimeField(blank=True, null=True, verbose_name='Finalizada em')),
+                ('atualizada_em', models.DateTimeField(auto_now=True, verbose_name='Atualizada em')),
+                ('scraping_log', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tarefas', to='fuel_prices.scrapinglog', verbose_name='Log de Scraping')),
+            ],
+            options={
+                'verbose_name': 'Tarefa do Scraper',
+                'verbose_name_plural': 'Tarefas do Scraper',
+                'ordering': ['-criada_em'],
+                'indexes': [models.Index(fields=['status', 'criada_em'], name='fuel_prices_status_cd5962_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'pendente')), fields=('credencial',), name='tarefa_scraper_uma_pendente_por_credencial')],
+            },
+        ),
+    ]
@@ -1186,6 +1186,10 @@ class PrecoVibra(models.Model):
     data_coleta = models.DateTimeField('Data da Coleta')
     disponivel = models.BooleanField('Disponível', default=True)
     
+    # Hash de (posto, produto, preço, prazo) - leituras repetidas na mesma
+    # janela de coleta são ignoradas (fuel_prices.ingestao_precos)
+    hash_conteudo = models.CharField('Hash do Conteúdo', max_length=40, blank=True, editable=False)
+    
     created_at = models.DateTimeField('Criado em', auto_now_add=True)
     
     class Meta:
@@ -1195,7 +1199,119 @@ class PrecoVibra(models.Model):
         indexes = [
             models.Index(fields=['-data_coleta', 'produto_nome']),
             models.Index(fields=['posto', '-data_coleta']),
+            models.Index(fields=['hash_conteudo', '-data_coleta']),
         ]
     
     def __str__(self):
         return f"{self.produto_nome} - {self.posto.nome_fantasia} - R$ {self.preco} ({self.data_coleta.strftime('%d/%m/%Y %H:%M')})"
+
+
+# ============================================================
+# 📸 SNAPSHOT DIÁRIO DE PREÇOS (Vibra)
+# ============================================================
+
+class PrecoVibraSnapshot(models.Model):
+    """
+    Último preço de cada (dia, posto, produto) - tabela materializada
+    
+    Atualizada a cada coleta (fuel_prices.snapshot_precos.atualizar_snapshot),
+    para que dashboards e APIs leiam O(postos × produtos) linhas em vez de
+    varrer todo o histórico de PrecoVibra.
+    
+    Reconstrução/conferência: python manage.py snapshot_precos_vibra
+    """
+    data = models.DateField('Data')
+    posto = models.ForeignKey(PostoVibra, on_delete=models.CASCADE, related_name='snapshots')
+    produto_nome = models.CharField('Nome do Produto', max_length=200)
+    produto_codigo = models.CharField('Código do Produto', max_length=50, blank=True)
+    
+    preco = models.DecimalField('Preço', max_digits=10, decimal_places=4)
+    prazo_pagamento = models.CharField('Prazo de Pagamento', max_length=50, blank=True)
+    base_distribuicao = models.CharField('Base de Distribuição', max_length=100, blank=True)
+    modalidade = models.CharField('Modalidade', max_length=50, blank=True)
+    
+    data_coleta = models.DateTimeField('Data da Coleta')
+    disponivel = models.BooleanField('Disponível', default=True)
+    preco_origem = models.ForeignKey(
+        PrecoVibra, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='+', verbose_name='Preço de origem'
+    )
+    
+    atualizado_em = models.DateTimeField('Atualizado em', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Snapshot de Preço Vibra'
+        verbose_name_plural = 'Snapshots de Preços Vibra'
+        ordering = ['-data', 'produto_nome', 'posto']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['data', 'posto', 'produto_nome'],
+                name='snapshot_vibra_dia_posto_produto',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['data', 'produto_nome']),
+            models.Index(fields=['posto', '-data_coleta']),
+        ]
+    
+    def __str__(self):
+        return f"{self.produto_nome} - {self.posto.nome_fantasia} - R$ {self.preco} ({self.data.strftime('%d/%m/%Y')})"
+
+
+# ============================================================
+# 📬 FILA DE EXECUÇÕES DO SCRAPER
+# ============================================================
+
+class TarefaScraper(models.Model):
+    """
+    Pedido de execução do scraper Vibra (fila no banco, sem broker)
+    
+    O dashboard enfileira; o worker (python manage.py worker_scraper) executa
+    uma tarefa por credencial de cada vez. Pedidos repetidos enquanto há uma
+    tarefa na fila são agrupados nela (fuel_prices.fila_scraper).
+    """
+    STATUS_CHOICES = [
+        ('pendente', '⏳ Na fila'),
+        ('executando', '🔄 Executando'),
+        ('concluida', '✅ Concluída'),
+        ('falhou', '❌ Falhou'),
+    ]
+    
+    credencial = models.CharField('Credencial', max_length=50, help_text='Usuário do portal usado na coleta')
+    postos = models.JSONField('Postos', default=list, help_text='Códigos Vibra a coletar')
+    status = models.CharField('Status', max_length=20, choices=STATUS_CHOICES, default='pendente')
+    solicitacoes = models.PositiveIntegerField('Solicitações', default=1, help_text='Pedidos agrupados nesta tarefa')
+    
+    progresso = models.JSONField('Progresso', default=dict, blank=True)
+    erro = models.TextField('Erro', blank=True)
+    scraping_log = models.ForeignKey(
+        ScrapingLog, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='tarefas', verbose_name='Log de Scraping'
+    )
+    
+    worker = models.CharField('Worker', max_length=100, blank=True)
+    heartbeat = models.DateTimeField('Último sinal do worker', null=True, blank=True)
+    
+    criada_em = models.DateTimeField('Criada em', auto_now_add=True)
+    iniciada_em = models.DateTimeField('Iniciada em', null=True, blank=True)
+    finalizada_em = models.DateTimeField('Finalizada em', null=True, blank=True)
+    atualizada_em = models.DateTimeField('Atualizada em', auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Tarefa do Scraper'
+        verbose_name_plural = 'Tarefas do Scraper'
+        ordering = ['-criada_em']
+        constraints = [
+            # No máximo UMA tarefa na fila por credencial (as demais são agrupadas)
+            models.UniqueConstraint(
+                fields=['credencial'],
+                condition=models.Q(status='pendente'),
+                name='tarefa_scraper_uma_pendente_por_credencial',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'criada_em']),
+        ]
+    
+    def __str__(self):
+        return f"#{self.pk} {self.get_status_display()} - {len(self.postos)} posto(s) ({self.credencial})"
@@ -0,0 +1,232 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║             EXTRAÇÃO RÁPIDA - PORTAL VIBRA (PEDIDOS)             ║
+║      Tabela inteira de produtos num único page.evaluate()        ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+Antes: cada seletor, cada inner_text() e cada sleep era uma ida e volta
+ao navegador (dezenas por posto), com esperas fixas de 0,5-2s.
+
+Agora:
+1. bloquear_recursos(context): imagens, fontes, mídia e scripts de
+   analytics são abortados na interceptação de rotas
+2. fechar_popups(): espera o botão "Continuar" FICAR visível e, após o
+   clique, espera ele sumir - sem sleep fixo; para no primeiro timeout
+3. extrair_rapido(page): UM page.evaluate() que
+   - rola até o fim e espera o DOM ficar quieto (MutationObserver)
+     em vez de sleep(1.5) por rolagem
+   - lê posto, modalidade e o texto de todos os app-item-vitrine
+   e devolve JSON; a interpretação dos cards (interpretar_cards) é a
+   mesma do modo antigo, em Python puro
+
+VibraScraper usa este modo quando VIBRA_EXTRACAO_RAPIDA = True (padrão)
+e volta ao modo antigo se algo falhar.
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+VIBRA_EXTRACAO_RAPIDA = True   # False = modo antigo (seletor a seletor)
+"""
+
+import re
+from datetime import datetime
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
+
+
+RECURSOS_BLOQUEADOS = {'image', 'font', 'media'}
+
+ANALYTICS = re.compile(
+    r'google-analytics|googletagmanager|doubleclick|hotjar|clarity\.ms|facebook\.(net|com)|'
+    r'newrelic|nr-data|segment\.(io|com)|mixpanel|sentry\.io|datadoghq'
+)
+
+COMBUSTIVEIS = ['etanol', 'gasolina', 'diesel', 'arla', 'gnv']
+
+PRAZO_PADRAO = '3 Dias'  # Prazo padronizado para todos os produtos
+
+SCRIPT_EXTRACAO = """
+async ({quietoMs, maximoMs}) => {
+    const quieto = () => new Promise(resolve => {
+        let timer;
+        const fim = () => { observer.disconnect(); resolve(); };
+        const observer = new MutationObserver(() => { clearTimeout(timer); timer = setTimeout(fim, quietoMs); });
+        observer.observe(document.body, {childList: true, subtree: true});
+        timer = setTimeout(fim, quietoMs);
+    });
+
+    // Rolar até o fim enquanto a página crescer (lazy loading)
+    const inicio = performance.now();
+    let altura = -1;
+    while (document.body.scrollHeight !== altura && performance.now() - inicio < maximoMs) {
+        altura = document.body.scrollHeight;
+        window.scrollTo(0, altura);
+        await quieto();
+    }
+    window.scrollTo(0, 0);
+
+    const visivel = el => !!el && !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+
+    let posto = null;
+    for (const seletor of ['header h1', 'header .posto', '[class*="posto"]', '.header-title', 'h1']) {
+        const el = document.querySelector(seletor);
+        const texto = visivel(el) ? el.innerText.trim() : '';
+        if (texto.length > 5) { posto = texto; break; }
+    }
+    if (!posto) {
+        const header = document.querySelector('header');
+        posto = header ? header.innerText.split('\\n')[0].trim() : null;
+    }
+
+    let modalidade = null;
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+    while (walker.nextNode()) {
+        const el = walker.currentNode.parentElement;
+        if (walker.currentNode.textContent.includes('Modalidade') && visivel(el)) {
+            const alvo = el.closest('mat-form-field') || el.parentElement || el;
+            modalidade = alvo.innerText.replace('Modalidade', '').trim() || null;
+            break;
+        }
+    }
+    if (!modalidade) {
+        const select = document.querySelector('mat-select');
+        modalidade = visivel(select) ? (select.innerText.trim() || null) : null;
+    }
+
+    const cards = Array.from(document.querySelectorAll('app-item-vitrine'), card => card.innerText);
+    return {posto, modalidade, cards};
+}
+"""
+
+
+# ============================================================
+# 🚫 BLOQUEIO DE RECURSOS
+# ============================================================
+
+def _rota(route):
+    requisicao = route.request
+    if requisicao.resource_type in RECURSOS_BLOQUEADOS or ANALYTICS.search(requisicao.url):
+        return route.abort()
+    return route.continue_()
+
+
+def bloquear_recursos(context):
+    """Aborta imagens, fontes, mídia e analytics em todas as páginas do contexto"""
+    context.route('**/*', _rota)
+
+
+# ============================================================
+# 🪟 POPUPS
+# ============================================================
+
+def fechar_popups(page, max_attempts=15, espera_ms=1500):
+    """
+    Fecha os modais pós-login esperando por eventos em vez de sleeps
+
+    Returns:
+        int: modais fechados
+    """
+    continuar = page.get_by_role('button', name='Continuar')
+    checkbox = page.locator('input[name*="j_idt"]')
+    fechados = 0
+
+    for _ in range(max_attempts):
+        try:
+            continuar.first.wait_for(state='visible', timeout=espera_ms)
+        except PlaywrightTimeout:
+            break
+
+        if checkbox.count() > 0 and checkbox.first.is_visible():
+            checkbox.first.click()
+
+        botao = continuar.first.element_handle()
+        botao.click()
+        fechados += 1
+        try:
+            # Próximo modal só depois que este sumir (ou sair do DOM)
+            botao.wait_for_element_state('hidden', timeout=espera_ms)
+        except PlaywrightTimeout:
+            pass
+
+    page.keyboard.press('Escape')
+    print(f"✓ {fechados} modal(is) fechado(s)")
+    return fechados
+
+
+# ============================================================
+# 📦 EXTRAÇÃO
+# ============================================================
+
+def interpretar_card(texto_card):
+    """
+    Texto de um app-item-vitrine → {'nome', 'base', 'preco', 'prazo'}
+
+    Returns:
+        dict, ou None se o produto está indisponível ou sem nome
+    """
+    if 'indisponível' in texto_card.lower() or 'indisponivel' in texto_card.lower():
+        return None
+
+    produto = {'nome': None, 'base': None, 'preco': None, 'prazo': None}
+    linhas = [linha.strip() for linha in texto_card.split('\n') if linha.strip()]
+
+    for indice, linha in enumerate(linhas):
+        linha_lower = linha.lower()
+
+        # Nome: linha com nome do combustível ou a primeira linha
+        if not produto['nome']:
+            if any(combustivel in linha_lower for combustivel in COMBUSTIVEIS):
+                produto['nome'] = linha
+            elif indice == 0 and linha_lower not in ['disponível', 'em estoque']:
+                produto['nome'] = linha
+
+        if ('r$' in linha_lower or 'preço:' in linha_lower or 'preco:' in linha_lower) and not produto['preco']:
+            produto['preco'] = linha
+
+        if 'dia' in linha_lower and 'prazo' not in linha_lower and not produto['prazo']:
+            produto['prazo'] = linha
+
+        if 'base' in linha_lower:
+            produto['base'] = linha
+
+    if not produto['nome']:
+        return None
+    produto['prazo'] = PRAZO_PADRAO
+    return produto
+
+
+def interpretar_cards(textos):
+    """Textos dos cards → produtos disponíveis, sem nomes repetidos (ordem da página)"""
+    produtos = {}
+    for texto in textos:
+        produto = interpretar_card(texto)
+        if produto is not None:
+            produtos.setdefault(produto['nome'], produto)
+    return list(produtos.values())
+
+
+def extrair_rapido(page, timeout_ms=15000, quieto_ms=300, maximo_rolagem_ms=10000):
+    """
+    Extrai posto, modalidade e produtos da página de Pedidos num único evaluate
+
+    Returns:
+        dict: mesmo formato de VibraScraper.extrair_produtos_pedidos
+    """
+    try:
+        page.wait_for_selector('app-item-vitrine', timeout=timeout_ms)
+    except PlaywrightTimeout:
+        print("  [WARN] Nenhum produto apareceu na página")
+
+    bruto = page.evaluate(SCRIPT_EXTRACAO, {'quietoMs': quieto_ms, 'maximoMs': maximo_rolagem_ms})
+    produtos = interpretar_cards(bruto['cards'])
+
+    print(f"  🏢 Posto: {bruto['posto']} | 📋 Modalidade: {bruto['modalidade'] or 'Não identificada'}")
+    print(f"  [OK] {len(bruto['cards'])} cards → {len(produtos)} produtos disponíveis")
+
+    return {
+        'posto': bruto['posto'] or 'Não identificado',
+        'modalidade': bruto['modalidade'],
+        'produtos': produtos,
+        'data_coleta': datetime.now().strftime("%H:%M %d/%m/%Y"),
+    }
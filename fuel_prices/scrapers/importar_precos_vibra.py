@@ -15,6 +15,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'logos.settings')
 django.setup()
 
 from fuel_prices.models import PostoVibra, PrecoVibra
+from fuel_prices.snapshot_precos import recalcular_snapshot
 from django.utils import timezone
 
 
@@ -86,11 +87,14 @@ def importar_json_individual(dados):
     inicio_dia = timezone.make_aware(datetime.combine(hoje, datetime.min.time()))
     fim_dia = timezone.make_aware(datetime.combine(hoje, datetime.max.time()))
     
-    precos_deletados = PrecoVibra.objects.filter(
+    precos_do_dia = PrecoVibra.objects.filter(
         posto=posto,
         data_coleta__gte=inicio_dia,
         data_coleta__lte=fim_dia
-    ).delete()[0]
+    )
+    # Guardados para refazer o snapshot do dia depois (recalcular_snapshot)
+    afetados = list(precos_do_dia)
+    precos_deletados = precos_do_dia.delete()[0]
     
     if precos_deletados > 0:
         print(f"  🗑️  Removidos {precos_deletados} preços de hoje (evitando duplicação)")
@@ -113,7 +117,7 @@ def importar_json_individual(dados):
             print(f"    [WARN] Não foi possível converter preço: {produto.get('preco', '')}")
             continue
         
-        PrecoVibra.objects.create(
+        afetados.append(PrecoVibra.objects.create(
             posto=posto,
             produto_nome=produto.get('nome', ''),
             produto_codigo=produto.get('codigo', ''),
@@ -123,9 +127,10 @@ def importar_json_individual(dados):
             modalidade=dados.get('modalidade', '') or 'Não especificada',
             data_coleta=timezone.now(),
             disponivel=True
-        )
+        ))
         precos_salvos += 1
     
+    recalcular_snapshot(afetados)
     print(f"  💾 Salvos {precos_salvos} preços")
     
     return (posto.nome_fantasia, precos_salvos)
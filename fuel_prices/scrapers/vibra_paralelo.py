@@ -0,0 +1,401 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║                COLETA PARALELA - PORTAL VIBRA                    ║
+║     Um login, N contextos de navegador isolados, fila de postos  ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. autenticar(): login UMA vez com o posto master; o storage_state do
+   contexto (cookies + localStorage) e a URL do portal são guardados
+2. N threads, cada uma com seu Playwright/navegador (a sync API não é
+   compartilhada entre threads) e um contexto criado a partir do
+   storage_state - sem login repetido, sessões isoladas
+3. Cada thread tira postos de uma fila: abre o portal → Pedidos →
+   trocar_posto → extrair_produtos_pedidos (mesmos passos do VibraScraper)
+4. LimitadorTaxa: intervalo mínimo entre o início de dois postos, para
+   não disparar 11 trocas de empresa ao mesmo tempo no portal
+5. Cada posto tem `tentativas` com espera crescente e página nova; a
+   falha de um posto não derruba os outros
+6. A thread principal grava no banco conforme os postos terminam e
+   fecha a execução com um relatório único (ScrapingLog + JSON)
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+VIBRA_SCRAPER_CONTEXTOS = 4         # contextos (threads) simultâneos
+VIBRA_SCRAPER_TENTATIVAS = 3        # tentativas por posto
+VIBRA_SCRAPER_INTERVALO_MIN = 2.0   # segundos entre inícios de posto
+VIBRA_SCRAPER_PASTA_SAIDA = 'arquivo/coletas_vibra'  # JSON de cada coleta
+VIBRA_PORTAL_USUARIO / VIBRA_PORTAL_SENHA           # login do posto master (variáveis de ambiente)
+
+Uso:
+    python vibra_scraper.py --paralelo 4 [--postos 95406 107469]
+    python manage.py scrape_vibra --all --paralelo 4
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from playwright.sync_api import sync_playwright
+
+from fuel_prices.models import PriceSource, ScrapingLog
+from fuel_prices.scrapers.vibra_scraper import VibraScraper
+
+
+# pasta_saida não informada → VIBRA_SCRAPER_PASTA_SAIDA (None continua = não grava)
+PASTA_CONFIGURADA = object()
+
+
+class LimitadorTaxa:
+    """Garante um intervalo mínimo entre chamadas de aguardar() (entre threads)"""
+
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._proximo = 0.0
+
+    def aguardar(self):
+        with self._lock:
+            agora = time.monotonic()
+            espera = max(0.0, self._proximo - agora)
+            self._proximo = max(agora, self._proximo) + self.intervalo
+        if espera:
+            time.sleep(espera)
+        return espera
+
+
+class ColetorParaleloVibra:
+    """
+    Coleta vários postos ao mesmo tempo reaproveitando um único login.
+
+    Args:
+        scraper (VibraScraper): credenciais, URL e passos de navegação/extração
+        contextos (int): contextos de navegador simultâneos
+        tentativas (int): tentativas por posto
+        intervalo_min (float): segundos entre o início de dois postos
+        timeout_pagina (int): timeout padrão das ações da página (ms)
+        pasta_saida (str): onde gravar os JSON (padrão VIBRA_SCRAPER_PASTA_SAIDA;
+                           None = não grava)
+    """
+
+    def __init__(self, scraper, contextos=None, tentativas=None, intervalo_min=None,
+                 timeout_pagina=30000, pasta_saida=PASTA_CONFIGURADA):
+        self.scraper = scraper
+        self.contextos = max(1, contextos or getattr(settings, 'VIBRA_SCRAPER_CONTEXTOS', 4))
+        self.tentativas = max(1, tentativas or getattr(settings, 'VIBRA_SCRAPER_TENTATIVAS', 3))
+        if intervalo_min is None:
+            intervalo_min = getattr(settings, 'VIBRA_SCRAPER_INTERVALO_MIN', 2.0)
+        self.limitador = LimitadorTaxa(intervalo_min)
+        self.timeout_pagina = timeout_pagina
+        if pasta_saida is PASTA_CONFIGURADA:
+            pasta_saida = getattr(settings, 'VIBRA_SCRAPER_PASTA_SAIDA', None)
+        self.pasta_saida = pasta_saida
+        self.viewport = {'width': 1920, 'height': 1080}
+
+    # ------------------------------------------------------------
+    # Login único
+    # ------------------------------------------------------------
+
+    def autenticar(self, playwright):
+        """
+        Faz login uma vez e devolve o estado da sessão
+
+        Returns:
+            tuple: (storage_state, url_portal)
+        """
+        browser = playwright.chromium.launch(headless=True)
+        try:
+            context = self.scraper.preparar_contexto(browser.new_context(viewport=self.viewport))
+            page = context.new_page()
+            page.set_default_timeout(self.timeout_pagina)
+            self.scraper.login(page)
+            return context.storage_state(), page.url
+        finally:
+            browser.close()
+
+    # ------------------------------------------------------------
+    # Trabalho por posto
+    # ------------------------------------------------------------
+
+    def _nova_pagina(self, context):
+        page = context.new_page()
+        page.set_default_timeout(self.timeout_pagina)
+        return page
+
+    def _coletar_posto(self, page, posto, url_portal):
+        """Passos do VibraScraper para um posto numa sessão já autenticada"""
+        page.goto(url_portal)
+        try:
+            page.wait_for_load_state('networkidle', timeout=self.timeout_pagina)
+        except Exception:
+            pass
+        self.scraper.close_popups(page, max_attempts=5)
+        self.scraper.navegar_pedidos(page)
+        self.scraper.trocar_posto(page, posto['cnpj'])
+
+        dados = self.scraper.extrair_produtos_pedidos(page)
+        if not dados['produtos']:
+            raise Exception('Nenhum produto extraído')
+        return dados
+
+    def _coletar_com_tentativas(self, context, page, posto, url_portal, contexto_id):
+        """
+        Returns:
+            tuple: (página em uso, resultado do posto)
+        """
+        resultado = {
+            'codigo': posto['codigo'],
+            'nome': posto['nome'],
+            'cnpj': posto['cnpj'],
+            'contexto': contexto_id,
+            'status': 'falha',
+            'tentativas': 0,
+            'produtos': 0,
+            'erros': [],
+            'dados': None,
+        }
+        inicio = time.perf_counter()
+
+        for tentativa in range(1, self.tentativas + 1):
+            resultado['tentativas'] = tentativa
+            self.limitador.aguardar()
+            try:
+                dados = self._coletar_posto(page, posto, url_portal)
+                resultado.update(status='sucesso', produtos=len(dados['produtos']), dados=dados)
+                break
+            except Exception as e:
+                resultado['erros'].append(f'{tentativa}: {e}')
+                print(f"  [WARN] [ctx {contexto_id}] {posto['nome']} - tentativa {tentativa}/{self.tentativas} falhou: {e}")
+                if tentativa < self.tentativas:
+                    time.sleep(2 ** (tentativa - 1))
+                    # Página nova: descarta diálogos/estado quebrado da tentativa anterior
+                    try:
+                        page.close()
+                    except Exception:
+                        pass
+                    page = self._nova_pagina(context)
+
+        resultado['duracao'] = round(time.perf_counter() - inicio, 2)
+        return page, resultado
+
+    def _trabalhador(self, contexto_id, fila, resultados, estado, url_portal):
+        try:
+            with sync_playwright() as p:
+                browser = p.chromium.launch(headless=True)
+                try:
+                    context = self.scraper.preparar_contexto(
+                        browser.new_context(storage_state=estado, viewport=self.viewport)
+                    )
+                    page = self._nova_pagina(context)
+                    while True:
+                        try:
+                            posto = fila.get_nowait()
+                        except queue.Empty:
+                            break
+                        print(f"🏢 [ctx {contexto_id}] {posto['nome']} ({posto['codigo']})")
+                        page, resultado = self._coletar_com_tentativas(
+                            context, page, posto, url_portal, contexto_id
+                        )
+                        resultados.put(resultado)
+                finally:
+                    browser.close()
+        except Exception as e:
+            print(f"  [ERROR] [ctx {contexto_id}] Contexto encerrado: {e}")
+
+    # ------------------------------------------------------------
+    # Execução completa
+    # ------------------------------------------------------------
+
+    def executar(self, postos, codigos_para_salvar=None, log=None, ao_concluir_posto=None):
+        """
+        Coleta os postos em paralelo, grava no banco e gera o relatório
+
+        Args:
+            postos (list): dicts {'codigo', 'razao', 'nome', 'cnpj'}
+            codigos_para_salvar (set): postos que vão para o banco (None = todos)
+            log (ScrapingLog): log já criado (ex.: pela fila do scraper)
+            ao_concluir_posto (callable): chamado na thread principal com o
+                resultado de cada posto, depois de gravado no banco
+
+        Returns:
+            dict: relatório da execução (também salvo no ScrapingLog)
+        """
+        if codigos_para_salvar is None:
+            codigos_para_salvar = {posto['codigo'] for posto in postos}
+
+        if log is None:
+            log = ScrapingLog.objects.create(source=PriceSource.VIBRA_PORTAL, started_at=timezone.now())
+        inicio = time.perf_counter()
+
+        print("\n" + "=" * 60)
+        print(f"[BROWSER] Coleta paralela: {len(postos)} posto(s), {self.contextos} contexto(s)")
+        print("=" * 60)
+
+        try:
+            with sync_playwright() as p:
+                estado, url_portal = self.autenticar(p)
+        except Exception as e:
+            log.finish('failed', error_message=f'Login falhou: {e}')
+            raise
+
+        fila = queue.Queue()
+        for posto in postos:
+            fila.put(posto)
+        resultados = queue.Queue()
+
+        threads = [
+            threading.Thread(
+                target=self._trabalhador, args=(n, fila, resultados, estado, url_portal), daemon=True
+            )
+            for n in range(1, min(self.contextos, len(postos)) + 1)
+        ]
+        for thread in threads:
+            thread.start()
+
+        # Grava no banco na thread principal, conforme os postos terminam
+        por_codigo = {}
+        while len(por_codigo) < len(postos):
+            try:
+                resultado = resultados.get(timeout=1)
+            except queue.Empty:
+                if not any(thread.is_alive() for thread in threads) and resultados.empty():
+                    break
+                continue
+
+            por_codigo[resultado['codigo']] = resultado
+            posto = next(p for p in postos if p['codigo'] == resultado['codigo'])
+            if resultado['status'] == 'sucesso' and resultado['codigo'] in codigos_para_salvar:
+                salvo = self.scraper.salvar_no_banco(resultado['dados'], posto)
+                resultado['inseridos'] = salvo['inseridos'] if salvo else 0
+                resultado['ignorados'] = salvo['ignorados'] if salvo else 0
+            print(f"{'✅' if resultado['status'] == 'sucesso' else '❌'} {resultado['nome']}: "
+                  f"{resultado['produtos']} produtos, {resultado['tentativas']} tentativa(s), {resultado['duracao']}s")
+            if ao_concluir_posto is not None:
+                ao_concluir_posto(resultado)
+
+        # Postos que nenhum contexto conseguiu pegar (ex.: navegador não abriu)
+        for posto in postos:
+            if posto['codigo'] not in por_codigo:
+                por_codigo[posto['codigo']] = {
+                    'codigo': posto['codigo'], 'nome': posto['nome'], 'cnpj': posto['cnpj'],
+                    'contexto': None, 'status': 'falha', 'tentativas': 0, 'produtos': 0,
+                    'erros': ['nenhum contexto disponível'], 'dados': None, 'duracao': 0.0,
+                }
+
+        relatorio = self._relatorio(log, [por_codigo[posto['codigo']] for posto in postos], codigos_para_salvar,
+                                    time.perf_counter() - inicio)
+        self._finalizar_log(log, relatorio)
+        self._salvar_arquivos(relatorio, postos, por_codigo, codigos_para_salvar)
+        self._imprimir(relatorio)
+        return relatorio
+
+    def _relatorio(self, log, resultados, codigos_para_salvar, duracao_total):
+        sucesso = [r for r in resultados if r['status'] == 'sucesso']
+        tempo_somado = sum(r['duracao'] for r in resultados)
+        return {
+            'inicio': log.started_at.isoformat(),
+            'fim': timezone.now().isoformat(),
+            'data_coleta': datetime.now().strftime("%H:%M %d/%m/%Y"),
+            'contextos': self.contextos,
+            'duracao_total': round(duracao_total, 2),
+            'tempo_somado_postos': round(tempo_somado, 2),
+            'ganho_paralelo': round(tempo_somado / duracao_total, 2) if duracao_total > 0 else None,
+            'postos_total': len(resultados),
+            'postos_sucesso': len(sucesso),
+            'postos_falha': len(resultados) - len(sucesso),
+            'produtos_total': sum(r['produtos'] for r in resultados),
+            'precos_salvos': sum(r.get('inseridos', 0) for r in resultados),
+            'precos_ignorados': sum(r.get('ignorados', 0) for r in resultados),
+            'postos': [{k: v for k, v in r.items() if k != 'dados'} for r in resultados],
+        }
+
+    def _finalizar_log(self, log, relatorio):
+        if relatorio['postos_falha'] == 0:
+            status = 'success'
+        elif relatorio['postos_sucesso']:
+            status = 'partial'
+        else:
+            status = 'failed'
+        erros = [
+            f"{p['nome']}: {p['erros'][-1]}" for p in relatorio['postos'] if p['status'] != 'sucesso'
+        ]
+        log.errors_count = sum(len(p['erros']) for p in relatorio['postos'])
+        log.log_details = relatorio
+        log.finish(status, prices_count=relatorio['precos_salvos'], error_message='\n'.join(erros))
+
+    def _salvar_arquivos(self, relatorio, postos, por_codigo, codigos_para_salvar):
+        if not self.pasta_saida:
+            return
+        os.makedirs(self.pasta_saida, exist_ok=True)
+
+        todos_dados = []
+        for posto in postos:
+            resultado = por_codigo[posto['codigo']]
+            if resultado['status'] == 'sucesso' and posto['codigo'] in codigos_para_salvar:
+                dados = dict(resultado['dados'], codigo_vibra=posto['codigo'],
+                             razao_social=posto['razao'], cnpj=posto['cnpj'])
+                todos_dados.append(dados)
+
+        with open(os.path.join(self.pasta_saida, 'vibra_precos_TODOS_POSTOS.json'), 'w', encoding='utf-8') as f:
+            json.dump(todos_dados, f, ensure_ascii=False, indent=2)
+        with open(os.path.join(self.pasta_saida, 'vibra_relatorio_coleta.json'), 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+    def _imprimir(self, relatorio):
+        print("\n" + "=" * 60)
+        print("[OK] COLETA PARALELA CONCLUÍDA")
+        print(f"   Postos: {relatorio['postos_sucesso']}/{relatorio['postos_total']} com sucesso")
+        print(f"   Produtos: {relatorio['produtos_total']} | Preços salvos: {relatorio['precos_salvos']} "
+              f"({relatorio['precos_ignorados']} repetidos ignorados)")
+        print(f"   Tempo total: {relatorio['duracao_total']}s "
+              f"(soma dos postos: {relatorio['tempo_somado_postos']}s, ganho {relatorio['ganho_paralelo']}x)")
+        for posto in relatorio['postos']:
+            if posto['status'] != 'sucesso':
+                print(f"   ❌ {posto['nome']}: {posto['erros'][-1]}")
+        print("=" * 60)
+
+
+def credenciais_portal():
+    """
+    Usuário e senha do posto master (settings VIBRA_PORTAL_USUARIO / VIBRA_PORTAL_SENHA)
+
+    Raises:
+        ImproperlyConfigured: credencial não configurada
+    """
+    usuario = getattr(settings, 'VIBRA_PORTAL_USUARIO', '')
+    senha = getattr(settings, 'VIBRA_PORTAL_SENHA', '')
+    if not usuario or not senha:
+        raise ImproperlyConfigured(
+            'Credencial do portal Vibra ausente: defina VIBRA_PORTAL_USUARIO e VIBRA_PORTAL_SENHA'
+        )
+    return usuario, senha
+
+
+def main_paralelo(codigos_selecionados=None, contextos=None, pasta_saida=PASTA_CONFIGURADA, **opcoes):
+    """
+    Versão paralela do main(): mesmos postos, login único, N contextos
+
+    Args:
+        codigos_selecionados: códigos dos postos (None = todos os 11)
+        contextos: contextos simultâneos (None = VIBRA_SCRAPER_CONTEXTOS)
+        pasta_saida: onde gravar os JSON (padrão VIBRA_SCRAPER_PASTA_SAIDA; None = não grava)
+        **opcoes: repassadas a ColetorParaleloVibra.executar (log, ao_concluir_posto)
+    """
+    from fuel_prices.scrapers.vibra_scraper import TODOS_POSTOS
+
+    usuario, senha = credenciais_portal()
+    scraper = VibraScraper(username=usuario, password=senha, headless=True)
+
+    if codigos_selecionados:
+        postos = [TODOS_POSTOS[codigo] for codigo in codigos_selecionados if codigo in TODOS_POSTOS]
+    else:
+        postos = list(TODOS_POSTOS.values())
+
+    return ColetorParaleloVibra(scraper, contextos=contextos, pasta_saida=pasta_saida).executar(postos, **opcoes)
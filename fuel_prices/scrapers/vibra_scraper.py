@@ -15,23 +15,61 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'logos.settings')
 django.setup()
 
-from fuel_prices.models import PostoVibra, PrecoVibra
+from django.conf import settings
+
+from fuel_prices.ingestao_precos import ingerir_precos
+from fuel_prices.scrapers.extracao_rapida import (
+    bloquear_recursos, extrair_rapido, fechar_popups, interpretar_card,
+)
+
+
+# POSTO MASTER (Casa Caiada) - SEMPRE O PRIMEIRO
+# Este é o posto da senha mestre (95406), então sempre começamos por ele
+CODIGO_MASTER = '95406'
+
+# Lista completa dos 11 postos do Grupo Lisboa
+TODOS_POSTOS = {
+    '95406': {'codigo': '95406', 'razao': 'AUTO POSTO CASA CAIADA LTDA', 'nome': 'AP CASA CAIADA', 'cnpj': '04284939000186'},
+    '107469': {'codigo': '107469', 'razao': 'POSTO ENSEADA DO NORTE LTDA', 'nome': 'POSTO ENSEADA DO NOR', 'cnpj': '00338804000103'},
+    '11236': {'codigo': '11236', 'razao': 'REAL RECIFE LTDA', 'nome': 'POSTO REAL', 'cnpj': '24156978000105'},
+    '1153963': {'codigo': '1153963', 'razao': 'POSTO CIDADE PATRIMONIO LTDA', 'nome': 'POSTO AVENIDA', 'cnpj': '05428059000280'},
+    '124282': {'codigo': '124282', 'razao': 'R.J. COMBUSTIVEIS E LUBRIFICANTES L', 'nome': 'R J', 'cnpj': '08726064000186'},
+    '14219': {'codigo': '14219', 'razao': 'AUTO POSTO GLOBO LTDA', 'nome': 'GLOBO105', 'cnpj': '41043647000188'},
+    '156075': {'codigo': '156075', 'razao': 'DISTRIBUIDORA R S DERIVADO DE PETRO', 'nome': 'POSTO BR SHOPPING', 'cnpj': '07018760000175'},
+    '1775869': {'codigo': '1775869', 'razao': 'POSTO DOZE COMERCIO DE COMBUSTIVEIS', 'nome': 'POSTO DOZE', 'cnpj': '52308604000101'},
+    '5039': {'codigo': '5039', 'razao': 'RIO DOCE COMERCIO E SERVICOS LTDA', 'nome': 'POSTO VIP', 'cnpj': '03008754000186'},
+    '61003': {'codigo': '61003', 'razao': 'AUTO POSTO IGARASSU LTDA.', 'nome': 'P IGARASSU', 'cnpj': '04274378000134'},
+    '94762': {'codigo': '94762', 'razao': 'POSTO CIDADE PATRIMONIO LTDA', 'nome': 'CIDADE PATRIMONIO', 'cnpj': '05428059000107'},
+}
 
 
 class VibraScraper:
     """Scraper do portal Vibra Energia"""
     
-    def __init__(self, username: str, password: str, headless: bool = False):
+    def __init__(self, username: str, password: str, headless: bool = False, login_url: str = None,
+                 modo_rapido: bool = None):
         """
         Args:
             username: Login do portal Vibra
             password: Senha do portal Vibra
             headless: Se True, roda sem abrir navegador visível
+            login_url: URL de login (padrão: portal Vibra; outro valor p/ testes)
+            modo_rapido: Extração num único page.evaluate + bloqueio de recursos
+                         (padrão: settings.VIBRA_EXTRACAO_RAPIDA)
         """
         self.username = username
         self.password = password
         self.headless = headless
-        self.login_url = "https://cn.vibraenergia.com.br/login/"
+        self.login_url = login_url or "https://cn.vibraenergia.com.br/login/"
+        if modo_rapido is None:
+            modo_rapido = getattr(settings, 'VIBRA_EXTRACAO_RAPIDA', True)
+        self.modo_rapido = modo_rapido
+
+    def preparar_contexto(self, context):
+        """No modo rápido, bloqueia imagens/fontes/analytics do contexto"""
+        if self.modo_rapido:
+            bloquear_recursos(context)
+        return context
         
     def close_popups(self, page, max_attempts=15):
         """
@@ -40,6 +78,9 @@ class VibraScraper:
         OTIMIZADO: Sleeps reduzidos e parada após 2 tentativas vazias
         """
         print("[INFO] Fechando modais...")
+
+        if self.modo_rapido:
+            return fechar_popups(page, max_attempts=max_attempts)
         
         modals_fechados = 0
         tentativas_vazias = 0
@@ -360,7 +401,17 @@ class VibraScraper:
         Retorna: dict com nome_posto, modalidade e lista de produtos
         """
         print("\n📦 EXTRAINDO PRODUTOS...")
-        
+
+        if self.modo_rapido:
+            try:
+                return extrair_rapido(page)
+            except Exception as e:
+                print(f"  [WARN] Extração rápida falhou ({e}) - usando extração por seletor")
+
+        return self.extrair_produtos_por_seletor(page)
+
+    def extrair_produtos_por_seletor(self, page):
+        """Extração antiga: um seletor/inner_text por vez (fallback do modo rápido)"""
         # 1. Extrair nome do posto (topo da página)
         try:
             # Tentar diferentes seletores para o nome do posto
@@ -468,14 +519,6 @@ class VibraScraper:
         
         for i, card in enumerate(cards, 1):
             try:
-                # Extrair informações do card usando seletores do Codegen
-                produto_info = {
-                    'nome': None,
-                    'base': None,
-                    'preco': None,
-                    'prazo': None
-                }
-                
                 # Pegar todo o texto do card
                 texto_card = card.inner_text()
                 
@@ -483,43 +526,10 @@ class VibraScraper:
                 print(f"\n    📦 Card {i}:")
                 print(f"    Texto: {texto_card[:150]}")
                 
-                # Verificar se está indisponível
-                if 'indisponível' in texto_card.lower() or 'indisponivel' in texto_card.lower():
-                    print(f"    [WARN] Indisponível - pulando")
-                    continue
-                
-                # Extrair dados linha por linha
-                linhas = [l.strip() for l in texto_card.split('\n') if l.strip()]
-                
-                for idx, linha in enumerate(linhas):
-                    linha_lower = linha.lower()
-                    
-                    # Nome do produto (primeira linha ou linha com nome do combustível)
-                    if not produto_info['nome']:
-                        if any(comb in linha_lower for comb in ['etanol', 'gasolina', 'diesel', 'arla', 'gnv']):
-                            produto_info['nome'] = linha
-                        elif idx == 0 and linha_lower not in ['disponível', 'em estoque']:
-                            produto_info['nome'] = linha
-                    
-                    # Preço (contém "R$" ou "Preço:")
-                    if 'r$' in linha_lower or 'preço:' in linha_lower or 'preco:' in linha_lower:
-                        if not produto_info['preco']:
-                            produto_info['preco'] = linha
-                    
-                    # Prazo (contém "dia" ou "prazo")
-                    if 'dia' in linha_lower and 'prazo' not in linha_lower:
-                        if not produto_info['prazo']:
-                            produto_info['prazo'] = linha
-                    
-                    # Base (contém "base")
-                    if 'base' in linha_lower:
-                        produto_info['base'] = linha
+                # Mesmas regras do modo rápido (prazo forçado em 3 Dias)
+                produto_info = interpretar_card(texto_card)
                 
-                # Se conseguiu extrair pelo menos nome, verificar se já existe
-                if produto_info['nome']:
-                    # FORÇAR PRAZO DE 3 DIAS PARA TODOS OS PRODUTOS
-                    produto_info['prazo'] = '3 Dias'
-                    
+                if produto_info:
                     # Usar nome como chave para evitar duplicatas
                     if produto_info['nome'] not in produtos_unicos:
                         produtos_unicos[produto_info['nome']] = produto_info
@@ -530,7 +540,7 @@ class VibraScraper:
                     else:
                         print(f"    [WARN] Duplicado - ignorando")
                 else:
-                    print(f"    [WARN] Não conseguiu extrair nome do produto")
+                    print(f"    [WARN] Indisponível ou sem nome - pulando")
                 
             except Exception as e:
                 print(f"    [ERROR] Erro ao processar card {i}: {e}")
@@ -564,55 +574,19 @@ class VibraScraper:
         Args:
             dados: Dicionário com produtos extraídos
             posto_info: Dicionário com informações do posto (codigo, nome, razao, cnpj)
+        
+        Returns:
+            dict com inseridos/ignorados/erros (ingerir_precos) ou False se falhou
         """
         try:
-            from django.utils import timezone as django_tz
+            # Valida tudo, ignora leituras repetidas e grava em lote (uma transação)
+            resultado = ingerir_precos(posto_info, dados['produtos'], modalidade=dados.get('modalidade') or '')
             
-            # Criar ou atualizar posto
-            posto, created = PostoVibra.objects.get_or_create(
-                cnpj=posto_info['cnpj'],
-                defaults={
-                    'codigo_vibra': posto_info['codigo'],
-                    'razao_social': posto_info['razao'],
-                    'nome_fantasia': posto_info['nome'],
-                }
-            )
-            
-            if not created:
-                # Atualizar informações se já existe
-                posto.codigo_vibra = posto_info['codigo']
-                posto.razao_social = posto_info['razao']
-                posto.nome_fantasia = posto_info['nome']
-                posto.save()
-            
-            # Salvar preços
-            precos_salvos = 0
-            for produto in dados['produtos']:
-                # Converter preço de string para decimal
-                # Formato: "Preço: R$ 3,6377" -> 3.6377
-                preco_str = produto.get('preco', '')
-                preco_str = preco_str.replace('Preço:', '').replace('R$', '').replace('.', '').replace(',', '.').strip()
-                try:
-                    preco_decimal = float(preco_str)
-                except:
-                    print(f"  [WARN] Não foi possível converter preço: {produto.get('preco', '')}")
-                    continue
-                
-                PrecoVibra.objects.create(
-                    posto=posto,
-                    produto_nome=produto['nome'],
-                    produto_codigo=produto.get('codigo', ''),
-                    preco=preco_decimal,
-                    prazo_pagamento=produto.get('prazo', ''),
-                    base_distribuicao=produto.get('base', ''),
-                    modalidade=dados.get('modalidade', ''),
-                    data_coleta=django_tz.now(),
-                    disponivel=True
-                )
-                precos_salvos += 1
-            
-            print(f"  [SAVE] Salvo no banco: {precos_salvos} preços")
-            return True
+            for erro in resultado['erros']:
+                print(f"  [WARN] {erro['produto'] or 'Produto'}: {erro['erro']}")
+            print(f"  [SAVE] Salvo no banco: {resultado['inseridos']} preços "
+                  f"({resultado['ignorados']} repetidos ignorados)")
+            return resultado
             
         except Exception as e:
             print(f"  [WARN] Erro ao salvar no banco: {e}")
@@ -638,7 +612,7 @@ class VibraScraper:
         with sync_playwright() as p:
             # Iniciar navegador
             browser = p.chromium.launch(headless=self.headless)
-            context = browser.new_context(viewport={'width': 1920, 'height': 1080})
+            context = self.preparar_contexto(browser.new_context(viewport={'width': 1920, 'height': 1080}))
             page = context.new_page()
             
             try:
@@ -743,32 +717,19 @@ def main(codigos_selecionados=None):
         codigos_selecionados: Lista de códigos dos postos a processar (ex: ['95406', '107469'])
                             Se None, processa todos os 11 postos
     """
-    # Credenciais do Grupo Lisboa
+    # Import tardio: vibra_paralelo importa este módulo
+    from fuel_prices.scrapers.vibra_paralelo import credenciais_portal
+
+    # Credenciais do Grupo Lisboa (VIBRA_PORTAL_USUARIO / VIBRA_PORTAL_SENHA)
+    usuario, senha = credenciais_portal()
     scraper = VibraScraper(
-        username='95406',
-        password='Apcc2350',
+        username=usuario,
+        password=senha,
         headless=False  # False = abre navegador visível para debug
     )
     
-    # POSTO MASTER (Casa Caiada) - SEMPRE O PRIMEIRO
-    # Este é o posto da senha mestre (95406), então sempre começamos por ele
-    CODIGO_MASTER = '95406'
-    posto_master = {'codigo': '95406', 'razao': 'AUTO POSTO CASA CAIADA LTDA', 'nome': 'AP CASA CAIADA', 'cnpj': '04284939000186'}
-    
-    # Lista completa dos 11 postos do Grupo Lisboa
-    todos_postos_dict = {
-        '95406': {'codigo': '95406', 'razao': 'AUTO POSTO CASA CAIADA LTDA', 'nome': 'AP CASA CAIADA', 'cnpj': '04284939000186'},
-        '107469': {'codigo': '107469', 'razao': 'POSTO ENSEADA DO NORTE LTDA', 'nome': 'POSTO ENSEADA DO NOR', 'cnpj': '00338804000103'},
-        '11236': {'codigo': '11236', 'razao': 'REAL RECIFE LTDA', 'nome': 'POSTO REAL', 'cnpj': '24156978000105'},
-        '1153963': {'codigo': '1153963', 'razao': 'POSTO CIDADE PATRIMONIO LTDA', 'nome': 'POSTO AVENIDA', 'cnpj': '05428059000280'},
-        '124282': {'codigo': '124282', 'razao': 'R.J. COMBUSTIVEIS E LUBRIFICANTES L', 'nome': 'R J', 'cnpj': '08726064000186'},
-        '14219': {'codigo': '14219', 'razao': 'AUTO POSTO GLOBO LTDA', 'nome': 'GLOBO105', 'cnpj': '41043647000188'},
-        '156075': {'codigo': '156075', 'razao': 'DISTRIBUIDORA R S DERIVADO DE PETRO', 'nome': 'POSTO BR SHOPPING', 'cnpj': '07018760000175'},
-        '1775869': {'codigo': '1775869', 'razao': 'POSTO DOZE COMERCIO DE COMBUSTIVEIS', 'nome': 'POSTO DOZE', 'cnpj': '52308604000101'},
-        '5039': {'codigo': '5039', 'razao': 'RIO DOCE COMERCIO E SERVICOS LTDA', 'nome': 'POSTO VIP', 'cnpj': '03008754000186'},
-        '61003': {'codigo': '61003', 'razao': 'AUTO POSTO IGARASSU LTDA.', 'nome': 'P IGARASSU', 'cnpj': '04274378000134'},
-        '94762': {'codigo': '94762', 'razao': 'POSTO CIDADE PATRIMONIO LTDA', 'nome': 'CIDADE PATRIMONIO', 'cnpj': '05428059000107'},
-    }
+    posto_master = TODOS_POSTOS[CODIGO_MASTER]
+    todos_postos_dict = TODOS_POSTOS
     
     # Determinar quais postos processar
     if codigos_selecionados:
@@ -825,7 +786,7 @@ def main(codigos_selecionados=None):
     
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=scraper.headless)
-        context = browser.new_context(viewport={'width': 1920, 'height': 1080})
+        context = scraper.preparar_contexto(browser.new_context(viewport={'width': 1920, 'height': 1080}))
         page = context.new_page()
         
         try:
@@ -965,8 +926,15 @@ if __name__ == '__main__':
     # Parser para argumentos de linha de comando
     parser = argparse.ArgumentParser(description='Scraper Vibra Energia - Grupo Lisboa')
     parser.add_argument('--postos', nargs='+', help='Códigos dos postos a processar (ex: 95406 107469)')
+    parser.add_argument('--paralelo', type=int, metavar='N',
+                        help='Coleta paralela com N contextos do navegador (headless, login único)')
     args = parser.parse_args()
     
+    if args.paralelo:
+        from fuel_prices.scrapers.vibra_paralelo import main_paralelo
+        main_paralelo(codigos_selecionados=args.postos, contextos=args.paralelo)
+        sys.exit(0)
+    
     # Se foram passados códigos específicos via linha de comando, usar esses
     if args.postos:
         print(f"\n🎯 Modo seletivo: {len(args.postos)} posto(s) solicitado(s)")
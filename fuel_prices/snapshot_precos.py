@@ -0,0 +1,313 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║              SNAPSHOT DIÁRIO DE PREÇOS - FUEL_PRICES             ║
+║     Último preço por (dia, posto, produto) em tabela própria     ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. Cada coleta (VibraScraper.salvar_no_banco, api_scraper) chama
+   atualizar_snapshot(precos) com os PrecoVibra recém-gravados:
+   - considera só preços disponíveis (disponivel=True): a regra é a
+     mesma da leitura direta no histórico (matriz_precos) - o snapshot
+     guarda o último preço DISPONÍVEL do dia
+   - agrupa por (data local da coleta, posto, produto_nome)
+   - descarta o que é mais antigo que o snapshot atual
+   - grava tudo num único INSERT ... ON CONFLICT DO UPDATE
+2. As leituras (dashboards e APIs) usam snapshot_do_dia() e
+   snapshot_recente(): O(postos × produtos) linhas, independente de
+   quantos meses de histórico o PrecoVibra guarda
+3. Quem altera ou exclui preços já gravados (admin, importar_json)
+   chama recalcular_snapshot(precos) com os preços afetados (antes de
+   excluir): as chaves (dia, posto, produto) deles são refeitas a partir
+   do histórico - atualizar_snapshot() só acrescenta, não retira um preço
+   que deixou de estar disponível
+4. reconstruir_snapshot() refaz um período a partir do histórico e
+   verificar_snapshot() compara snapshot × histórico (só dias ainda na
+   tabela viva - os arquivados por arquivo_precos ficam como estão).
+   Gravação fora desses caminhos (SQL direto, update() em massa) exige
+   python manage.py snapshot_precos_vibra
+5. Toda gravação no snapshot invalida o cache dos feeds Logus
+   (cache_feeds.invalidar_feeds, depois do commit)
+
+Comando: python manage.py snapshot_precos_vibra [--verificar] [--dias N]
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .arquivo_precos import ultimo_dia_arquivado
+from .cache_feeds import invalidar_feeds
+from .models import PrecoVibra, PrecoVibraSnapshot
+
+
+CAMPOS_SNAPSHOT = [
+    'produto_codigo', 'preco', 'prazo_pagamento', 'base_distribuicao',
+    'modalidade', 'data_coleta', 'disponivel', 'preco_origem', 'atualizado_em',
+]
+
+
+def _chave(preco):
+    return (timezone.localdate(preco.data_coleta), preco.posto_id, preco.produto_nome)
+
+
+def _mais_recente(preco_a, preco_b):
+    """True se `preco_a` é posterior a `preco_b` (coleta, depois id)"""
+    return (preco_a.data_coleta, preco_a.pk or 0) >= (preco_b.data_coleta, preco_b.pk or 0)
+
+
+# ============================================================
+# ✍️ ATUALIZAÇÃO INCREMENTAL
+# ============================================================
+
+def atualizar_snapshot(precos):
+    """
+    Atualiza o snapshot com preços recém-gravados no PrecoVibra
+
+    Args:
+        precos: iterável de PrecoVibra (já salvos)
+
+    Returns:
+        int: linhas do snapshot inseridas/atualizadas
+    """
+    candidatos = {}
+    for preco in precos:
+        if not preco.disponivel:
+            continue
+        chave = _chave(preco)
+        atual = candidatos.get(chave)
+        if atual is None or _mais_recente(preco, atual):
+            candidatos[chave] = preco
+
+    if not candidatos:
+        return 0
+
+    # Não sobrescrever um snapshot mais novo (ex.: reprocessamento fora de ordem)
+    existentes = PrecoVibraSnapshot.objects.filter(
+        data__in={chave[0] for chave in candidatos},
+        posto_id__in={chave[1] for chave in candidatos},
+        produto_nome__in={chave[2] for chave in candidatos},
+    ).order_by().values_list('data', 'posto_id', 'produto_nome', 'data_coleta', 'preco_origem_id')
+
+    for data, posto_id, produto_nome, data_coleta, origem_id in existentes:
+        chave = (data, posto_id, produto_nome)
+        preco = candidatos.get(chave)
+        if preco is not None and (preco.data_coleta, preco.pk or 0) < (data_coleta, origem_id or 0):
+            del candidatos[chave]
+
+    linhas = [
+        PrecoVibraSnapshot(
+            data=data,
+            posto_id=posto_id,
+            produto_nome=produto_nome,
+            produto_codigo=preco.produto_codigo or '',
+            preco=preco.preco,
+            prazo_pagamento=preco.prazo_pagamento,
+            base_distribuicao=preco.base_distribuicao,
+            modalidade=preco.modalidade,
+            data_coleta=preco.data_coleta,
+            disponivel=preco.disponivel,
+            preco_origem_id=preco.pk,
+        )
+        for (data, posto_id, produto_nome), preco in candidatos.items()
+    ]
+
+    PrecoVibraSnapshot.objects.bulk_create(
+        linhas,
+        update_conflicts=True,
+        unique_fields=['data', 'posto', 'produto_nome'],
+        update_fields=CAMPOS_SNAPSHOT,
+    )
+    transaction.on_commit(invalidar_feeds)
+    return len(linhas)
+
+
+# ============================================================
+# 📖 LEITURA
+# ============================================================
+
+def snapshot_do_dia(data, apenas_postos_ativos=True):
+    """
+    Último preço disponível de cada (posto, produto) no dia
+
+    Returns:
+        list[PrecoVibraSnapshot]: com o posto carregado - mesmos atributos que
+        o PrecoVibra usa na matriz (posto, produto_nome, preco, prazo_pagamento...)
+    """
+    linhas = PrecoVibraSnapshot.objects.filter(data=data, disponivel=True)
+    if apenas_postos_ativos:
+        linhas = linhas.filter(posto__ativo=True)
+    return list(linhas.select_related('posto'))
+
+
+def snapshot_recente(desde, apenas_postos_ativos=True):
+    """
+    Último preço disponível de cada (posto, produto) coletado a partir de `desde`
+
+    Lê no máximo os dias cobertos pelo período (ex.: 24h → hoje e ontem).
+
+    Returns:
+        list[PrecoVibraSnapshot]: um por (posto, produto), mais recente primeiro
+    """
+    linhas = PrecoVibraSnapshot.objects.filter(
+        data__gte=timezone.localdate(desde),
+        data_coleta__gte=desde,
+        disponivel=True,
+    )
+    if apenas_postos_ativos:
+        linhas = linhas.filter(posto__ativo=True)
+
+    ultimos = {}
+    for linha in linhas.select_related('posto').order_by('-data_coleta', '-preco_origem_id'):
+        ultimos.setdefault((linha.posto_id, linha.produto_nome), linha)
+    return list(ultimos.values())
+
+
+def datas_com_snapshot(desde):
+    """Dias com preço disponível a partir de `desde` (mais recente primeiro)"""
+    return list(
+        PrecoVibraSnapshot.objects.filter(data__gte=timezone.localdate(desde), disponivel=True)
+        .order_by('-data').values_list('data', flat=True).distinct()
+    )
+
+
+# ============================================================
+# 🔁 RECONSTRUÇÃO E CONFERÊNCIA
+# ============================================================
+
+def _inicio_tabela_viva(data_inicio):
+    """Dias já arquivados (arquivo_precos) não estão mais no PrecoVibra"""
+    arquivado = ultimo_dia_arquivado()
+    if arquivado is not None and (data_inicio is None or data_inicio <= arquivado):
+        return arquivado + timedelta(days=1)
+    return data_inicio
+
+
+def _historico(data_inicio=None, data_fim=None):
+    precos = PrecoVibra.objects.all()
+    if data_inicio is not None:
+        precos = precos.filter(data_coleta__date__gte=data_inicio)
+    if data_fim is not None:
+        precos = precos.filter(data_coleta__date__lte=data_fim)
+    return precos
+
+
+def _snapshots(data_inicio=None, data_fim=None):
+    linhas = PrecoVibraSnapshot.objects.all()
+    if data_inicio is not None:
+        linhas = linhas.filter(data__gte=data_inicio)
+    if data_fim is not None:
+        linhas = linhas.filter(data__lte=data_fim)
+    return linhas
+
+
+def reconstruir_snapshot(data_inicio=None, data_fim=None, tamanho_lote=5000):
+    """
+    Refaz o snapshot do período a partir do histórico do PrecoVibra
+
+    Apaga as linhas do período e reprocessa o histórico em lotes (ordem de
+    coleta), então o resultado não depende de quantos lotes foram usados.
+
+    Returns:
+        dict: {'precos_lidos': int, 'linhas': int}
+    """
+    data_inicio = _inicio_tabela_viva(data_inicio)
+    precos_lidos = 0
+    with transaction.atomic():
+        _snapshots(data_inicio, data_fim).delete()
+
+        lote = []
+        historico = _historico(data_inicio, data_fim).order_by('data_coleta', 'id')
+        for preco in historico.iterator(chunk_size=tamanho_lote):
+            lote.append(preco)
+            if len(lote) >= tamanho_lote:
+                atualizar_snapshot(lote)
+                precos_lidos += len(lote)
+                lote = []
+        if lote:
+            atualizar_snapshot(lote)
+            precos_lidos += len(lote)
+
+    return {
+        'precos_lidos': precos_lidos,
+        'linhas': _snapshots(data_inicio, data_fim).count(),
+    }
+
+
+def recalcular_snapshot(precos):
+    """
+    Refaz as chaves (dia, posto, produto) de preços alterados ou excluídos
+
+    Args:
+        precos: iterável de PrecoVibra com os valores antigos (para exclusão,
+            lidos antes de excluir) e/ou novos - só as chaves importam
+
+    Returns:
+        int: chaves recalculadas
+    """
+    chaves = {_chave(preco) for preco in precos}
+    arquivado = ultimo_dia_arquivado()
+    if arquivado is not None:
+        # Dias arquivados não têm mais histórico: o snapshot deles fica como está
+        chaves = {chave for chave in chaves if chave[0] > arquivado}
+    if not chaves:
+        return 0
+
+    datas = {chave[0] for chave in chaves}
+    postos = {chave[1] for chave in chaves}
+    produtos = {chave[2] for chave in chaves}
+
+    with transaction.atomic():
+        linhas = _snapshots(min(datas), max(datas)).filter(posto_id__in=postos, produto_nome__in=produtos)
+        PrecoVibraSnapshot.objects.filter(id__in=[
+            linha_id for linha_id, *chave in linhas.values_list('id', 'data', 'posto_id', 'produto_nome')
+            if tuple(chave) in chaves
+        ]).delete()
+
+        historico = _historico(min(datas), max(datas)).filter(
+            posto_id__in=postos, produto_nome__in=produtos, disponivel=True,
+        ).order_by('data_coleta', 'id')
+        atualizar_snapshot(preco for preco in historico if _chave(preco) in chaves)
+        # Chave que ficou sem preço disponível não passa por atualizar_snapshot
+        transaction.on_commit(invalidar_feeds)
+
+    return len(chaves)
+
+
+def verificar_snapshot(data_inicio=None, data_fim=None):
+    """
+    Compara o snapshot com o último preço disponível de cada (dia, posto,
+    produto) do histórico
+
+    Returns:
+        dict: conferidos, faltando, sobrando e divergentes (listas de chaves
+              (data, posto_id, produto_nome))
+    """
+    data_inicio = _inicio_tabela_viva(data_inicio)
+    esperado = {}
+    historico = _historico(data_inicio, data_fim).filter(disponivel=True).order_by('-data_coleta', '-id').values_list(
+        'id', 'posto_id', 'produto_nome', 'preco', 'data_coleta', 'disponivel'
+    )
+    for preco_id, posto_id, produto_nome, preco, data_coleta, disponivel in historico.iterator():
+        chave = (timezone.localdate(data_coleta), posto_id, produto_nome)
+        esperado.setdefault(chave, (preco, data_coleta, disponivel))
+
+    atual = {
+        (data, posto_id, produto_nome): (preco, data_coleta, disponivel)
+        for data, posto_id, produto_nome, preco, data_coleta, disponivel in
+        _snapshots(data_inicio, data_fim).order_by().values_list(
+            'data', 'posto_id', 'produto_nome', 'preco', 'data_coleta', 'disponivel'
+        ).iterator()
+    }
+
+    return {
+        'conferidos': len(esperado),
+        'faltando': sorted(chave for chave in esperado if chave not in atual),
+        'sobrando': sorted(chave for chave in atual if chave not in esperado),
+        'divergentes': sorted(
+            chave for chave, valores in esperado.items()
+            if chave in atual and atual[chave] != valores
+        ),
+    }
@@ -1,3 +1,391 @@
-from django.test import TestCase
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .delta_precos import aguardar_precos
+from .ingestao_precos import converter_preco, ingerir_precos
+from .models import PrecoVibra, PrecoVibraSnapshot, ScrapingLog
+from .snapshot_precos import atualizar_snapshot, snapshot_do_dia, verificar_snapshot
+
+try:
+    from playwright.sync_api import sync_playwright
+    from .scrapers.extracao_rapida import extrair_rapido, interpretar_cards
+    from .scrapers.vibra_paralelo import ColetorParaleloVibra, LimitadorTaxa
+    from .scrapers.vibra_scraper import VibraScraper
+    PLAYWRIGHT_DISPONIVEL = True
+except ImportError:
+    PLAYWRIGHT_DISPONIVEL = False
+
+
+# ============================================================
+# 📥 INGESTÃO DE PREÇOS
+# ============================================================
+
+POSTO_INGESTAO = {'codigo': '95406', 'cnpj': '11222333000144', 'razao': 'AP CASA CAIADA LTDA', 'nome': 'AP CASA CAIADA'}
+
+
+class ConverterPrecoTests(SimpleTestCase):
+
+    def test_formatos_do_portal(self):
+        self.assertEqual(converter_preco('Preço: R$ 3,6377'), Decimal('3.6377'))
+        self.assertEqual(converter_preco('R$ 1.234,5678'), Decimal('1234.5678'))
+        self.assertEqual(converter_preco(3.6377), Decimal('3.6377'))
+
+    def test_nao_finito_vira_value_error(self):
+        for valor in ('NaN', 'nan', float('nan'), 'Infinity', float('-inf'), '', '0', '-1,00', 'abc'):
+            with self.subTest(valor=valor):
+                with self.assertRaises(ValueError):
+                    converter_preco(valor)
+
+
+class IngestaoPrecosTests(TestCase):
+
+    def _ingerir(self, preco, minutos, produtos=None):
+        return ingerir_precos(
+            POSTO_INGESTAO,
+            produtos or [{'nome': 'GASOLINA C COMUM', 'preco': preco, 'prazo': '3 Dias'}],
+            modalidade='FOB',
+            data_coleta=self.inicio + timedelta(minutes=minutos),
+        )
+
+    def setUp(self):
+        self.inicio = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0)
+
+    def test_repeticao_da_ultima_leitura_e_ignorada(self):
+        self._ingerir('R$ 5,00', 0)
+        resultado = self._ingerir('R$ 5,00', 5)
+
+        self.assertEqual((resultado['inseridos'], resultado['ignorados']), (0, 1))
+        self.assertEqual(PrecoVibra.objects.count(), 1)
+
+    def test_preco_que_volta_ao_valor_anterior_e_gravado(self):
+        for minutos, preco in ((0, 'R$ 5,00'), (5, 'R$ 5,10'), (10, 'R$ 5,00')):
+            self.assertEqual(self._ingerir(preco, minutos)['inseridos'], 1)
+
+        self.assertEqual(
+            list(PrecoVibra.objects.order_by('data_coleta').values_list('preco', flat=True)),
+            [Decimal('5.0000'), Decimal('5.1000'), Decimal('5.0000')],
+        )
+        self.assertEqual(PrecoVibraSnapshot.objects.get().preco, Decimal('5.0000'))
+
+    def test_preco_nan_vira_erro_so_do_produto(self):
+        resultado = self._ingerir(None, 0, produtos=[
+            {'nome': 'GASOLINA C COMUM', 'preco': 'NaN', 'prazo': '3 Dias'},
+            {'nome': 'ETANOL HIDRATADO COMUM', 'preco': float('nan'), 'prazo': '3 Dias'},
+            {'nome': 'DIESEL S500 COMUM', 'preco': 'R$ 5,7730', 'prazo': '3 Dias'},
+        ])
+
+        self.assertEqual(resultado['inseridos'], 1)
+        self.assertEqual([erro['produto'] for erro in resultado['erros']], ['GASOLINA C COMUM', 'ETANOL HIDRATADO COMUM'])
+
+
+class SnapshotPrecosTests(TestCase):
+
+    def test_ultimo_preco_indisponivel_nao_tira_o_produto_do_dia(self):
+        inicio = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0)
+        resultado = ingerir_precos(
+            POSTO_INGESTAO, [{'nome': 'GASOLINA C COMUM', 'preco': 'R$ 5,00', 'prazo': '3 Dias'}],
+            data_coleta=inicio,
+        )
+        indisponivel = PrecoVibra.objects.create(
+            posto=resultado['posto'], produto_nome='GASOLINA C COMUM', preco=Decimal('5.20'),
+            prazo_pagamento='3 Dias', data_coleta=inicio + timedelta(minutes=30), disponivel=False,
+        )
+        atualizar_snapshot([indisponivel])
+
+        self.assertEqual([linha.preco for linha in snapshot_do_dia(timezone.localdate(inicio))], [Decimal('5.0000')])
+        conferencia = verificar_snapshot()
+        self.assertEqual((conferencia['faltando'], conferencia['sobrando'], conferencia['divergentes']), ([], [], []))
+
+    def test_marcar_indisponivel_no_admin_tira_o_preco_do_snapshot(self):
+        inicio = timezone.now().replace(hour=10, minute=0, second=0, microsecond=0)
+        for minutos, preco in ((0, 'R$ 5,00'), (30, 'R$ 5,10')):
+            ingerir_precos(
+                POSTO_INGESTAO, [{'nome': 'GASOLINA C COMUM', 'preco': preco, 'prazo': '3 Dias'}],
+                data_coleta=inicio + timedelta(minutes=minutos),
+            )
+        dia = timezone.localdate(inicio)
+        self.assertEqual([linha.preco for linha in snapshot_do_dia(dia)], [Decimal('5.1000')])
+
+        admin = get_user_model().objects.create_superuser(username='admin', email='admin@exemplo.com', password='senha')
+        self.client.force_login(admin)
+        changelist = reverse('admin:fuel_prices_precovibra_changelist')
+        for preco, restante in ((Decimal('5.10'), [Decimal('5.0000')]), (Decimal('5.00'), [])):
+            with self.subTest(preco=preco):
+                retirado = PrecoVibra.objects.get(preco=preco)
+                self.client.post(changelist, {'action': 'marcar_indisponivel', '_selected_action': [retirado.pk]})
+                self.assertEqual([linha.preco for linha in snapshot_do_dia(dia)], restante)
+                conferencia = verificar_snapshot()
+                self.assertEqual((conferencia['faltando'], conferencia['sobrando'], conferencia['divergentes']), ([], [], []))
+
+
+class DeltaPrecosTests(TestCase):
+
+    def test_aguardar_nao_finito(self):
+        resposta = self.client.get(reverse('api_precos_delta'), {'aguardar': 'nan'})
+        self.assertEqual(resposta.status_code, 400)
+
+        inicio = time.monotonic()
+        pagina = aguardar_precos(0, espera_segundos=float('nan'))
+        self.assertEqual(pagina['dados'], [])
+        self.assertLess(time.monotonic() - inicio, 1)
+
+
+# ============================================================
+# 🧪 PORTAL VIBRA DE MENTIRA (HTML local)
+# ============================================================
+
+CNPJ_FALHA_UMA_VEZ = '99999999000199'
+
+PAGINA_LOGIN = """<html><body>
+<form method="post" action="/login/">
+  <input type="text" name="usuario"><input type="password" name="senha">
+  <button type="submit">Entrar</button>
+</form></body></html>"""
+
+PAGINA_PORTAL = """<html><body>
+<header><h1>PORTAL VIBRA (STUB)</h1></header>
+<button onclick="location.href='/pedidos/'">Pedidos</button>
+</body></html>"""
+
+PAGINA_PEDIDOS = """<html><body>
+<header><h1>POSTO {cnpj}</h1></header>
+<span onclick="document.getElementById('dialogo').style.display='block'">import_export</span>
+<div id="dialogo" style="display:none">
+  <input id="busca" aria-label="Buscar empresa">
+  <span class="mat-radio-outer-circle" style="display:inline-block;width:12px;height:12px"></span>
+  <button onclick="location.href='/pedidos/?cnpj=' + document.getElementById('busca').value">Confirmar</button>
+</div>
+{cards}
+</body></html>"""
+
+CARD = """<app-item-vitrine style="display:block">
+  <div>{nome}</div><div>Preço: R$ {preco}</div><div>Base Suape</div>{status}
+</app-item-vitrine>"""
+
+
+class PortalStub(BaseHTTPRequestHandler):
+    """Login com cookie, página Pedidos e troca de posto via ?cnpj="""
+
+    logins = 0
+    acessos = {}
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _html(self, corpo, status=200, cabecalhos=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        for chave, valor in (cabecalhos or {}).items():
+            self.send_header(chave, valor)
+        self.end_headers()
+        self.wfile.write(corpo.encode('utf-8'))
+
+    def _redirecionar(self, destino, cabecalhos=None):
+        self._html('', 302, dict(cabecalhos or {}, Location=destino))
+
+    def do_POST(self):
+        tamanho = int(self.headers.get('Content-Length', 0))
+        campos = parse_qs(self.rfile.read(tamanho).decode())
+        if campos.get('senha') == ['segredo']:
+            with self.lock:
+                PortalStub.logins += 1
+            self._redirecionar('/portal/', {'Set-Cookie': 'sessao=ok; Path=/'})
+        else:
+            self._redirecionar('/login/')
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/login/':
+            return self._html(PAGINA_LOGIN)
+        if 'sessao=ok' not in self.headers.get('Cookie', ''):
+            return self._redirecionar('/login/')
+        if url.path == '/portal/':
+            return self._html(PAGINA_PORTAL)
+
+        cnpj = parse_qs(url.query).get('cnpj', [''])[0]
+        with self.lock:
+            acessos = PortalStub.acessos[cnpj] = PortalStub.acessos.get(cnpj, 0) + 1
+
+        # Primeiro acesso ao posto "instável": tudo indisponível → nova tentativa
+        status = '<div>Indisponível</div>' if cnpj == CNPJ_FALHA_UMA_VEZ and acessos == 1 else ''
+        cards = ''.join(
+            CARD.format(nome=nome, preco=f'{base},{cnpj[-4:] or "0000"}', status=status)
+            for nome, base in [('GASOLINA COMUM', 5), ('DIESEL S10', 6)]
+        ) if cnpj else ''
+        self._html(PAGINA_PEDIDOS.format(cnpj=cnpj or 'MASTER', cards=cards))
+
+
+# ============================================================
+# ⏱️ LIMITADOR DE TAXA
+# ============================================================
+
+@unittest.skipUnless(PLAYWRIGHT_DISPONIVEL, 'playwright não instalado')
+class LimitadorTaxaTests(SimpleTestCase):
+
+    def test_intervalo_minimo_entre_threads(self):
+        limitador = LimitadorTaxa(0.05)
+        inicios = []
+        lock = threading.Lock()
+
+        def chamar():
+            limitador.aguardar()
+            with lock:
+                inicios.append(time.monotonic())
+
+        threads = [threading.Thread(target=chamar) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        inicios.sort()
+        intervalos = [b - a for a, b in zip(inicios, inicios[1:])]
+        self.assertTrue(all(intervalo >= 0.04 for intervalo in intervalos), intervalos)
+
+
+# ============================================================
+# 🌐 COLETA PARALELA CONTRA O PORTAL STUB
+# ============================================================
+
+@unittest.skipUnless(PLAYWRIGHT_DISPONIVEL, 'playwright não instalado')
+class ColetaParalelaPortalStubTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        try:
+            with sync_playwright() as p:
+                p.chromium.launch(headless=True).close()
+        except Exception as e:
+            raise unittest.SkipTest(f'Chromium do playwright indisponível: {e}')
+
+        cls.servidor = ThreadingHTTPServer(('127.0.0.1', 0), PortalStub)
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+        cls.url = f'http://127.0.0.1:{cls.servidor.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        super().tearDownClass()
+
+    def test_coleta_paralela_com_login_unico_e_nova_tentativa(self):
+        PortalStub.logins = 0
+        PortalStub.acessos = {}
+        postos = [
+            {'codigo': str(i), 'razao': f'POSTO {i} LTDA', 'nome': f'POSTO {i}', 'cnpj': cnpj}
+            for i, cnpj in enumerate(['11111111000111', '22222222000122', CNPJ_FALHA_UMA_VEZ, '33333333000133'])
+        ]
+        scraper = VibraScraper('95406', 'segredo', headless=True, login_url=f'{self.url}/login/')
+        coletor = ColetorParaleloVibra(
+            scraper, contextos=2, tentativas=2, intervalo_min=0, timeout_pagina=10000, pasta_saida=None
+        )
+
+        relatorio = coletor.executar(postos, codigos_para_salvar={'0', '1', '2'})
+
+        # Um único login; os contextos reaproveitam o storage_state
+        self.assertEqual(PortalStub.logins, 1)
+        self.assertEqual(relatorio['postos_sucesso'], 4)
+        self.assertEqual(relatorio['postos_falha'], 0)
+        self.assertEqual({p['contexto'] for p in relatorio['postos']}, {1, 2})
+
+        instavel = next(p for p in relatorio['postos'] if p['cnpj'] == CNPJ_FALHA_UMA_VEZ)
+        self.assertEqual(instavel['tentativas'], 2)
+        self.assertEqual(len(instavel['erros']), 1)
+
+        # Só os postos pedidos vão para o banco, com o preço do posto certo
+        self.assertEqual(PrecoVibra.objects.count(), 6)
+        self.assertFalse(PrecoVibra.objects.filter(posto__codigo_vibra='3').exists())
+        preco = PrecoVibra.objects.get(posto__codigo_vibra='1', produto_nome='DIESEL S10')
+        self.assertEqual(str(preco.preco), '6.0122')
+
+        log = ScrapingLog.objects.get()
+        self.assertEqual(log.status, 'success')
+        self.assertEqual(log.prices_collected, 6)
+        self.assertEqual(log.log_details['postos_total'], 4)
+
+
+# ============================================================
+# ⚡ EXTRAÇÃO RÁPIDA (página Pedidos salva)
+# ============================================================
+
+FIXTURE_PEDIDOS = Path(__file__).parent / 'testdata' / 'vibra_pedidos.html'
+
+PRODUTOS_FIXTURE = [
+    {'nome': 'GASOLINA C COMUM', 'base': 'Base Suape', 'preco': 'Preço: R$ 5,8123', 'prazo': '3 Dias'},
+    {'nome': 'ETANOL HIDRATADO COMUM', 'base': 'Base Suape', 'preco': 'R$ 4,1290', 'prazo': '3 Dias'},
+    {'nome': 'GASOLINA C ADITIVADA GRID', 'base': 'Base Suape', 'preco': 'Preço: R$ 5,9410', 'prazo': '3 Dias'},
+    {'nome': 'DIESEL S500 COMUM', 'base': 'Base Suape', 'preco': 'Preço: R$ 5,7730', 'prazo': '3 Dias'},
+    {'nome': 'ARLA 32 GRANEL', 'base': 'Base Suape', 'preco': 'Preço: R$ 3,1500', 'prazo': '3 Dias'},
+]
+
+
+@unittest.skipUnless(PLAYWRIGHT_DISPONIVEL, 'playwright não instalado')
+class InterpretarCardsTests(SimpleTestCase):
+
+    def test_regras_dos_cards(self):
+        textos = [
+            'Em estoque\nGASOLINA C COMUM\nPreço: R$ 5,8123\nPrazo: 3 dias\nBase Suape',
+            'DIESEL S10\nIndisponível\nPreço: R$ 6,0000',
+            'GASOLINA C COMUM\nPreço: R$ 5,9999\nBase Cabedelo',
+            'PRODUTO SEM PREÇO',
+        ]
+
+        self.assertEqual(interpretar_cards(textos), [
+            {'nome': 'GASOLINA C COMUM', 'base': 'Base Suape', 'preco': 'Preço: R$ 5,8123', 'prazo': '3 Dias'},
+            {'nome': 'PRODUTO SEM PREÇO', 'base': None, 'preco': None, 'prazo': '3 Dias'},
+        ])
+
+
+@unittest.skipUnless(PLAYWRIGHT_DISPONIVEL, 'playwright não instalado')
+class ExtracaoRapidaFixtureTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        try:
+            with sync_playwright() as p:
+                p.chromium.launch(headless=True).close()
+        except Exception as e:
+            raise unittest.SkipTest(f'Chromium do playwright indisponível: {e}')
+
+    def _extrair(self, modo_rapido):
+        scraper = VibraScraper('95406', 'segredo', headless=True, modo_rapido=modo_rapido)
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            try:
+                context = scraper.preparar_contexto(browser.new_context())
+                page = context.new_page()
+                page.set_content(FIXTURE_PEDIDOS.read_text(encoding='utf-8'))
+                if modo_rapido:
+                    return extrair_rapido(page, quieto_ms=400)
+                return scraper.extrair_produtos_por_seletor(page)
+            finally:
+                browser.close()
+
+    def test_extracao_rapida_le_a_tabela_inteira(self):
+        dados = self._extrair(modo_rapido=True)
+
+        self.assertEqual(dados['posto'], 'AP CASA CAIADA - 95406')
+        self.assertEqual(dados['modalidade'], 'FOB')
+        self.assertEqual(dados['produtos'], PRODUTOS_FIXTURE)
+
+    def test_mesmo_resultado_da_extracao_por_seletor(self):
+        rapida = self._extrair(modo_rapido=True)
+        antiga = self._extrair(modo_rapido=False)
+
+        for campo in ('posto', 'modalidade', 'produtos'):
+            self.assertEqual(rapida[campo], antiga[campo], campo)
@@ -10,6 +10,7 @@ urlpatterns = [
     path('por-produto/', views.dashboard_vibra, name='dashboard_vibra'),
     path('por-posto/', views.dashboard_por_posto, name='dashboard_por_posto'),
     path('executar-scraper/', views.executar_scraper, name='executar_scraper'),
+    path('api/scraper-status/', views.status_scraper, name='status_scraper'),  # Polling da fila
     path('api/precos-por-data/', views.api_precos_por_data, name='api_precos_por_data'),  # API histórico
     
     # APIs para scraper standalone
@@ -20,4 +21,6 @@ urlpatterns = [
     path('api/logus-feed/', views.api_logus_feed, name='api_logus_feed'),
     path('api/precos-atual/', views.api_precos_atual, name='api_precos_atual'),
     path('api/resumo-postos/', views.api_resumo_postos, name='api_resumo_postos'),
+    path('api/precos-delta/', views.api_precos_delta, name='api_precos_delta'),  # Delta por cursor
+    path('api/historico-precos/', views.api_historico_precos, name='api_historico_precos'),  # Arquivo + banco
 ]
@@ -1,15 +1,21 @@
+from django.conf import settings
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.db.models import Min, Max, Avg, Count
+from django.db.models import Min, Max, Avg, Count, Q
 from django.utils import timezone
 from django.http import JsonResponse
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 from datetime import timedelta
-import subprocess
 import json
-import os
-import threading
+import math
 from .models import PostoVibra, PrecoVibra
+from .arquivo_precos import historico_precos
+from .cache_feeds import resposta_em_cache
+from .delta_precos import aguardar_precos, resolver_cursor
+from .fila_scraper import enfileirar, status_tarefa
+from .matriz_precos import montar_matriz_precos, resumo_periodo
+from .snapshot_precos import datas_com_snapshot, snapshot_do_dia, snapshot_recente
 
 
 def home(request):
@@ -25,13 +31,18 @@ def dashboard_consolidado(request):
     """
     from datetime import datetime, date, timedelta
     
-    # Buscar todas as datas disponíveis (últimos 30 dias)
-    datas_disponiveis_query = PrecoVibra.objects.filter(
-        data_coleta__gte=timezone.now() - timedelta(days=30),
-        disponivel=True
-    ).dates('data_coleta', 'day', order='DESC')
-    
-    datas_disponiveis_list = list(datas_disponiveis_query)
+    # Buscar todas as datas disponíveis (últimos 30 dias) - snapshot diário
+    # somado ao histórico, para um backfill parcial não esconder dias
+    trinta_dias = timezone.now() - timedelta(days=30)
+    datas_disponiveis_list = sorted(
+        set(datas_com_snapshot(trinta_dias)) | set(
+            PrecoVibra.objects.filter(
+                data_coleta__gte=trinta_dias,
+                disponivel=True
+            ).dates('data_coleta', 'day')
+        ),
+        reverse=True
+    )
     
     # Determinar qual data mostrar
     data_param = request.GET.get('data')
@@ -65,123 +76,17 @@ def dashboard_consolidado(request):
                 data_proxima = datas_disponiveis_list[i - 1]
             break
     
-    # Buscar postos com preços nesta data
-    postos = PostoVibra.objects.filter(
-        ativo=True,
-        precos__data_coleta__gte=inicio,
-        precos__data_coleta__lte=fim,
-        precos__disponivel=True
-    ).distinct().order_by('codigo_vibra')
-    
-    # Adicionar última data de coleta para cada posto
-    postos_com_data = []
-    for posto in postos:
-        ultima_coleta_posto = PrecoVibra.objects.filter(
-            posto=posto,
-            data_coleta__gte=inicio,
-            disponivel=True
-        ).order_by('-data_coleta').first()
-        
-        posto.ultima_coleta = ultima_coleta_posto.data_coleta if ultima_coleta_posto else None
-        postos_com_data.append(posto)
-    
-    # Pegar TODOS os produtos únicos do período
-    produtos_nomes = PrecoVibra.objects.filter(
-        data_coleta__gte=inicio,
-        data_coleta__lte=fim,
-        disponivel=True
-    ).values_list('produto_nome', flat=True).distinct().order_by('produto_nome')
-    
-    # Construir matriz de preços (PRODUTO × POSTO)
-    matriz_precos = []
-    
-    for produto_nome in produtos_nomes:
-        linha = {
-            'produto': produto_nome,
-            'postos': {},  # {cnpj: {preco, prazo, data}}
-            'preco_min': None,
-            'preco_max': None,
-            'preco_medio': None,
-            'variacao_percentual': 0,
-        }
-        
-        # Para cada posto, pegar o preço MAIS RECENTE deste produto no período
-        precos_valores = []
-        
-        for posto in postos_com_data:
-            preco_mais_recente = PrecoVibra.objects.filter(
-                posto=posto,
-                produto_nome=produto_nome,
-                data_coleta__gte=inicio,
-                data_coleta__lte=fim,
-                disponivel=True
-            ).order_by('-data_coleta').first()
-            
-            if preco_mais_recente:
-                preco_float = float(preco_mais_recente.preco)
-                linha['postos'][posto.cnpj] = {
-                    'preco': preco_float,
-                    'prazo': preco_mais_recente.prazo_pagamento,
-                    'data': preco_mais_recente.data_coleta,
-                    'posto_nome': posto.nome_fantasia or posto.razao_social,
-                }
-                precos_valores.append(preco_float)
-        
-        # Calcular min/max/média/variação e classes CSS
-        if precos_valores:
-            linha['preco_min'] = min(precos_valores)
-            linha['preco_max'] = max(precos_valores)
-            linha['preco_medio'] = sum(precos_valores) / len(precos_valores)
-            
-            if linha['preco_min'] > 0:
-                linha['variacao_percentual'] = ((linha['preco_max'] - linha['preco_min']) / linha['preco_min']) * 100
-            
-            # Adicionar classe CSS para cada preço
-            # NOVA LÓGICA: Usa a MÉDIA como referência
-            for cnpj, info in linha['postos'].items():
-                preco = info['preco']
-                media = linha['preco_medio']
-                
-                # Calcular diferença percentual em relação à média
-                diff_media = ((preco - media) / media) * 100 if media > 0 else 0
-                
-                if preco == linha['preco_min']:
-                    info['css_class'] = 'preco-min'  # Verde forte (melhor preço)
-                elif preco == linha['preco_max']:
-                    info['css_class'] = 'preco-max'  # Vermelho forte (pior preço)
-                elif diff_media <= -2:  # 2% abaixo da média
-                    info['css_class'] = 'preco-baixo'  # Verde claro
-                elif diff_media <= -0.5:  # Até 0.5% abaixo da média
-                    info['css_class'] = 'preco-medio-baixo'  # Amarelo claro
-                elif diff_media <= 0.5:  # Próximo da média (±0.5%)
-                    info['css_class'] = 'preco-medio'  # Neutro
-                elif diff_media <= 2:  # Até 2% acima da média
-                    info['css_class'] = 'preco-medio-alto'  # Laranja claro
-                else:  # Mais de 2% acima da média
-                    info['css_class'] = 'preco-alto'  # Vermelho claro
-                
-                # Adicionar informação de diferença para exibir
-                info['diff_media'] = diff_media
-        
-        # Só adicionar produtos que têm pelo menos 1 preço
-        if linha['postos']:
-            matriz_precos.append(linha)
+    # Último preço de cada (posto, produto) do dia vem do snapshot diário
+    # (sem snapshot: uma query no histórico); a matriz PRODUTO × POSTO,
+    # mín/máx/média e cores são montadas em memória
+    matriz = montar_matriz_precos(inicio, fim, precos=snapshot_do_dia(data_filtro) or None)
+    postos_com_data = matriz['postos']
+    matriz_precos = matriz['matriz']
     
     # Estatísticas gerais
     total_postos = len(postos_com_data)
     total_produtos = len(matriz_precos)
-    total_precos = PrecoVibra.objects.filter(
-        data_coleta__gte=inicio,
-        data_coleta__lte=fim,
-        disponivel=True
-    ).count()
-    
-    # Última atualização no período
-    ultima_coleta = PrecoVibra.objects.filter(
-        data_coleta__gte=inicio,
-        data_coleta__lte=fim,
-        disponivel=True
-    ).order_by('-data_coleta').first()
+    resumo = resumo_periodo(inicio, fim)
     
     # Montar lista de datas disponíveis para o dropdown
     datas_disponiveis = []
@@ -197,8 +102,8 @@ def dashboard_consolidado(request):
         'matriz_precos': matriz_precos,
         'total_postos': total_postos,
         'total_produtos': total_produtos,
-        'total_precos': total_precos,
-        'ultima_atualizacao': ultima_coleta.data_coleta if ultima_coleta else None,
+        'total_precos': resumo['total_precos'],
+        'ultima_atualizacao': resumo['ultima_coleta'],
         'data_atual': data_filtro,
         'data_anterior': data_anterior,
         'data_proxima': data_proxima,
@@ -271,24 +176,15 @@ def dashboard_por_posto(request):
     
     ultimas_24h = timezone.now() - timedelta(hours=24)
     
-    postos = PostoVibra.objects.filter(ativo=True).prefetch_related(
-        'precos'
-    )
-    
+    # Último preço de cada produto por posto (mesma consulta da matriz)
     dados_postos = []
-    for posto in postos:
-        precos_recentes = posto.precos.filter(
-            data_coleta__gte=ultimas_24h,
-            disponivel=True
-        ).order_by('produto_nome')
-        
-        if precos_recentes.exists():
-            dados_postos.append({
-                'posto': posto,
-                'precos': precos_recentes,
-                'total_produtos': precos_recentes.count(),
-                'ultima_coleta': precos_recentes.order_by('-data_coleta').first().data_coleta
-            })
+    for posto in montar_matriz_precos(ultimas_24h, precos=snapshot_recente(ultimas_24h) or None)['postos']:
+        dados_postos.append({
+            'posto': posto,
+            'precos': posto.precos_periodo,
+            'total_produtos': len(posto.precos_periodo),
+            'ultima_coleta': posto.ultima_coleta
+        })
     
     context = {
         'postos': dados_postos,
@@ -298,12 +194,10 @@ def dashboard_por_posto(request):
     return render(request, 'fuel_prices/dashboard_por_posto.html', context)
 
 
-from django.views.decorators.csrf import csrf_exempt
-
 @csrf_exempt
 def executar_scraper(request):
     """
-    Executa o scraper para os postos selecionados em background
+    Enfileira o scraper para os postos selecionados (fila no banco)
     """
     print(f"\n🔵 executar_scraper chamado - Método: {request.method}")
     print(f"🔵 Headers: {dict(request.headers)}")
@@ -325,47 +219,21 @@ def executar_scraper(request):
         if not codigos_selecionados:
             return JsonResponse({'status': 'error', 'message': 'Nenhum posto selecionado'})
         
-        # Executar scraper em background
-        def run_scraper_background(codigos):
-            try:
-                base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-                scraper_path = os.path.join(base_dir, 'fuel_prices', 'scrapers', 'vibra_scraper.py')
-                
-                print(f"\n🚀 Iniciando scraper para {len(codigos)} posto(s): {', '.join(codigos)}")
-                
-                # Executar scraper passando os códigos como argumentos
-                # Exemplo: python vibra_scraper.py --postos 95406 107469
-                cmd = ['python', scraper_path, '--postos'] + codigos
-                
-                print(f"🔵 Comando: {' '.join(cmd)}")
-                
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    cwd=os.path.join(base_dir, 'fuel_prices', 'scrapers'),
-                    timeout=1800  # 30 minutos timeout
-                )
-                
-                if result.returncode == 0:
-                    print("✅ Scraper concluído e dados importados!")
-                    print(f"Output: {result.stdout}")
-                else:
-                    print(f"❌ Erro no scraper: {result.stderr}")
-                    
-            except Exception as e:
-                print(f"❌ Erro ao executar scraper: {e}")
-                import traceback
-                traceback.print_exc()
-        
-        # Iniciar em thread separada
-        thread = threading.Thread(target=run_scraper_background, args=(codigos_selecionados,))
-        thread.daemon = True
-        thread.start()
+        # Enfileirar: o worker (python manage.py worker_scraper) executa.
+        # Pedidos repetidos enquanto a tarefa espera são agrupados nela.
+        tarefa, agrupada = enfileirar(codigos_selecionados)
+        
+        if agrupada:
+            message = f'Pedido agrupado à coleta #{tarefa.pk} ({len(tarefa.postos)} posto(s)). Aguarde a atualização...'
+        else:
+            message = f'Scraper enfileirado para {len(codigos_selecionados)} posto(s). Aguarde a atualização...'
         
         return JsonResponse({
             'status': 'iniciado',
-            'message': f'Scraper iniciado para {len(codigos_selecionados)} posto(s). Aguarde a atualização...'
+            'tarefa_id': tarefa.pk,
+            'agrupada': agrupada,
+            'status_url': f"{reverse('status_scraper')}?tarefa={tarefa.pk}",
+            'message': message
         })
         
     except Exception as e:
@@ -375,6 +243,24 @@ def executar_scraper(request):
         })
 
 
+def status_scraper(request):
+    """
+    Estado da coleta enfileirada (polling do dashboard)
+    Parâmetro GET: tarefa (id; sem ele, a tarefa mais recente)
+    """
+    tarefa_id = request.GET.get('tarefa')
+    if tarefa_id and not tarefa_id.isdigit():
+        return JsonResponse({'status': 'error', 'message': 'Parâmetro tarefa inválido'}, status=400)
+    
+    dados = status_tarefa(tarefa_id)
+    if dados is None:
+        response = JsonResponse({'status': 'error', 'message': 'Tarefa não encontrada'}, status=404)
+    else:
+        response = JsonResponse({'status': 'success', 'tarefa': dados})
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
 def api_precos_por_data(request):
     """
     API para retornar preços de uma data específica
@@ -408,14 +294,10 @@ def api_precos_por_data(request):
     inicio_dia = timezone.make_aware(datetime.combine(data_selecionada, datetime.min.time()))
     fim_dia = timezone.make_aware(datetime.combine(data_selecionada, datetime.max.time()))
     
-    # Buscar preços
-    precos = PrecoVibra.objects.filter(
-        data_coleta__gte=inicio_dia,
-        data_coleta__lte=fim_dia,
-        disponivel=True
-    ).select_related('posto').order_by('produto_nome')
+    # Último preço de cada (posto, produto) do dia
+    matriz = montar_matriz_precos(inicio_dia, fim_dia, precos=snapshot_do_dia(data_selecionada) or None)
     
-    if not precos.exists():
+    if not matriz['matriz']:
         return JsonResponse({
             'status': 'error',
             'message': f'Nenhum dado encontrado para {data_selecionada.strftime("%d/%m/%Y")}'
@@ -423,28 +305,23 @@ def api_precos_por_data(request):
     
     # Organizar dados por produto
     produtos_dict = {}
-    postos_set = set()
-    
-    for preco in precos:
-        produto = preco.produto_nome
-        posto_id = preco.posto.id
-        postos_set.add(preco.posto.id)
-        
-        if produto not in produtos_dict:
-            produtos_dict[produto] = {}
-        
-        produtos_dict[produto][posto_id] = {
-            'preco': float(preco.preco),
-            'prazo': preco.prazo_pagamento,
-            'base': preco.base_distribuicao,
-            'posto_nome': preco.posto.nome_fantasia,
+    for linha in matriz['matriz']:
+        produtos_dict[linha['produto']] = {
+            info['posto_id']: {
+                'preco': info['preco'],
+                'prazo': info['prazo'],
+                'base': info['base'],
+                'posto_nome': info['posto_nome'],
+            }
+            for info in linha['postos'].values()
         }
+    postos_set = {posto.id for posto in matriz['postos']}
     
     # Estatísticas
     estatisticas = {
         'total_produtos': len(produtos_dict),
         'total_postos': len(postos_set),
-        'total_precos': precos.count(),
+        'total_precos': resumo_periodo(inicio_dia, fim_dia)['total_precos'],
     }
     
     return JsonResponse({
@@ -466,24 +343,19 @@ def api_logus_feed(request):
     API específica para alimentar sistema Logus/Price
     Retorna dados formatados para integração
     """
-    try:
-        from django.db.models import Max
-        
+    def construir():
         # Buscar preços mais recentes (últimas 6 horas)
         periodo = timezone.now() - timedelta(hours=6)
         
-        # Query otimizada para feed
-        precos_recentes = PrecoVibra.objects.filter(
-            data_coleta__gte=periodo,
-            disponivel=True
-        ).select_related('posto').order_by('-data_coleta')
+        # Último preço de cada posto/produto, lido do snapshot diário
+        precos_recentes = snapshot_recente(periodo, apenas_postos_ativos=False)
         
         # Organizar por posto
         feed_data = {}
         
         for preco in precos_recentes:
             codigo_posto = preco.posto.codigo_vibra
-            
+        
             if codigo_posto not in feed_data:
                 feed_data[codigo_posto] = {
                     'posto_info': {
@@ -494,7 +366,7 @@ def api_logus_feed(request):
                     },
                     'combustiveis': []
                 }
-            
+        
             # Adicionar combustível
             feed_data[codigo_posto]['combustiveis'].append({
                 'produto': preco.produto_nome,
@@ -510,7 +382,7 @@ def api_logus_feed(request):
         # Converter para lista
         postos_lista = list(feed_data.values())
         
-        response = {
+        return {
             'sistema': 'Fuel Prices - Feed Logus/Price',
             'versao': '1.0',
             'status': 'online',
@@ -520,8 +392,9 @@ def api_logus_feed(request):
             'total_precos': sum(len(posto['combustiveis']) for posto in postos_lista),
             'postos': postos_lista
         }
-        
-        return JsonResponse(response, json_dumps_params={'indent': 2})
+
+    try:
+        return resposta_em_cache(request, 'logus_feed', construir)
         
     except Exception as e:
         return JsonResponse({
@@ -538,68 +411,46 @@ def api_precos_atual(request):
     API para obter preços atuais de combustível
     Retorna preços mais recentes de cada posto/produto
     """
-    try:
-        from django.db.models import Max
-        
+    def construir():
         # Buscar preços das últimas 24 horas
         ontem = timezone.now() - timedelta(days=1)
         
-        # Obter preços mais recentes por posto e produto
-        precos_recentes = PrecoVibra.objects.filter(
-            data_coleta__gte=ontem,
-            disponivel=True
-        ).values(
-            'posto__nome_fantasia',
-            'posto__codigo_vibra', 
-            'posto__cnpj',
-            'produto_nome',
-            'produto_codigo'
-        ).annotate(
-            data_mais_recente=Max('data_coleta')
-        )
-        
-        # Buscar dados completos
+        # Preço mais recente por posto e produto (snapshot diário, uma query)
         precos_finais = []
-        for item in precos_recentes:
-            preco_obj = PrecoVibra.objects.filter(
-                posto__nome_fantasia=item['posto__nome_fantasia'],
-                produto_nome=item['produto_nome'],
-                data_coleta=item['data_mais_recente']
-            ).first()
-            
-            if preco_obj:
-                precos_finais.append({
-                    'posto': {
-                        'nome': preco_obj.posto.nome_fantasia,
-                        'codigo': preco_obj.posto.codigo_vibra,
-                        'cnpj': preco_obj.posto.cnpj,
-                        'razao_social': preco_obj.posto.razao_social
-                    },
-                    'combustivel': {
-                        'nome': preco_obj.produto_nome,
-                        'codigo': preco_obj.produto_codigo
-                    },
-                    'preco': {
-                        'valor': float(preco_obj.preco),
-                        'prazo_pagamento': preco_obj.prazo_pagamento,
-                        'modalidade': preco_obj.modalidade,
-                        'base_distribuicao': preco_obj.base_distribuicao
-                    },
-                    'coleta': {
-                        'data_hora': preco_obj.data_coleta.isoformat(),
-                        'disponivel': preco_obj.disponivel
-                    }
-                })
+        for preco_obj in snapshot_recente(ontem, apenas_postos_ativos=False):
+            precos_finais.append({
+                'posto': {
+                    'nome': preco_obj.posto.nome_fantasia,
+                    'codigo': preco_obj.posto.codigo_vibra,
+                    'cnpj': preco_obj.posto.cnpj,
+                    'razao_social': preco_obj.posto.razao_social
+                },
+                'combustivel': {
+                    'nome': preco_obj.produto_nome,
+                    'codigo': preco_obj.produto_codigo
+                },
+                'preco': {
+                    'valor': float(preco_obj.preco),
+                    'prazo_pagamento': preco_obj.prazo_pagamento,
+                    'modalidade': preco_obj.modalidade,
+                    'base_distribuicao': preco_obj.base_distribuicao
+                },
+                'coleta': {
+                    'data_hora': preco_obj.data_coleta.isoformat(),
+                    'disponivel': preco_obj.disponivel
+                }
+            })
         
-        response = {
+        return {
             'status': 'success',
             'timestamp': timezone.now().isoformat(),
             'total_precos': len(precos_finais),
             'periodo_coleta': '24 horas',
             'dados': precos_finais
         }
-        
-        return JsonResponse(response)
+
+    try:
+        return resposta_em_cache(request, 'precos_atual', construir)
         
     except Exception as e:
         return JsonResponse({
@@ -614,24 +465,24 @@ def api_resumo_postos(request):
     """
     API para obter resumo de todos os postos
     """
-    try:
-        # Buscar todos os postos ativos
-        postos = PostoVibra.objects.filter(ativo=True)
+    def construir():
+        ontem = timezone.now() - timedelta(days=1)
+        
+        # Postos ativos com produtos com preço nas últimas 24h e última
+        # coleta, agregados do snapshot diário numa única query
+        postos = PostoVibra.objects.filter(ativo=True).annotate(
+            total_precos_recentes=Count(
+                'snapshots__produto_nome',
+                filter=Q(snapshots__data_coleta__gte=ontem),
+                distinct=True
+            ),
+            ultima_coleta=Max('snapshots__data_coleta'),
+        )
         
         resumo_postos = []
         for posto in postos:
-            # Contar preços das últimas 24 horas
-            ontem = timezone.now() - timedelta(days=1)
-            total_precos_recentes = PrecoVibra.objects.filter(
-                posto=posto,
-                data_coleta__gte=ontem
-            ).count()
-            
-            # Última coleta
-            ultimo_preco = PrecoVibra.objects.filter(
-                posto=posto
-            ).order_by('-data_coleta').first()
-            
+            total_precos_recentes = posto.total_precos_recentes
+        
             resumo_postos.append({
                 'codigo': posto.codigo_vibra,
                 'nome': posto.nome_fantasia,
@@ -640,19 +491,20 @@ def api_resumo_postos(request):
                 'ativo': posto.ativo,
                 'estatisticas': {
                     'precos_24h': total_precos_recentes,
-                    'ultima_coleta': ultimo_preco.data_coleta.isoformat() if ultimo_preco else None,
+                    'ultima_coleta': posto.ultima_coleta.isoformat() if posto.ultima_coleta else None,
                     'tem_dados_recentes': total_precos_recentes > 0
                 }
             })
         
-        response = {
+        return {
             'status': 'success',
             'timestamp': timezone.now().isoformat(),
             'total_postos': len(resumo_postos),
             'dados': resumo_postos
         }
-        
-        return JsonResponse(response)
+
+    try:
+        return resposta_em_cache(request, 'resumo_postos', construir)
         
     except Exception as e:
         return JsonResponse({
@@ -660,3 +512,108 @@ def api_resumo_postos(request):
             'message': str(e),
             'timestamp': timezone.now().isoformat()
         }, status=500)
+
+
+@csrf_exempt
+def api_precos_delta(request):
+    """
+    API de delta: só os preços gravados depois do cursor do cliente
+    Parâmetros GET:
+        cursor   - id do último preço recebido (resposta anterior)
+        desde    - data/hora ISO, só na primeira chamada (sem cursor)
+        limite   - itens por página (padrão 500)
+        aguardar - segundos de long-polling se não houver nada novo
+    """
+    try:
+        cursor = resolver_cursor(request.GET.get('cursor'), request.GET.get('desde'))
+        limite = int(request.GET.get('limite', 500))
+        aguardar = float(request.GET.get('aguardar', 0))
+        if not math.isfinite(aguardar):
+            raise ValueError(f"aguardar inválido: {request.GET.get('aguardar')!r}")
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    
+    limite = min(max(limite, 1), getattr(settings, 'FUEL_DELTA_LIMITE_MAX', 5000))
+    
+    try:
+        pagina = aguardar_precos(cursor, limite, aguardar)
+        
+        response = JsonResponse({
+            'status': 'success',
+            'timestamp': timezone.now().isoformat(),
+            'cursor': pagina['cursor'],
+            'tem_mais': pagina['tem_mais'],
+            'total': len(pagina['dados']),
+            'dados': pagina['dados']
+        })
+        response['Cache-Control'] = 'no-store'
+        return response
+        
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e),
+            'timestamp': timezone.now().isoformat()
+        }, status=500)
+
+
+@csrf_exempt
+def api_historico_precos(request):
+    """
+    API de histórico para gráficos: junta preços arquivados e da tabela viva
+    Parâmetros GET:
+        inicio, fim - datas YYYY-MM-DD (padrão: últimos 30 dias)
+        posto       - código Vibra (pode repetir)
+        produto     - nome do produto (pode repetir)
+    """
+    from datetime import datetime
+    
+    try:
+        hoje = timezone.localdate()
+        data_inicio = datetime.strptime(request.GET['inicio'], '%Y-%m-%d').date() if request.GET.get('inicio') else hoje - timedelta(days=30)
+        data_fim = datetime.strptime(request.GET['fim'], '%Y-%m-%d').date() if request.GET.get('fim') else hoje
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Formato de data inválido. Use YYYY-MM-DD'}, status=400)
+    
+    try:
+        inicio = timezone.make_aware(datetime.combine(data_inicio, datetime.min.time()))
+        fim = timezone.make_aware(datetime.combine(data_fim, datetime.max.time()))
+        
+        postos = PostoVibra.objects.all()
+        codigos = request.GET.getlist('posto')
+        if codigos:
+            postos = postos.filter(codigo_vibra__in=codigos)
+        codigo_por_id = dict(postos.values_list('id', 'codigo_vibra'))
+        
+        precos = historico_precos(
+            inicio, fim,
+            posto_ids=set(codigo_por_id) if codigos else None,
+            produtos=request.GET.getlist('produto') or None,
+        )
+        
+        dados = [
+            {
+                'posto': codigo_por_id.get(preco['posto_id']),
+                'produto': preco['produto_nome'],
+                'preco': float(preco['preco']),
+                'prazo_pagamento': preco['prazo_pagamento'],
+                'data_coleta': preco['data_coleta'].isoformat(),
+                'disponivel': preco['disponivel']
+            }
+            for preco in precos
+        ]
+        
+        return JsonResponse({
+            'status': 'success',
+            'inicio': data_inicio.isoformat(),
+            'fim': data_fim.isoformat(),
+            'total': len(dados),
+            'dados': dados
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e),
+            'timestamp': timezone.now().isoformat()
+        }, status=500)
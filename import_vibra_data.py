@@ -12,6 +12,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'logos.settings')
 django.setup()
 
 from fuel_prices.models import PostoVibra, PrecoVibra
+from fuel_prices.snapshot_precos import atualizar_snapshot
 from django.utils import timezone
 from decimal import Decimal
 
@@ -24,6 +25,7 @@ def importar_consolidado_para_banco(arquivo='vibra_precos_CONSOLIDADO.json'):
         dados = json.load(f)
     
     total_produtos = 0
+    criados = []
     
     for produto in dados.get('produtos', []):
         nome_produto = produto['nome']
@@ -56,7 +58,7 @@ def importar_consolidado_para_banco(arquivo='vibra_precos_CONSOLIDADO.json'):
                 continue
             
             # Salvar preço
-            PrecoVibra.objects.create(
+            criados.append(PrecoVibra.objects.create(
                 posto=posto,
                 produto_nome=nome_produto,
                 produto_codigo=codigo_produto,
@@ -66,9 +68,10 @@ def importar_consolidado_para_banco(arquivo='vibra_precos_CONSOLIDADO.json'):
                 modalidade='',
                 data_coleta=timezone.now(),
                 disponivel=True
-            )
+            ))
             total_produtos += 1
     
+    atualizar_snapshot(criados)
     print(f"  💾 Salvos {total_produtos} produtos no total")
     return total_produtos
 
@@ -30,6 +30,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import json
 import dj_database_url  # 📦 Biblioteca para parsear URL do PostgreSQL
 
 # ============================================================
@@ -318,6 +319,144 @@ if not DEBUG:
     SECURE_HSTS_INCLUDE_SUBDOMAINS = True
     SECURE_HSTS_PRELOAD = True
 
+# ============================================================
+# 🤖 VERIFIK - DETECÇÃO DE PRODUTOS
+# ============================================================
+# Pool que analisa os bboxes do YOLO em paralelo (código de barras,
+# forma e OCR). 'thread' (padrão), 'process' ou 'off'
+VERIFIK_POOL_TIPO = os.environ.get('VERIFIK_POOL_TIPO', 'thread')
+VERIFIK_POOL_WORKERS = int(os.environ.get('VERIFIK_POOL_WORKERS', os.cpu_count() or 1))
+
+# Orçamento de tempo (segundos) por foto; estourou = resultado parcial
+VERIFIK_TIMEOUT_ANALISE = float(os.environ.get('VERIFIK_TIMEOUT_ANALISE', 20))
+
+# Cache de códigos de barras (CodigoBarrasProdutoMae): LRU + TTL, com
+# cache negativo para EANs desconhecidos
+VERIFIK_BARCODE_CACHE_MAX = int(os.environ.get('VERIFIK_BARCODE_CACHE_MAX', 20000))
+VERIFIK_BARCODE_TTL = int(os.environ.get('VERIFIK_BARCODE_TTL', 3600))
+VERIFIK_BARCODE_TTL_NEGATIVO = int(os.environ.get('VERIFIK_BARCODE_TTL_NEGATIVO', 300))
+VERIFIK_BARCODE_AQUECER = os.environ.get('VERIFIK_BARCODE_AQUECER', 'True') == 'True'
+
+# Registro de modelos YOLO: uma instância por processo, recarregada quando
+# o .pt muda no disco. Pré-carga no ready() (a primeira requisição não paga
+# a carga), só no servidor web (gunicorn/uwsgi/daphne/uvicorn ou runserver) -
+# comandos, testes, scripts e workers de pool carregam sob demanda
+VERIFIK_PRECARREGAR_MODELOS = os.environ.get('VERIFIK_PRECARREGAR_MODELOS', 'True') == 'True'
+VERIFIK_MODELO_VERIFICAR_SEG = int(os.environ.get('VERIFIK_MODELO_VERIFICAR_SEG', 10))
+VERIFIK_MODELO_AQUECER = os.environ.get('VERIFIK_MODELO_AQUECER', 'True') == 'True'
+
+# Detecção em lote (api/verifik/detectar/lote/): teto do batch do YOLO e
+# estimativa de RAM por imagem usada para dimensionar o batch
+VERIFIK_LOTE_MAX = int(os.environ.get('VERIFIK_LOTE_MAX', 32))
+VERIFIK_LOTE_MB_POR_IMAGEM = int(os.environ.get('VERIFIK_LOTE_MB_POR_IMAGEM', 80))
+# .zip no mesmo endpoint: máximo de imagens e de bytes descompactados (cada
+# imagem também respeita VERIFIK_TAMANHO_MAX_IMAGEM)
+VERIFIK_ZIP_MAX_IMAGENS = int(os.environ.get('VERIFIK_ZIP_MAX_IMAGENS', 1000))
+VERIFIK_ZIP_TAMANHO_MAX_TOTAL = int(os.environ.get('VERIFIK_ZIP_TAMANHO_MAX_TOTAL', 512 * 1024 * 1024))
+
+# Fotos muito maiores que a entrada do modelo são decodificadas já
+# reduzidas (JPEG 1/2, 1/4, 1/8) pela API de detecção
+VERIFIK_TAMANHO_ENTRADA_MODELO = int(os.environ.get('VERIFIK_TAMANHO_ENTRADA_MODELO', 640))
+VERIFIK_REDUZIR_NA_DECODIFICACAO = os.environ.get('VERIFIK_REDUZIR_NA_DECODIFICACAO', 'True') == 'True'
+VERIFIK_TAMANHO_MAX_IMAGEM = int(os.environ.get('VERIFIK_TAMANHO_MAX_IMAGEM', 30 * 1024 * 1024))
+
+# Streaming: YOLO a cada N frames, caixas propagadas por fluxo óptico
+# entre eles. O intervalo vem do Camera.detection_fps; aqui dá para
+# sobrescrever por código da câmera, ex.:
+# {'CX01': {'intervalo': 3, 'limiar_movimento': 6.0}}
+VERIFIK_AGENDADOR_CAMERAS = json.loads(os.environ.get('VERIFIK_AGENDADOR_CAMERAS', '{}'))
+
+# Scraper Vibra em paralelo: um login, N contextos de navegador,
+# tentativas por posto e intervalo mínimo entre postos (segundos)
+VIBRA_SCRAPER_CONTEXTOS = int(os.environ.get('VIBRA_SCRAPER_CONTEXTOS', 4))
+VIBRA_SCRAPER_TENTATIVAS = int(os.environ.get('VIBRA_SCRAPER_TENTATIVAS', 3))
+VIBRA_SCRAPER_INTERVALO_MIN = float(os.environ.get('VIBRA_SCRAPER_INTERVALO_MIN', 2.0))
+# Login do posto master (só por variável de ambiente) e pasta dos JSON de cada coleta
+VIBRA_PORTAL_USUARIO = os.environ.get('VIBRA_PORTAL_USUARIO', '')
+VIBRA_PORTAL_SENHA = os.environ.get('VIBRA_PORTAL_SENHA', '')
+VIBRA_SCRAPER_PASTA_SAIDA = Path(os.environ.get('VIBRA_SCRAPER_PASTA_SAIDA', BASE_DIR / 'arquivo' / 'coletas_vibra'))
+# Extração rápida: tabela de produtos num único page.evaluate, esperas por
+# evento e imagens/fontes/analytics bloqueados (False = seletor a seletor)
+VIBRA_EXTRACAO_RAPIDA = os.environ.get('VIBRA_EXTRACAO_RAPIDA', 'True') == 'True'
+
+# Ingestão de preços: leitura idêntica (posto, produto, preço, prazo)
+# dentro desta janela é considerada repetida e não é gravada de novo
+VIBRA_JANELA_DEDUP_MINUTOS = int(os.environ.get('VIBRA_JANELA_DEDUP_MINUTOS', 60))
+
+# Fila do scraper (python manage.py worker_scraper): heartbeat do worker e
+# tempo sem sinal para considerar a tarefa travada
+VIBRA_FILA_HEARTBEAT_SEGUNDOS = int(os.environ.get('VIBRA_FILA_HEARTBEAT_SEGUNDOS', 15))
+VIBRA_FILA_TIMEOUT_SEGUNDOS = int(os.environ.get('VIBRA_FILA_TIMEOUT_SEGUNDOS', 300))
+
+# Feeds Logus (api/logus-feed, api/precos-atual, api/resumo-postos):
+# corpo JSON em cache por versão dos preços, com ETag/304 e gzip
+FUEL_FEED_CACHE_SEGUNDOS = int(os.environ.get('FUEL_FEED_CACHE_SEGUNDOS', 60))
+FUEL_FEED_VERSAO_TTL = int(os.environ.get('FUEL_FEED_VERSAO_TTL', 10))
+FUEL_FEED_GZIP = os.environ.get('FUEL_FEED_GZIP', 'True') == 'True'
+
+# Delta de preços (api/precos-delta): página máxima, long-polling e
+# idade mínima do preço antes de entrar no delta (commits fora de ordem)
+FUEL_DELTA_LIMITE_MAX = int(os.environ.get('FUEL_DELTA_LIMITE_MAX', 5000))
+FUEL_DELTA_ESPERA_MAX = int(os.environ.get('FUEL_DELTA_ESPERA_MAX', 25))
+FUEL_DELTA_INTERVALO_SEGUNDOS = float(os.environ.get('FUEL_DELTA_INTERVALO_SEGUNDOS', 1.0))
+FUEL_DELTA_MARGEM_SEGUNDOS = int(os.environ.get('FUEL_DELTA_MARGEM_SEGUNDOS', 2))
+
+# Análise de preços (analise_precos.gerar_alertas): histórico carregado,
+# janela móvel, limiares dos alertas e validade
+FUEL_ANALISE_HISTORICO_DIAS = int(os.environ.get('FUEL_ANALISE_HISTORICO_DIAS', 365))
+FUEL_ANALISE_JANELA_DIAS = int(os.environ.get('FUEL_ANALISE_JANELA_DIAS', 30))
+FUEL_ANALISE_MIN_AMOSTRAS = int(os.environ.get('FUEL_ANALISE_MIN_AMOSTRAS', 5))
+FUEL_ALERTA_LIMIAR_Z = float(os.environ.get('FUEL_ALERTA_LIMIAR_Z', 2.5))
+FUEL_ALERTA_DIFERENCA_MIN = float(os.environ.get('FUEL_ALERTA_DIFERENCA_MIN', 0.02))
+FUEL_ALERTA_ECONOMIA_MIN = float(os.environ.get('FUEL_ALERTA_ECONOMIA_MIN', 50))
+FUEL_ALERTA_VALIDADE_DIAS = int(os.environ.get('FUEL_ALERTA_VALIDADE_DIAS', 7))
+
+# Arquivo do histórico PrecoVibra (python manage.py arquivar_precos_vibra):
+# dias mantidos na tabela e pasta dos arquivos colunares por dia
+FUEL_ARQUIVO_DIAS = int(os.environ.get('FUEL_ARQUIVO_DIAS', 90))
+FUEL_ARQUIVO_DIR = Path(os.environ.get('FUEL_ARQUIVO_DIR', BASE_DIR / 'arquivo' / 'precos_vibra'))
+
+# Ingestão de telemetria solar (POST /solar/api/leituras/ingestao/):
+# linhas por INSERT, leituras por requisição e token dos coletores
+# (header X-Ingestao-Token; vazio = exige usuário logado)
+SOLAR_INGESTAO_LOTE = int(os.environ.get('SOLAR_INGESTAO_LOTE', 2000))
+SOLAR_INGESTAO_MAX_LEITURAS = int(os.environ.get('SOLAR_INGESTAO_MAX_LEITURAS', 200000))
+SOLAR_INGESTAO_MAX_BYTES = int(os.environ.get('SOLAR_INGESTAO_MAX_BYTES', 256 * 1024 * 1024))
+SOLAR_INGESTAO_TOKEN = os.environ.get('SOLAR_INGESTAO_TOKEN', '')
+
+# Agregados de leituras solares (5 min / hora / dia): atualizados a cada lote
+# ingerido e a cada leitura salva pelo ORM; python manage.py
+# atualizar_agregados_solar refaz a partir das leituras
+SOLAR_AGREGADOS_NA_INGESTAO = os.environ.get('SOLAR_AGREGADOS_NA_INGESTAO', 'True') == 'True'
+
+# Status das usinas em tempo real (long-polling e SSE em /solar/api/status-geral/):
+# espera máxima, intervalo entre consultas e duração de cada conexão SSE.
+# Cada conexão ocupa uma thread do gunicorn (Procfile: gthread) enquanto
+# está aberta: mantenha a duração abaixo do --timeout dos workers
+SOLAR_STATUS_ESPERA_MAX = int(os.environ.get('SOLAR_STATUS_ESPERA_MAX', 25))
+SOLAR_STATUS_INTERVALO_SEGUNDOS = float(os.environ.get('SOLAR_STATUS_INTERVALO_SEGUNDOS', 1.0))
+SOLAR_STATUS_STREAM_SEGUNDOS = float(os.environ.get('SOLAR_STATUS_STREAM_SEGUNDOS', 60))
+
+# Análise de performance em lote (python manage.py analisar_performance_solar):
+# fração da potência AC que conta como clipping, chuva (mm) que lava as placas
+# e nebulosidade máxima (%) de um dia de referência para estimar sujeira
+SOLAR_ANALISE_LIMIAR_CLIPPING = float(os.environ.get('SOLAR_ANALISE_LIMIAR_CLIPPING', 0.98))
+SOLAR_ANALISE_CHUVA_LIMPEZA_MM = float(os.environ.get('SOLAR_ANALISE_CHUVA_LIMPEZA_MM', 5))
+SOLAR_ANALISE_NEBULOSIDADE_CEU_LIMPO = float(os.environ.get('SOLAR_ANALISE_NEBULOSIDADE_CEU_LIMPO', 30))
+
+# Detector de anomalias nas leituras solares (ingestão e save() → AlertaUsina):
+# peso da leitura nova na média exponencial, desvios para "produção baixa",
+# leituras de aquecimento, irradiância mínima (W/m²), tolerância da tensão
+# dos inversores e faixa de frequência da rede
+SOLAR_DETECTOR_NA_INGESTAO = os.environ.get('SOLAR_DETECTOR_NA_INGESTAO', 'True') == 'True'
+SOLAR_DETECTOR_ALFA = float(os.environ.get('SOLAR_DETECTOR_ALFA', 0.02))
+SOLAR_DETECTOR_LIMIAR_Z = float(os.environ.get('SOLAR_DETECTOR_LIMIAR_Z', 4.0))
+SOLAR_DETECTOR_AQUECIMENTO = int(os.environ.get('SOLAR_DETECTOR_AQUECIMENTO', 50))
+SOLAR_DETECTOR_IRRADIANCIA_MIN = float(os.environ.get('SOLAR_DETECTOR_IRRADIANCIA_MIN', 200))
+SOLAR_DETECTOR_TOLERANCIA_TENSAO = float(os.environ.get('SOLAR_DETECTOR_TOLERANCIA_TENSAO', 0.10))
+SOLAR_DETECTOR_FREQUENCIA_MIN_HZ = float(os.environ.get('SOLAR_DETECTOR_FREQUENCIA_MIN_HZ', 59.5))
+SOLAR_DETECTOR_FREQUENCIA_MAX_HZ = float(os.environ.get('SOLAR_DETECTOR_FREQUENCIA_MAX_HZ', 60.5))
+
 # 🔐 CONFIGURAÇÕES DE AUTENTICAÇÃO
 # ============================================================
 # URLs de redirecionamento para login/logout
@@ -15,17 +15,19 @@ from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeo
 class VibraScraperStandalone:
     """Scraper standalone para executável"""
     
-    def __init__(self, username='95406', password='Apcc2350', headless=True):
+    def __init__(self, username=None, password=None, headless=True):
         """
         Inicializa o scraper standalone
         
         Args:
-            username: Login do portal Vibra (padrão: Casa Caiada)
-            password: Senha do portal Vibra
+            username: Login do portal Vibra (padrão: variável VIBRA_PORTAL_USUARIO)
+            password: Senha do portal Vibra (padrão: variável VIBRA_PORTAL_SENHA)
             headless: True = sem interface gráfica, False = mostra navegador
         """
-        self.username = username
-        self.password = password
+        self.username = username or os.environ.get('VIBRA_PORTAL_USUARIO', '')
+        self.password = password or os.environ.get('VIBRA_PORTAL_SENHA', '')
+        if not self.username or not self.password:
+            raise ValueError('Credencial do portal Vibra ausente: defina VIBRA_PORTAL_USUARIO e VIBRA_PORTAL_SENHA')
         self.headless = headless
         self.login_url = "https://cn.vibraenergia.com.br/login/"
         
@@ -100,7 +100,7 @@ class AnalisePerformanceAdmin(admin.ModelAdmin):
         }),
         ('Perdas Estimadas', {
             'fields': ('perda_temperatura_percent', 'perda_sujeira_percent', 
-                      'perda_sombreamento_percent', 'perda_outros_percent'),
+                      'perda_sombreamento_percent', 'perda_clipping_percent', 'perda_outros_percent'),
             'classes': ('collapse',)
         }),
     )
@@ -0,0 +1,414 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║              AGREGADOS DE LEITURAS - SOLAR_MONITOR               ║
+║       Resumos por usina em 5 minutos, hora e dia (rollups)       ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. AgregadoUsina guarda, por usina e intervalo: leituras, potência
+   mín/máx/soma, contadores de energia (mín/máx de energia_gerada_kwh e
+   máx de energia_dia_kwh), soma e contagem de temperatura do módulo e
+   de irradiância. Somas + contagens (e não médias) permitem juntar
+   lotes novos sem reler as leituras
+2. Na ingestão em lote (ingestao_leituras) atualizar_com_leituras()
+   agrupa as leituras novas com numpy e soma nos agregados existentes
+   (uma consulta por granularidade)
+3. save() de LeituraUsina (admin, scripts) → sinal post_save
+   (signals.py) → atualizar_com_leitura(): leitura nova é somada como
+   um lote de uma linha; leitura editada refaz o dia daquela usina
+4. recalcular(inicio, fim) refaz os agregados dia a dia a partir das
+   leituras - leituras apagadas, gravação sem sinais (bulk_create, SQL)
+   ou qualquer divergência:
+       python manage.py atualizar_agregados_solar --dias 2
+5. Leitura: serie() (energia de cada intervalo pela diferença dos
+   contadores), energia_do_dia() e gerar_relatorio_mensal() - os
+   dashboards e o RelatorioMensal leem centenas de agregados em vez de
+   meses de leituras
+
+Intervalos alinhados no fuso do projeto (dia = 00:00 local).
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+SOLAR_AGREGADOS_NA_INGESTAO = True   # atualizar agregados a cada lote ingerido (e a cada save())
+"""
+
+import calendar
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from .models import AgregadoUsina, LeituraUsina, RelatorioMensal, UsinaSolar
+
+
+GRANULARIDADES = {'5min': 300, 'hora': 3600, 'dia': 86400}
+
+CAMPOS_MIN = ['potencia_min_kw', 'energia_gerada_min_kwh']
+CAMPOS_MAX = ['potencia_max_kw', 'energia_gerada_max_kwh', 'energia_dia_max_kwh']
+CAMPOS_SOMA = [
+    'leituras', 'potencia_soma_kw',
+    'temperatura_soma_c', 'temperatura_leituras',
+    'irradiancia_soma_w_m2', 'irradiancia_leituras',
+]
+CAMPOS_AGREGADO = CAMPOS_MIN + CAMPOS_MAX + CAMPOS_SOMA
+
+# Leituras carregadas para agregar (na ordem de values_list)
+CAMPOS_LEITURA = [
+    'potencia_atual_kw', 'energia_gerada_kwh', 'energia_dia_kwh',
+    'temperatura_modulo_c', 'irradiancia_w_m2',
+]
+
+# Mesmos fatores de LeituraUsina.save()
+FATOR_CO2 = Decimal('0.475')
+TARIFA = Decimal('0.80')
+
+
+def _limites_dia(dia):
+    inicio = timezone.make_aware(datetime.combine(dia, time.min))
+    return inicio, timezone.make_aware(datetime.combine(dia + timedelta(days=1), time.min))
+
+
+def _momento(epoch):
+    return datetime.fromtimestamp(int(epoch), tz=timezone.get_current_timezone())
+
+
+# ============================================================
+# 🧮 AGRUPAMENTO (numpy)
+# ============================================================
+
+def _inicios(epoch, granularidade):
+    """Início (epoch) do intervalo de cada leitura, alinhado no fuso local"""
+    fuso = timezone.get_current_timezone()
+    horas, por_hora = np.unique(epoch // 3600, return_inverse=True)
+    deslocamentos = np.array(
+        [datetime.fromtimestamp(int(hora) * 3600, fuso).utcoffset().total_seconds() for hora in horas],
+        dtype=np.int64,
+    )[por_hora]
+    locais = epoch + deslocamentos
+
+    if granularidade != 'dia':
+        passo = GRANULARIDADES[granularidade]
+        return locais - locais % passo - deslocamentos
+
+    # Meia-noite local de cada dia (make_aware resolve horário de verão)
+    dias, por_dia = np.unique(locais // 86400, return_inverse=True)
+    meias_noites = np.array(
+        [int(_limites_dia(date(1970, 1, 1) + timedelta(days=int(dia)))[0].timestamp()) for dia in dias],
+        dtype=np.int64,
+    )
+    return meias_noites[por_dia]
+
+
+def agregar(colunas, granularidade):
+    """
+    Leituras em colunas → um registro por (usina, intervalo)
+
+    Args:
+        colunas (dict): usina_id, epoch (int64) e um array float por
+                        campo de CAMPOS_LEITURA (NaN = sem valor)
+
+    Returns:
+        dict de arrays: usina_id, inicio (epoch) e os CAMPOS_AGREGADO
+    """
+    if not len(colunas['epoch']):
+        return None
+
+    inicios = _inicios(colunas['epoch'], granularidade)
+    ordem = np.lexsort((inicios, colunas['usina_id']))
+    usinas, inicios = colunas['usina_id'][ordem], inicios[ordem]
+    novo_grupo = np.ones(len(ordem), dtype=bool)
+    novo_grupo[1:] = (usinas[1:] != usinas[:-1]) | (inicios[1:] != inicios[:-1])
+    cortes = np.flatnonzero(novo_grupo)
+
+    potencia = colunas['potencia_atual_kw'][ordem]
+    energia = colunas['energia_gerada_kwh'][ordem]
+    energia_dia = np.nan_to_num(colunas['energia_dia_kwh'][ordem])
+    temperatura = colunas['temperatura_modulo_c'][ordem]
+    irradiancia = colunas['irradiancia_w_m2'][ordem]
+    com_temperatura = ~np.isnan(temperatura)
+    com_irradiancia = ~np.isnan(irradiancia)
+
+    return {
+        'usina_id': usinas[cortes],
+        'inicio': inicios[cortes],
+        'leituras': np.diff(np.append(cortes, len(ordem))),
+        'potencia_min_kw': np.minimum.reduceat(potencia, cortes),
+        'potencia_max_kw': np.maximum.reduceat(potencia, cortes),
+        'potencia_soma_kw': np.add.reduceat(potencia, cortes),
+        'energia_gerada_min_kwh': np.minimum.reduceat(energia, cortes),
+        'energia_gerada_max_kwh': np.maximum.reduceat(energia, cortes),
+        'energia_dia_max_kwh': np.maximum.reduceat(energia_dia, cortes),
+        'temperatura_soma_c': np.add.reduceat(np.where(com_temperatura, temperatura, 0), cortes),
+        'temperatura_leituras': np.add.reduceat(com_temperatura.astype(np.int64), cortes),
+        'irradiancia_soma_w_m2': np.add.reduceat(np.where(com_irradiancia, irradiancia, 0), cortes),
+        'irradiancia_leituras': np.add.reduceat(com_irradiancia.astype(np.int64), cortes),
+    }
+
+
+def _valor(campo, valor):
+    """float do numpy → tipo do campo (Decimal com as casas do model ou int)"""
+    field = AgregadoUsina._meta.get_field(campo)
+    if field.get_internal_type() == 'DecimalField':
+        return Decimal(f'{float(valor):.{field.decimal_places}f}')
+    return int(valor)
+
+
+# ============================================================
+# 💾 GRAVAÇÃO
+# ============================================================
+
+def _mesclar(granularidade, grupos):
+    """Soma os grupos nos agregados existentes (ou cria) - numa transação"""
+    inicios = [_momento(inicio) for inicio in grupos['inicio'].tolist()]
+    usina_ids = grupos['usina_id'].tolist()
+
+    existentes = {
+        (agregado.usina_id, agregado.inicio): agregado
+        for agregado in AgregadoUsina.objects.select_for_update().filter(
+            granularidade=granularidade,
+            usina_id__in=set(usina_ids),
+            inicio__gte=min(inicios),
+            inicio__lte=max(inicios),
+        )
+    }
+
+    agora = timezone.now()
+    novos, alterados = [], []
+    for posicao, (usina_id, inicio) in enumerate(zip(usina_ids, inicios)):
+        valores = {campo: _valor(campo, grupos[campo][posicao]) for campo in CAMPOS_AGREGADO}
+        agregado = existentes.get((usina_id, inicio))
+        if agregado is None:
+            novos.append(AgregadoUsina(usina_id=usina_id, granularidade=granularidade, inicio=inicio, **valores))
+            continue
+        for campo in CAMPOS_MIN:
+            setattr(agregado, campo, min(getattr(agregado, campo), valores[campo]))
+        for campo in CAMPOS_MAX:
+            setattr(agregado, campo, max(getattr(agregado, campo), valores[campo]))
+        for campo in CAMPOS_SOMA:
+            setattr(agregado, campo, getattr(agregado, campo) + valores[campo])
+        agregado.atualizado_em = agora  # bulk_update não aplica auto_now
+        alterados.append(agregado)
+
+    AgregadoUsina.objects.bulk_update(alterados, CAMPOS_AGREGADO + ['atualizado_em'], batch_size=500)
+    AgregadoUsina.objects.bulk_create(novos, batch_size=500)
+    return len(novos) + len(alterados)
+
+
+def atualizar_com_leituras(colunas):
+    """
+    Soma leituras recém-gravadas nos agregados das três granularidades
+
+    Args:
+        colunas (dict): usina_id, epoch e CAMPOS_LEITURA (ver agregar)
+
+    Returns:
+        dict: granularidade → agregados tocados
+    """
+    tocados = {}
+    for granularidade in GRANULARIDADES:
+        grupos = agregar(colunas, granularidade)
+        if grupos is None:
+            continue
+        for tentativa in range(2):
+            try:
+                with transaction.atomic():
+                    tocados[granularidade] = _mesclar(granularidade, grupos)
+                break
+            except IntegrityError:
+                # Outro lote criou o mesmo intervalo ao mesmo tempo: relê e soma
+                if tentativa:
+                    raise
+    return tocados
+
+
+def atualizar_com_leitura(leitura, nova=True):
+    """
+    Agregados de uma LeituraUsina salva pelo ORM
+
+    Leitura nova entra como um lote de uma linha; leitura editada não pode
+    ser somada de novo, então o dia dela é refeito para aquela usina.
+    """
+    if not nova:
+        dia = timezone.localdate(leitura.timestamp)
+        return recalcular(dia, dia, usina_ids=[leitura.usina_id])
+    valores = [getattr(leitura, campo) for campo in CAMPOS_LEITURA]
+    return atualizar_com_leituras(_colunas_do_banco([(leitura.usina_id, leitura.timestamp, *valores)]))
+
+
+def _colunas_do_banco(linhas):
+    """values_list(usina_id, timestamp, *CAMPOS_LEITURA) → colunas para agregar()"""
+    if not linhas:
+        return {'usina_id': np.array([], dtype=np.int64), 'epoch': np.array([], dtype=np.int64)}
+    transpostas = list(zip(*linhas))
+    colunas = {
+        'usina_id': np.array(transpostas[0], dtype=np.int64),
+        'epoch': np.array([int(momento.timestamp()) for momento in transpostas[1]], dtype=np.int64),
+    }
+    for campo, valores in zip(CAMPOS_LEITURA, transpostas[2:]):
+        colunas[campo] = np.array([np.nan if valor is None else valor for valor in valores], dtype=float)
+    return colunas
+
+
+def recalcular(inicio, fim=None, usina_ids=None):
+    """
+    Refaz os agregados dos dias [inicio, fim] a partir das leituras
+
+    Args:
+        inicio, fim (date): dias locais (fim padrão hoje)
+        usina_ids (iterável): só estas usinas (padrão todas)
+
+    Returns:
+        dict: dias, leituras, agregados
+    """
+    fim = fim or timezone.localdate()
+    resultado = {'dias': 0, 'leituras': 0, 'agregados': 0}
+
+    dia = inicio
+    while dia <= fim:
+        comeco, final = _limites_dia(dia)
+        leituras = LeituraUsina.objects.filter(timestamp__gte=comeco, timestamp__lt=final).order_by()
+        agregados = AgregadoUsina.objects.filter(inicio__gte=comeco, inicio__lt=final)
+        if usina_ids is not None:
+            leituras = leituras.filter(usina_id__in=usina_ids)
+            agregados = agregados.filter(usina_id__in=usina_ids)
+
+        colunas = _colunas_do_banco(list(leituras.values_list('usina_id', 'timestamp', *CAMPOS_LEITURA)))
+
+        with transaction.atomic():
+            agregados.delete()
+            for granularidade in GRANULARIDADES:
+                grupos = agregar(colunas, granularidade)
+                if grupos is None:
+                    continue
+                novos = [
+                    AgregadoUsina(
+                        usina_id=usina_id,
+                        granularidade=granularidade,
+                        inicio=_momento(grupos['inicio'][posicao]),
+                        **{campo: _valor(campo, grupos[campo][posicao]) for campo in CAMPOS_AGREGADO},
+                    )
+                    for posicao, usina_id in enumerate(grupos['usina_id'].tolist())
+                ]
+                AgregadoUsina.objects.bulk_create(novos, batch_size=500)
+                resultado['agregados'] += len(novos)
+
+        resultado['dias'] += 1
+        resultado['leituras'] += len(colunas['epoch'])
+        dia += timedelta(days=1)
+
+    return resultado
+
+
+# ============================================================
+# 📊 CONSULTAS
+# ============================================================
+
+def serie(usina_id, granularidade, inicio, fim):
+    """
+    Agregados de uma usina no período, com a energia de cada intervalo
+
+    A energia vem da diferença do contador energia_gerada_kwh entre o fim
+    do intervalo anterior e o fim deste (se o contador zerou, só o
+    próprio intervalo conta).
+
+    Returns:
+        list[dict]: inicio, leituras, potencia_min/max/media_kw,
+                    energia_kwh, energia_dia_kwh, temperatura_media_c,
+                    irradiancia_media_w_m2
+    """
+    agregados = AgregadoUsina.objects.filter(usina_id=usina_id, granularidade=granularidade)
+    anterior = agregados.filter(inicio__lt=inicio).order_by('-inicio').first()
+    base = anterior.energia_gerada_max_kwh if anterior else None
+
+    pontos = []
+    for agregado in agregados.filter(inicio__gte=inicio, inicio__lt=fim).order_by('inicio'):
+        if base is None or agregado.energia_gerada_max_kwh < base:
+            base = agregado.energia_gerada_min_kwh
+        pontos.append({
+            'inicio': agregado.inicio,
+            'leituras': agregado.leituras,
+            'potencia_min_kw': agregado.potencia_min_kw,
+            'potencia_max_kw': agregado.potencia_max_kw,
+            'potencia_media_kw': agregado.potencia_media_kw,
+            'energia_kwh': agregado.energia_gerada_max_kwh - base,
+            'energia_dia_kwh': agregado.energia_dia_max_kwh,
+            'temperatura_media_c': agregado.temperatura_media_c,
+            'irradiancia_media_w_m2': agregado.irradiancia_media_w_m2,
+        })
+        base = agregado.energia_gerada_max_kwh
+    return pontos
+
+
+def energia_do_dia(dia=None, usinas=None):
+    """Geração do dia (soma do energia_dia_kwh final de cada usina)"""
+    inicio, _ = _limites_dia(dia or timezone.localdate())
+    agregados = AgregadoUsina.objects.filter(granularidade='dia', inicio=inicio)
+    if usinas is not None:
+        agregados = agregados.filter(usina__in=usinas)
+    return agregados.aggregate(total=Sum('energia_dia_max_kwh'))['total'] or 0
+
+
+def gerar_relatorio_mensal(usina, ano, mes):
+    """
+    Cria/atualiza o RelatorioMensal da usina a partir dos agregados
+    diários (energia, pico) e horários (horas de sol pico)
+
+    Returns:
+        RelatorioMensal ou None se não há agregados no mês
+    """
+    primeiro = date(ano, mes, 1)
+    ultimo = date(ano, mes, calendar.monthrange(ano, mes)[1])
+    inicio, _ = _limites_dia(primeiro)
+    _, fim = _limites_dia(ultimo)
+
+    dias = list(
+        AgregadoUsina.objects.filter(usina=usina, granularidade='dia', inicio__gte=inicio, inicio__lt=fim)
+        .filter(leituras__gt=0)
+        .values_list('inicio', 'energia_dia_max_kwh')
+    )
+    if not dias:
+        return None
+
+    energia_total = sum(energia for _, energia in dias)
+    pico = AgregadoUsina.objects.filter(
+        usina=usina, granularidade='dia', inicio__gte=inicio, inicio__lt=fim
+    ).aggregate(pico=Max('potencia_max_kw'))['pico'] or 0
+
+    # HSP do dia = Σ irradiância média de cada hora (W/m² × 1h) / 1000
+    irradiacao_por_dia = {}
+    for hora, soma, leituras in AgregadoUsina.objects.filter(
+        usina=usina, granularidade='hora', inicio__gte=inicio, inicio__lt=fim, irradiancia_leituras__gt=0
+    ).values_list('inicio', 'irradiancia_soma_w_m2', 'irradiancia_leituras'):
+        dia = timezone.localtime(hora).date()
+        irradiacao_por_dia[dia] = irradiacao_por_dia.get(dia, 0) + soma / leituras / 1000
+    horas_sol_pico = (
+        sum(irradiacao_por_dia.values()) / len(irradiacao_por_dia) if irradiacao_por_dia else Decimal('0')
+    )
+
+    ultimo_considerado = min(ultimo, timezone.localdate())
+    primeiro_considerado = max(primeiro, usina.data_instalacao)
+    dias_considerados = max((ultimo_considerado - primeiro_considerado).days + 1, 0)
+
+    relatorio, _ = RelatorioMensal.objects.update_or_create(
+        usina=usina, mes=mes, ano=ano,
+        defaults={
+            'energia_gerada_total_kwh': round(energia_total, 2),
+            'energia_media_dia_kwh': round(energia_total / len(dias), 2),
+            'potencia_pico_kw': round(pico, 2),
+            'horas_sol_pico': round(Decimal(horas_sol_pico), 2),
+            'co2_evitado_total_kg': round(energia_total * FATOR_CO2, 2),
+            'economia_total_reais': round(energia_total * TARIFA, 2),
+            'dias_offline': max(dias_considerados - len(dias), 0),
+        },
+    )
+    return relatorio
+
+
+def gerar_relatorios_mensais(ano, mes, usinas=None):
+    """gerar_relatorio_mensal() para as usinas ativas (ou as informadas)"""
+    usinas = usinas if usinas is not None else UsinaSolar.objects.filter(ativa=True)
+    return [relatorio for relatorio in (gerar_relatorio_mensal(usina, ano, mes) for usina in usinas) if relatorio]
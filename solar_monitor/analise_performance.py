@@ -0,0 +1,588 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║             ANÁLISE DE PERFORMANCE - SOLAR_MONITOR               ║
+║   Geração + clima de um período → AnalisePerformance em lote     ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. Carga: poucas queries para o período inteiro, direto para DataFrame
+   - carregar_usinas(): kWp, PR esperado (sombreamento médio, como
+     UsinaSolar.performance_ratio_esperado), coeficiente de temperatura
+     das placas (média ponderada pelos Wp instalados) e potência AC dos
+     inversores ativos
+   - carregar_clima(): DadosMeteorologicos do período
+   - carregar_geracao(): energia de cada dia pelos agregados diários
+     (AgregadoUsina, ver agregados.py) - sem ler leituras
+   - carregar_clipping(): só os intervalos de 5 min com potência no
+     limite dos inversores (usinas e menor limite filtrados no banco, o
+     limite de cada usina em pandas)
+2. Cálculo em bloco (pandas/numpy), todas as usinas e dias de uma vez:
+   - resumir_clima(): por (usina, dia) HSP (irradiância × tempo até a
+     amostra seguinte, ou hsp_dia_kwh_m2 quando informado), HSP efetiva
+     (fator de nebulosidade de DadosMeteorologicos), temperatura média
+     do ar e da célula (modelo NOCT, ponderada pela irradiância),
+     nebulosidade média e chuva total
+   - calcular_analises():
+       esperada ideal = kWp × HSP × PR        (calcular_geracao_esperada_kwh)
+       esperada real  = kWp × HSP efetiva × PR × fator de temperatura
+     PR vs ideal/real e status nas faixas de AnalisePerformance.save();
+     perdas por temperatura, sombreamento, clipping (potência DC
+     esperada acima da AC nos intervalos no limite) e sujeira
+   - sujeira: em dias de céu limpo, queda do PR em relação ao melhor PR
+     desde a última chuva forte (a chuva lava as placas); nos outros
+     dias vale a última estimativa
+3. gravar_analises(): UM bulk_create com upsert em (usina, data_analise)
+   - reanalisar um período substitui as análises existentes
+
+Dias sem dados meteorológicos ou sem agregados de leituras ficam de fora
+(contados no resultado). Leituras gravadas fora da ingestão em lote
+precisam de `python manage.py atualizar_agregados_solar` antes.
+
+    python manage.py analisar_performance_solar --dias 30
+    python manage.py analisar_performance_solar --benchmark --usinas 20 --dias 365
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+SOLAR_ANALISE_LIMIAR_CLIPPING = 0.98       # fração da potência AC que conta como no limite
+SOLAR_ANALISE_CHUVA_LIMPEZA_MM = 5         # chuva no dia que lava as placas (zera a sujeira)
+SOLAR_ANALISE_NEBULOSIDADE_CEU_LIMPO = 30  # nebulosidade máxima (%) de um dia de referência
+"""
+
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+try:
+    import pandas as pd
+    PANDAS_DISPONIVEL = True
+except ImportError:
+    PANDAS_DISPONIVEL = False
+
+from .agregados import GRANULARIDADES, _limites_dia
+from .models import AgregadoUsina, ConfiguracaoPlacasUsina, Inversor, PR_BASE_ESPERADO, UsinaSolar
+from .models_meteorologia import (
+    FAIXAS_NEBULOSIDADE, FAIXAS_PERFORMANCE, FATOR_NEBULOSIDADE_MAXIMA, PERFORMANCE_CRITICA,
+    AnalisePerformance, DadosMeteorologicos,
+)
+
+
+CHAVE = ['usina_id', 'dia']
+
+COLUNAS_CLIMA = [
+    'usina_id', 'timestamp', 'irradiancia_global_w_m2', 'temperatura_ar_c',
+    'nebulosidade_percent', 'precipitacao_mm', 'hsp_dia_kwh_m2',
+]
+
+# Campos numéricos gravados em AnalisePerformance (colunas de calcular_analises)
+CAMPOS_DECIMAIS = [
+    'energia_gerada_kwh', 'energia_esperada_ideal_kwh', 'energia_esperada_real_kwh',
+    'irradiancia_media_w_m2', 'hsp_dia_kwh_m2', 'temperatura_media_c',
+    'nebulosidade_media_percent', 'precipitacao_total_mm',
+    'pr_ideal_percent', 'pr_real_percent',
+    'perda_temperatura_percent', 'perda_sujeira_estimada_percent',
+    'perda_sombreamento_percent', 'perda_clipping_percent',
+]
+CAMPOS_ATUALIZADOS = CAMPOS_DECIMAIS + [
+    'status_performance', 'requer_atencao', 'justificativa_climatica', 'recomendacoes', 'atualizado_em',
+]
+
+NOCT_C = 45                      # temperatura nominal da célula (800 W/m², ar a 20 °C)
+COEF_TEMPERATURA_PADRAO = -0.4   # %/°C, padrão de ModeloPlacaSolar
+INTERVALO_CLIMA_MAXIMO = 3600    # uma amostra de clima vale no máximo 1 h
+PR_MAXIMO = 999.99               # limite dos campos de PR (max_digits=5)
+
+
+def _config(nome, padrao):
+    return getattr(settings, nome, padrao)
+
+
+def _dias_locais(momentos):
+    """Series de datetimes (aware) → dia local, como datetime64 à meia-noite"""
+    return (
+        pd.to_datetime(momentos, utc=True).dt
+        .tz_convert(timezone.get_current_timezone_name()).dt
+        .tz_localize(None).dt
+        .normalize()
+    )
+
+
+def _periodo(inicio, fim):
+    return _limites_dia(inicio)[0], _limites_dia(fim)[1]
+
+
+def fator_nebulosidade(nebulosidade):
+    """Mesmo fator de DadosMeteorologicos.fator_reducao_nuvens, para arrays"""
+    nebulosidade = np.asarray(nebulosidade, dtype=float)
+    return np.select(
+        [nebulosidade < limite for limite, _ in FAIXAS_NEBULOSIDADE],
+        [fator for _, fator in FAIXAS_NEBULOSIDADE],
+        default=FATOR_NEBULOSIDADE_MAXIMA,
+    )
+
+
+def classificar(pr_real_percent):
+    """
+    Mesmas faixas de AnalisePerformance.save(), para arrays
+
+    Returns:
+        tuple: (status_performance, requer_atencao) como arrays
+    """
+    pr = np.asarray(pr_real_percent, dtype=float)
+    condicoes = [pr >= limite for limite, _, _ in FAIXAS_PERFORMANCE]
+    status = np.select(condicoes, [status for _, status, _ in FAIXAS_PERFORMANCE], default=PERFORMANCE_CRITICA[0])
+    atencao = np.select(condicoes, [atencao for _, _, atencao in FAIXAS_PERFORMANCE], default=PERFORMANCE_CRITICA[1])
+    return status, atencao.astype(bool)
+
+
+# ============================================================
+# 📥 CARGA
+# ============================================================
+
+def carregar_usinas(usina_ids=None):
+    """
+    Parâmetros de cada usina (três queries para todas)
+
+    Returns:
+        DataFrame: usina_id, capacidade_kwp, sombreamento_percent,
+                   pr_esperado, coef_temperatura (%/°C), potencia_ac_kw
+    """
+    usinas = UsinaSolar.objects.filter(ativa=True) if usina_ids is None else UsinaSolar.objects.filter(id__in=usina_ids)
+    parametros = pd.DataFrame(list(usinas.values_list('id', 'capacidade_kwp')), columns=['usina_id', 'capacidade_kwp'])
+    parametros['capacidade_kwp'] = parametros['capacidade_kwp'].astype(float)
+
+    configuracoes = pd.DataFrame(
+        list(ConfiguracaoPlacasUsina.objects.filter(ativa=True, usina__in=usinas).values_list(
+            'usina_id', 'sombreamento_estimado_percent', 'quantidade_placas',
+            'modelo_placa__potencia_pico_wp', 'modelo_placa__coef_temp_potencia_percent',
+        )),
+        columns=['usina_id', 'sombreamento', 'quantidade', 'potencia_pico_wp', 'coef'],
+    )
+    if len(configuracoes):
+        configuracoes = configuracoes.astype({'sombreamento': float, 'potencia_pico_wp': float, 'coef': float})
+        wp = configuracoes['quantidade'] * configuracoes['potencia_pico_wp']
+        configuracoes = configuracoes.assign(wp=wp, coef_wp=configuracoes['coef'] * wp)
+        por_usina = configuracoes.groupby('usina_id').agg(
+            sombreamento_percent=('sombreamento', 'mean'),
+            wp=('wp', 'sum'),
+            coef_wp=('coef_wp', 'sum'),
+        )
+        por_usina['coef_temperatura'] = (por_usina['coef_wp'] / por_usina['wp']).where(por_usina['wp'] > 0)
+        parametros = parametros.merge(
+            por_usina[['sombreamento_percent', 'coef_temperatura']], left_on='usina_id', right_index=True, how='left'
+        )
+    else:
+        parametros = parametros.assign(sombreamento_percent=np.nan, coef_temperatura=np.nan)
+
+    potencia_ac = dict(
+        Inversor.objects.filter(ativo=True, usina__in=usinas)
+        .values('usina_id').annotate(total=Sum('potencia_nominal_kw'))
+        .values_list('usina_id', 'total')
+    )
+    parametros['potencia_ac_kw'] = parametros['usina_id'].map(potencia_ac).astype(float).fillna(0)
+    parametros['sombreamento_percent'] = parametros['sombreamento_percent'].fillna(0)
+    parametros['coef_temperatura'] = parametros['coef_temperatura'].fillna(COEF_TEMPERATURA_PADRAO)
+    parametros['pr_esperado'] = float(PR_BASE_ESPERADO) * (1 - parametros['sombreamento_percent'] / 100)
+    return parametros
+
+
+def carregar_clima(inicio, fim, usina_ids):
+    """DadosMeteorologicos dos dias [inicio, fim] (uma query)"""
+    comeco, final = _periodo(inicio, fim)
+    linhas = list(
+        DadosMeteorologicos.objects
+        .filter(usina_id__in=list(usina_ids), timestamp__gte=comeco, timestamp__lt=final)
+        .order_by().values_list(*COLUNAS_CLIMA)
+    )
+    clima = pd.DataFrame(linhas, columns=COLUNAS_CLIMA)
+    return clima.astype({coluna: float for coluna in COLUNAS_CLIMA[2:]})
+
+
+def carregar_geracao(inicio, fim, usina_ids):
+    """
+    Energia de cada (usina, dia) pelo agregado diário (energia_dia_kwh
+    final do dia, como no RelatorioMensal)
+    """
+    comeco, final = _periodo(inicio, fim)
+    linhas = list(
+        AgregadoUsina.objects
+        .filter(granularidade='dia', usina_id__in=list(usina_ids), inicio__gte=comeco, inicio__lt=final, leituras__gt=0)
+        .order_by().values_list('usina_id', 'inicio', 'energia_dia_max_kwh')
+    )
+    geracao = pd.DataFrame(linhas, columns=['usina_id', 'inicio', 'energia_gerada_kwh'])
+    geracao['dia'] = _dias_locais(geracao['inicio'])
+    geracao['energia_gerada_kwh'] = geracao['energia_gerada_kwh'].astype(float)
+    return geracao[CHAVE + ['energia_gerada_kwh']]
+
+
+def carregar_clipping(inicio, fim, usinas, limiar=None):
+    """
+    Intervalos de 5 min em que a potência máxima chegou a `limiar` × a
+    potência AC da usina (só usinas com inversores cadastrados)
+    """
+    limiar = limiar if limiar is not None else _config('SOLAR_ANALISE_LIMIAR_CLIPPING', 0.98)
+    colunas = ['usina_id', 'inicio', 'potencia_max_kw', 'irradiancia_soma_w_m2', 'irradiancia_leituras']
+
+    com_inversores = usinas.loc[usinas['potencia_ac_kw'] > 0]
+    if com_inversores.empty:
+        return pd.DataFrame(columns=colunas)
+    limites = (com_inversores['potencia_ac_kw'] * limiar).round(3)
+    limites.index = com_inversores['usina_id']
+
+    # Um IN e o menor limite no banco; o limite de cada usina fica para o
+    # pandas (um Q por usina estoura a profundidade de expressão do SQLite)
+    comeco, final = _periodo(inicio, fim)
+    linhas = list(
+        AgregadoUsina.objects
+        .filter(
+            usina_id__in=limites.index.tolist(), granularidade='5min', inicio__gte=comeco, inicio__lt=final,
+            potencia_max_kw__gte=Decimal(f'{limites.min():.3f}'),
+        )
+        .order_by().values_list(*colunas)
+    )
+    intervalos = pd.DataFrame(linhas, columns=colunas)
+    no_limite = intervalos['potencia_max_kw'].astype(float) >= intervalos['usina_id'].map(limites)
+    return intervalos[no_limite].reset_index(drop=True)
+
+
+# ============================================================
+# 🧮 CÁLCULO (pandas/numpy)
+# ============================================================
+
+def resumir_clima(clima):
+    """
+    Amostras de clima → um registro por (usina, dia)
+
+    Returns:
+        DataFrame: usina_id, dia, irradiancia_media_w_m2, hsp_dia_kwh_m2,
+                   hsp_efetiva_kwh_m2, temperatura_media_c,
+                   temperatura_celula_c, nebulosidade_media_percent,
+                   precipitacao_total_mm
+    """
+    colunas = CHAVE + [
+        'irradiancia_media_w_m2', 'hsp_dia_kwh_m2', 'hsp_efetiva_kwh_m2', 'temperatura_media_c',
+        'temperatura_celula_c', 'nebulosidade_media_percent', 'precipitacao_total_mm',
+    ]
+    if clima.empty:
+        return pd.DataFrame(columns=colunas)
+
+    momentos = pd.to_datetime(clima['timestamp'], utc=True)
+    clima = clima.assign(
+        dia=_dias_locais(clima['timestamp']),
+        epoch=(momentos - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1),
+    ).sort_values(['usina_id', 'epoch'])
+
+    # Cada amostra vale até a seguinte do mesmo dia (a última, o mesmo que a anterior)
+    epoch = clima['epoch']
+    grupos = clima.groupby(CHAVE, sort=False)['epoch']
+    intervalo = (grupos.shift(-1) - epoch).clip(upper=INTERVALO_CLIMA_MAXIMO)
+    anterior = (epoch - grupos.shift(1)).clip(upper=INTERVALO_CLIMA_MAXIMO)
+    intervalo = intervalo.fillna(anterior).fillna(INTERVALO_CLIMA_MAXIMO)
+
+    irradiancia = clima['irradiancia_global_w_m2']
+    irradiacao = irradiancia * intervalo / 3600  # Wh/m²
+    celula = clima['temperatura_ar_c'] + irradiancia / 800 * (NOCT_C - 20)
+    clima = clima.assign(
+        irradiacao_wh=irradiacao,
+        efetiva_wh=irradiacao * fator_nebulosidade(clima['nebulosidade_percent']),
+        celula_wh=celula * irradiacao,
+    )
+
+    resumo = clima.groupby(CHAVE).agg(
+        irradiancia_media_w_m2=('irradiancia_global_w_m2', 'mean'),
+        irradiacao_wh=('irradiacao_wh', 'sum'),
+        efetiva_wh=('efetiva_wh', 'sum'),
+        celula_wh=('celula_wh', 'sum'),
+        temperatura_media_c=('temperatura_ar_c', 'mean'),
+        nebulosidade_media_percent=('nebulosidade_percent', 'mean'),
+        precipitacao_total_mm=('precipitacao_mm', 'sum'),
+        hsp_informado=('hsp_dia_kwh_m2', 'max'),
+    ).reset_index()
+
+    com_irradiacao = resumo['irradiacao_wh'] > 0
+    hsp = resumo['hsp_informado'].fillna(resumo['irradiacao_wh'] / 1000)
+    proporcao_efetiva = np.where(
+        com_irradiacao,
+        resumo['efetiva_wh'] / resumo['irradiacao_wh'].where(com_irradiacao, 1),
+        fator_nebulosidade(resumo['nebulosidade_media_percent']),
+    )
+    resumo['hsp_dia_kwh_m2'] = hsp
+    resumo['hsp_efetiva_kwh_m2'] = hsp * proporcao_efetiva
+    resumo['temperatura_celula_c'] = np.where(
+        com_irradiacao,
+        resumo['celula_wh'] / resumo['irradiacao_wh'].where(com_irradiacao, 1),
+        resumo['temperatura_media_c'],
+    )
+    return resumo[colunas]
+
+
+def resumir_clipping(intervalos, usinas):
+    """
+    Intervalos no limite → energia estimada cortada por (usina, dia):
+    potência DC esperada (kWp × irradiância/1000 × PR) acima da AC
+
+    Returns:
+        DataFrame: usina_id, dia, perda_clipping_kwh, intervalos_clipping
+    """
+    if intervalos.empty:
+        return pd.DataFrame(columns=CHAVE + ['perda_clipping_kwh', 'intervalos_clipping'])
+
+    dados = intervalos.merge(usinas, on='usina_id')
+    leituras = dados['irradiancia_leituras'].astype(float)
+    irradiancia = dados['irradiancia_soma_w_m2'].astype(float) / leituras.where(leituras > 0)
+    potencia_dc = dados['capacidade_kwp'] * irradiancia / 1000 * dados['pr_esperado']
+    horas = GRANULARIDADES['5min'] / 3600
+    dados = dados.assign(
+        dia=_dias_locais(dados['inicio']),
+        perda_clipping_kwh=((potencia_dc - dados['potencia_ac_kw']).clip(lower=0) * horas).fillna(0),
+    )
+    return dados.groupby(CHAVE).agg(
+        perda_clipping_kwh=('perda_clipping_kwh', 'sum'),
+        intervalos_clipping=('perda_clipping_kwh', 'size'),
+    ).reset_index()
+
+
+def _razao_percentual(numerador, denominador):
+    denominador = np.asarray(denominador, dtype=float)
+    return np.where(denominador > 0, 100 * np.asarray(numerador, dtype=float) / np.where(denominador > 0, denominador, 1), 0)
+
+
+def estimar_sujeira(analises, chuva_limpeza_mm=None, nebulosidade_ceu_limpo=None):
+    """
+    Perda por sujeira (%) de cada (usina, dia), com as análises em ordem
+    de usina e dia: 1 - PR do dia / melhor PR de céu limpo desde a última
+    chuva forte. Dias nublados repetem a última estimativa.
+    """
+    chuva_limpeza_mm = chuva_limpeza_mm if chuva_limpeza_mm is not None else _config('SOLAR_ANALISE_CHUVA_LIMPEZA_MM', 5)
+    nebulosidade_ceu_limpo = (
+        nebulosidade_ceu_limpo if nebulosidade_ceu_limpo is not None
+        else _config('SOLAR_ANALISE_NEBULOSIDADE_CEU_LIMPO', 30)
+    )
+
+    usina = analises['usina_id']
+    lavagens = (analises['precipitacao_total_mm'] >= chuva_limpeza_mm).astype(int)
+    trecho = lavagens.groupby(usina).cumsum()
+
+    referencia = (analises['nebulosidade_media_percent'] <= nebulosidade_ceu_limpo) & (analises['pr_real_percent'] > 0)
+    pr = analises['pr_real_percent'].where(referencia)
+    melhor = pr.groupby([usina, trecho]).cummax()
+    sujeira = (1 - pr / melhor) * 100
+    return sujeira.groupby([usina, trecho]).ffill().fillna(0).clip(0, 100)
+
+
+def calcular_analises(usinas, clima_dia, geracao, clipping_dia):
+    """
+    Junta parâmetros, clima e geração e calcula todos os campos de
+    AnalisePerformance (um registro por usina e dia com clima e geração)
+
+    Returns:
+        DataFrame ordenado por usina e dia
+    """
+    dados = (
+        clima_dia.merge(geracao, on=CHAVE)
+        .merge(usinas, on='usina_id')
+        .merge(clipping_dia, on=CHAVE, how='left')
+        .sort_values(CHAVE, ignore_index=True)
+    )
+    if dados.empty:
+        return dados
+
+    dados['perda_clipping_kwh'] = dados['perda_clipping_kwh'].astype(float).fillna(0)
+
+    fator_temperatura = 1 + dados['coef_temperatura'] / 100 * (dados['temperatura_celula_c'] - 25)
+    potencia = dados['capacidade_kwp'] * dados['pr_esperado']
+    energia = dados['energia_gerada_kwh']
+
+    dados['energia_esperada_ideal_kwh'] = potencia * dados['hsp_dia_kwh_m2']
+    dados['energia_esperada_real_kwh'] = potencia * dados['hsp_efetiva_kwh_m2'] * fator_temperatura
+    dados['pr_ideal_percent'] = np.clip(_razao_percentual(energia, dados['energia_esperada_ideal_kwh']), 0, PR_MAXIMO)
+    dados['pr_real_percent'] = np.clip(_razao_percentual(energia, dados['energia_esperada_real_kwh']), 0, PR_MAXIMO)
+    dados['status_performance'], dados['requer_atencao'] = classificar(dados['pr_real_percent'])
+
+    dados['perda_temperatura_percent'] = ((1 - fator_temperatura) * 100).clip(0, 100)
+    dados['perda_sombreamento_percent'] = dados['sombreamento_percent']
+    dados['perda_clipping_percent'] = _razao_percentual(dados['perda_clipping_kwh'], energia + dados['perda_clipping_kwh'])
+    dados['perda_sujeira_estimada_percent'] = estimar_sujeira(dados)
+    return dados
+
+
+def montar_analises(analises):
+    """
+    DataFrame de calcular_analises() → instâncias de AnalisePerformance
+    (com justificativa e recomendações geradas pelo próprio model)
+    """
+    casas = {campo: AnalisePerformance._meta.get_field(campo).decimal_places for campo in CAMPOS_DECIMAIS}
+    valores = {campo: analises[campo].to_numpy(dtype=float) for campo in CAMPOS_DECIMAIS}
+    usinas = analises['usina_id'].tolist()
+    dias = analises['dia'].dt.date.tolist()
+    status = analises['status_performance'].tolist()
+    atencao = analises['requer_atencao'].tolist()
+
+    instancias = []
+    for posicao in range(len(analises)):
+        analise = AnalisePerformance(
+            usina_id=usinas[posicao],
+            data_analise=dias[posicao],
+            status_performance=status[posicao],
+            requer_atencao=atencao[posicao],
+            **{campo: Decimal(f'{valores[campo][posicao]:.{casas[campo]}f}') for campo in CAMPOS_DECIMAIS},
+        )
+        analise.justificativa_climatica = analise.gerar_justificativa_climatica()
+        analise.recomendacoes = analise.gerar_recomendacoes()
+        instancias.append(analise)
+    return instancias
+
+
+# ============================================================
+# 💾 GRAVAÇÃO
+# ============================================================
+
+def gravar_analises(instancias):
+    """Upsert em (usina, data_analise): cria as novas, sobrescreve as existentes"""
+    AnalisePerformance.objects.bulk_create(
+        instancias,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['usina', 'data_analise'],
+        update_fields=CAMPOS_ATUALIZADOS,
+    )
+    return len(instancias)
+
+
+def analisar_periodo(inicio, fim=None, usina_ids=None, gravar=True):
+    """
+    Analisa os dias [inicio, fim] de todas as usinas ativas (ou as informadas)
+
+    Returns:
+        dict: analises, sem_clima (dias com geração e sem clima),
+              sem_geracao (dias com clima e sem agregados), por_status,
+              requer_atencao, tempos {carga, calculo, gravacao}
+    """
+    if not PANDAS_DISPONIVEL:
+        print("⚠️  pandas não instalado - análise de performance desativada")
+        return {'analises': 0, 'sem_clima': 0, 'sem_geracao': 0, 'por_status': {}, 'requer_atencao': 0, 'tempos': {}}
+
+    fim = fim or timezone.localdate()
+    tempos = {}
+
+    inicio_etapa = time.perf_counter()
+    usinas = carregar_usinas(usina_ids)
+    clima = carregar_clima(inicio, fim, usinas['usina_id'])
+    geracao = carregar_geracao(inicio, fim, usinas['usina_id'])
+    intervalos = carregar_clipping(inicio, fim, usinas)
+    tempos['carga'] = time.perf_counter() - inicio_etapa
+
+    inicio_etapa = time.perf_counter()
+    clima_dia = resumir_clima(clima)
+    analises = calcular_analises(usinas, clima_dia, geracao, resumir_clipping(intervalos, usinas))
+    instancias = montar_analises(analises) if len(analises) else []
+    tempos['calculo'] = time.perf_counter() - inicio_etapa
+
+    inicio_etapa = time.perf_counter()
+    if gravar and instancias:
+        with transaction.atomic():
+            gravar_analises(instancias)
+    tempos['gravacao'] = time.perf_counter() - inicio_etapa
+
+    return {
+        'analises': len(instancias),
+        'sem_clima': len(geracao) - len(instancias),
+        'sem_geracao': len(clima_dia) - len(instancias),
+        'por_status': analises['status_performance'].value_counts().to_dict() if len(analises) else {},
+        'requer_atencao': int(analises['requer_atencao'].sum()) if len(analises) else 0,
+        'tempos': tempos,
+    }
+
+
+# ============================================================
+# ⏱️ BENCHMARK
+# ============================================================
+
+def _dados_sinteticos(usina_ids, dias, amostras_por_dia, inicio):
+    """Clima horário, agregados diários e intervalos de clipping plausíveis"""
+    gerador = np.random.default_rng(42)
+    clima, diarios, intervalos = [], [], []
+    for usina_id in usina_ids:
+        for numero in range(dias):
+            meia_noite = _limites_dia(inicio + timedelta(days=numero))[0]
+            nebulosidade = float(gerador.uniform(0, 100))
+            chuva = float(gerador.choice([0, 0, 0, 2, 12]))
+            for amostra in range(amostras_por_dia):
+                hora = 6 + 12 * amostra / amostras_por_dia
+                irradiancia = max(0.0, 1000 * np.sin(np.pi * (hora - 6) / 12)) * (1 - nebulosidade / 200)
+                clima.append(DadosMeteorologicos(
+                    usina_id=usina_id, timestamp=meia_noite + timedelta(hours=hora),
+                    irradiancia_global_w_m2=round(irradiancia, 2), temperatura_ar_c=round(26 + 6 * irradiancia / 1000, 2),
+                    nebulosidade_percent=round(nebulosidade, 2), condicao_clima='parcialmente_nublado',
+                    precipitacao_mm=chuva / amostras_por_dia,
+                ))
+            energia = round(float(gerador.uniform(250, 450)), 3)
+            diarios.append(AgregadoUsina(
+                usina_id=usina_id, granularidade='dia', inicio=meia_noite, leituras=288,
+                potencia_min_kw=0, potencia_max_kw=98, potencia_soma_kw=energia * 12,
+                energia_gerada_min_kwh=numero * 400, energia_gerada_max_kwh=numero * 400 + energia,
+                energia_dia_max_kwh=energia,
+                temperatura_soma_c=0, temperatura_leituras=0, irradiancia_soma_w_m2=0, irradiancia_leituras=0,
+            ))
+            for minuto in range(0, 60, 5):
+                intervalos.append(AgregadoUsina(
+                    usina_id=usina_id, granularidade='5min', inicio=meia_noite + timedelta(hours=11, minutes=minuto),
+                    leituras=1, potencia_min_kw=95, potencia_max_kw=99.5, potencia_soma_kw=99.5,
+                    energia_gerada_min_kwh=0, energia_gerada_max_kwh=0, energia_dia_max_kwh=0,
+                    temperatura_soma_c=0, temperatura_leituras=0, irradiancia_soma_w_m2=1050, irradiancia_leituras=1,
+                ))
+    return clima, diarios, intervalos
+
+
+def benchmark(usinas=20, dias=365, amostras_por_dia=12):
+    """
+    Mede analisar_periodo() sobre `dias` de clima e agregados sintéticos
+    de `usinas` usinas novas (tudo numa transação desfeita no fim)
+
+    Returns:
+        dict: usinas, dias, amostras_clima, analises, preparo (s), tempos, total
+    """
+    if not PANDAS_DISPONIVEL:
+        raise RuntimeError('pandas não instalado')
+
+    inicio = date(2001, 1, 1)
+    with transaction.atomic():
+        inicio_preparo = time.perf_counter()
+        usina_ids = [
+            UsinaSolar.objects.create(
+                nome=f'Benchmark {numero}', localizacao='-', capacidade_kwp=120, data_instalacao=inicio,
+            ).id
+            for numero in range(usinas)
+        ]
+        Inversor.objects.bulk_create([
+            Inversor(
+                usina_id=usina_id, fabricante='Benchmark', modelo='100K', potencia_nominal_kw=100,
+                potencia_maxima_dc_kw=130, tensao_entrada_min_v=200, tensao_entrada_max_v=1000,
+                tensao_mppt_min_v=200, tensao_mppt_max_v=850, corrente_entrada_max_a=30,
+                corrente_saida_max_a=150, numero_mppt=6, strings_por_mppt=2,
+            )
+            for usina_id in usina_ids
+        ])
+        clima, diarios, intervalos = _dados_sinteticos(usina_ids, dias, amostras_por_dia, inicio)
+        DadosMeteorologicos.objects.bulk_create(clima, batch_size=2000)
+        AgregadoUsina.objects.bulk_create(diarios + intervalos, batch_size=2000)
+        preparo = time.perf_counter() - inicio_preparo
+
+        resultado = analisar_periodo(inicio, inicio + timedelta(days=dias - 1), usina_ids=usina_ids)
+        transaction.set_rollback(True)
+
+    return {
+        'usinas': usinas,
+        'dias': dias,
+        'amostras_clima': len(clima),
+        'analises': resultado['analises'],
+        'preparo': preparo,
+        'tempos': resultado['tempos'],
+        'total': sum(resultado['tempos'].values()),
+    }
@@ -5,3 +5,6 @@ class SolarMonitorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'solar_monitor'
     verbose_name = 'Monitoramento Solar'
+
+    def ready(self):
+        from . import signals  # noqa: F401
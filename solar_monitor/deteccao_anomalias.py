@@ -0,0 +1,474 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║             DETECÇÃO DE ANOMALIAS - SOLAR_MONITOR                ║
+║   Cada leitura que chega é avaliada em O(1) → AlertaUsina        ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. Estado constante por usina (DetectorUsina): média e variância
+   exponenciais (EWMA) da potência normalizada, quantas leituras já
+   entraram e o horário da última
+2. Potência normalizada = potência / (kWp × irradiância/1000 × fator de
+   temperatura). O fator vem do coeficiente das placas (ModeloPlacaSolar,
+   média ponderada pelos Wp instalados) e da temperatura do módulo: um
+   "PR instantâneo" que não cai só porque os módulos esquentaram
+3. Regras, todas O(1) por leitura:
+   - producao_baixa: z-score da potência normalizada abaixo de
+     -SOLAR_DETECTOR_LIMIAR_Z (depois de SOLAR_DETECTOR_AQUECIMENTO leituras)
+   - sem_producao: irradiância forte e potência perto de zero
+   - tensao / corrente / sobrecarga: fora dos limites dos inversores
+     ativos (tensão de saída ± tolerância, soma das correntes de saída e
+     das potências nominais)
+   - frequencia: fora da faixa da rede
+   - temperatura: módulo acima de temperatura_operacao_max_c das placas
+   Leitura anômala entra na média limitada a ±limiar desvios e não mexe
+   na variância (falha longa não vira o "normal" logo); leitura mais
+   antiga que o estado só passa pelos limites
+4. Deduplicação: não cria alerta se a usina já tem AlertaUsina não
+   resolvido com o mesmo título (um título por regra); no lote, só o
+   primeiro de cada
+5. Onde roda: ingestão em lote (mesma transação das leituras) e save()
+   de LeituraUsina (sinal post_save)
+6. reproduzir(): o mesmo detector sobre leituras históricas, com estado
+   em memória (não mexe no DetectorUsina) - para calibrar os limiares:
+       python manage.py reproduzir_anomalias_solar --dias 30
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+SOLAR_DETECTOR_NA_INGESTAO = True       # avaliar leituras na ingestão e no save()
+SOLAR_DETECTOR_ALFA = 0.02              # peso da leitura nova na EWMA (~50 leituras de memória)
+SOLAR_DETECTOR_LIMIAR_Z = 4.0           # desvios abaixo da média para produção baixa
+SOLAR_DETECTOR_AQUECIMENTO = 50         # leituras antes de avaliar o z-score
+SOLAR_DETECTOR_IRRADIANCIA_MIN = 200    # W/m² mínimos para normalizar a potência
+SOLAR_DETECTOR_TOLERANCIA_TENSAO = 0.10 # ± fração da tensão de saída nominal
+SOLAR_DETECTOR_FREQUENCIA_MIN_HZ = 59.5
+SOLAR_DETECTOR_FREQUENCIA_MAX_HZ = 60.5
+"""
+
+import math
+import time
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import AlertaUsina, ConfiguracaoPlacasUsina, DetectorUsina, Inversor, LeituraUsina, UsinaSolar
+
+
+# regra → (tipo, categoria, título do AlertaUsina, descrição)
+REGRAS = {
+    'sem_producao': (
+        'critico', 'producao', 'Usina sem produção com sol',
+        'Potência de {potencia:.2f} kW com irradiância de {irradiancia:.0f} W/m².',
+    ),
+    'producao_baixa': (
+        'alerta', 'producao', 'Produção abaixo do esperado',
+        'Potência normalizada {razao:.2f} contra média de {media:.2f} (z = {z:.1f}): '
+        '{potencia:.1f} kW com {irradiancia:.0f} W/m².',
+    ),
+    'temperatura': (
+        'critico', 'temperatura', 'Temperatura dos módulos acima do limite',
+        'Módulos a {temperatura:.1f} °C, acima do limite de operação das placas ({temperatura_max:.0f} °C).',
+    ),
+    'tensao': (
+        'alerta', 'tensao', 'Tensão fora da faixa dos inversores',
+        'Tensão de {tensao:.1f} V fora da faixa {tensao_min:.0f}-{tensao_max:.0f} V.',
+    ),
+    'frequencia': (
+        'alerta', 'tensao', 'Frequência fora da faixa da rede',
+        'Frequência de {frequencia:.2f} Hz fora da faixa {frequencia_min:.1f}-{frequencia_max:.1f} Hz.',
+    ),
+    'corrente': (
+        'alerta', 'tensao', 'Corrente acima do limite dos inversores',
+        'Corrente de {corrente:.1f} A acima de {corrente_max:.1f} A (soma das saídas dos inversores).',
+    ),
+    'sobrecarga': (
+        'aviso', 'eficiencia', 'Potência acima da capacidade dos inversores',
+        'Potência de {potencia:.1f} kW acima da potência nominal dos inversores ({potencia_ac:.1f} kW) - '
+        'verificar o medidor.',
+    ),
+}
+TITULOS = [titulo for _, _, titulo, _ in REGRAS.values()]
+
+# Colunas lidas de cada leitura (arrays float, NaN = vazio)
+CAMPOS_DETECCAO = [
+    'potencia_atual_kw', 'irradiancia_w_m2', 'temperatura_modulo_c',
+    'tensao_v', 'corrente_a', 'frequencia_hz',
+]
+
+DESVIO_MINIMO = 0.03              # piso do desvio da potência normalizada
+SEM_PRODUCAO_IRRADIANCIA = 400    # W/m²
+SEM_PRODUCAO_FRACAO = 0.01        # potência abaixo de 1% do kWp
+SOBRECARGA_FRACAO = 1.05          # potência acima de 105% da nominal AC
+COEF_TEMPERATURA_PADRAO = -0.4    # %/°C, padrão de ModeloPlacaSolar
+
+# "Epoch de abertura" de alerta não resolvido no banco: no futuro, então
+# nenhuma janela de reabertura (reabrir_segundos) o libera
+ABERTO_NO_BANCO = math.inf
+
+
+def _config():
+    return {
+        'alfa': getattr(settings, 'SOLAR_DETECTOR_ALFA', 0.02),
+        'limiar_z': getattr(settings, 'SOLAR_DETECTOR_LIMIAR_Z', 4.0),
+        'aquecimento': getattr(settings, 'SOLAR_DETECTOR_AQUECIMENTO', 50),
+        'irradiancia_min': getattr(settings, 'SOLAR_DETECTOR_IRRADIANCIA_MIN', 200),
+        'tolerancia_tensao': getattr(settings, 'SOLAR_DETECTOR_TOLERANCIA_TENSAO', 0.10),
+        'frequencia_min': getattr(settings, 'SOLAR_DETECTOR_FREQUENCIA_MIN_HZ', 59.5),
+        'frequencia_max': getattr(settings, 'SOLAR_DETECTOR_FREQUENCIA_MAX_HZ', 60.5),
+    }
+
+
+def _epoch(momento):
+    return momento.timestamp() if momento else -math.inf
+
+
+# ============================================================
+# 📋 ESPECIFICAÇÕES (inversores e placas)
+# ============================================================
+
+def especificacoes(usina_ids):
+    """
+    Limites de cada usina a partir dos equipamentos ativos (três queries)
+
+    Returns:
+        dict: usina_id → kwp, coef_temperatura, temperatura_max,
+              tensao_min, tensao_max, corrente_max, potencia_ac
+              (NaN quando não há equipamento cadastrado - regra desligada)
+    """
+    tolerancia = _config()['tolerancia_tensao']
+    especs = {
+        usina_id: {
+            'kwp': float(kwp), 'coef_temperatura': COEF_TEMPERATURA_PADRAO, 'temperatura_max': math.nan,
+            'tensao_min': math.nan, 'tensao_max': math.nan, 'corrente_max': math.nan, 'potencia_ac': math.nan,
+        }
+        for usina_id, kwp in UsinaSolar.objects.filter(id__in=usina_ids).values_list('id', 'capacidade_kwp')
+    }
+
+    inversores = {}
+    for usina_id, tensao, corrente, potencia in Inversor.objects.filter(ativo=True, usina_id__in=usina_ids).values_list(
+        'usina_id', 'tensao_saida_v', 'corrente_saida_max_a', 'potencia_nominal_kw'
+    ):
+        inversores.setdefault(usina_id, []).append((float(tensao), float(corrente), float(potencia)))
+    for usina_id, lista in inversores.items():
+        tensoes = [tensao for tensao, _, _ in lista]
+        especs[usina_id].update(
+            tensao_min=min(tensoes) * (1 - tolerancia),
+            tensao_max=max(tensoes) * (1 + tolerancia),
+            corrente_max=sum(corrente for _, corrente, _ in lista),
+            potencia_ac=sum(potencia for _, _, potencia in lista),
+        )
+
+    placas = {}
+    for usina_id, quantidade, pico, coef, temperatura_max in ConfiguracaoPlacasUsina.objects.filter(
+        ativa=True, usina_id__in=usina_ids
+    ).values_list(
+        'usina_id', 'quantidade_placas', 'modelo_placa__potencia_pico_wp',
+        'modelo_placa__coef_temp_potencia_percent', 'modelo_placa__temperatura_operacao_max_c',
+    ):
+        placas.setdefault(usina_id, []).append((quantidade * float(pico), float(coef), float(temperatura_max)))
+    for usina_id, lista in placas.items():
+        wp = sum(peso for peso, _, _ in lista)
+        if wp > 0:
+            especs[usina_id]['coef_temperatura'] = sum(peso * coef for peso, coef, _ in lista) / wp
+        especs[usina_id]['temperatura_max'] = min(temperatura for _, _, temperatura in lista)
+
+    return especs
+
+
+# ============================================================
+# 🔎 DETECÇÃO (sem banco)
+# ============================================================
+
+def detectar(colunas, estados, especs, abertos, reabrir_segundos=None, config=None):
+    """
+    Avalia leituras em colunas e devolve os alertas novos
+
+    Args:
+        colunas (dict): usina_id (int64), epoch, timestamp e CAMPOS_DETECCAO
+        estados (dict): usina_id → [leituras, media, variancia, ultimo_epoch]
+            (atualizado aqui - é o estado EWMA)
+        especs (dict): resultado de especificacoes()
+        abertos (dict): (usina_id, titulo) → epoch em que abriu; alerta
+            aberto suprime repetições (atualizado aqui). ABERTO_NO_BANCO
+            suprime sempre (alerta não resolvido no AlertaUsina)
+        reabrir_segundos (float): se informado, um alerta aberto há mais
+            tempo que isso deixa de suprimir (usado na reprodução)
+
+    Returns:
+        tuple: (list[AlertaUsina] não salvos, dict regra → quantidade de leituras anômalas)
+    """
+    config = config or _config()
+    usinas = colunas['usina_id']
+    epoch = colunas['epoch']
+    total = len(usinas)
+    if not total:
+        return [], {}
+
+    # Especificação de cada linha (NaN desliga a regra)
+    ids = np.array(sorted(especs), dtype=np.int64)
+    posicao_usina = np.searchsorted(ids, usinas)
+
+    def espec(campo):
+        return np.array([especs[usina_id][campo] for usina_id in ids.tolist()], dtype=float)[posicao_usina]
+
+    potencia = colunas['potencia_atual_kw']
+    irradiancia = colunas['irradiancia_w_m2']
+    temperatura = colunas['temperatura_modulo_c']
+    tensao = colunas['tensao_v']
+    kwp = espec('kwp')
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mascaras = {
+            'sem_producao': (irradiancia >= SEM_PRODUCAO_IRRADIANCIA) & (potencia < kwp * SEM_PRODUCAO_FRACAO),
+            'temperatura': temperatura > espec('temperatura_max'),
+            'tensao': (tensao < espec('tensao_min')) | (tensao > espec('tensao_max')),
+            'frequencia': (colunas['frequencia_hz'] < config['frequencia_min']) | (colunas['frequencia_hz'] > config['frequencia_max']),
+            'corrente': colunas['corrente_a'] > espec('corrente_max'),
+            'sobrecarga': potencia > espec('potencia_ac') * SOBRECARGA_FRACAO,
+        }
+
+        # Potência normalizada: kWp × irradiância × derating de temperatura
+        fator_temperatura = np.where(
+            np.isnan(temperatura), 1.0, 1 + espec('coef_temperatura') / 100 * (temperatura - 25)
+        )
+        esperada = kwp * irradiancia / 1000 * fator_temperatura
+        razao = np.where(
+            (irradiancia >= config['irradiancia_min']) & (esperada > 0) & ~mascaras['sem_producao'],
+            potencia / esperada, np.nan,
+        )
+
+    # EWMA em ordem de usina e horário: O(1) por leitura, estado de 4 números por usina
+    ordem = np.lexsort((epoch, usinas))
+    candidatas = ordem[~np.isnan(razao[ordem])]
+    z = np.full(total, np.nan)
+    media_antes = np.full(total, np.nan)
+    alfa, limiar, aquecimento = config['alfa'], config['limiar_z'], config['aquecimento']
+    lista_usinas, lista_epoch, lista_razao = usinas.tolist(), epoch.tolist(), razao.tolist()
+
+    for posicao in candidatas.tolist():
+        estado = estados.setdefault(lista_usinas[posicao], [0, 0.0, 0.0, -math.inf])
+        momento = lista_epoch[posicao]
+        if momento <= estado[3]:
+            continue  # atrasada: só os limites valem
+        leituras, media, variancia = estado[0], estado[1], estado[2]
+        valor = lista_razao[posicao]
+        anomala = False
+
+        if leituras >= aquecimento:
+            desvio = max(math.sqrt(variancia), DESVIO_MINIMO)
+            pontuacao = (valor - media) / desvio
+            z[posicao] = pontuacao
+            media_antes[posicao] = media
+            if abs(pontuacao) > limiar:
+                # Anômala entra limitada e não mexe na variância: uma falha
+                # longa não desloca a média nem se esconde num desvio inflado
+                anomala = True
+                valor = media + math.copysign(limiar * desvio, pontuacao)
+
+        if leituras == 0:
+            media, variancia = valor, 0.0
+        else:
+            peso = max(alfa, 1 / (leituras + 1))  # média simples no aquecimento
+            diferenca = valor - media
+            incremento = peso * diferenca
+            media += incremento
+            if not anomala:
+                variancia = (1 - peso) * (variancia + diferenca * incremento)
+        estado[:] = [leituras + 1, media, variancia, momento]
+
+    with np.errstate(invalid='ignore'):
+        mascaras['producao_baixa'] = z < -limiar
+
+    # Primeiro caso de cada (usina, regra) no lote, em ordem de horário
+    alertas, anomalas = [], {}
+    for regra, (tipo, categoria, titulo, descricao) in REGRAS.items():
+        marcadas = ordem[mascaras[regra][ordem]]
+        if not len(marcadas):
+            continue
+        anomalas[regra] = len(marcadas)
+        for posicao in marcadas.tolist():
+            chave = (lista_usinas[posicao], titulo)
+            aberto = abertos.get(chave)
+            if aberto is not None and (reabrir_segundos is None or lista_epoch[posicao] - aberto < reabrir_segundos):
+                continue
+            abertos[chave] = lista_epoch[posicao]
+            especificacao = especs[lista_usinas[posicao]]
+            valores = {
+                'potencia': potencia[posicao], 'irradiancia': irradiancia[posicao],
+                'temperatura': temperatura[posicao], 'tensao': tensao[posicao],
+                'corrente': colunas['corrente_a'][posicao], 'frequencia': colunas['frequencia_hz'][posicao],
+                'razao': razao[posicao], 'media': media_antes[posicao], 'z': z[posicao],
+                'frequencia_min': config['frequencia_min'], 'frequencia_max': config['frequencia_max'],
+                **especificacao,
+            }
+            alertas.append(AlertaUsina(
+                usina_id=lista_usinas[posicao],
+                timestamp=colunas['timestamp'][posicao],
+                tipo=tipo,
+                categoria=categoria,
+                titulo=titulo,
+                descricao=descricao.format(**valores),
+            ))
+    return alertas, anomalas
+
+
+# ============================================================
+# 💾 NA INGESTÃO
+# ============================================================
+
+def _abertos_no_banco(usina_ids):
+    """Alertas do detector ainda não resolvidos → {(usina_id, titulo): ABERTO_NO_BANCO}"""
+    return {
+        chave: ABERTO_NO_BANCO
+        for chave in AlertaUsina.objects.filter(
+            resolvido=False, usina_id__in=usina_ids, titulo__in=TITULOS
+        ).values_list('usina_id', 'titulo')
+    }
+
+
+def detectar_lote(colunas):
+    """
+    Avalia leituras recém-gravadas, atualiza DetectorUsina e grava os
+    alertas novos (use dentro da transação da gravação das leituras)
+
+    Args:
+        colunas (dict): as `novas` da ingestão (usina_id, epoch,
+            timestamp e os campos numéricos, NaN = vazio)
+
+    Returns:
+        dict: alertas (criados), anomalas (regra → leituras)
+    """
+    if not len(colunas['usina_id']):
+        return {'alertas': 0, 'anomalas': {}}
+
+    usina_ids = sorted(set(colunas['usina_id'].tolist()))
+    especs = especificacoes(usina_ids)
+
+    for tentativa in range(2):
+        try:
+            with transaction.atomic():
+                detectores = DetectorUsina.objects.select_for_update().in_bulk(usina_ids)
+                estados = {
+                    usina_id: [detector.leituras, detector.razao_media, detector.razao_variancia, _epoch(detector.ultima_leitura)]
+                    for usina_id, detector in detectores.items()
+                }
+                alertas, anomalas = detectar(colunas, estados, especs, _abertos_no_banco(usina_ids))
+
+                atualizar, criar = [], []
+                agora = timezone.now()
+                for usina_id, (leituras, media, variancia, ultimo) in estados.items():
+                    detector = detectores.get(usina_id) or DetectorUsina(usina_id=usina_id)
+                    detector.leituras, detector.razao_media, detector.razao_variancia = leituras, media, variancia
+                    detector.ultima_leitura = datetime.fromtimestamp(ultimo, dt_timezone.utc) if ultimo > -math.inf else None
+                    # bulk_update não aplica auto_now
+                    detector.atualizado_em = agora
+                    (atualizar if usina_id in detectores else criar).append(detector)
+                if atualizar:
+                    DetectorUsina.objects.bulk_update(
+                        atualizar, ['leituras', 'razao_media', 'razao_variancia', 'ultima_leitura', 'atualizado_em']
+                    )
+                if criar:
+                    DetectorUsina.objects.bulk_create(criar)
+                AlertaUsina.objects.bulk_create(alertas)
+            return {'alertas': len(alertas), 'anomalas': anomalas}
+        except IntegrityError:
+            # Outro lote criou o detector da mesma usina ao mesmo tempo: relê e avalia de novo
+            if tentativa:
+                raise
+
+
+def detectar_leitura(leitura):
+    """detectar_lote() para uma LeituraUsina salva pelo ORM"""
+    colunas = {
+        'usina_id': np.array([leitura.usina_id], dtype=np.int64),
+        'epoch': np.array([leitura.timestamp.timestamp()]),
+        'timestamp': [leitura.timestamp],
+    }
+    for campo in CAMPOS_DETECCAO:
+        valor = getattr(leitura, campo)
+        colunas[campo] = np.array([math.nan if valor is None else float(valor)])
+    return detectar_lote(colunas)
+
+
+# ============================================================
+# ⏪ REPRODUÇÃO (histórico)
+# ============================================================
+
+def _colunas_historico(linhas, usina_id):
+    transpostas = list(zip(*linhas))
+    colunas = {
+        'usina_id': np.full(len(linhas), usina_id, dtype=np.int64),
+        'timestamp': list(transpostas[0]),
+        'epoch': np.array([momento.timestamp() for momento in transpostas[0]]),
+    }
+    for campo, valores in zip(CAMPOS_DETECCAO, transpostas[1:]):
+        colunas[campo] = np.array([math.nan if valor is None else valor for valor in valores], dtype=float)
+    return colunas
+
+
+def reproduzir(inicio, fim=None, usina_ids=None, reabrir_horas=24, gravar=False, tamanho_bloco=20000):
+    """
+    Roda o detector sobre as leituras de [inicio, fim) com estado novo em
+    memória. Um alerta "aberto" volta a poder disparar depois de
+    `reabrir_horas` (como se alguém o resolvesse)
+
+    Args:
+        inicio, fim (datetime): período (fim padrão agora)
+        gravar (bool): grava os alertas (pulando os que já estão abertos no banco)
+
+    Returns:
+        dict: leituras, alertas (list[AlertaUsina]), anomalas, segundos, por_segundo
+    """
+    fim = fim or timezone.now()
+    usinas = UsinaSolar.objects.all() if usina_ids is None else UsinaSolar.objects.filter(id__in=usina_ids)
+    usina_ids = list(usinas.values_list('id', flat=True))
+    especs = especificacoes(usina_ids)
+    config = _config()
+    abertos = _abertos_no_banco(usina_ids) if gravar else {}
+
+    inicio_relogio = time.perf_counter()
+    total, alertas, anomalas = 0, [], {}
+    estados = {}
+    for usina_id in usina_ids:
+        leituras = (
+            LeituraUsina.objects
+            .filter(usina_id=usina_id, timestamp__gte=inicio, timestamp__lt=fim)
+            .order_by('timestamp')
+            .values_list('timestamp', *CAMPOS_DETECCAO)
+        )
+        bloco = []
+        for linha in leituras.iterator(chunk_size=tamanho_bloco):
+            bloco.append(linha)
+            if len(bloco) == tamanho_bloco:
+                total += _reproduzir_bloco(bloco, usina_id, estados, especs, abertos, reabrir_horas, config, alertas, anomalas)
+                bloco = []
+        if bloco:
+            total += _reproduzir_bloco(bloco, usina_id, estados, especs, abertos, reabrir_horas, config, alertas, anomalas)
+    segundos = time.perf_counter() - inicio_relogio
+
+    if gravar and alertas:
+        AlertaUsina.objects.bulk_create(alertas, batch_size=500)
+
+    return {
+        'leituras': total,
+        'alertas': alertas,
+        'anomalas': anomalas,
+        'segundos': segundos,
+        'por_segundo': total / segundos if segundos else 0,
+    }
+
+
+def _reproduzir_bloco(bloco, usina_id, estados, especs, abertos, reabrir_horas, config, alertas, anomalas):
+    novos, marcadas = detectar(
+        _colunas_historico(bloco, usina_id), estados, especs, abertos,
+        reabrir_segundos=reabrir_horas * 3600 if reabrir_horas else None, config=config,
+    )
+    alertas.extend(novos)
+    for regra, quantidade in marcadas.items():
+        anomalas[regra] = anomalas.get(regra, 0) + quantidade
+    return len(bloco)
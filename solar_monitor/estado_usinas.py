@@ -0,0 +1,263 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║               ESTADO ATUAL DAS USINAS - SOLAR_MONITOR            ║
+║     Última leitura de cada usina numa linha, sem varrer leituras ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. EstadoUsina guarda, por usina, potência, energia e status da leitura
+   mais recente. Só avança: leitura mais antiga que o estado (lote
+   atrasado, correção de histórico) não sobrescreve
+2. Quem grava leituras atualiza o estado:
+   - ingestão em lote (ingestao_leituras) → registrar_lote(), uma
+     consulta para todas as usinas do lote, na mesma transação
+   - save() de LeituraUsina (admin, scripts) → sinal post_save
+     (signals.py) → registrar_leitura()
+3. status_usinas() monta o status geral com uma consulta (usinas +
+   estado via JOIN) e devolve uma versão (hash do conteúdo)
+4. O painel não precisa ficar recarregando:
+   - aguardar_status(versao): long-polling - segura a requisição até
+     a versão mudar ou o tempo acabar
+   - eventos_status(): Server-Sent Events - uma conexão aberta que
+     empurra o status a cada mudança; o navegador (EventSource)
+     reconecta sozinho ao fim de SOLAR_STATUS_STREAM_SEGUNDOS
+5. reconstruir() refaz os estados a partir das leituras (leituras
+   apagadas, estado divergente):
+       python manage.py atualizar_agregados_solar
+
+Cada conexão de stream (ou long-polling) ocupa uma thread enquanto
+está aberta: o Procfile roda o gunicorn com workers gthread, e
+SOLAR_STATUS_STREAM_SEGUNDOS fica abaixo do --timeout (120s) para que
+o stream termine sozinho e o navegador reconecte.
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+SOLAR_STATUS_ESPERA_MAX = 25           # long-polling máximo (segundos)
+SOLAR_STATUS_INTERVALO_SEGUNDOS = 1.0  # intervalo entre consultas na espera/stream
+SOLAR_STATUS_STREAM_SEGUNDOS = 60      # duração de cada conexão SSE
+"""
+
+import hashlib
+import json
+import math
+import time
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import EstadoUsina, LeituraUsina, UsinaSolar
+
+
+CAMPOS_ESTADO = ['timestamp', 'potencia_atual_kw', 'energia_gerada_kwh', 'energia_dia_kwh', 'status']
+
+# Comentário SSE enviado quando nada muda, para proxies não derrubarem a conexão
+INTERVALO_PING_SEGUNDOS = 15
+
+
+# ============================================================
+# 💾 GRAVAÇÃO
+# ============================================================
+
+def _gravar(novos):
+    """
+    Aplica {usina_id: {campo: valor}} nos estados, só onde a leitura é
+    mais recente que o estado atual
+
+    Returns:
+        int: estados criados ou atualizados
+    """
+    if not novos:
+        return 0
+
+    for tentativa in range(2):
+        try:
+            with transaction.atomic():
+                existentes = EstadoUsina.objects.select_for_update().in_bulk(list(novos))
+                agora = timezone.now()
+                atualizar, criar = [], []
+                for usina_id, valores in novos.items():
+                    estado = existentes.get(usina_id)
+                    if estado is None:
+                        criar.append(EstadoUsina(usina_id=usina_id, atualizado_em=agora, **valores))
+                    elif valores['timestamp'] >= estado.timestamp:
+                        for campo, valor in valores.items():
+                            setattr(estado, campo, valor)
+                        # bulk_update não aplica auto_now
+                        estado.atualizado_em = agora
+                        atualizar.append(estado)
+                if atualizar:
+                    EstadoUsina.objects.bulk_update(atualizar, CAMPOS_ESTADO + ['atualizado_em'])
+                if criar:
+                    EstadoUsina.objects.bulk_create(criar)
+            return len(atualizar) + len(criar)
+        except IntegrityError:
+            # Outra gravação criou o estado da mesma usina ao mesmo tempo: relê e compara
+            if tentativa:
+                raise
+
+
+def _decimal(campo, valor):
+    """float do numpy → Decimal com as casas do campo em EstadoUsina"""
+    casas = EstadoUsina._meta.get_field(campo).decimal_places
+    return Decimal(f'{float(valor):.{casas}f}')
+
+
+def registrar_lote(colunas):
+    """
+    Atualiza o estado das usinas com as leituras recém-gravadas
+
+    Args:
+        colunas (dict): usina_id, epoch, timestamp, status e os campos
+            numéricos (arrays; NaN = vazio) - as `novas` da ingestão
+
+    Returns:
+        int: estados criados ou atualizados
+    """
+    usinas = colunas['usina_id']
+    if not len(usinas):
+        return 0
+
+    # Ordena por usina e horário; a última posição de cada usina é a leitura mais nova
+    ordem = np.lexsort((colunas['epoch'], usinas))
+    ultimas = ordem[np.append(usinas[ordem][1:] != usinas[ordem][:-1], True)]
+
+    novos = {}
+    for posicao in ultimas.tolist():
+        energia_dia = colunas['energia_dia_kwh'][posicao]
+        novos[int(usinas[posicao])] = {
+            'timestamp': colunas['timestamp'][posicao],
+            'potencia_atual_kw': _decimal('potencia_atual_kw', colunas['potencia_atual_kw'][posicao]),
+            'energia_gerada_kwh': _decimal('energia_gerada_kwh', colunas['energia_gerada_kwh'][posicao]),
+            'energia_dia_kwh': _decimal('energia_dia_kwh', 0 if np.isnan(energia_dia) else energia_dia),
+            'status': colunas['status'][posicao],
+        }
+    return _gravar(novos)
+
+
+def _valores_da_leitura(leitura):
+    return {
+        'timestamp': leitura.timestamp,
+        'potencia_atual_kw': leitura.potencia_atual_kw,
+        'energia_gerada_kwh': leitura.energia_gerada_kwh,
+        'energia_dia_kwh': leitura.energia_dia_kwh or 0,
+        'status': leitura.status,
+    }
+
+
+def registrar_leitura(leitura):
+    """Atualiza o estado com uma LeituraUsina salva pelo ORM"""
+    return _gravar({leitura.usina_id: _valores_da_leitura(leitura)})
+
+
+def reconstruir(usina_ids=None):
+    """
+    Refaz os estados a partir da leitura mais recente de cada usina
+    (uma consulta por usina, pelo índice usina + timestamp)
+
+    Returns:
+        int: estados gravados
+    """
+    usinas = UsinaSolar.objects.all()
+    if usina_ids is not None:
+        usinas = usinas.filter(id__in=usina_ids)
+
+    gravados = 0
+    with transaction.atomic():
+        for usina_id in usinas.values_list('id', flat=True):
+            leitura = LeituraUsina.objects.filter(usina_id=usina_id).order_by('-timestamp').first()
+            if leitura is None:
+                EstadoUsina.objects.filter(usina_id=usina_id).delete()
+                continue
+            EstadoUsina.objects.update_or_create(usina_id=usina_id, defaults=_valores_da_leitura(leitura))
+            gravados += 1
+    return gravados
+
+
+# ============================================================
+# 📡 LEITURA / PUSH
+# ============================================================
+
+def status_usinas():
+    """
+    Status de todas as usinas ativas numa consulta
+
+    Returns:
+        tuple: (versao, lista de dicts no formato de api_status_geral)
+    """
+    usinas = UsinaSolar.objects.filter(ativa=True).select_related('estado_atual')
+
+    dados = []
+    for usina in usinas:
+        estado = getattr(usina, 'estado_atual', None)
+        dados.append({
+            'id': usina.id,
+            'nome': usina.nome,
+            'capacidade_kwp': float(usina.capacidade_kwp),
+            'localizacao': usina.localizacao,
+            'status': estado.status if estado else 'offline',
+            'potencia_atual_kw': float(estado.potencia_atual_kw) if estado else 0,
+            'energia_dia_kwh': float(estado.energia_dia_kwh) if estado else 0,
+            'ultima_atualizacao': estado.timestamp.isoformat() if estado else None,
+        })
+
+    versao = hashlib.sha1(json.dumps(dados, sort_keys=True).encode()).hexdigest()[:16]
+    return versao, dados
+
+
+def aguardar_status(versao=None, espera_segundos=0):
+    """
+    status_usinas() com long-polling: enquanto a versão for igual à do
+    cliente, consulta de novo a cada SOLAR_STATUS_INTERVALO_SEGUNDOS até
+    `espera_segundos` (NaN/infinito = sem espera)
+    """
+    if not math.isfinite(espera_segundos):
+        espera_segundos = 0
+    espera_segundos = min(max(espera_segundos, 0), getattr(settings, 'SOLAR_STATUS_ESPERA_MAX', 25))
+    intervalo = getattr(settings, 'SOLAR_STATUS_INTERVALO_SEGUNDOS', 1.0)
+    prazo = time.monotonic() + espera_segundos
+
+    while True:
+        atual, dados = status_usinas()
+        restante = prazo - time.monotonic()
+        if atual != versao or restante <= 0:
+            return atual, dados
+        time.sleep(min(intervalo, restante))
+
+
+def eventos_status(ultima_versao=None, duracao_segundos=None):
+    """
+    Gerador de Server-Sent Events: um evento `status` a cada versão nova
+    (o primeiro sai logo, a não ser que o cliente já tenha essa versão)
+
+    Args:
+        ultima_versao (str): Last-Event-ID enviado pelo EventSource ao reconectar
+        duracao_segundos (float): encerra o stream depois disso (o cliente reconecta)
+    """
+    if duracao_segundos is None:
+        duracao_segundos = getattr(settings, 'SOLAR_STATUS_STREAM_SEGUNDOS', 60)
+    intervalo = getattr(settings, 'SOLAR_STATUS_INTERVALO_SEGUNDOS', 1.0)
+    prazo = time.monotonic() + duracao_segundos
+
+    # Reconexão do navegador em 1s quando o stream termina
+    yield 'retry: 1000\n\n'
+    ultimo_envio = time.monotonic()
+
+    while True:
+        versao, dados = status_usinas()
+        agora = time.monotonic()
+        if versao != ultima_versao:
+            ultima_versao = versao
+            ultimo_envio = agora
+            yield f'id: {versao}\nevent: status\ndata: {json.dumps({"usinas": dados})}\n\n'
+        elif agora - ultimo_envio >= INTERVALO_PING_SEGUNDOS:
+            ultimo_envio = agora
+            yield ': ping\n\n'
+
+        restante = prazo - agora
+        if restante <= 0:
+            return
+        time.sleep(min(intervalo, restante))
@@ -0,0 +1,84 @@
+"""
+Comando Django para analisar a performance das usinas (AnalisePerformance) em lote
+Uso:
+    python manage.py analisar_performance_solar                      # últimos 7 dias
+    python manage.py analisar_performance_solar --dias 365           # último ano
+    python manage.py analisar_performance_solar --desde 2025-01-01 --ate 2025-03-31 --usina 3
+    python manage.py analisar_performance_solar --simular            # calcula sem gravar
+    python manage.py analisar_performance_solar --benchmark --usinas 20 --dias 365
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from solar_monitor.analise_performance import PANDAS_DISPONIVEL, analisar_periodo, benchmark
+
+
+class Command(BaseCommand):
+    help = 'Calcula PR, energia esperada e perdas de todas as usinas por dia e grava AnalisePerformance em lote'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, help='Dias para trás, contando hoje (padrão: 7; benchmark: 365)')
+        parser.add_argument('--desde', help='Primeiro dia (AAAA-MM-DD); substitui --dias')
+        parser.add_argument('--ate', help='Último dia (AAAA-MM-DD, padrão: hoje)')
+        parser.add_argument('--usina', type=int, action='append', help='Só esta usina (pode repetir)')
+        parser.add_argument('--simular', action='store_true', help='Calcula sem gravar as análises')
+        parser.add_argument('--benchmark', action='store_true', help='Mede a análise em dados sintéticos')
+        parser.add_argument('--usinas', type=int, default=20, help='Benchmark: usinas')
+        parser.add_argument('--amostras-por-dia', type=int, default=12, help='Benchmark: amostras de clima por dia')
+
+    def handle(self, *args, **options):
+        if not PANDAS_DISPONIVEL:
+            raise CommandError('pandas não instalado (pip install pandas)')
+
+        if options['benchmark']:
+            return self._benchmark(options)
+
+        try:
+            fim = date.fromisoformat(options['ate']) if options['ate'] else timezone.localdate()
+            inicio = (
+                date.fromisoformat(options['desde']) if options['desde']
+                else fim - timedelta(days=max(options['dias'] or 7, 1) - 1)
+            )
+        except ValueError as e:
+            raise CommandError(f'Data inválida: {e}')
+        if inicio > fim:
+            raise CommandError('--desde depois de --ate')
+
+        self.stdout.write(self.style.SUCCESS(f'\n☀️  Analisando performance de {inicio:%d/%m/%Y} a {fim:%d/%m/%Y}\n'))
+        resultado = analisar_periodo(inicio, fim, usina_ids=options['usina'], gravar=not options['simular'])
+
+        tempos = resultado['tempos']
+        self.stdout.write(
+            f"⏱️  Carga {tempos['carga']:.2f}s | cálculo {tempos['calculo']:.2f}s | gravação {tempos['gravacao']:.2f}s"
+        )
+        for status, total in sorted(resultado['por_status'].items()):
+            self.stdout.write(f"   {status}: {total}")
+        if resultado['sem_clima']:
+            self.stdout.write(self.style.WARNING(f"   ⚠️  {resultado['sem_clima']} dia(s) com geração e sem dados meteorológicos"))
+        if resultado['sem_geracao']:
+            self.stdout.write(self.style.WARNING(f"   ⚠️  {resultado['sem_geracao']} dia(s) com clima e sem agregados de leituras"))
+
+        verbo = 'seriam gravadas' if options['simular'] else 'gravadas'
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {resultado['analises']} análise(s) {verbo} ({resultado['requer_atencao']} requerem atenção)"
+        ))
+
+    def _benchmark(self, options):
+        resultado = benchmark(
+            usinas=options['usinas'],
+            dias=options['dias'] or 365,
+            amostras_por_dia=options['amostras_por_dia'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n⏱️  Benchmark: {resultado['usinas']} usinas × {resultado['dias']} dias "
+            f"({resultado['amostras_clima']:,} amostras de clima)"
+        ))
+        self.stdout.write(f"   (dados gerados em {resultado['preparo']:.2f}s, transação desfeita no fim)")
+        for etapa, segundos in resultado['tempos'].items():
+            self.stdout.write(f"   {etapa:<10} {segundos:.3f}s")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {resultado['analises']:,} análises em {resultado['total']:.2f}s"
+        ))
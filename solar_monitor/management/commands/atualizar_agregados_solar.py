@@ -0,0 +1,61 @@
+"""
+Comando Django para refazer os agregados de leituras solares, o estado atual
+das usinas e os relatórios mensais
+Uso:
+    python manage.py atualizar_agregados_solar                    # últimos 2 dias
+    python manage.py atualizar_agregados_solar --dias 30          # últimos 30 dias
+    python manage.py atualizar_agregados_solar --desde 2025-01-01 --ate 2025-03-31
+    python manage.py atualizar_agregados_solar --usina 3 --sem-relatorios
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from solar_monitor.agregados import gerar_relatorios_mensais, recalcular
+from solar_monitor.estado_usinas import reconstruir
+from solar_monitor.models import UsinaSolar
+
+
+class Command(BaseCommand):
+    help = 'Refaz os agregados (5 min, hora, dia) e o estado atual das usinas a partir das leituras e atualiza os relatórios mensais'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=2, help='Dias para trás, contando hoje (padrão: 2)')
+        parser.add_argument('--desde', help='Primeiro dia (AAAA-MM-DD); substitui --dias')
+        parser.add_argument('--ate', help='Último dia (AAAA-MM-DD, padrão: hoje)')
+        parser.add_argument('--usina', type=int, action='append', help='Só esta usina (pode repetir)')
+        parser.add_argument('--sem-relatorios', action='store_true', help='Não atualiza RelatorioMensal')
+
+    def handle(self, *args, **options):
+        try:
+            fim = date.fromisoformat(options['ate']) if options['ate'] else timezone.localdate()
+            inicio = (
+                date.fromisoformat(options['desde']) if options['desde']
+                else fim - timedelta(days=max(options['dias'], 1) - 1)
+            )
+        except ValueError as e:
+            raise CommandError(f'Data inválida: {e}')
+        if inicio > fim:
+            raise CommandError('--desde depois de --ate')
+
+        self.stdout.write(self.style.SUCCESS(f'\n📊 Agregando leituras de {inicio:%d/%m/%Y} a {fim:%d/%m/%Y}\n'))
+        resultado = recalcular(inicio, fim, usina_ids=options['usina'])
+        self.stdout.write(
+            f"   {resultado['leituras']} leitura(s) em {resultado['dias']} dia(s) → {resultado['agregados']} agregado(s)"
+        )
+
+        estados = reconstruir(usina_ids=options['usina'])
+        self.stdout.write(f"   📍 {estados} estado(s) atual(is) de usina")
+
+        if not options['sem_relatorios']:
+            usinas = UsinaSolar.objects.filter(ativa=True)
+            if options['usina']:
+                usinas = UsinaSolar.objects.filter(id__in=options['usina'])
+            ano, mes = inicio.year, inicio.month
+            while (ano, mes) <= (fim.year, fim.month):
+                relatorios = gerar_relatorios_mensais(ano, mes, usinas=usinas)
+                self.stdout.write(f"   📄 {mes:02d}/{ano}: {len(relatorios)} relatório(s) mensal(is)")
+                ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+
+        self.stdout.write(self.style.SUCCESS('✅ Agregados atualizados'))
@@ -0,0 +1,56 @@
+"""
+Comando Django para ingerir telemetria solar em lote (mesmo caminho da API)
+Uso:
+    python manage.py ingerir_leituras_solar leituras.jsonl     # JSON lines
+    python manage.py ingerir_leituras_solar leituras.csv       # CSV com cabeçalho
+    python manage.py ingerir_leituras_solar --benchmark 50000  # mede com dados sintéticos
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from solar_monitor.ingestao_leituras import LoteInvalido, benchmark, ingerir_leituras, ler_csv, ler_jsonl
+
+
+class Command(BaseCommand):
+    help = 'Ingere leituras de usinas solares (JSON lines ou CSV) em lote'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', nargs='?', help='Arquivo .jsonl ou .csv')
+        parser.add_argument('--formato', choices=['jsonl', 'csv'], help='Padrão: pela extensão do arquivo')
+        parser.add_argument('--lote', type=int, help='Linhas por INSERT (padrão: SOLAR_INGESTAO_LOTE)')
+        parser.add_argument('--benchmark', type=int, metavar='N', help='Mede N leituras sintéticas (sem gravar)')
+        parser.add_argument('--usinas', type=int, default=20, help='Benchmark: usinas')
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            return self._benchmark(options)
+        if not options['arquivo']:
+            raise CommandError('Informe o arquivo ou --benchmark N')
+
+        formato = options['formato'] or ('csv' if options['arquivo'].lower().endswith('.csv') else 'jsonl')
+        leitor = ler_csv if formato == 'csv' else ler_jsonl
+        try:
+            with open(options['arquivo'], encoding='utf-8-sig', newline='') as arquivo:
+                resultado = ingerir_leituras(leitor(arquivo), tamanho_lote=options['lote'])
+        except (OSError, LoteInvalido) as e:
+            raise CommandError(str(e))
+
+        for erro in resultado['erros']:
+            self.stdout.write(self.style.WARNING(f"   linha {erro['linha']}: {erro['erro']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {resultado['inseridas']} leitura(s) gravada(s), {resultado['ignoradas']} repetida(s), "
+            f"{resultado['invalidas']} inválida(s) de {resultado['recebidas']}"
+        ))
+        if resultado['alertas']:
+            self.stdout.write(self.style.WARNING(f"🚨 {resultado['alertas']} alerta(s) de anomalia criado(s)"))
+
+    def _benchmark(self, options):
+        resultado = benchmark(options['benchmark'], usinas=options['usinas'], tamanho_lote=options['lote'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n⏱️  Benchmark: {resultado['leituras']:,} leituras em {resultado['segundos']:.2f}s "
+            f"→ {resultado['por_segundo']:,.0f} leituras/s"
+        ))
+        for etapa, segundos in resultado['tempos'].items():
+            self.stdout.write(f"   {etapa:<12} {segundos:7.3f}s")
+        if resultado['invalidas']:
+            self.stdout.write(self.style.WARNING(f"⚠️  {resultado['invalidas']} leitura(s) inválida(s)"))
@@ -0,0 +1,81 @@
+"""
+Comando Django para rodar o detector de anomalias sobre leituras históricas
+Uso:
+    python manage.py reproduzir_anomalias_solar                   # últimos 7 dias
+    python manage.py reproduzir_anomalias_solar --dias 90 --limiar-z 3.5
+    python manage.py reproduzir_anomalias_solar --desde 2025-01-01 --ate 2025-03-31 --usina 3
+    python manage.py reproduzir_anomalias_solar --dias 30 --gravar   # grava os AlertaUsina
+"""
+from datetime import date, datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from solar_monitor.deteccao_anomalias import REGRAS, reproduzir
+
+
+class Command(BaseCommand):
+    help = 'Roda o detector de anomalias sobre as leituras de um período (estado em memória) e mostra os alertas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=7, help='Dias para trás, contando hoje (padrão: 7)')
+        parser.add_argument('--desde', help='Primeiro dia (AAAA-MM-DD); substitui --dias')
+        parser.add_argument('--ate', help='Último dia (AAAA-MM-DD, padrão: hoje)')
+        parser.add_argument('--usina', type=int, action='append', help='Só esta usina (pode repetir)')
+        parser.add_argument('--reabrir-horas', type=float, default=24,
+                            help='Horas até um alerta repetido voltar a disparar (padrão: 24)')
+        parser.add_argument('--limiar-z', type=float, help='Substitui SOLAR_DETECTOR_LIMIAR_Z nesta reprodução')
+        parser.add_argument('--alfa', type=float, help='Substitui SOLAR_DETECTOR_ALFA nesta reprodução')
+        parser.add_argument('--listar', type=int, default=20, help='Alertas mostrados (padrão: 20)')
+        parser.add_argument('--gravar', action='store_true', help='Grava os alertas (pula os já abertos)')
+
+    def handle(self, *args, **options):
+        try:
+            fim = date.fromisoformat(options['ate']) if options['ate'] else timezone.localdate()
+            inicio = (
+                date.fromisoformat(options['desde']) if options['desde']
+                else fim - timedelta(days=max(options['dias'], 1) - 1)
+            )
+        except ValueError as e:
+            raise CommandError(f'Data inválida: {e}')
+        if inicio > fim:
+            raise CommandError('--desde depois de --ate')
+
+        ajustes = {}
+        if options['limiar_z'] is not None:
+            ajustes['SOLAR_DETECTOR_LIMIAR_Z'] = options['limiar_z']
+        if options['alfa'] is not None:
+            ajustes['SOLAR_DETECTOR_ALFA'] = options['alfa']
+
+        self.stdout.write(self.style.SUCCESS(f'\n🔎 Reproduzindo o detector de {inicio:%d/%m/%Y} a {fim:%d/%m/%Y}\n'))
+        with override_settings(**ajustes):
+            resultado = reproduzir(
+                timezone.make_aware(datetime.combine(inicio, time.min)),
+                timezone.make_aware(datetime.combine(fim + timedelta(days=1), time.min)),
+                usina_ids=options['usina'],
+                reabrir_horas=options['reabrir_horas'],
+                gravar=options['gravar'],
+            )
+
+        self.stdout.write(
+            f"   {resultado['leituras']:,} leitura(s) em {resultado['segundos']:.2f}s "
+            f"→ {resultado['por_segundo']:,.0f} leituras/s"
+        )
+        for regra, (_, _, titulo, _) in REGRAS.items():
+            alertas = sum(1 for alerta in resultado['alertas'] if alerta.titulo == titulo)
+            anomalas = resultado['anomalas'].get(regra, 0)
+            if anomalas:
+                self.stdout.write(f"   {titulo}: {anomalas} leitura(s) anômala(s) → {alertas} alerta(s)")
+
+        for alerta in resultado['alertas'][:options['listar']]:
+            momento = timezone.localtime(alerta.timestamp)
+            self.stdout.write(f"   🚨 usina {alerta.usina_id} {momento:%d/%m/%Y %H:%M} [{alerta.tipo}] {alerta.descricao}")
+        if len(resultado['alertas']) > options['listar']:
+            self.stdout.write(f"   ... e mais {len(resultado['alertas']) - options['listar']}")
+
+        total = len(resultado['alertas'])
+        if options['gravar']:
+            self.stdout.write(self.style.SUCCESS(f'\n✅ {total} alerta(s) gravado(s)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'\n✅ {total} alerta(s) (simulação - use --gravar para salvar)'))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solar_monitor', '0004_usinasolar_altitude_m_usinasolar_cep_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgregadoUsina',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularidade', models.CharField(choices=[('5min', '5 minutos'), ('hora', 'Hora'), ('dia', 'Dia')], max_length=5)),
+                ('inicio', models.DateTimeField(verbose_name='Início do Intervalo')),
+                ('leituras', models.PositiveIntegerField(default=0, verbose_name='Leituras')),
+                ('potencia_min_kw', models.DecimalField(decimal_places=3, max_digits=10, verbose_name='Potência Mínima (kW)')),
+                ('potencia_max_kw', models.DecimalField(decimal_places=3, max_digits=10, verbose_name='Potência Máxima (kW)')),
+                ('potencia_soma_kw', models.DecimalField(decimal_places=3, help_text='Média = soma / leituras (guardada assim para somar lotes novos)', max_digits=16, verbose_name='Soma das Potências (kW)')),
+                ('energia_gerada_min_kwh', models.DecimalField(decimal_places=3, max_digits=12, verbose_name='Energia Acumulada Inicial (kWh)')),
+                ('energia_gerada_max_kwh', models.DecimalField(decimal_places=3, max_digits=12, verbose_name='Energia Acumulada Final (kWh)')),
+                ('energia_dia_max_kwh', models.DecimalField(decimal_places=3, default=0, help_text='Maior energia_dia_kwh do intervalo (no agregado diário, a geração do dia)', max_digits=10, verbose_name='Energia do Dia (kWh)')),
+                ('temperatura_soma_c', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('temperatura_leituras', models.PositiveIntegerField(default=0)),
+                ('irradiancia_soma_w_m2', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('irradiancia_leituras', models.PositiveIntegerField(default=0)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('usina', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='agregados', to='solar_monitor.usinasolar')),
+            ],
+            options={
+                'verbose_name': 'Agregado de Leituras',
+                'verbose_name_plural': 'Agregados de Leituras',
+                'ordering': ['-inicio'],
+                'indexes': [models.Index(fields=['granularidade', 'inicio'], name='solar_monit_granula_61d847_idx')],
+                'unique_together': {('usina', 'granularidade', 'inicio')},
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def preencher_estados(apps, schema_editor):
+    """Estado inicial de cada usina = leitura mais recente já gravada"""
+    UsinaSolar = apps.get_model('solar_monitor', 'UsinaSolar')
+    LeituraUsina = apps.get_model('solar_monitor', 'LeituraUsina')
+    EstadoUsina = apps.get_model('solar_monitor', 'EstadoUsina')
+
+    estados = []
+    for usina_id in UsinaSolar.objects.values_list('id', flat=True):
+        leitura = LeituraUsina.objects.filter(usina_id=usina_id).order_by('-timestamp').first()
+        if leitura is not None:
+            estados.append(EstadoUsina(
+                usina_id=usina_id,
+                timestamp=leitura.timestamp,
+                potencia_atual_kw=leitura.potencia_atual_kw,
+                energia_gerada_kwh=leitura.energia_gerada_kwh,
+                energia_dia_kwh=leitura.energia_dia_kwh or 0,
+                status=leitura.status,
+            ))
+    EstadoUsina.objects.bulk_create(estados)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solar_monitor', '0005_agregadousina'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadoUsina',
+            fields=[
+                ('usina', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estado_atual', serialize=False, to='solar_monitor.usinasolar')),
+                ('timestamp', models.DateTimeField(verbose_name='Última Leitura')),
+                ('potencia_atual_kw', models.DecimalField(decimal_places=3, max_digits=10, verbose_name='Potência Atual (kW)')),
+                ('energia_gerada_kwh', models.DecimalField(decimal_places=3, max_digits=12, verbose_name='Energia Gerada Acumulada (kWh)')),
+                ('energia_dia_kwh', models.DecimalField(decimal_places=3, default=0, max_digits=10, verbose_name='Energia do Dia (kWh)')),
+                ('status', models.CharField(choices=[('online', 'Online'), ('offline', 'Offline'), ('manutencao', 'Manutenção'), ('alerta', 'Alerta'), ('erro', 'Erro')], default='online', max_length=20)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Estado Atual da Usina',
+                'verbose_name_plural': 'Estados Atuais das Usinas',
+            },
+        ),
+        migrations.RunPython(preencher_estados, migrations.RunPython.noop),
+    ]
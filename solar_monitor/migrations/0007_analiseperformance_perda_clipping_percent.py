@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:22
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solar_monitor', '0006_estadousina'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analiseperformance',
+            name='perda_clipping_percent',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Energia estimada cortada pelo limite de potência dos inversores', max_digits=5, verbose_name='Perda por Clipping (%)'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solar_monitor', '0007_analiseperformance_perda_clipping_percent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DetectorUsina',
+            fields=[
+                ('usina', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='detector', serialize=False, to='solar_monitor.usinasolar')),
+                ('leituras', models.PositiveIntegerField(default=0, verbose_name='Leituras Avaliadas')),
+                ('razao_media', models.FloatField(default=0, verbose_name='Potência Normalizada - Média')),
+                ('razao_variancia', models.FloatField(default=0, verbose_name='Potência Normalizada - Variância')),
+                ('ultima_leitura', models.DateTimeField(blank=True, null=True, verbose_name='Última Leitura Avaliada')),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Detector de Anomalias',
+                'verbose_name_plural': 'Detectores de Anomalias',
+            },
+        ),
+    ]
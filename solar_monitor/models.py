@@ -3,6 +3,10 @@ from django.utils import timezone
 from decimal import Decimal
 
 
+# PR típico = 75-85% (perdas por temperatura, cabeamento, sujeira, etc.)
+PR_BASE_ESPERADO = Decimal('0.80')
+
+
 class Inversor(models.Model):
     """Inversor Solar - Equipamento que converte corrente contínua (DC) em alternada (AC)"""
     
@@ -747,8 +751,7 @@ class UsinaSolar(models.Model):
     @property
     def performance_ratio_esperado(self):
         """Performance Ratio esperado (considerando perdas típicas)"""
-        # PR típico = 75-85% (perdas por temperatura, cabeamento, sujeira, etc.)
-        pr_base = Decimal('0.80')  # 80%
+        pr_base = PR_BASE_ESPERADO
         
         # Reduzir por sombreamento
         sombreamento_total = 0
@@ -1060,5 +1063,132 @@ class RelatorioMensal(models.Model):
         return f"{self.usina.nome} - {self.mes:02d}/{self.ano}"
 
 
+class AgregadoUsina(models.Model):
+    """Resumo das leituras de uma usina por intervalo (5 min, hora ou dia)"""
+    usina = models.ForeignKey(
+        UsinaSolar,
+        on_delete=models.CASCADE,
+        related_name='agregados'
+    )
+    granularidade = models.CharField(
+        max_length=5,
+        choices=[
+            ('5min', '5 minutos'),
+            ('hora', 'Hora'),
+            ('dia', 'Dia'),
+        ]
+    )
+    inicio = models.DateTimeField(verbose_name="Início do Intervalo")
+    leituras = models.PositiveIntegerField(default=0, verbose_name="Leituras")
+
+    # Potência
+    potencia_min_kw = models.DecimalField(max_digits=10, decimal_places=3, verbose_name="Potência Mínima (kW)")
+    potencia_max_kw = models.DecimalField(max_digits=10, decimal_places=3, verbose_name="Potência Máxima (kW)")
+    potencia_soma_kw = models.DecimalField(
+        max_digits=16,
+        decimal_places=3,
+        verbose_name="Soma das Potências (kW)",
+        help_text="Média = soma / leituras (guardada assim para somar lotes novos)"
+    )
+
+    # Contadores de energia (a diferença entre intervalos é a energia gerada)
+    energia_gerada_min_kwh = models.DecimalField(max_digits=12, decimal_places=3, verbose_name="Energia Acumulada Inicial (kWh)")
+    energia_gerada_max_kwh = models.DecimalField(max_digits=12, decimal_places=3, verbose_name="Energia Acumulada Final (kWh)")
+    energia_dia_max_kwh = models.DecimalField(
+        max_digits=10,
+        decimal_places=3,
+        default=0,
+        verbose_name="Energia do Dia (kWh)",
+        help_text="Maior energia_dia_kwh do intervalo (no agregado diário, a geração do dia)"
+    )
+
+    # Ambiente (leituras sem o valor não entram na média)
+    temperatura_soma_c = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    temperatura_leituras = models.PositiveIntegerField(default=0)
+    irradiancia_soma_w_m2 = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    irradiancia_leituras = models.PositiveIntegerField(default=0)
+
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Agregado de Leituras"
+        verbose_name_plural = "Agregados de Leituras"
+        ordering = ['-inicio']
+        unique_together = ['usina', 'granularidade', 'inicio']
+        indexes = [
+            models.Index(fields=['granularidade', 'inicio']),
+        ]
+
+    def __str__(self):
+        return f"{self.usina.nome} - {self.granularidade} {self.inicio:%d/%m/%Y %H:%M}"
+
+    @property
+    def potencia_media_kw(self):
+        return self.potencia_soma_kw / self.leituras if self.leituras else None
+
+    @property
+    def temperatura_media_c(self):
+        return self.temperatura_soma_c / self.temperatura_leituras if self.temperatura_leituras else None
+
+    @property
+    def irradiancia_media_w_m2(self):
+        return self.irradiancia_soma_w_m2 / self.irradiancia_leituras if self.irradiancia_leituras else None
+
+
+class EstadoUsina(models.Model):
+    """Estado atual da usina: cópia da leitura mais recente (uma linha por usina)"""
+    usina = models.OneToOneField(
+        UsinaSolar,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='estado_atual'
+    )
+    timestamp = models.DateTimeField(verbose_name="Última Leitura")
+    potencia_atual_kw = models.DecimalField(max_digits=10, decimal_places=3, verbose_name="Potência Atual (kW)")
+    energia_gerada_kwh = models.DecimalField(max_digits=12, decimal_places=3, verbose_name="Energia Gerada Acumulada (kWh)")
+    energia_dia_kwh = models.DecimalField(max_digits=10, decimal_places=3, default=0, verbose_name="Energia do Dia (kWh)")
+    status = models.CharField(
+        max_length=20,
+        choices=[
+            ('online', 'Online'),
+            ('offline', 'Offline'),
+            ('manutencao', 'Manutenção'),
+            ('alerta', 'Alerta'),
+            ('erro', 'Erro'),
+        ],
+        default='online'
+    )
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Estado Atual da Usina"
+        verbose_name_plural = "Estados Atuais das Usinas"
+
+    def __str__(self):
+        return f"{self.usina.nome} - {self.get_status_display()} ({self.timestamp:%d/%m/%Y %H:%M})"
+
+
+class DetectorUsina(models.Model):
+    """Estado do detector de anomalias da usina (EWMA da potência normalizada pela irradiância)"""
+    usina = models.OneToOneField(
+        UsinaSolar,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='detector'
+    )
+    leituras = models.PositiveIntegerField(default=0, verbose_name="Leituras Avaliadas")
+    razao_media = models.FloatField(default=0, verbose_name="Potência Normalizada - Média")
+    razao_variancia = models.FloatField(default=0, verbose_name="Potência Normalizada - Variância")
+    ultima_leitura = models.DateTimeField(null=True, blank=True, verbose_name="Última Leitura Avaliada")
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Detector de Anomalias"
+        verbose_name_plural = "Detectores de Anomalias"
+
+    def __str__(self):
+        return f"{self.usina.nome} - {self.leituras} leituras (média {self.razao_media:.2f})"
+
+
 # Importar modelos meteorológicos
 from .models_meteorologia import DadosMeteorologicos, AnalisePerformance
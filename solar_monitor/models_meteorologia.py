@@ -3,6 +3,29 @@ from django.utils import timezone
 from decimal import Decimal
 
 
+# Nebulosidade (%) abaixo do limite → fator de redução da irradiância
+# (Céu limpo: 100%, Parcialmente nublado: 70-90%, Nublado: 30-50%, Chuvoso: 10-20%)
+FAIXAS_NEBULOSIDADE = [(20, 1.0), (50, 0.8), (80, 0.5)]
+FATOR_NEBULOSIDADE_MAXIMA = 0.2
+
+# PR vs real (%) a partir do limite → status da performance e se requer atenção
+FAIXAS_PERFORMANCE = [
+    (95, 'excelente', False),
+    (85, 'bom', False),
+    (75, 'aceitavel', False),
+    (60, 'abaixo', True),
+]
+PERFORMANCE_CRITICA = ('critico', True)
+
+
+def classificar_performance(pr_real_percent):
+    """PR vs real (%) → (status_performance, requer_atencao)"""
+    for limite, status, requer_atencao in FAIXAS_PERFORMANCE:
+        if pr_real_percent >= limite:
+            return status, requer_atencao
+    return PERFORMANCE_CRITICA
+
+
 class DadosMeteorologicos(models.Model):
     """Dados meteorológicos para análise de performance das usinas"""
     
@@ -178,17 +201,11 @@ class DadosMeteorologicos(models.Model):
     @property
     def fator_reducao_nuvens(self):
         """Fator de redução de irradiância devido às nuvens"""
-        # Céu limpo: 100%, Parcialmente nublado: 70-90%, Nublado: 30-50%, Chuvoso: 10-20%
         nebulosidade = float(self.nebulosidade_percent)
-        
-        if nebulosidade < 20:
-            return 1.0  # 100% - céu limpo
-        elif nebulosidade < 50:
-            return 0.8  # 80% - poucas nuvens
-        elif nebulosidade < 80:
-            return 0.5  # 50% - muitas nuvens
-        else:
-            return 0.2  # 20% - completamente nublado
+        for limite, fator in FAIXAS_NEBULOSIDADE:
+            if nebulosidade < limite:
+                return fator
+        return FATOR_NEBULOSIDADE_MAXIMA  # completamente nublado
 
     @property
     def irradiancia_efetiva_w_m2(self):
@@ -318,6 +335,13 @@ class AnalisePerformance(models.Model):
         default=Decimal('0.00'),
         verbose_name="Perda por Sombreamento (%)"
     )
+    perda_clipping_percent = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name="Perda por Clipping (%)",
+        help_text="Energia estimada cortada pelo limite de potência dos inversores"
+    )
     
     # Justificativa Climática
     justificativa_climatica = models.TextField(
@@ -407,6 +431,10 @@ class AnalisePerformance(models.Model):
         elif perda_sujeira > 3:
             recomendacoes.append("🧹 Considerar limpeza dos painéis em breve.")
         
+        # Recomendações baseadas em clipping (inversor no limite)
+        if float(self.perda_clipping_percent) > 3:
+            recomendacoes.append("⚡ Inversores limitando a geração (clipping > 3%). Avaliar dimensionamento DC/AC.")
+        
         # Recomendações baseadas em clima
         if nebulosidade < 20 and pr_real < 85:
             recomendacoes.append("☀️ Céu limpo mas performance baixa. Investigar causas técnicas.")
@@ -423,22 +451,7 @@ class AnalisePerformance(models.Model):
             self.pr_real_percent = (self.energia_gerada_kwh / self.energia_esperada_real_kwh) * 100
         
         # Determinar status
-        pr = float(self.pr_real_percent)
-        if pr >= 95:
-            self.status_performance = 'excelente'
-            self.requer_atencao = False
-        elif pr >= 85:
-            self.status_performance = 'bom'
-            self.requer_atencao = False
-        elif pr >= 75:
-            self.status_performance = 'aceitavel'
-            self.requer_atencao = False
-        elif pr >= 60:
-            self.status_performance = 'abaixo'
-            self.requer_atencao = True
-        else:
-            self.status_performance = 'critico'
-            self.requer_atencao = True
+        self.status_performance, self.requer_atencao = classificar_performance(float(self.pr_real_percent))
         
         # Gerar justificativa e recomendações
         if not self.justificativa_climatica:
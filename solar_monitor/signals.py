@@ -0,0 +1,33 @@
+"""
+Sinais do Monitoramento Solar
+
+Mantém EstadoUsina (última leitura de cada usina) e os agregados
+(AgregadoUsina) coerentes com as leituras salvas pelo ORM e passa
+leituras novas pelo detector de anomalias. A ingestão em lote grava sem
+sinais e faz as três coisas por conta própria (estado_usinas.registrar_lote,
+agregados.atualizar_com_leituras, deteccao_anomalias.detectar_lote).
+"""
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .agregados import atualizar_com_leitura
+from .deteccao_anomalias import detectar_leitura
+from .estado_usinas import registrar_leitura
+from .models import LeituraUsina
+
+
+@receiver(post_save, sender=LeituraUsina)
+def leitura_salva(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Leitura nova ou editada → estado da usina avança se ela for a mais
+    recente e os agregados do dia passam a incluí-la; leitura nova →
+    detector de anomalias
+    """
+    if raw:
+        return  # loaddata
+    registrar_leitura(instance)
+    if getattr(settings, 'SOLAR_AGREGADOS_NA_INGESTAO', True):
+        atualizar_com_leitura(instance, nova=created)
+    if created and getattr(settings, 'SOLAR_DETECTOR_NA_INGESTAO', True):
+        detectar_leitura(instance)
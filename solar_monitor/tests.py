@@ -1,3 +1,317 @@
-from django.test import TestCase
+import gzip
+import json
+import time
+import unittest
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .agregados import CAMPOS_AGREGADO, _limites_dia, energia_do_dia, recalcular
+from .analise_performance import CAMPOS_DECIMAIS, PANDAS_DISPONIVEL, analisar_periodo, carregar_clipping
+from .deteccao_anomalias import REGRAS, reproduzir
+from .estado_usinas import aguardar_status, eventos_status, status_usinas
+from .ingestao_leituras import ingerir_leituras
+from .models import AgregadoUsina, AlertaUsina, Inversor, LeituraUsina, UsinaSolar
+from .models_meteorologia import AnalisePerformance, DadosMeteorologicos
+
+
+# ============================================================
+# 📡 STATUS EM TEMPO REAL
+# ============================================================
+
+class StatusGeralTests(TestCase):
+
+    def setUp(self):
+        usuario = get_user_model().objects.create_user(username='operador', email='operador@exemplo.com', password='senha')
+        self.client.force_login(usuario)
+
+    def test_aguardar_nao_finito(self):
+        versao, _ = status_usinas()
+        for valor in ('nan', 'inf'):
+            with self.subTest(valor=valor):
+                resposta = self.client.get(reverse('solar_monitor:api_status_geral'), {'versao': versao, 'aguardar': valor})
+                self.assertEqual(resposta.status_code, 400)
+
+        inicio = time.monotonic()
+        self.assertEqual(aguardar_status(versao, float('nan'))[0], versao)
+        self.assertLess(time.monotonic() - inicio, 1)
+
+    @override_settings(SOLAR_STATUS_STREAM_SEGUNDOS=0.3, SOLAR_STATUS_INTERVALO_SEGUNDOS=0.05)
+    def test_stream_termina_no_limite(self):
+        inicio = time.monotonic()
+        eventos = list(eventos_status())
+        duracao = time.monotonic() - inicio
+        self.assertGreaterEqual(duracao, 0.3)
+        self.assertLess(duracao, 1)
+        self.assertEqual(eventos[0], 'retry: 1000\n\n')
+        self.assertEqual(sum(evento.startswith('id: ') for evento in eventos), 1)
+
+        # Pela view: o corpo da resposta também termina (o navegador reconecta)
+        resposta = self.client.get(reverse('solar_monitor:api_status_stream'))
+        corpo = b''.join(resposta.streaming_content).decode()
+        self.assertIn('event: status', corpo)
+
+
+# ============================================================
+# 📊 AGREGADOS
+# ============================================================
+
+class AgregadosTests(TestCase):
+
+    def setUp(self):
+        self.usina = UsinaSolar.objects.create(
+            nome='Usina Agregados', localizacao='-', capacidade_kwp=100, data_instalacao=timezone.localdate(),
+        )
+        self.hoje = timezone.localdate()
+        self.inicio = timezone.localtime().replace(hour=9, minute=0, second=0, microsecond=0)
+
+    def _ler(self, minutos, potencia, energia, energia_dia):
+        return LeituraUsina.objects.create(
+            usina=self.usina, timestamp=self.inicio + timedelta(minutes=minutos), potencia_atual_kw=potencia,
+            energia_gerada_kwh=energia, energia_dia_kwh=Decimal(str(energia_dia)), temperatura_modulo_c=40, irradiancia_w_m2=800,
+        )
+
+    def _agregados(self):
+        return list(AgregadoUsina.objects.filter(usina=self.usina).order_by('granularidade', 'inicio').values_list(
+            'granularidade', 'inicio', *CAMPOS_AGREGADO
+        ))
+
+    def test_leituras_salvas_pelo_orm_entram_no_dia(self):
+        self.assertEqual(energia_do_dia(self.hoje), 0)
+        self._ler(0, 40, 1000, 12.5)
+        self.assertEqual(energia_do_dia(self.hoje), Decimal('12.500'))
+        self._ler(70, 55, 1010, 22.5)
+        self.assertEqual(energia_do_dia(self.hoje), Decimal('22.500'))
+
+        dia = AgregadoUsina.objects.get(usina=self.usina, granularidade='dia')
+        self.assertEqual(dia.leituras, 2)
+        self.assertEqual(AgregadoUsina.objects.filter(usina=self.usina, granularidade='hora').count(), 2)
+
+    def test_incremental_igual_a_recalcular(self):
+        for minutos, potencia, energia, energia_dia in ((0, 40, 1000, 1), (3, 45, 1002, 3), (8, 30, 1004, 5), (65, 50, 1010, 11)):
+            self._ler(minutos, potencia, energia, energia_dia)
+        incremental = self._agregados()
+
+        recalcular(self.hoje, self.hoje, usina_ids=[self.usina.id])
+        self.assertEqual(self._agregados(), incremental)
+
+    def test_leitura_editada_nao_e_somada_de_novo(self):
+        self._ler(0, 40, 1000, 10)
+        leitura = self._ler(5, 45, 1002, 12)
+        leitura.energia_dia_kwh = Decimal('15')
+        leitura.save()
+
+        dia = AgregadoUsina.objects.get(usina=self.usina, granularidade='dia')
+        self.assertEqual((dia.leituras, dia.energia_dia_max_kwh), (2, Decimal('15.000')))
+        self.assertEqual(energia_do_dia(self.hoje), Decimal('15.000'))
+
+
+# ============================================================
+# 📥 INGESTÃO DE LEITURAS
+# ============================================================
+
+class IngestaoLeiturasTests(TestCase):
+
+    def setUp(self):
+        self.usina = UsinaSolar.objects.create(
+            nome='Usina Ingestão', localizacao='-', capacidade_kwp=100, data_instalacao=timezone.localdate(),
+        )
+        self.inicio = timezone.localtime().replace(hour=9, minute=0, second=0, microsecond=0)
+        usuario = get_user_model().objects.create_user(username='coletor', email='coletor@exemplo.com', password='senha')
+        self.client.force_login(usuario)
+
+    def _registro(self, minutos, energia_dia='12.5'):
+        return {
+            'usina': self.usina.id, 'timestamp': (self.inicio + timedelta(minutes=minutos)).isoformat(),
+            'potencia_atual_kw': 40, 'energia_gerada_kwh': 1000 + minutos, 'energia_dia_kwh': energia_dia,
+        }
+
+    def _postar(self, corpo, **extra):
+        return self.client.post(
+            reverse('solar_monitor:api_ingestao_leituras'), data=corpo, content_type='application/x-ndjson', **extra
+        )
+
+    def test_derivados_iguais_ao_save(self):
+        # Inclui empates no arredondamento (0.6 × 0.475 = 0.285; 0.2 × 0.475 = 0.095)
+        energias = ['12.345', '1.010', '0.600', '0.200', '0.100', '10.500', '99999.999']
+        resultado = ingerir_leituras([self._registro(minutos, energia) for minutos, energia in enumerate(energias)])
+        self.assertEqual(resultado['inseridas'], len(energias))
+
+        for minutos, energia in enumerate(energias):
+            with self.subTest(energia=energia):
+                pelo_orm = LeituraUsina.objects.create(
+                    usina=self.usina, timestamp=self.inicio + timedelta(hours=1, minutes=minutos),
+                    potencia_atual_kw=40, energia_gerada_kwh=1000, energia_dia_kwh=Decimal(energia),
+                )
+                pelo_orm.refresh_from_db()
+                ingerida = LeituraUsina.objects.get(usina=self.usina, timestamp=self.inicio + timedelta(minutes=minutos))
+                self.assertEqual(
+                    (ingerida.co2_evitado_kg, ingerida.economia_reais),
+                    (pelo_orm.co2_evitado_kg, pelo_orm.economia_reais),
+                )
+
+    def test_lote_reenviado_e_ignorado(self):
+        lote = [self._registro(minutos) for minutos in range(0, 15, 5)]
+        primeiro = ingerir_leituras(lote + [lote[0]])
+        self.assertEqual((primeiro['inseridas'], primeiro['ignoradas']), (3, 1))
+
+        reenvio = ingerir_leituras(lote)
+        self.assertEqual((reenvio['inseridas'], reenvio['ignoradas'], reenvio['invalidas']), (0, 3, 0))
+        self.assertEqual(LeituraUsina.objects.filter(usina=self.usina).count(), 3)
+
+    def test_gzip_ilegivel_e_recusado(self):
+        linhas = '\n'.join(json.dumps(self._registro(minutos)) for minutos in range(3)).encode()
+        compactado = gzip.compress(linhas)
+        for nome, corpo in (('não é gzip', b'nao e gzip'), ('truncado', compactado[:len(compactado) // 2])):
+            with self.subTest(nome):
+                resposta = self._postar(corpo, HTTP_CONTENT_ENCODING='gzip')
+                self.assertEqual(resposta.status_code, 400)
+                self.assertEqual(resposta.json()['status'], 'error')
+        self.assertFalse(LeituraUsina.objects.exists())
+
+        resposta = self._postar(compactado, HTTP_CONTENT_ENCODING='gzip')
+        self.assertEqual((resposta.status_code, resposta.json()['inseridas']), (200, 3))
+
+    def test_gzip_grande_demais_e_recusado(self):
+        linhas = '\n'.join(json.dumps(self._registro(minutos)) for minutos in range(3)).encode()
+        with self.settings(SOLAR_INGESTAO_MAX_LEITURAS=2):
+            resposta = self._postar(gzip.compress(linhas), HTTP_CONTENT_ENCODING='gzip')
+        self.assertEqual(resposta.status_code, 413)
+
+        # Uma linha só, sem quebras: para no limite de bytes
+        with self.settings(SOLAR_INGESTAO_MAX_BYTES=1024 * 1024):
+            resposta = self._postar(gzip.compress(b' ' * (2 * 1024 * 1024)), HTTP_CONTENT_ENCODING='gzip')
+        self.assertEqual(resposta.status_code, 413)
+        self.assertFalse(LeituraUsina.objects.exists())
+
+
+# ============================================================
+# 📈 ANÁLISE DE PERFORMANCE
+# ============================================================
+
+@unittest.skipUnless(PANDAS_DISPONIVEL, 'pandas não instalado')
+class AnalisePerformanceTests(TestCase):
+
+    def setUp(self):
+        self.dia = timezone.localdate() - timedelta(days=1)
+        self.usina = UsinaSolar.objects.create(
+            nome='Usina Análise', localizacao='-', capacidade_kwp=100, data_instalacao=self.dia,
+        )
+        Inversor.objects.create(
+            usina=self.usina, fabricante='Teste', modelo='60K', potencia_nominal_kw=60,
+            potencia_maxima_dc_kw=80, tensao_entrada_min_v=200, tensao_entrada_max_v=1000,
+            tensao_mppt_min_v=200, tensao_mppt_max_v=850, corrente_entrada_max_a=30,
+            corrente_saida_max_a=100, numero_mppt=4, strings_por_mppt=2,
+        )
+        meia_noite = _limites_dia(self.dia)[0]
+        DadosMeteorologicos.objects.bulk_create([
+            DadosMeteorologicos(
+                usina=self.usina, timestamp=meia_noite + timedelta(hours=hora), irradiancia_global_w_m2=irradiancia,
+                temperatura_ar_c=28, nebulosidade_percent=20, condicao_clima='parcialmente_nublado', precipitacao_mm=0,
+            )
+            for hora, irradiancia in ((7, 150), (9, 600), (11, 1000), (13, 950), (15, 500), (17, 100))
+        ])
+        self.diario = AgregadoUsina.objects.create(
+            usina=self.usina, granularidade='dia', inicio=meia_noite, leituras=288,
+            potencia_min_kw=0, potencia_max_kw=60, potencia_soma_kw=4000,
+            energia_gerada_min_kwh=1000, energia_gerada_max_kwh=1300, energia_dia_max_kwh=300,
+            temperatura_soma_c=0, temperatura_leituras=0, irradiancia_soma_w_m2=0, irradiancia_leituras=0,
+        )
+        # Um intervalo no limite do inversor (≥ 98% de 60 kW) e um abaixo
+        for minutos, potencia in ((660, 59.5), (665, 50)):
+            AgregadoUsina.objects.create(
+                usina=self.usina, granularidade='5min', inicio=meia_noite + timedelta(minutes=minutos), leituras=1,
+                potencia_min_kw=potencia, potencia_max_kw=potencia, potencia_soma_kw=potencia,
+                energia_gerada_min_kwh=0, energia_gerada_max_kwh=0, energia_dia_max_kwh=0,
+                temperatura_soma_c=0, temperatura_leituras=0, irradiancia_soma_w_m2=1000, irradiancia_leituras=1,
+            )
+
+    def test_igual_ao_save_por_linha(self):
+        self.assertEqual(analisar_periodo(self.dia, self.dia, usina_ids=[self.usina.id])['analises'], 1)
+        em_lote = AnalisePerformance.objects.get(usina=self.usina, data_analise=self.dia)
+        self.assertGreater(em_lote.perda_clipping_percent, 0)
+        self.assertAlmostEqual(
+            float(em_lote.energia_esperada_ideal_kwh),
+            self.usina.calcular_geracao_esperada_kwh(float(em_lote.hsp_dia_kwh_m2)),
+            delta=0.01,
+        )
+
+        # Mesmas entradas pelo caminho antigo: save() calcula PR, status e textos
+        entradas = {campo: getattr(em_lote, campo) for campo in CAMPOS_DECIMAIS if not campo.startswith('pr_')}
+        em_lote.delete()
+        por_linha = AnalisePerformance(usina=self.usina, data_analise=self.dia, **entradas)
+        por_linha.save()
+        por_linha.refresh_from_db()
+
+        for campo in ('pr_ideal_percent', 'pr_real_percent'):
+            self.assertAlmostEqual(getattr(em_lote, campo), getattr(por_linha, campo), delta=Decimal('0.01'))
+        for campo in ('status_performance', 'requer_atencao', 'justificativa_climatica', 'recomendacoes'):
+            self.assertEqual(getattr(em_lote, campo), getattr(por_linha, campo), campo)
+
+    def test_reanalisar_atualiza_sem_duplicar(self):
+        analisar_periodo(self.dia, self.dia, usina_ids=[self.usina.id])
+        primeira = AnalisePerformance.objects.get(usina=self.usina, data_analise=self.dia)
+
+        self.diario.energia_dia_max_kwh = 150
+        self.diario.save()
+        analisar_periodo(self.dia, self.dia, usina_ids=[self.usina.id])
+
+        analises = AnalisePerformance.objects.filter(usina=self.usina, data_analise=self.dia)
+        self.assertEqual(analises.count(), 1)
+        segunda = analises.get()
+        self.assertEqual(segunda.pk, primeira.pk)
+        self.assertEqual(segunda.energia_gerada_kwh, Decimal('150.000'))
+        self.assertLess(segunda.pr_real_percent, primeira.pr_real_percent)
+
+    def test_clipping_com_muitas_usinas(self):
+        import pandas as pd
+
+        # Centenas de usinas numa consulta só, cada uma com o próprio limite
+        usinas = pd.DataFrame({
+            'usina_id': [self.usina.id] + [self.usina.id + numero for numero in range(1, 1500)],
+            'potencia_ac_kw': [60.0] + [40.0] * 1499,
+        })
+        intervalos = carregar_clipping(self.dia, self.dia, usinas)
+        self.assertEqual(intervalos['potencia_max_kw'].astype(float).tolist(), [59.5])
+
+
+# ============================================================
+# 🚨 DETECÇÃO DE ANOMALIAS
+# ============================================================
+
+class ReproducaoAnomaliasTests(TestCase):
+
+    def setUp(self):
+        self.usina = UsinaSolar.objects.create(
+            nome='Usina Teste', localizacao='-', capacidade_kwp=100, data_instalacao=timezone.localdate(),
+        )
+        Inversor.objects.create(
+            usina=self.usina, fabricante='X', modelo='Y', numero_serie='T-1', ativo=True,
+            potencia_nominal_kw=90, potencia_maxima_dc_kw=110, tensao_saida_v=380, corrente_saida_max_a=150,
+            tensao_entrada_min_v=200, tensao_entrada_max_v=1000, tensao_mppt_min_v=200, tensao_mppt_max_v=800,
+            corrente_entrada_max_a=30, numero_mppt=2, strings_por_mppt=2, certificacoes='', tipo_comunicacao='wifi',
+            api_endpoint='', api_key='', dimensoes='', observacoes='',
+        )
+        self.titulo = REGRAS['tensao'][2]
+        self.inicio = timezone.now() - timedelta(days=3)
+        # Leitura com sobretensão salva pelo ORM → alerta do detector (sinal)
+        LeituraUsina.objects.create(
+            usina=self.usina, timestamp=self.inicio, potencia_atual_kw=40, energia_gerada_kwh=1000, tensao_v=450,
+        )
+
+    def test_reproducao_nao_duplica_alerta_aberto_no_banco(self):
+        self.assertEqual(AlertaUsina.objects.filter(usina=self.usina, titulo=self.titulo).count(), 1)
+
+        # Mais de --reabrir-horas depois da abertura, e o alerta ainda aberto no banco
+        resultado = reproduzir(self.inicio, usina_ids=[self.usina.id], reabrir_horas=1, gravar=True)
+        self.assertEqual(resultado['alertas'], [])
+        self.assertEqual(AlertaUsina.objects.filter(usina=self.usina, titulo=self.titulo).count(), 1)
+
+        AlertaUsina.objects.filter(usina=self.usina).update(resolvido=True)
+        resultado = reproduzir(self.inicio, usina_ids=[self.usina.id], reabrir_horas=1, gravar=True)
+        self.assertEqual([alerta.titulo for alerta in resultado['alertas']], [self.titulo])
+        self.assertEqual(AlertaUsina.objects.filter(usina=self.usina, titulo=self.titulo).count(), 2)
@@ -11,5 +11,8 @@ urlpatterns = [
     
     # APIs JSON
     path('api/usina/<int:usina_id>/realtime/', views.api_leituras_realtime, name='api_realtime'),
+    path('api/usina/<int:usina_id>/serie/', views.api_serie_usina, name='api_serie'),
     path('api/status-geral/', views.api_status_geral, name='api_status_geral'),
+    path('api/status-geral/stream/', views.api_status_stream, name='api_status_stream'),
+    path('api/leituras/ingestao/', views.api_ingestao_leituras, name='api_ingestao_leituras'),
 ]
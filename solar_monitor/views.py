@@ -1,30 +1,38 @@
+import gzip
+import hmac
+import math
+import zlib
 from django.shortcuts import render, get_object_or_404
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from datetime import timedelta
 from django.db.models import Avg, Sum, Max, Min, Count
-from .models import UsinaSolar, LeituraUsina, AlertaUsina, RelatorioMensal
+from .agregados import GRANULARIDADES, energia_do_dia, serie
+from .estado_usinas import aguardar_status, eventos_status
+from .ingestao_leituras import (
+    LoteGrandeDemais, LoteInvalido, ingerir_leituras, ler_csv, ler_jsonl, linhas_limitadas,
+)
+from .models import UsinaSolar, EstadoUsina, AlertaUsina, RelatorioMensal
 
 
 @login_required
 def dashboard(request):
     """Dashboard principal do monitoramento solar"""
-    usinas = UsinaSolar.objects.filter(ativa=True)
+    usinas = UsinaSolar.objects.filter(ativa=True).select_related('estado_atual')
     
     # Estatísticas gerais
     total_capacidade = usinas.aggregate(total=Sum('capacidade_kwp'))['total'] or 0
     total_usinas = usinas.count()
     
-    # Última hora
+    # Potência atual: estado das usinas com leitura na última hora
     ultima_hora = timezone.now() - timedelta(hours=1)
-    leituras_recentes = LeituraUsina.objects.filter(
+    potencia_atual_total = EstadoUsina.objects.filter(
         timestamp__gte=ultima_hora,
         usina__ativa=True
-    )
-    
-    potencia_atual_total = leituras_recentes.values('usina').annotate(
-        ultima=Max('timestamp')
     ).aggregate(total=Sum('potencia_atual_kw'))['total'] or 0
     
     # Alertas não resolvidos
@@ -33,12 +41,8 @@ def dashboard(request):
         usina__ativa=True
     ).order_by('-timestamp')[:5]
     
-    # Dados de hoje
-    hoje = timezone.now().date()
-    energia_hoje = LeituraUsina.objects.filter(
-        timestamp__date=hoje,
-        usina__ativa=True
-    ).aggregate(total=Sum('energia_dia_kwh'))['total'] or 0
+    # Dados de hoje (agregado diário: energia_dia_kwh final de cada usina)
+    energia_hoje = energia_do_dia(usinas=usinas)
     
     context = {
         'usinas': usinas,
@@ -119,26 +123,125 @@ def api_leituras_realtime(request, usina_id):
     return JsonResponse(dados)
 
 
+@login_required
+def api_serie_usina(request, usina_id):
+    """
+    API JSON da série agregada de uma usina (gráficos)
+
+    ?granularidade=5min|hora|dia (padrão hora) &dias=N (padrão 1; 30 no diário)
+    """
+    usina = get_object_or_404(UsinaSolar, id=usina_id)
+    granularidade = request.GET.get('granularidade', 'hora')
+    if granularidade not in GRANULARIDADES:
+        return JsonResponse({'error': f'granularidade deve ser uma de {list(GRANULARIDADES)}'}, status=400)
+    try:
+        dias = min(int(request.GET.get('dias', 30 if granularidade == 'dia' else 1)), 400)
+    except ValueError:
+        return JsonResponse({'error': 'dias deve ser um número'}, status=400)
+
+    fim = timezone.now()
+    pontos = serie(usina.id, granularidade, fim - timedelta(days=dias), fim)
+
+    def numero(valor):
+        return float(valor) if valor is not None else None
+
+    return JsonResponse({
+        'usina': {'id': usina.id, 'nome': usina.nome},
+        'granularidade': granularidade,
+        'pontos': [
+            {
+                'inicio': ponto['inicio'].isoformat(),
+                'leituras': ponto['leituras'],
+                **{campo: numero(valor) for campo, valor in ponto.items() if campo not in ('inicio', 'leituras')},
+            }
+            for ponto in pontos
+        ],
+    })
+
+
 @login_required
 def api_status_geral(request):
-    """API JSON para status geral de todas as usinas"""
-    usinas = UsinaSolar.objects.filter(ativa=True)
+    """
+    API JSON para status geral de todas as usinas (estado atual, uma consulta)
+    Parâmetros GET (long-polling, opcionais):
+        versao   - versão recebida na resposta anterior
+        aguardar - segundos para segurar a resposta até a versão mudar
+    """
+    try:
+        aguardar = float(request.GET.get('aguardar', 0))
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'aguardar deve ser numérico'}, status=400)
+    if not math.isfinite(aguardar):
+        return JsonResponse({'status': 'error', 'message': 'aguardar deve ser finito'}, status=400)
     
-    dados = []
-    for usina in usinas:
-        ultima = usina.ultima_leitura
-        dados.append({
-            'id': usina.id,
-            'nome': usina.nome,
-            'capacidade_kwp': float(usina.capacidade_kwp),
-            'localizacao': usina.localizacao,
-            'status': ultima.status if ultima else 'offline',
-            'potencia_atual_kw': float(ultima.potencia_atual_kw) if ultima else 0,
-            'energia_dia_kwh': float(ultima.energia_dia_kwh) if ultima else 0,
-            'ultima_atualizacao': ultima.timestamp.isoformat() if ultima else None,
-        })
-    
-    return JsonResponse({'usinas': dados})
+    versao, dados = aguardar_status(request.GET.get('versao'), aguardar)
+    
+    response = JsonResponse({'usinas': dados, 'versao': versao})
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+@login_required
+def api_status_stream(request):
+    """Status geral via Server-Sent Events: um evento `status` a cada mudança"""
+    ultima_versao = request.headers.get('Last-Event-ID') or request.GET.get('versao')
+    response = StreamingHttpResponse(eventos_status(ultima_versao), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # nginx: não acumular o stream em buffer
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _ingestao_autorizada(request):
+    """Token compartilhado (coletores) ou usuário logado"""
+    token = getattr(settings, 'SOLAR_INGESTAO_TOKEN', '')
+    if token:
+        return hmac.compare_digest(request.headers.get('X-Ingestao-Token', ''), token)
+    return request.user.is_authenticated
+
+
+@csrf_exempt
+@require_POST
+def api_ingestao_leituras(request):
+    """
+    Recebe leituras em lote de várias usinas
+
+    Corpo: JSON lines (padrão) ou CSV com cabeçalho
+    (Content-Type: text/csv ou ?formato=csv); aceita Content-Encoding: gzip.
+
+        {"usina": 3, "timestamp": "2025-06-01T10:15:00-03:00", "potencia_atual_kw": 41.2, "energia_gerada_kwh": 18234.5}
+    """
+    if not _ingestao_autorizada(request):
+        return JsonResponse({'status': 'error', 'message': 'Não autorizado'}, status=401)
+
+    corpo = request
+    if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+        corpo = gzip.GzipFile(fileobj=request)
+
+    formato = request.GET.get('formato') or ('csv' if request.content_type == 'text/csv' else 'jsonl')
+    leitor = ler_csv if formato == 'csv' else ler_jsonl
+    maximo = getattr(settings, 'SOLAR_INGESTAO_MAX_LEITURAS', 200000)
+    maximo_bytes = getattr(settings, 'SOLAR_INGESTAO_MAX_BYTES', 256 * 1024 * 1024)
+
+    try:
+        resultado = ingerir_leituras(leitor(linhas_limitadas(corpo, maximo_bytes), maximo=maximo))
+    except LoteGrandeDemais as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=413)
+    except LoteInvalido as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    except (OSError, EOFError, zlib.error, UnicodeDecodeError) as e:
+        # OSError: não é gzip; EOFError/zlib.error: gzip truncado ou corrompido
+        return JsonResponse({'status': 'error', 'message': f'Corpo ilegível: {e}'}, status=400)
+
+    return JsonResponse({
+        'status': 'success' if not resultado['invalidas'] else 'parcial',
+        'recebidas': resultado['recebidas'],
+        'inseridas': resultado['inseridas'],
+        'ignoradas': resultado['ignoradas'],
+        'invalidas': resultado['invalidas'],
+        'alertas': resultado['alertas'],
+        'erros': resultado['erros'],
+    })
 
 
 @login_required
@@ -12,8 +12,9 @@
 4. Retorna JSON com produtos detectados + confiança
 5. Opcionalmente salva DeteccaoProduto no banco
 
-📌 ENDPOINT:
-POST /api/verifik/detectar/
+📌 ENDPOINTS:
+POST /api/verifik/detectar/        → uma imagem (JSON)
+POST /api/verifik/detectar/lote/   → várias imagens (multipart/zip → NDJSON)
 
 📋 BODY (JSON):
 {
@@ -67,13 +68,13 @@ fetch('/api/verifik/detectar/', {
 
 import base64
 import io
+import json
 import time
+import zipfile
 from pathlib import Path
 
-import cv2
-import numpy as np
 from django.conf import settings
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from rest_framework.decorators import api_view, permission_classes
@@ -89,25 +90,24 @@ except ImportError:
     print("⚠️  AVISO: Ultralytics não instalado. Instale: pip install ultralytics")
 
 from .models import ProdutoMae, DeteccaoProduto, Camera
+from .models_coleta import LoteFotos
+from .services.deteccao_lote import (
+    ZipGrandeDemais, detectar_em_lote, fontes_arquivos, fontes_lote, fontes_zip, tamanho_lote,
+    verificar_zip,
+)
+from .services.imagem_entrada import (
+    TIPOS_IMAGEM_CRUA, buffer_arquivo, decodificar_buffer, ler_corpo_requisicao
+)
+from .services.registro_modelos import candidatos_modelo_padrao, obter_modelo_yolo
 
 
 # ============================================================
 # 🔧 CONFIGURAÇÕES
 # ============================================================
 
-# Caminho do modelo YOLO treinado
-MODELO_YOLO_PATH = getattr(
-    settings, 
-    'YOLO_MODEL_PATH', 
-    Path(settings.BASE_DIR) / 'models' / 'verifik_yolov8.pt'
-)
-
 # Confiança mínima para detecção (0-1)
 CONFIANCA_MINIMA = getattr(settings, 'CONFIDENCE_THRESHOLD', 0.75)
 
-# Cache do modelo (evita recarregar a cada request)
-_modelo_cache = None
-
 
 # ============================================================
 # 🤖 FUNÇÕES AUXILIARES
@@ -115,7 +115,7 @@ _modelo_cache = None
 
 def carregar_modelo():
     """
-    Carrega modelo YOLO (usa cache se já carregado)
+    Carrega modelo YOLO (instância compartilhada do registro de modelos)
     
     Returns:
         YOLO: Modelo carregado
@@ -124,42 +124,27 @@ def carregar_modelo():
         FileNotFoundError: Se modelo não existe
         ImportError: Se ultralytics não instalado
     """
-    global _modelo_cache
-    
     if not YOLO_DISPONIVEL:
         raise ImportError(
             "Ultralytics não instalado. Execute: pip install ultralytics"
         )
     
-    # Retorna cache se existe
-    if _modelo_cache is not None:
-        return _modelo_cache
-    
-    # Verifica se modelo existe
-    if not Path(MODELO_YOLO_PATH).exists():
-        # Se não existe modelo treinado, usa modelo base
-        print(f"⚠️  Modelo não encontrado em {MODELO_YOLO_PATH}")
-        print(f"📦 Usando YOLOv8s base (não treinado)")
-        modelo_path = 'yolov8s.pt'
-    else:
-        modelo_path = str(MODELO_YOLO_PATH)
-        print(f"✅ Carregando modelo: {modelo_path}")
-    
-    # Carrega modelo
-    _modelo_cache = YOLO(modelo_path)
-    
-    return _modelo_cache
+    # Instância compartilhada com as demais views (registro de modelos)
+    return obter_modelo_yolo(fallback='yolov8s.pt')
 
 
 def decodificar_imagem(imagem_data):
     """
-    Decodifica imagem de base64 ou bytes para numpy array
+    Decodifica imagem de base64, bytes ou buffer numpy
+    
+    Fotos muito maiores que a entrada do modelo já são decodificadas
+    reduzidas (ver services/imagem_entrada.py).
     
     Args:
-        imagem_data (str|bytes): Imagem em base64 ou bytes
+        imagem_data (str|bytes|np.ndarray): Imagem em base64, bytes ou buffer
         
     Returns:
-        np.ndarray: Imagem decodificada (BGR)
+        tuple: (imagem BGR, escala para voltar às coordenadas originais)
         
     Raises:
         ValueError: Se formato inválido
@@ -176,20 +161,13 @@ def decodificar_imagem(imagem_data):
         else:
             img_bytes = imagem_data
         
-        # Converte bytes → numpy array
-        nparr = np.frombuffer(img_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        if img is None:
-            raise ValueError("Não foi possível decodificar a imagem")
-        
-        return img
+        return decodificar_buffer(img_bytes)
         
     except Exception as e:
         raise ValueError(f"Erro ao decodificar imagem: {str(e)}")
 
 
-def processar_deteccoes(resultados, salvar=False, camera_id=None):
+def processar_deteccoes(resultados, salvar=False, camera_id=None, escala=1.0):
     """
     Processa resultados do YOLO e retorna JSON estruturado
     
@@ -197,6 +175,8 @@ def processar_deteccoes(resultados, salvar=False, camera_id=None):
         resultados: Resultado do modelo.predict()
         salvar (bool): Se deve salvar DeteccaoProduto no banco
         camera_id (int): ID da câmera (opcional)
+        escala (float): Fator para levar as bbox à imagem original
+            (imagem decodificada reduzida)
         
     Returns:
         list: Lista de detecções processadas
@@ -218,7 +198,7 @@ def processar_deteccoes(resultados, salvar=False, camera_id=None):
             classe_id = int(box.cls[0])
             
             # Bbox (x1, y1, x2, y2)
-            bbox = box.xyxy[0].tolist()
+            bbox = [x * escala for x in box.xyxy[0].tolist()]
             
             # TODO: Mapear classe_id → ProdutoMae
             # Por enquanto, retorna classe_id diretamente
@@ -279,22 +259,39 @@ def detectar_produtos(request):
     
     POST /api/verifik/detectar/
     
-    Body:
-    {
-        "imagem": "base64...",
-        "camera_id": 1,  # opcional
-        "salvar": true   # opcional
-    }
+    Body (uma das opções):
+    1. JSON: {"imagem": "base64...", "camera_id": 1, "salvar": true}
+    2. Multipart: imagem=<arquivo>, camera_id, salvar
+    3. Corpo cru (Content-Type: image/jpeg), parâmetros na URL:
+       POST /api/verifik/detectar/?camera_id=1&salvar=true
+    
+    2 e 3 evitam os ~33% a mais do base64 e a cópia extra da imagem.
     """
     inicio = time.time()
     
     try:
         # Validar dados
-        imagem_data = request.data.get('imagem')
-        camera_id = request.data.get('camera_id')
-        salvar = request.data.get('salvar', False)
+        if request.content_type.split(';')[0].strip() in TIPOS_IMAGEM_CRUA:
+            # Corpo cru: não tocar em request.data (não há parser para image/*)
+            parametros = request.query_params
+            try:
+                imagem_data = ler_corpo_requisicao(request)
+            except ValueError as e:
+                return Response(
+                    {'error': str(e)},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                )
+        else:
+            parametros = request.data
+            arquivo = request.FILES.get('imagem')
+            imagem_data = buffer_arquivo(arquivo) if arquivo else request.data.get('imagem')
         
-        if not imagem_data:
+        camera_id = parametros.get('camera_id')
+        salvar = parametros.get('salvar', False)
+        if isinstance(salvar, str):
+            salvar = salvar.lower() in ('1', 'true', 'sim')
+        
+        if imagem_data is None or len(imagem_data) == 0:
             return Response(
                 {'error': 'Campo "imagem" é obrigatório'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -302,7 +299,7 @@ def detectar_produtos(request):
         
         # Decodificar imagem
         try:
-            img = decodificar_imagem(imagem_data)
+            img, escala = decodificar_imagem(imagem_data)
         except ValueError as e:
             return Response(
                 {'error': f'Imagem inválida: {str(e)}'},
@@ -329,7 +326,8 @@ def detectar_produtos(request):
         deteccoes = processar_deteccoes(
             resultados,
             salvar=salvar,
-            camera_id=camera_id
+            camera_id=camera_id,
+            escala=escala
         )
         
         # Calcular tempo
@@ -355,6 +353,112 @@ def detectar_produtos(request):
         )
 
 
+# ============================================================
+# 📦 API EM LOTE (NDJSON)
+# ============================================================
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def detectar_produtos_lote(request):
+    """
+    Detecção em lote: N imagens por chamada, resultado em streaming
+    
+    POST /api/verifik/detectar/lote/
+    
+    Multipart (uma das opções):
+        imagens=<arquivo1>, imagens=<arquivo2>, ...   # vários arquivos
+        zip=<arquivo.zip>                             # zip com as fotos
+        lote_id=123                                   # LoteFotos já salvo
+    Opcionais: camera_id, salvar
+    
+    Resposta (application/x-ndjson), uma linha por imagem, na ordem:
+        {"indice": 0, "nome": "foto1.jpg", "status": "success", "deteccoes": [...], ...}
+    e uma última linha de resumo:
+        {"status": "fim", "total_imagens": N, "total_erros": 0, ...}
+    """
+    imagens = request.FILES.getlist('imagens')
+    arquivo_zip = request.FILES.get('zip')
+    lote_id = request.data.get('lote_id')
+    camera_id = request.data.get('camera_id')
+    salvar = str(request.data.get('salvar', '')).lower() in ('1', 'true', 'sim')
+    
+    if imagens:
+        fontes = fontes_arquivos(imagens)
+    elif arquivo_zip:
+        if not zipfile.is_zipfile(arquivo_zip):
+            return Response(
+                {'error': 'Arquivo "zip" inválido'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            verificar_zip(arquivo_zip)
+        except ZipGrandeDemais as e:
+            return Response({'error': str(e)}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        fontes = fontes_zip(arquivo_zip)
+    elif lote_id:
+        lote = LoteFotos.objects.filter(id=lote_id).first()
+        if not lote:
+            return Response(
+                {'error': f'Lote {lote_id} não encontrado'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        fontes = fontes_lote(lote)
+    else:
+        return Response(
+            {'error': 'Envie "imagens" (multipart), "zip" ou "lote_id"'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        modelo = carregar_modelo()
+    except Exception as e:
+        return Response(
+            {'error': f'Erro ao carregar modelo: {str(e)}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    def gerar_linhas():
+        inicio = time.time()
+        tamanho = tamanho_lote()
+        total = erros = 0
+        
+        try:
+            for indice, nome, resultado, escala, erro in detectar_em_lote(
+                fontes, modelo, CONFIANCA_MINIMA, tamanho=tamanho
+            ):
+                total += 1
+                if erro:
+                    erros += 1
+                    linha = {'indice': indice, 'nome': nome, 'status': 'error', 'error': erro}
+                else:
+                    deteccoes = processar_deteccoes(
+                        [resultado], salvar=salvar, camera_id=camera_id, escala=escala
+                    )
+                    linha = {
+                        'indice': indice,
+                        'nome': nome,
+                        'status': 'success',
+                        'deteccoes': deteccoes,
+                        'total_detectado': len(deteccoes),
+                    }
+                yield json.dumps(linha, ensure_ascii=False) + '\n'
+        except Exception as e:
+            # Cabeçalhos já foram enviados: o erro vai como última linha
+            yield json.dumps({'status': 'error', 'error': str(e), 'tipo_erro': type(e).__name__}) + '\n'
+            return
+        
+        yield json.dumps({
+            'status': 'fim',
+            'total_imagens': total,
+            'total_erros': erros,
+            'tamanho_lote': tamanho,
+            'tempo_processamento': round(time.time() - inicio, 2),
+            'confianca_minima': CONFIANCA_MINIMA,
+        }) + '\n'
+    
+    return StreamingHttpResponse(gerar_linhas(), content_type='application/x-ndjson')
+
+
 # ============================================================
 # 🧪 ENDPOINT DE TESTE (sem autenticação)
 # ============================================================
@@ -370,10 +474,15 @@ def detectar_teste(request):
     POST: Detecta produtos
     """
     if request.method == 'GET':
+        # Primeiro candidato existente (AIModel padrão, YOLO_MODEL_PATH, verifik_yolov8.pt)
+        modelo_path = next(
+            (Path(c) for c in candidatos_modelo_padrao() if Path(c).exists()),
+            Path(settings.BASE_DIR) / 'verifik' / 'verifik_yolov8.pt'
+        )
         return JsonResponse({
             'status': 'online',
-            'modelo': str(MODELO_YOLO_PATH),
-            'modelo_existe': Path(MODELO_YOLO_PATH).exists(),
+            'modelo': str(modelo_path),
+            'modelo_existe': modelo_path.exists(),
             'confianca_minima': CONFIANCA_MINIMA,
             'yolo_disponivel': YOLO_DISPONIVEL,
             'produtos_cadastrados': ProdutoMae.objects.count()
@@ -7,5 +7,6 @@ from . import api_deteccao
 urlpatterns = [
     # API de Detecção
     path('detectar/', api_deteccao.detectar_produtos, name='api_detectar_produtos'),
+    path('detectar/lote/', api_deteccao.detectar_produtos_lote, name='api_detectar_produtos_lote'),
     path('detectar/teste/', api_deteccao.detectar_teste, name='api_detectar_teste'),
 ]
@@ -1,6 +1,38 @@
+import multiprocessing
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
+
+
+# Executáveis de servidor WSGI/ASGI em que vale pré-carregar o YOLO
+SERVIDORES_WEB = {'gunicorn', 'uwsgi', 'daphne', 'uvicorn', 'hypercorn', 'waitress-serve'}
 
 
 class VerifikConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'verifik'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if getattr(settings, 'VERIFIK_PRECARREGAR_MODELOS', True) and self._servindo_requisicoes():
+            from .services.registro_modelos import precarregar_modelos
+            precarregar_modelos()
+
+    @staticmethod
+    def _servindo_requisicoes():
+        """
+        True só no servidor web: executável WSGI/ASGI conhecido ou runserver
+        (fora do processo do autoreload). Comandos de manutenção, workers,
+        testes, scripts e processos filhos do pool de análise ficam de fora
+        """
+        if multiprocessing.parent_process() is not None:
+            return False  # worker do pool (spawn herda o argv do pai)
+        programa = os.path.basename(sys.argv[0]) if sys.argv else ''
+        if programa == 'manage.py':
+            if len(sys.argv) < 2 or sys.argv[1] != 'runserver':
+                return False
+            return os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv
+        return programa in SERVIDORES_WEB
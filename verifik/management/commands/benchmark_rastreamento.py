@@ -0,0 +1,148 @@
+"""
+Django Management Command - Benchmark do Rastreamento (MOT)
+Simula N objetos em movimento e mede o custo por frame do NucleoRastreamento
+comparado à associação gulosa antiga (loop detecção × objeto)
+"""
+
+import math
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from verifik.services.rastreamento import SCIPY_DISPONIVEL, NucleoRastreamento
+
+
+def cena_sintetica(objetos, frames, largura, altura, classes, falhas, seed):
+    """
+    Gera as detecções de cada frame: objetos de 30-60 px andando em linha
+    reta (rebatendo nas bordas), com ruído na bbox e detecções perdidas
+
+    Yields:
+        tuple: (bboxes N×4, classes N, ids verdadeiros N) na ordem do detector
+    """
+    rng = np.random.default_rng(seed)
+    centros = rng.uniform([0, 0], [largura, altura], size=(objetos, 2))
+    velocidades = rng.uniform(-4, 4, size=(objetos, 2))
+    tamanhos = rng.uniform(30, 60, size=(objetos, 2))
+    rotulos = np.array([f"classe_{i}" for i in rng.integers(0, classes, objetos)])
+
+    for _ in range(frames):
+        centros += velocidades
+        fora = (centros < 0) | (centros > [largura, altura])
+        velocidades[fora] *= -1
+
+        ruido = rng.normal(0, 1.5, size=(objetos, 4))
+        bboxes = np.hstack([centros - tamanhos / 2, centros + tamanhos / 2]) + ruido
+
+        visiveis = np.nonzero(rng.random(objetos) >= falhas)[0]
+        rng.shuffle(visiveis)
+        yield bboxes[visiveis], rotulos[visiveis], visiveis
+
+
+class RastreadorGuloso:
+    """Associação antiga do MultiObjectTracker, para comparação"""
+
+    def __init__(self, max_distance):
+        self.max_distance = max_distance
+        self.objetos = {}
+        self.proximo_id = 1
+
+    def atualizar(self, bboxes, classes):
+        for obj in self.objetos.values():
+            obj['perdidos'] += 1
+
+        ids = []
+        for bbox, classe in zip(bboxes.tolist(), classes.tolist()):
+            cx, cy = (bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2
+            melhor, menor = None, float('inf')
+            for obj_id, obj in self.objetos.items():
+                if obj['classe'] == classe:
+                    ox, oy = obj['centro']
+                    distancia = math.sqrt((ox - cx) ** 2 + (oy - cy) ** 2)
+                    if distancia < self.max_distance and distancia < menor:
+                        melhor, menor = obj_id, distancia
+            if melhor is None:
+                melhor = self.proximo_id
+                self.proximo_id += 1
+            self.objetos[melhor] = {'classe': classe, 'centro': (cx, cy), 'perdidos': 0}
+            ids.append(melhor)
+
+        for obj_id in [i for i, o in self.objetos.items() if o['perdidos'] > 30]:
+            del self.objetos[obj_id]
+        return ids
+
+
+def trocas_de_id(historico):
+    """Quantas vezes um objeto verdadeiro mudou de track entre aparições"""
+    ultimo = {}
+    trocas = 0
+    for verdadeiros, ids in historico:
+        for verdadeiro, track in zip(verdadeiros, ids):
+            if verdadeiro in ultimo and ultimo[verdadeiro] != track:
+                trocas += 1
+            ultimo[verdadeiro] = track
+    return trocas
+
+
+class Command(BaseCommand):
+    help = 'Mede o rastreamento com muitos objetos simultâneos (orçamento de tempo por frame)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--objetos', type=int, default=200, help='Objetos simultâneos')
+        parser.add_argument('--frames', type=int, default=300, help='Frames simulados')
+        parser.add_argument('--fps', type=float, default=30, help='FPS alvo (define o orçamento)')
+        parser.add_argument('--classes', type=int, default=10, help='Quantidade de classes')
+        parser.add_argument('--falhas', type=float, default=0.05, help='Fração de detecções perdidas por frame')
+        parser.add_argument('--max-distancia', type=float, default=80)
+        parser.add_argument('--largura', type=int, default=1920)
+        parser.add_argument('--altura', type=int, default=1080)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--sem-comparar', action='store_true', help='Não roda a associação gulosa antiga')
+
+    def _rodar(self, atualizar, opcoes):
+        tempos = []
+        historico = []
+        cena = cena_sintetica(
+            opcoes['objetos'], opcoes['frames'], opcoes['largura'], opcoes['altura'],
+            opcoes['classes'], opcoes['falhas'], opcoes['seed'],
+        )
+        for bboxes, classes, verdadeiros in cena:
+            inicio = time.perf_counter()
+            ids = atualizar(bboxes, classes)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+            historico.append((verdadeiros.tolist(), list(ids)))
+        return np.array(tempos), trocas_de_id(historico)
+
+    def _relatorio(self, nome, tempos, trocas, orcamento_ms):
+        media, p95, maximo = tempos.mean(), np.percentile(tempos, 95), tempos.max()
+        estilo = self.style.SUCCESS if p95 <= orcamento_ms else self.style.ERROR
+        self.stdout.write(estilo(
+            f'   {nome:22} média {media:7.2f} ms | p95 {p95:7.2f} ms | máx {maximo:7.2f} ms | '
+            f'trocas de ID {trocas}'
+        ))
+        return media
+
+    def handle(self, *args, **opcoes):
+        orcamento_ms = 1000 / opcoes['fps']
+
+        self.stdout.write(self.style.SUCCESS('\n' + '=' * 80))
+        self.stdout.write(self.style.SUCCESS('BENCHMARK - RASTREAMENTO DE MÚLTIPLOS OBJETOS'))
+        self.stdout.write(self.style.SUCCESS('=' * 80))
+        self.stdout.write(
+            f"\n🎯 {opcoes['objetos']} objetos, {opcoes['frames']} frames, {opcoes['classes']} classes, "
+            f"{opcoes['falhas']:.0%} de detecções perdidas"
+        )
+        self.stdout.write(f"⏱️  Orçamento por frame a {opcoes['fps']:g} fps: {orcamento_ms:.1f} ms")
+        self.stdout.write(f"🧮 Atribuição: {'scipy' if SCIPY_DISPONIVEL else 'Húngaro em numpy'}\n")
+
+        nucleo = NucleoRastreamento(max_distancia=opcoes['max_distancia'])
+        media_nucleo = self._relatorio(
+            'NucleoRastreamento', *self._rodar(lambda b, c: nucleo.atualizar(b, c)[0].tolist(), opcoes),
+            orcamento_ms,
+        )
+
+        if not opcoes['sem_comparar']:
+            guloso = RastreadorGuloso(opcoes['max_distancia'])
+            media_guloso = self._relatorio('Guloso (antigo)', *self._rodar(guloso.atualizar, opcoes), orcamento_ms)
+            self.stdout.write(f'\n🚀 Ganho: {media_guloso / media_nucleo:.1f}x')
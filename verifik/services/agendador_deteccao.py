@@ -0,0 +1,276 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║              AGENDADOR DE DETECÇÃO (STREAMING) - VERIFIK         ║
+║   YOLO a cada N frames; entre eles as caixas andam por fluxo     ║
+║   óptico — OCR/código de barras uma vez por track novo           ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. decidir(img) diz se o frame vai para o detector. Roda quando:
+   - é o primeiro frame
+   - já passaram `intervalo` frames desde a última detecção
+   - a imagem mudou muito em relação ao frame anterior (`limiar_movimento`,
+     diferença média numa miniatura em tons de cinza)
+   - o fluxo óptico perdeu caixas demais (`limiar_incerteza`)
+2. Nos frames intermediários, propagar() move as caixas dos tracks:
+   pontos em grade dentro de cada caixa seguem o Lucas-Kanade
+   (cv2.calcOpticalFlowPyrLK, uma chamada para todas as caixas) e a
+   caixa anda a mediana dos deslocamentos. Caixa sem pontos válidos
+   segue a última velocidade conhecida e conta como incerta
+3. identificar_pendentes(ids) devolve os tracks que ainda não passaram
+   por OCR/código de barras — cada track é identificado UMA vez
+4. estatisticas() mostra quanto tempo de detector foi economizado
+   (frames pulados × tempo médio do detector − tempo de propagação)
+
+Não depende do Django; os apps de streaming (tkinter) criam um agendador
+por câmera. No Django, AgendadorDeteccao.de_camera(camera) usa o
+Camera.detection_fps e VERIFIK_AGENDADOR_CAMERAS[camera.code].
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+VERIFIK_AGENDADOR_CAMERAS = {
+    'CX01': {'intervalo': 3, 'limiar_movimento': 6.0},
+}
+"""
+
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+
+def _lista_ids(ids):
+    return ids.tolist() if isinstance(ids, np.ndarray) else list(ids)
+
+
+class AgendadorDeteccao:
+    """
+    Decide quando rodar o detector e propaga as caixas entre detecções.
+
+    Args:
+        intervalo (int): detector a cada N frames (1 = todo frame)
+        limiar_movimento (float): diferença média (0-255) entre frames
+            consecutivos que força uma detecção
+        limiar_incerteza (float): fração de caixas perdidas pelo fluxo
+            óptico que força uma detecção
+        largura_miniatura (int): largura da miniatura usada no teste de movimento
+        escala_fluxo (float): escala da imagem usada no fluxo óptico
+        pontos_por_lado (int): grade de pontos por caixa (N × N)
+    """
+
+    def __init__(self, intervalo=5, limiar_movimento=8.0, limiar_incerteza=0.3,
+                 largura_miniatura=160, escala_fluxo=0.5, pontos_por_lado=3):
+        self.intervalo = max(1, int(intervalo))
+        self.limiar_movimento = limiar_movimento
+        self.limiar_incerteza = limiar_incerteza
+        self.largura_miniatura = largura_miniatura
+        self.escala_fluxo = escala_fluxo
+        self.pontos_por_lado = pontos_por_lado
+
+        self._lk_params = dict(
+            winSize=(15, 15), maxLevel=2,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+        )
+        self.resetar()
+
+    @classmethod
+    def de_camera(cls, camera, fps_captura=15, **config):
+        """
+        Agendador de uma câmera cadastrada (cameras.Camera)
+
+        O intervalo sai do FPS de detecção da câmera (ex.: captura a 15 fps e
+        detection_fps=5 → detector a cada 3 frames); VERIFIK_AGENDADOR_CAMERAS
+        pode sobrescrever qualquer parâmetro por código da câmera.
+        """
+        from django.conf import settings
+
+        detection_fps = getattr(camera, 'detection_fps', 0) or fps_captura
+        parametros = {'intervalo': max(1, round(fps_captura / detection_fps))}
+        parametros.update(getattr(settings, 'VERIFIK_AGENDADOR_CAMERAS', {}).get(camera.code, {}))
+        parametros.update(config)
+        return cls(**parametros)
+
+    def resetar(self):
+        """Esquece o estado (ex.: rastreamento limpo ou câmera trocada)"""
+        self._miniatura_anterior = None
+        self._cinza_anterior = None
+        self._frames_desde_deteccao = 0
+        self._incerteza = 0.0
+        self._velocidades = {}          # track_id → (dx, dy) por frame
+        self._identificados = set()     # tracks que já passaram por OCR/barcode
+
+        self.frames = 0
+        self.frames_detectados = 0
+        self.frames_propagados = 0
+        self.tempo_detector = 0.0
+        self.tempo_propagacao = 0.0
+        self.identificacoes = 0
+        self.motivos = Counter()
+
+    # ------------------------------------------------------------
+    # Decisão
+    # ------------------------------------------------------------
+
+    def _miniatura(self, img):
+        altura, largura = img.shape[:2]
+        escala = self.largura_miniatura / largura
+        cinza = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        return cv2.resize(cinza, (self.largura_miniatura, max(1, int(altura * escala))),
+                          interpolation=cv2.INTER_AREA)
+
+    def decidir(self, img):
+        """
+        O detector deve rodar neste frame?
+
+        Returns:
+            tuple: (detectar, motivo) — motivo: primeiro_frame, intervalo,
+                   movimento, incerteza ou None quando o frame é propagado
+        """
+        self.frames += 1
+        miniatura = self._miniatura(img)
+        anterior, self._miniatura_anterior = self._miniatura_anterior, miniatura
+
+        if anterior is None or anterior.shape != miniatura.shape:
+            motivo = 'primeiro_frame'
+        elif self._frames_desde_deteccao + 1 >= self.intervalo:
+            motivo = 'intervalo'
+        elif float(cv2.absdiff(miniatura, anterior).mean()) > self.limiar_movimento:
+            motivo = 'movimento'
+        elif self._incerteza > self.limiar_incerteza:
+            motivo = 'incerteza'
+        else:
+            self._frames_desde_deteccao += 1
+            return False, None
+
+        self._frames_desde_deteccao = 0
+        self.motivos[motivo] += 1
+        return True, motivo
+
+    def registrar_deteccao(self, img, duracao, ids=None):
+        """
+        Informa que o detector rodou (tempo gasto) e guarda o frame de referência
+
+        Args:
+            ids: tracks ativos após a associação (os demais são esquecidos)
+        """
+        self.frames_detectados += 1
+        self.tempo_detector += duracao
+        self._incerteza = 0.0
+        self._cinza_anterior = self._cinza_fluxo(img)
+        if ids is not None:
+            self._esquecer_ausentes(ids)
+
+    # ------------------------------------------------------------
+    # Propagação (frames sem detector)
+    # ------------------------------------------------------------
+
+    def _cinza_fluxo(self, img):
+        cinza = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+        if self.escala_fluxo != 1:
+            cinza = cv2.resize(cinza, None, fx=self.escala_fluxo, fy=self.escala_fluxo,
+                               interpolation=cv2.INTER_AREA)
+        return cinza
+
+    def _esquecer_ausentes(self, ids):
+        ativos = set(_lista_ids(ids))
+        for track_id in list(self._velocidades):
+            if track_id not in ativos:
+                del self._velocidades[track_id]
+        self._identificados &= ativos
+
+    def propagar(self, img, ids, bboxes):
+        """
+        Move as caixas dos tracks para o frame atual sem rodar o detector
+
+        Args:
+            img: frame atual (BGR)
+            ids: ids dos tracks (N)
+            bboxes: caixas atuais dos tracks (N × 4)
+
+        Returns:
+            ndarray: N × 4 com as caixas propagadas
+        """
+        inicio = time.perf_counter()
+        bboxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+        ids = _lista_ids(ids)
+        cinza = self._cinza_fluxo(img)
+        anterior, self._cinza_anterior = self._cinza_anterior, cinza
+
+        deslocamentos = np.zeros((len(bboxes), 2), dtype=np.float32)
+        validos = np.zeros(len(bboxes), dtype=bool)
+
+        if len(bboxes) and anterior is not None and anterior.shape == cinza.shape:
+            # Grade N × N dentro de cada caixa (margem de 20%), todas numa chamada
+            n = self.pontos_por_lado
+            fracoes = np.linspace(0.2, 0.8, n, dtype=np.float32)
+            fx, fy = np.meshgrid(fracoes, fracoes)
+            fx, fy = fx.ravel(), fy.ravel()
+            largura = bboxes[:, 2] - bboxes[:, 0]
+            altura = bboxes[:, 3] - bboxes[:, 1]
+            px = bboxes[:, 0:1] + largura[:, None] * fx[None, :]
+            py = bboxes[:, 1:2] + altura[:, None] * fy[None, :]
+            pontos = np.stack([px, py], axis=-1).reshape(-1, 1, 2) * self.escala_fluxo
+
+            novos, status, _ = cv2.calcOpticalFlowPyrLK(anterior, cinza, pontos, None, **self._lk_params)
+            movimento = ((novos - pontos) / self.escala_fluxo).reshape(len(bboxes), n * n, 2)
+            ok = status.reshape(len(bboxes), n * n).astype(bool)
+
+            # Mediana por caixa só dos pontos rastreados (NaN nos que falharam)
+            movimento[~ok] = np.nan
+            validos = ok.sum(axis=1) >= (n * n + 1) // 2
+            if validos.any():
+                deslocamentos[validos] = np.nanmedian(movimento[validos], axis=1)
+
+        # Caixas que o fluxo perdeu seguem a última velocidade conhecida
+        for i in np.nonzero(~validos)[0]:
+            deslocamentos[i] = self._velocidades.get(ids[i], (0.0, 0.0))
+        for i in np.nonzero(validos)[0]:
+            self._velocidades[ids[i]] = tuple(deslocamentos[i].tolist())
+
+        self._incerteza = float((~validos).mean()) if len(bboxes) else 0.0
+        self.frames_propagados += 1
+        self.tempo_propagacao += time.perf_counter() - inicio
+        return bboxes + np.hstack([deslocamentos, deslocamentos])
+
+    # ------------------------------------------------------------
+    # OCR / código de barras por track
+    # ------------------------------------------------------------
+
+    def identificar_pendentes(self, ids):
+        """
+        Tracks que ainda não passaram por OCR/código de barras (e os marca)
+
+        Returns:
+            list: ids novos — vazio quando todos já foram identificados
+        """
+        pendentes = [track_id for track_id in _lista_ids(ids) if track_id not in self._identificados]
+        self._identificados.update(pendentes)
+        if pendentes:
+            self.identificacoes += 1
+        return pendentes
+
+    # ------------------------------------------------------------
+    # Estatísticas
+    # ------------------------------------------------------------
+
+    def estatisticas(self):
+        tempo_medio = self.tempo_detector / self.frames_detectados if self.frames_detectados else 0.0
+        economizado = self.frames_propagados * tempo_medio - self.tempo_propagacao
+        return {
+            'frames': self.frames,
+            'frames_detectados': self.frames_detectados,
+            'frames_propagados': self.frames_propagados,
+            'fracao_detectada': round(self.frames_detectados / self.frames, 3) if self.frames else None,
+            'tempo_detector': round(self.tempo_detector, 3),
+            'tempo_medio_detector_ms': round(tempo_medio * 1000, 1),
+            'tempo_propagacao': round(self.tempo_propagacao, 3),
+            'tempo_medio_propagacao_ms': round(
+                self.tempo_propagacao * 1000 / self.frames_propagados, 2
+            ) if self.frames_propagados else None,
+            'tempo_economizado': round(max(0.0, economizado), 3),
+            'identificacoes': self.identificacoes,
+            'motivos': dict(self.motivos),
+            'intervalo': self.intervalo,
+        }
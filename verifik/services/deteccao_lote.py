@@ -0,0 +1,244 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║                DETECÇÃO EM LOTE - VERIFIK                        ║
+║     N imagens por chamada, YOLO em batches do tamanho da RAM     ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. As FONTES entregam (nome, bytes) uma a uma: arquivos multipart,
+   membros de um .zip ou as fotos de um LoteFotos já salvo
+   - .zip: verificar_zip() recusa o arquivo inteiro se passa de
+     VERIFIK_ZIP_MAX_IMAGENS ou VERIFIK_ZIP_TAMANHO_MAX_TOTAL
+     (descompactado); membro maior que VERIFIK_TAMANHO_MAX_IMAGEM não
+     é lido e vira linha de erro (zip bomb não chega à memória)
+2. Cada bloco de `tamanho_lote()` imagens é decodificado em paralelo
+   (cv2.imdecode libera o GIL; fotos grandes já saem reduzidas)
+3. O bloco inteiro vai para o YOLO numa única chamada predict()
+4. Enquanto o YOLO roda um bloco, o próximo já está sendo decodificado
+5. Os resultados saem por imagem, NA ORDEM, assim que o bloco termina
+   (o endpoint transforma cada um em uma linha NDJSON)
+
+O tamanho do bloco acompanha a memória livre: sobra de RAM × fração /
+MB por imagem, limitado a VERIFIK_LOTE_MAX.
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+VERIFIK_LOTE_MAX            = 32    # imagens por chamada ao YOLO (teto)
+VERIFIK_LOTE_MB_POR_IMAGEM  = 80    # estimativa de RAM por imagem no batch
+VERIFIK_LOTE_FRACAO_RAM     = 0.5   # fração da RAM livre que o batch pode usar
+VERIFIK_LOTE_WORKERS        = 4     # threads de decodificação
+VERIFIK_ZIP_MAX_IMAGENS     = 1000  # imagens por .zip
+VERIFIK_ZIP_TAMANHO_MAX_TOTAL = 512 * 1024 * 1024  # bytes descompactados por .zip
+"""
+
+import itertools
+import os
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from .imagem_entrada import TAMANHO_MAX_IMAGEM, buffer_arquivo, decodificar_buffer
+
+try:
+    import psutil
+    PSUTIL_DISPONIVEL = True
+except ImportError:
+    PSUTIL_DISPONIVEL = False
+
+
+# ============================================================
+# 🔧 CONFIGURAÇÕES
+# ============================================================
+
+LOTE_MAX = getattr(settings, 'VERIFIK_LOTE_MAX', 32)
+
+MB_POR_IMAGEM = getattr(settings, 'VERIFIK_LOTE_MB_POR_IMAGEM', 80)
+
+FRACAO_RAM = getattr(settings, 'VERIFIK_LOTE_FRACAO_RAM', 0.5)
+
+WORKERS_DECODIFICACAO = getattr(settings, 'VERIFIK_LOTE_WORKERS', os.cpu_count() or 1)
+
+ZIP_MAX_IMAGENS = getattr(settings, 'VERIFIK_ZIP_MAX_IMAGENS', 1000)
+
+ZIP_TAMANHO_MAX_TOTAL = getattr(settings, 'VERIFIK_ZIP_TAMANHO_MAX_TOTAL', 512 * 1024 * 1024)
+
+EXTENSOES_IMAGEM = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+
+class ZipGrandeDemais(ValueError):
+    """.zip com imagens demais ou grande demais descompactado"""
+
+
+class ImagemRecusada(ValueError):
+    """Entregue por uma fonte no lugar dos bytes: a imagem vira linha de erro"""
+
+
+# ============================================================
+# 📏 TAMANHO DO BATCH
+# ============================================================
+
+def memoria_disponivel_mb():
+    """RAM livre em MB (None se não for possível medir)"""
+    if PSUTIL_DISPONIVEL:
+        return psutil.virtual_memory().available / 1024 / 1024
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def tamanho_lote():
+    """Quantas imagens cabem em um batch agora"""
+    livre = memoria_disponivel_mb()
+    if livre is None:
+        return LOTE_MAX
+    return max(1, min(LOTE_MAX, int(livre * FRACAO_RAM // MB_POR_IMAGEM)))
+
+
+# ============================================================
+# 📥 FONTES DE IMAGENS (nome, bytes)
+# ============================================================
+
+def fontes_arquivos(arquivos):
+    """Arquivos de um upload multipart (request.FILES.getlist)"""
+    for arquivo in arquivos:
+        yield arquivo.name, buffer_arquivo(arquivo)
+
+
+def _imagens_zip(zf):
+    return [
+        info for info in zf.infolist()
+        if not info.is_dir() and info.filename.lower().endswith(EXTENSOES_IMAGEM)
+    ]
+
+
+def _verificar_membros(membros):
+    if len(membros) > ZIP_MAX_IMAGENS:
+        raise ZipGrandeDemais(f"Zip com {len(membros)} imagens (máximo {ZIP_MAX_IMAGENS})")
+    # Membros acima do limite individual não serão lidos: não contam no total
+    total = sum(info.file_size for info in membros if info.file_size <= TAMANHO_MAX_IMAGEM)
+    if total > ZIP_TAMANHO_MAX_TOTAL:
+        raise ZipGrandeDemais(
+            f"Zip com {total // (1024 * 1024)} MB descompactados "
+            f"(máximo {ZIP_TAMANHO_MAX_TOTAL // (1024 * 1024)} MB)"
+        )
+
+
+def verificar_zip(arquivo):
+    """
+    Confere os limites do .zip pelo diretório central (sem descompactar)
+
+    Raises:
+        ZipGrandeDemais: imagens demais ou tamanho total descompactado acima do limite
+    """
+    with zipfile.ZipFile(arquivo) as zf:
+        _verificar_membros(_imagens_zip(zf))
+    arquivo.seek(0)
+
+
+def fontes_zip(arquivo):
+    """
+    Imagens dentro de um .zip (lidas uma a uma, sem extrair em disco)
+
+    Membro maior que VERIFIK_TAMANHO_MAX_IMAGEM sai como ImagemRecusada no
+    lugar dos bytes (linha de erro) sem ser descompactado.
+    """
+    with zipfile.ZipFile(arquivo) as zf:
+        membros = _imagens_zip(zf)
+        _verificar_membros(membros)
+        for info in membros:
+            if info.file_size > TAMANHO_MAX_IMAGEM:
+                yield info.filename, ImagemRecusada(
+                    f"Imagem maior que o limite de {TAMANHO_MAX_IMAGEM // (1024 * 1024)} MB"
+                )
+                continue
+            # ZipExtFile para em file_size: o cabeçalho não consegue mentir para mais
+            yield info.filename, zf.read(info)
+
+
+def fontes_lote(lote):
+    """Fotos já salvas de um LoteFotos (reprocessamento de lotes históricos)"""
+    for imagem in lote.imagens.order_by('id').iterator():
+        try:
+            with imagem.imagem.open('rb') as f:
+                yield imagem.imagem.name, f.read()
+        except (OSError, ValueError):
+            # Arquivo sumiu do storage: vira linha de erro na saída
+            yield imagem.imagem.name, b''
+
+
+# ============================================================
+# 🧠 DECODIFICAÇÃO + INFERÊNCIA
+# ============================================================
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool_decodificacao():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=max(1, int(WORKERS_DECODIFICACAO)),
+                    thread_name_prefix='verifik-decode',
+                )
+    return _pool
+
+
+def _decodificar(item):
+    """(nome, bytes) → (nome, imagem BGR ou None, escala, erro)"""
+    nome, dados = item
+    if isinstance(dados, ImagemRecusada):
+        return nome, None, 1.0, str(dados)
+    if len(dados) == 0:
+        return nome, None, 1.0, 'Arquivo vazio ou não encontrado'
+    try:
+        img, escala = decodificar_buffer(dados)
+    except ValueError as e:
+        return nome, None, 1.0, str(e)
+    return nome, img, escala, None
+
+
+def detectar_em_lote(fontes, modelo, conf, tamanho=None):
+    """
+    Roda o YOLO sobre muitas imagens, em batches
+
+    Args:
+        fontes (iterable): (nome, bytes) por imagem
+        modelo (YOLO): Modelo carregado
+        conf (float): Confiança mínima
+        tamanho (int): Imagens por batch (padrão: tamanho_lote())
+
+    Yields:
+        tuple: (indice, nome, resultado_yolo ou None, escala, erro ou None)
+            escala: fator para levar as bbox à imagem original
+    """
+    pool = get_pool_decodificacao()
+    fontes = iter(fontes)
+    tamanho = tamanho or tamanho_lote()
+
+    def _proximo_bloco():
+        bloco = list(itertools.islice(fontes, tamanho))
+        return [pool.submit(_decodificar, item) for item in bloco]
+
+    indice = 0
+    futuros = _proximo_bloco()
+    while futuros:
+        decodificados = [f.result() for f in futuros]
+
+        # Decodifica o próximo bloco enquanto o YOLO processa este
+        futuros = _proximo_bloco()
+
+        imagens = [img for _, img, _, _ in decodificados if img is not None]
+        resultados = iter(
+            modelo.predict(source=imagens, conf=conf, verbose=False) if imagens else []
+        )
+
+        for nome, img, escala, erro in decodificados:
+            yield indice, nome, (next(resultados) if img is not None else None), escala, erro
+            indice += 1
@@ -0,0 +1,173 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║             ENTRADA DE IMAGENS DA API - VERIFIK                  ║
+║   Corpo JPEG cru / multipart → numpy, sem cópias intermediárias  ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. Corpo cru (Content-Type: image/jpeg): lido do stream da requisição
+   direto para um buffer numpy pré-alocado pelo Content-Length
+2. Multipart: o arquivo em memória é usado no lugar (BytesIO.getbuffer);
+   o arquivo temporário em disco é lido uma única vez (np.fromfile)
+3. Redução na decodificação: se o JPEG é muito maior que a entrada do
+   modelo (640 px), o libjpeg decodifica já reduzido (DCT 1/2, 1/4,
+   1/8 via cv2.IMREAD_REDUCED_COLOR_*). Uma foto de 12 MP vira ~1000 px
+   sem nunca existir em tamanho cheio na memória
+4. decodificar_buffer() devolve também a ESCALA para converter as
+   coordenadas das detecções de volta para a imagem original
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+VERIFIK_TAMANHO_ENTRADA_MODELO   = 640   # lado maior que o YOLO usa
+VERIFIK_REDUZIR_NA_DECODIFICACAO = True
+VERIFIK_TAMANHO_MAX_IMAGEM       = 30 * 1024 * 1024  # limite do corpo cru
+                                                    # (o Django só limita request.body/POST)
+"""
+
+import cv2
+import numpy as np
+from django.conf import settings
+
+
+# ============================================================
+# 🔧 CONFIGURAÇÕES
+# ============================================================
+
+TAMANHO_ENTRADA_MODELO = getattr(settings, 'VERIFIK_TAMANHO_ENTRADA_MODELO', 640)
+
+REDUZIR_NA_DECODIFICACAO = getattr(settings, 'VERIFIK_REDUZIR_NA_DECODIFICACAO', True)
+
+TAMANHO_MAX_IMAGEM = getattr(settings, 'VERIFIK_TAMANHO_MAX_IMAGEM', 30 * 1024 * 1024)
+
+# Content-Types aceitos como corpo cru
+TIPOS_IMAGEM_CRUA = ('image/jpeg', 'image/jpg', 'image/png', 'application/octet-stream')
+
+FLAGS_REDUCAO = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+}
+
+# Marcadores SOF do JPEG (contêm altura/largura); C4, C8 e CC não são SOF
+_MARCADORES_SOF = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+TAMANHO_BLOCO_LEITURA = 64 * 1024
+
+
+# ============================================================
+# 📐 REDUÇÃO NA DECODIFICAÇÃO
+# ============================================================
+
+def dimensoes_jpeg(buf):
+    """
+    (largura, altura) lidas do cabeçalho JPEG, sem decodificar
+
+    Returns:
+        tuple ou None se não for JPEG (ou cabeçalho inválido)
+    """
+    n = len(buf)
+    if n < 4 or buf[0] != 0xFF or buf[1] != 0xD8:
+        return None
+
+    i = 2
+    while i + 9 < n:
+        if buf[i] != 0xFF:
+            return None
+        marcador = buf[i + 1]
+        if marcador == 0xFF:  # byte de preenchimento
+            i += 1
+            continue
+        if marcador in _MARCADORES_SOF:
+            altura = (int(buf[i + 5]) << 8) | int(buf[i + 6])
+            largura = (int(buf[i + 7]) << 8) | int(buf[i + 8])
+            return largura, altura
+        i += 2 + ((int(buf[i + 2]) << 8) | int(buf[i + 3]))
+    return None
+
+
+def fator_reducao(largura, altura, alvo=None):
+    """Maior fator (8, 4 ou 2) que ainda deixa o lado maior >= alvo"""
+    alvo = alvo or TAMANHO_ENTRADA_MODELO
+    lado = max(largura, altura)
+    for fator in (8, 4, 2):
+        if lado / fator >= alvo:
+            return fator
+    return 1
+
+
+def decodificar_buffer(buf, reduzir=None):
+    """
+    Decodifica bytes/numpy → imagem BGR, reduzindo no decode quando vale a pena
+
+    Returns:
+        tuple: (imagem, escala) — multiplicar coordenadas por `escala`
+               leva de volta à imagem original
+
+    Raises:
+        ValueError: Se não for uma imagem válida
+    """
+    if not isinstance(buf, np.ndarray):
+        buf = np.frombuffer(buf, np.uint8)
+
+    reduzir = REDUZIR_NA_DECODIFICACAO if reduzir is None else reduzir
+    dimensoes = dimensoes_jpeg(buf) if reduzir else None
+    fator = fator_reducao(*dimensoes) if dimensoes else 1
+
+    img = cv2.imdecode(buf, FLAGS_REDUCAO.get(fator, cv2.IMREAD_COLOR))
+    if img is None:
+        raise ValueError("Não foi possível decodificar a imagem")
+
+    escala = max(dimensoes) / max(img.shape[:2]) if fator > 1 else 1.0
+    return img, escala
+
+
+# ============================================================
+# 📥 LEITURA DA REQUISIÇÃO
+# ============================================================
+
+def ler_corpo_requisicao(request):
+    """
+    Corpo cru da requisição → buffer numpy (uint8)
+
+    Com Content-Length o buffer é alocado uma vez e preenchido em blocos
+    direto do stream (sem montar um bytes do tamanho da foto).
+
+    Raises:
+        ValueError: Se o corpo passa de VERIFIK_TAMANHO_MAX_IMAGEM
+    """
+    try:
+        tamanho = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        tamanho = 0
+
+    if tamanho > TAMANHO_MAX_IMAGEM:
+        raise ValueError(f"Imagem maior que o limite de {TAMANHO_MAX_IMAGEM // (1024 * 1024)} MB")
+
+    if tamanho <= 0:
+        dados = request.read(TAMANHO_MAX_IMAGEM + 1)
+        if len(dados) > TAMANHO_MAX_IMAGEM:
+            raise ValueError(f"Imagem maior que o limite de {TAMANHO_MAX_IMAGEM // (1024 * 1024)} MB")
+        return np.frombuffer(dados, np.uint8)
+
+    buf = np.empty(tamanho, np.uint8)
+    pos = 0
+    while pos < tamanho:
+        bloco = request.read(min(TAMANHO_BLOCO_LEITURA, tamanho - pos))
+        if not bloco:
+            break
+        buf[pos:pos + len(bloco)] = np.frombuffer(bloco, np.uint8)
+        pos += len(bloco)
+    return buf[:pos]
+
+
+def buffer_arquivo(arquivo):
+    """Arquivo de upload (multipart) → buffer numpy, sem cópia quando está em memória"""
+    if hasattr(arquivo, 'temporary_file_path'):
+        return np.fromfile(arquivo.temporary_file_path(), np.uint8)
+
+    conteudo = getattr(arquivo, 'file', None)
+    if hasattr(conteudo, 'getbuffer'):
+        return np.frombuffer(conteudo.getbuffer(), np.uint8)
+
+    return np.frombuffer(arquivo.read(), np.uint8)
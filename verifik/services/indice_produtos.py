@@ -0,0 +1,654 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║             ÍNDICE DE PRODUTOS EM MEMÓRIA - VERIFIK              ║
+║       Sugestão de produto por OCR sem varrer o catálogo          ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+Antes, cada bbox comparava o OCR com TODOS os ProdutoMae (O(produtos ×
+palavras)) e recriava os dicionários de aliases a cada chamada.
+
+Agora o catálogo é indexado UMA vez por processo:
+  - Tries de aliases (marca, recipiente, tipo) → quais produtos citam
+    cada marca/recipiente/tipo na descrição
+  - Postings de volume (350ML, 2L...) e de palavras da descrição
+  - Postings de trigramas → candidatos para "palavra contida na
+    descrição" e para a similaridade de fallback
+
+Uma consulta soma os pesos direto nos postings (numpy), escolhe o
+melhor e só monta a "razão" do vencedor. Os pesos são os mesmos do
+sugerir_produto_ia original (marca 35, recipiente 25, volume 30...).
+
+A similaridade de fallback (score < 20) também é calculada em bloco
+(trigramas, postings de palavras e matriz de presença de caracteres),
+com o mesmo resultado de calcular_similaridade produto a produto.
+
+♻️ INVALIDAÇÃO:
+--------------
+- post_save/post_delete de ProdutoMae e Marca (verifik/signals.py)
+  marcam o índice como desatualizado e incrementam uma versão no cache
+  do Django (outros processos percebem se o cache for compartilhado)
+- Rede de segurança: reconstrói após VERIFIK_INDICE_TTL segundos
+  (cobre queryset.update()/bulk_create, que não disparam sinais)
+
+🎯 USO:
+-------
+from verifik.services.indice_produtos import get_indice_produtos
+
+indice = get_indice_produtos()
+indice.sugerir(['HEINEKEN', '350ML'], 'lata')      # (id, confiança, razão)
+indice.buscar(['HEINEKEN', '350ML'], 'lata', k=5)  # top-k candidatos
+"""
+
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+
+# ============================================================
+# 🔧 CONFIGURAÇÕES
+# ============================================================
+
+INDICE_TTL = getattr(settings, 'VERIFIK_INDICE_TTL', 300)
+
+CHAVE_VERSAO_CACHE = 'verifik:indice_produtos:versao'
+
+
+# ============================================================
+# 📝 VOCABULÁRIO (antes recriado a cada chamada de sugerir_produto_ia)
+# ============================================================
+
+MARCAS_ALIASES = {
+    # CERVEJAS
+    'HEINEKEN': ['HEINEKEN', 'HEIN', 'HNK', 'HEINEK'],
+    'AMSTEL': ['AMSTEL', 'AMST', 'AMSTERDAM'],
+    'STELLA': ['STELLA', 'ARTOIS', 'STELLA ARTOIS'],
+    'BUDWEISER': ['BUDWEISER', 'BUD', 'BUDW'],
+    'CORONA': ['CORONA', 'CORON'],
+    'BRAHMA': ['BRAHMA', 'BRAH'],
+    'SKOL': ['SKOL', 'SK'],
+    'LOKAL': ['LOKAL', 'LOCAL'],
+    'DEVASSA': ['DEVASSA', 'DEVAS'],
+    'EISENBAHN': ['EISENBAHN', 'EISEN'],
+    'ANTARCTICA': ['ANTARCTICA', 'ANTARTICA', 'ANTARTC'],
+    'BOHEMIA': ['BOHEMIA', 'BOHEM'],
+    'ORIGINAL': ['ORIGINAL'],
+    'SPATEN': ['SPATEN'],
+    'BECKS': ['BECKS', 'BECK'],
+    # REFRIGERANTES
+    'COCA COLA': ['COCA COLA', 'COCA', 'COLA', 'COCA-COLA', 'COCACOLA'],
+    'PEPSI': ['PEPSI', 'PEPS'],
+    'GUARANA': ['GUARANA', 'GUARANÁ', 'GUAR'],
+    'FANTA': ['FANTA', 'FANT'],
+    'SPRITE': ['SPRITE', 'SPRIT'],
+    'SCHWEPPES': ['SCHWEPPES', 'SCHWEP'],
+    'SUKITA': ['SUKITA'],
+    'KUAT': ['KUAT'],
+    'H2OH': ['H2OH', 'H2O'],
+}
+
+# CERVEJAS: LATA = 350ml | LATÃO = 473/550ml | LONG NECK = 330/355ml | GARRAFA = 600ml/1L
+# REFRIGERANTES: LATA = 350ml | PET = 600ml, 1L, 2L
+RECIPIENTES_ALIASES = {
+    'lata': ['LATA', 'LT', 'CAN', 'LATINHA', 'LATAS'],
+    'latao': ['LATAO', 'LATÃO', 'LATA GRANDE', 'LATONA'],
+    'long neck': ['LONG NECK', 'LONGNECK', 'LONG', 'NECK', 'LN'],
+    'garrafa': ['GARRAFA', 'GF', 'BOTTLE', 'GARR', 'VIDRO'],
+    'pet': ['PET', 'PLASTICO', 'PLÁSTICO', 'DESCARTAVEL', 'DESCARTÁVEL'],
+    'caixa': ['CAIXA', 'CX', 'PACK', 'BOX', 'FARDO', 'ENGRADADO'],
+    'ks': ['KS', 'GARRAFA KS'],  # Garrafa retornável pequena
+    'litrinho': ['LITRINHO', 'LITRÃO', 'LITRAO'],
+}
+
+TIPOS_CERVEJA_ALIASES = {
+    'PILSEN': ['PILSEN', 'PILS', 'PILSNER'],
+    'PURO MALTE': ['PURO MALTE', 'PUROMALTE', 'PURE MALT'],
+    'ZERO ALCOOL': ['ZERO ALCOOL', 'ZERO ÁLCOOL', 'SEM ALCOOL', 'SEM ÁLCOOL', '0,0%', '0.0%', '0%'],
+    'ZERO': ['ZERO'],  # Pode ser Zero Açúcar (refri) ou Zero Álcool (cerveja)
+    'BLACK': ['BLACK', 'BLK', 'PRETA', 'ESCURA', 'DARK'],
+    'GOLD': ['GOLD', 'GOLDEN', 'DOURADA'],
+    'PUREGOLD': ['PUREGOLD', 'PURE GOLD'],
+    'IPA': ['IPA', 'INDIA PALE ALE'],
+    'LAGER': ['LAGER'],
+    'WEISS': ['WEISS', 'WEIZEN', 'TRIGO'],
+    'PREMIUM': ['PREMIUM', 'EXTRA', 'SPECIAL'],
+    'ORIGINAL': ['ORIGINAL', 'ORIG'],
+    'MALZBIER': ['MALZBIER', 'MALZ'],
+}
+
+TIPOS_REFRI_ALIASES = {
+    'ZERO': ['ZERO', 'ZERO AÇUCAR', 'ZERO ACUCAR', 'SEM AÇUCAR', 'SEM ACUCAR'],
+    'LIGHT': ['LIGHT', 'DIET', 'DIETA'],
+    'ORIGINAL': ['ORIGINAL', 'TRADICIONAL', 'NORMAL'],
+    'LARANJA': ['LARANJA', 'ORANGE'],
+    'UVA': ['UVA', 'GRAPE'],
+    'LIMAO': ['LIMAO', 'LIMÃO', 'LEMON', 'LIMA'],
+    'GUARANA': ['GUARANA', 'GUARANÁ'],
+    'CITRUS': ['CITRUS', 'CITRICO', 'CÍTRICO'],
+}
+
+VOLUMES_CONHECIDOS = [
+    # Latas
+    '269ML', '310ML', '350ML',
+    # Latão
+    '473ML', '550ML',
+    # Long Neck
+    '330ML', '355ML',
+    # Garrafas/PET
+    '600ML',
+    '1L', '1LT', '1000ML', '1LITRO',
+    '2L', '2LT', '2000ML', '2LITROS', '2LTS',
+    '3L', '3LT', '3000ML',
+]
+
+VOLUME_PARA_RECIPIENTE = {
+    '269ML': 'lata', '310ML': 'lata', '350ML': 'lata',
+    '473ML': 'latao', '550ML': 'latao',
+    '330ML': 'long neck', '355ML': 'long neck',
+    '600ML': 'pet',
+    '1L': 'pet', '1LT': 'pet', '1000ML': 'pet', '1LITRO': 'pet',
+    '2L': 'pet', '2LT': 'pet', '2LTS': 'pet', '2000ML': 'pet', '2LITROS': 'pet',
+    '3L': 'pet', '3LT': 'pet', '3000ML': 'pet',
+}
+
+# Variantes de escrita de cada volume ('350ML' → '350 ML', ...)
+VOLUMES_VARIANTES = {
+    vol: [vol, vol.replace('ML', ' ML'), vol.replace('L', ' L'), vol.replace('LT', ' LT')]
+    for vol in VOLUMES_CONHECIDOS
+}
+
+PESO_MARCA = 35
+PESO_RECIPIENTE = 25
+PESO_VOLUME = 30
+PESO_TIPO = 20
+PESO_PALAVRA_EXATA = 8
+PESO_PALAVRA_PARCIAL = 4
+PESO_LONG_NECK = 10
+
+
+def calcular_similaridade(texto1, texto2):
+    """Calcula similaridade entre dois textos usando múltiplas técnicas"""
+    texto1 = texto1.upper().strip()
+    texto2 = texto2.upper().strip()
+
+    if not texto1 or not texto2:
+        return 0
+
+    # 1. Match exato
+    if texto1 == texto2:
+        return 100
+
+    # 2. Contido um no outro
+    if texto1 in texto2 or texto2 in texto1:
+        return 80
+
+    # 3. Calcular Jaccard (palavras em comum)
+    palavras1 = set(texto1.split())
+    palavras2 = set(texto2.split())
+    if palavras1 and palavras2:
+        intersecao = len(palavras1 & palavras2)
+        uniao = len(palavras1 | palavras2)
+        jaccard = (intersecao / uniao) * 100 if uniao > 0 else 0
+        if jaccard > 0:
+            return jaccard
+
+    # 4. Calcular distância de caracteres (simples)
+    comum = sum(1 for c in texto1 if c in texto2)
+    max_len = max(len(texto1), len(texto2))
+    return (comum / max_len) * 60 if max_len > 0 else 0
+
+
+# ============================================================
+# 🌳 TRIE DE ALIASES
+# ============================================================
+
+class TrieAliases:
+    """
+    Trie de aliases → chave canônica.
+
+    buscar(texto) devolve as chaves cujos aliases aparecem em QUALQUER
+    posição do texto (mesma semântica de `alias in texto`), em uma
+    passada por posição em vez de um `in` por alias.
+    """
+
+    def __init__(self, aliases_por_chave):
+        self._raiz = {}
+        for chave, aliases in aliases_por_chave.items():
+            for alias in aliases:
+                no = self._raiz
+                for c in alias:
+                    no = no.setdefault(c, {})
+                no.setdefault(None, set()).add(chave)
+
+    def buscar(self, texto):
+        encontradas = set()
+        raiz = self._raiz
+        for inicio in range(len(texto)):
+            no = raiz
+            for c in texto[inicio:]:
+                no = no.get(c)
+                if no is None:
+                    break
+                chaves = no.get(None)
+                if chaves:
+                    encontradas |= chaves
+        return encontradas
+
+
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _volumes_em(texto):
+    return {vol for vol, variantes in VOLUMES_VARIANTES.items() if any(v in texto for v in variantes)}
+
+
+# ============================================================
+# 🗂️ ÍNDICE
+# ============================================================
+
+class IndiceProdutos:
+    """Índice imutável de um conjunto de ProdutoMae"""
+
+    def __init__(self, produtos, marcas_aliases=None):
+        inicio = time.perf_counter()
+
+        self.marcas_aliases = marcas_aliases or MARCAS_ALIASES
+        self.trie_marcas = TrieAliases(self.marcas_aliases)
+        self.trie_recipientes = TrieAliases(RECIPIENTES_ALIASES)
+        self.trie_tipos_cerveja = TrieAliases(TIPOS_CERVEJA_ALIASES)
+        self.trie_tipos_refri = TrieAliases(TIPOS_REFRI_ALIASES)
+
+        self.ids = []
+        self.descricoes = []
+        self.marcas = []
+        self.recipientes = []
+        self.volumes = []
+        self.tipos_cerveja = []
+        self.tipos_refri = []
+        self.tokens = []
+
+        postings = {
+            'marca': {}, 'recipiente': {}, 'volume': {},
+            'tipo_cerveja': {}, 'tipo_refri': {}, 'token': {},
+        }
+        self.postings_trigrama = {}
+        long_neck = []
+
+        for i, produto in enumerate(produtos):
+            descricao = produto.descricao_produto.upper()
+            self.ids.append(produto.id)
+            self.descricoes.append(descricao)
+
+            features = {
+                'marca': self.trie_marcas.buscar(descricao),
+                'recipiente': self.trie_recipientes.buscar(descricao),
+                'volume': _volumes_em(descricao),
+                'tipo_cerveja': self.trie_tipos_cerveja.buscar(descricao),
+                'tipo_refri': self.trie_tipos_refri.buscar(descricao),
+                'token': set(descricao.split()),
+            }
+            self.marcas.append(features['marca'])
+            self.recipientes.append(features['recipiente'])
+            self.volumes.append(features['volume'])
+            self.tipos_cerveja.append(features['tipo_cerveja'])
+            self.tipos_refri.append(features['tipo_refri'])
+            self.tokens.append(features['token'])
+
+            for nome, valores in features.items():
+                for valor in valores:
+                    postings[nome].setdefault(valor, []).append(i)
+
+            for trigrama in _trigramas(descricao):
+                self.postings_trigrama.setdefault(trigrama, []).append(i)
+
+            if 'LONG' in descricao or 'NECK' in descricao:
+                long_neck.append(i)
+
+        self.total = len(self.ids)
+        self._postings = {
+            nome: {valor: np.array(idx, dtype=np.int32) for valor, idx in por_valor.items()}
+            for nome, por_valor in postings.items()
+        }
+        self.postings_trigrama = {t: np.array(idx, dtype=np.int32) for t, idx in self.postings_trigrama.items()}
+        self._long_neck = np.array(long_neck, dtype=np.int32)
+        self._n_tokens = np.array([len(t) for t in self.tokens], dtype=np.int32)
+        self._n_trigramas = np.array([len(_trigramas(d)) for d in self.descricoes], dtype=np.int32)
+
+        # Matriz de presença de caracteres (similaridade por caracteres)
+        self._alfabeto = {}
+        for d in self.descricoes:
+            for c in d.strip():
+                self._alfabeto.setdefault(c, len(self._alfabeto))
+        self._presenca = np.zeros((self.total, len(self._alfabeto)), dtype=np.int32)
+        for i, d in enumerate(self.descricoes):
+            for c in set(d.strip()):
+                self._presenca[i, self._alfabeto[c]] = 1
+        self._tamanhos = np.array([len(d.strip()) for d in self.descricoes], dtype=np.int32)
+        self.tempo_construcao = time.perf_counter() - inicio
+
+    # ------------------------------------------------------------
+    # Auxiliares de consulta
+    # ------------------------------------------------------------
+
+    def _mascara(self, nome, valores):
+        mascara = np.zeros(self.total, dtype=bool)
+        por_valor = self._postings[nome]
+        for valor in valores:
+            idx = por_valor.get(valor)
+            if idx is not None:
+                mascara[idx] = True
+        return mascara
+
+    def _contem(self, palavra):
+        """Índices dos produtos cuja descrição contém `palavra` (via trigramas)"""
+        trigramas = _trigramas(palavra)
+        if not trigramas:
+            return [i for i, d in enumerate(self.descricoes) if palavra in d]
+
+        listas = []
+        for t in trigramas:
+            idx = self.postings_trigrama.get(t)
+            if idx is None:
+                return []
+            listas.append(idx)
+        listas.sort(key=len)
+
+        candidatos = listas[0]
+        for idx in listas[1:]:
+            candidatos = np.intersect1d(candidatos, idx, assume_unique=True)
+            if not len(candidatos):
+                return []
+        return [int(i) for i in candidatos if palavra in self.descricoes[i]]
+
+    def _com_token_contido(self, palavra):
+        """Índices dos produtos com alguma palavra da descrição contida em `palavra`"""
+        por_token = self._postings['token']
+        encontrados = set()
+        n = len(palavra)
+        for a in range(n):
+            for b in range(a + 1, n + 1):
+                idx = por_token.get(palavra[a:b])
+                if idx is not None:
+                    encontrados.update(idx.tolist())
+        return encontrados
+
+    def _similaridades(self, texto, scores):
+        """
+        calcular_similaridade(texto, descrição) para os produtos com score < 20
+
+        Mesmo resultado de chamar calcular_similaridade produto a produto,
+        mas calculado em bloco: exato/contido via trigramas, Jaccard via
+        postings de palavras e sobreposição de caracteres via matriz de
+        presença (produto × caractere).
+
+        Returns:
+            dict: {indice_produto: similaridade} (só as > 30)
+        """
+        texto = texto.strip()
+        if not texto or not self.total:
+            return {}
+
+        elegiveis = scores < 20
+        resultado = {}
+
+        # Exato ou contido (um no outro)
+        contagem = np.zeros(self.total, dtype=np.int32)
+        for t in _trigramas(texto):
+            idx = self.postings_trigrama.get(t)
+            if idx is not None:
+                contagem[idx] += 1
+        contidos = set(self._contem(texto))
+        contidos.update(np.flatnonzero((contagem == self._n_trigramas) & (self._n_trigramas > 0)).tolist())
+        contidos.update(np.flatnonzero(self._n_trigramas == 0).tolist())
+        for i in contidos:
+            if elegiveis[i]:
+                descricao = self.descricoes[i].strip()
+                if not descricao:
+                    continue
+                if descricao == texto:
+                    resultado[i] = 100
+                elif texto in descricao or descricao in texto:
+                    resultado[i] = 80
+
+        # Jaccard (palavras em comum)
+        palavras = set(texto.split())
+        intersecao = np.zeros(self.total, dtype=np.int32)
+        for palavra in palavras:
+            idx = self._postings['token'].get(palavra)
+            if idx is not None:
+                intersecao[idx] += 1
+        uniao = np.maximum(len(palavras) + self._n_tokens - intersecao, 1)
+        jaccard = 100 * intersecao / uniao
+        for i in np.flatnonzero(elegiveis & (jaccard > 30)).tolist():
+            if i not in resultado:
+                resultado[i] = float(jaccard[i])
+
+        # Sobreposição de caracteres (sem palavras em comum):
+        # comum = quantos caracteres do OCR existem na descrição
+        comum = np.zeros(self.total, dtype=np.int32)
+        for c in set(texto):
+            coluna = self._alfabeto.get(c)
+            if coluna is not None:
+                comum += texto.count(c) * self._presenca[:, coluna]
+        max_len = np.maximum(len(texto), self._tamanhos)
+        caracteres = 60 * comum / max_len
+        for i in np.flatnonzero(elegiveis & (intersecao == 0) & (caracteres > 30)).tolist():
+            if i not in resultado:
+                resultado[i] = float(caracteres[i])
+
+        return {i: v for i, v in resultado.items() if v > 30}
+
+    def _analisar_ocr(self, texto_ocr, forma):
+        texto = ' '.join(texto_ocr).upper()
+
+        # Volume no OCR → recipiente inferido (primeiro volume conhecido)
+        recipiente_inferido = None
+        for vol in VOLUMES_CONHECIDOS:
+            if vol in texto:
+                recipiente_inferido = VOLUME_PARA_RECIPIENTE.get(vol)
+                break
+
+        return {
+            'texto': texto,
+            'recipiente': recipiente_inferido if recipiente_inferido else forma,
+            'marcas': self.trie_marcas.buscar(texto),
+            'volumes': _volumes_em(texto),
+            'tipos_cerveja': self.trie_tipos_cerveja.buscar(texto),
+            'tipos_refri': self.trie_tipos_refri.buscar(texto),
+            'long_neck': 'LONG' in texto or 'NECK' in texto,
+        }
+
+    # ------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------
+
+    def pontuar(self, texto_ocr, forma):
+        """
+        Score de todos os produtos para um OCR + forma
+
+        Returns:
+            tuple: (scores np.ndarray, palavras_match np.ndarray, contexto)
+        """
+        ctx = self._analisar_ocr(texto_ocr, forma)
+        scores = np.zeros(self.total, dtype=np.float64)
+        palavras_match = np.zeros(self.total, dtype=np.float64)
+        if not self.total:
+            return scores, palavras_match, ctx
+
+        # 1. Marca / 2. Recipiente / 3. Volume / 4-5. Tipos
+        scores += PESO_MARCA * self._mascara('marca', ctx['marcas'])
+        if ctx['recipiente']:
+            scores += PESO_RECIPIENTE * self._mascara('recipiente', [ctx['recipiente']])
+        scores += PESO_VOLUME * self._mascara('volume', ctx['volumes'])
+        scores += PESO_TIPO * self._mascara('tipo_cerveja', ctx['tipos_cerveja'])
+        scores += PESO_TIPO * self._mascara('tipo_refri', ctx['tipos_refri'])
+
+        # 6. Palavras OCR individuais (exata > parcial)
+        for palavra in texto_ocr:
+            if len(palavra) < 3:
+                continue
+            exatos = self._contem(palavra)
+            if exatos:
+                scores[exatos] += PESO_PALAVRA_EXATA
+                palavras_match[exatos] += 1
+            parciais = list(self._com_token_contido(palavra).difference(exatos))
+            if parciais:
+                scores[parciais] += PESO_PALAVRA_PARCIAL
+                palavras_match[parciais] += 0.5
+
+        # 7. Similaridade geral (fallback)
+        ctx['similaridade'] = self._similaridades(ctx['texto'], scores)
+        for i, similaridade in ctx['similaridade'].items():
+            scores[i] += similaridade * 0.3
+
+        # 8. Bônus Long Neck
+        if ctx['long_neck'] and len(self._long_neck):
+            scores[self._long_neck] += PESO_LONG_NECK
+
+        return scores, palavras_match, ctx
+
+    def _razao(self, i, palavras_match, ctx):
+        """Monta a explicação do match (mesmo texto do sugerir_produto_ia original)"""
+        razoes = []
+
+        for marca in self.marcas_aliases:
+            if marca in ctx['marcas'] and marca in self.marcas[i]:
+                razoes.append(f"Marca: {marca}")
+                break
+
+        recipiente = ctx['recipiente']
+        if recipiente and recipiente in self.recipientes[i]:
+            if recipiente == 'latao':
+                razoes.append("Recipiente: LATÃO (473ml)")
+            elif recipiente == 'long neck':
+                razoes.append("Recipiente: LONG NECK (330ml)")
+            elif recipiente == 'pet':
+                razoes.append("Recipiente: PET")
+            else:
+                razoes.append(f"Recipiente: {recipiente.upper()}")
+
+        for vol in VOLUMES_CONHECIDOS:
+            if vol in ctx['volumes'] and vol in self.volumes[i]:
+                razoes.append(f"Volume: {vol}")
+                break
+
+        for tipo in TIPOS_CERVEJA_ALIASES:
+            if tipo in ctx['tipos_cerveja'] and tipo in self.tipos_cerveja[i]:
+                razoes.append(f"Tipo Cerveja: {tipo}")
+                break
+
+        for tipo in TIPOS_REFRI_ALIASES:
+            if tipo in ctx['tipos_refri'] and tipo in self.tipos_refri[i]:
+                razoes.append(f"Tipo Refri: {tipo}")
+                break
+
+        if palavras_match[i] > 0:
+            razoes.append(f"Palavras: {int(palavras_match[i])} matches")
+
+        if i in ctx['similaridade']:
+            razoes.append(f"Similaridade: {ctx['similaridade'][i]:.0f}%")
+
+        descricao = self.descricoes[i]
+        if ctx['long_neck'] and ('LONG' in descricao or 'NECK' in descricao):
+            if 'LONG NECK' not in ' '.join(razoes):
+                razoes.append("Recipiente: LONG NECK")
+
+        return " | ".join(razoes[:5]) if razoes else "Baixa correspondência"
+
+    def buscar(self, texto_ocr, forma, k=5):
+        """
+        Top-k produtos para um OCR + forma
+
+        Returns:
+            list: [(produto_id, score, razao), ...] do melhor para o pior
+        """
+        scores, palavras_match, ctx = self.pontuar(texto_ocr, forma)
+        positivos = np.flatnonzero(scores > 0)
+        if not len(positivos):
+            return []
+
+        # Ordem estável: empate fica com o primeiro produto do catálogo
+        ordem = positivos[np.argsort(-scores[positivos], kind='stable')[:k]]
+        return [
+            (self.ids[i], float(scores[i]), self._razao(int(i), palavras_match, ctx))
+            for i in ordem
+        ]
+
+    def sugerir(self, texto_ocr, forma):
+        """
+        Melhor produto para um OCR + forma
+
+        Returns:
+            tuple: (produto_id, confianca 0-95, razao)
+        """
+        melhores = self.buscar(texto_ocr, forma, k=1)
+        if not melhores:
+            return (None, 0, "")
+
+        produto_id, score, razao = melhores[0]
+        confianca = min(95, (score / 100) * 100)
+        return (produto_id, round(confianca, 2), razao)
+
+
+# ============================================================
+# 🔁 ÍNDICE COMPARTILHADO (um por processo)
+# ============================================================
+
+_indice = None
+_indice_versao = None
+_indice_criado_em = 0.0
+_indice_lock = threading.Lock()
+
+
+def _marcas_aliases_banco():
+    """Aliases fixos + aliases cadastrados em Marca (admin)"""
+    from verifik.models import Marca
+
+    aliases = {marca: list(lista) for marca, lista in MARCAS_ALIASES.items()}
+    for marca in Marca.objects.filter(ativo=True).only('nome', 'aliases'):
+        chave = marca.nome.upper()
+        lista = aliases.setdefault(chave, [chave])
+        for alias in marca.get_aliases_list():
+            if alias and alias not in lista:
+                lista.append(alias)
+    return aliases
+
+
+def invalidar_indice_produtos(**kwargs):
+    """Marca o índice como desatualizado (usado pelos sinais de ProdutoMae/Marca)"""
+    global _indice
+    _indice = None
+    try:
+        cache.incr(CHAVE_VERSAO_CACHE)
+    except ValueError:
+        cache.set(CHAVE_VERSAO_CACHE, 1, None)
+
+
+def get_indice_produtos():
+    """Retorna o índice do processo, reconstruindo se estiver desatualizado"""
+    global _indice, _indice_versao, _indice_criado_em
+
+    versao = cache.get(CHAVE_VERSAO_CACHE, 0)
+    indice = _indice
+    if (indice is not None and versao == _indice_versao
+            and time.monotonic() - _indice_criado_em < INDICE_TTL):
+        return indice
+
+    with _indice_lock:
+        if (_indice is not None and versao == _indice_versao
+                and time.monotonic() - _indice_criado_em < INDICE_TTL):
+            return _indice
+
+        from verifik.models import ProdutoMae
+
+        produtos = ProdutoMae.objects.only('id', 'descricao_produto')
+        _indice = IndiceProdutos(produtos, marcas_aliases=_marcas_aliases_banco())
+        _indice_versao = versao
+        _indice_criado_em = time.monotonic()
+        print(f"✅ Índice de produtos: {_indice.total} produtos em {_indice.tempo_construcao * 1000:.0f}ms")
+        return _indice
@@ -0,0 +1,464 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║                  MOTOR OCR EM LOTE - VERIFIK                     ║
+║        Tesseract persistente + variantes adaptativas             ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. Mantém um pool de instâncias do Tesseract vivas (tesserocr) em vez de
+   abrir um processo novo por chamada (pytesseract)
+2. Recebe um LOTE de recortes (bboxes) e processa em paralelo; também
+   pode ser chamado de várias threads ao mesmo tempo (o pool de análise
+   por bbox, services/pool_analise.py): cada chamada pega uma instância
+   livre do Tesseract, esperando no máximo VERIFIK_OCR_ESPERA_API
+3. Para cada recorte, tenta as variantes de pré-processamento em ordem
+   e PARA assim que encontra uma marca conhecida
+4. Guarda estatísticas por variante (taxa de acerto) para sabermos
+   quais variantes nunca ajudam e podem ser desligadas
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+VERIFIK_OCR_IDIOMA     = 'por+eng'
+VERIFIK_OCR_WORKERS    = 4           # instâncias do Tesseract no pool
+VERIFIK_OCR_VARIANTES  = [...]       # variantes habilitadas (ordem padrão)
+VERIFIK_OCR_AMOSTRAS_ADAPTATIVO = 50 # execuções antes de reordenar
+VERIFIK_OCR_ESPERA_API = 30          # segundos esperando um Tesseract livre
+
+🎯 USO:
+-------
+from verifik.services.ocr_engine import get_motor_ocr
+
+motor = get_motor_ocr()
+palavras = motor.extrair(bbox_img)              # um recorte
+lote = motor.extrair_lote([crop1, crop2, ...])  # vários recortes
+print(motor.estatisticas())
+"""
+
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+from django.conf import settings
+
+try:
+    import tesserocr
+    from PIL import Image
+    TESSEROCR_DISPONIVEL = True
+except ImportError:
+    TESSEROCR_DISPONIVEL = False
+
+try:
+    import pytesseract
+    PYTESSERACT_DISPONIVEL = True
+except ImportError:
+    PYTESSERACT_DISPONIVEL = False
+
+
+# ============================================================
+# 🔧 CONFIGURAÇÕES
+# ============================================================
+
+OCR_IDIOMA = getattr(settings, 'VERIFIK_OCR_IDIOMA', 'por+eng')
+
+OCR_WORKERS = getattr(settings, 'VERIFIK_OCR_WORKERS', min(4, os.cpu_count() or 1))
+
+# Ordem padrão das variantes (mesma ordem histórica do extrair_texto_ocr)
+VARIANTES_PADRAO = ['adaptativo', 'otsu', 'clahe', 'invertido', 'dilatado', 'cinza']
+
+OCR_VARIANTES = getattr(settings, 'VERIFIK_OCR_VARIANTES', VARIANTES_PADRAO)
+
+# Execuções antes de começar a reordenar as variantes pela taxa de acerto
+OCR_AMOSTRAS_ADAPTATIVO = getattr(settings, 'VERIFIK_OCR_AMOSTRAS_ADAPTATIVO', 50)
+
+# Espera máxima por uma instância livre do Tesseract (segundos)
+OCR_ESPERA_API = getattr(settings, 'VERIFIK_OCR_ESPERA_API', 30)
+
+# Quantidade máxima de palavras retornadas por recorte
+MAX_PALAVRAS = 15
+
+
+# ============================================================
+# 📝 VOCABULÁRIO
+# ============================================================
+
+MARCAS_CONHECIDAS = [
+    # Cervejas
+    'HEINEKEN', 'AMSTEL', 'STELLA', 'BUDWEISER', 'CORONA', 'BRAHMA', 'SKOL',
+    'DEVASSA', 'EISENBAHN', 'LOKAL', 'ANTARCTICA', 'BOHEMIA', 'SPATEN', 'BECKS',
+    # Refrigerantes
+    'PEPSI', 'COCA COLA', 'GUARANA', 'FANTA', 'SPRITE', 'SCHWEPPES', 'SUKITA', 'KUAT', 'H2OH'
+]
+
+# LATA = 350ml | LATÃO = 473/550ml | LONG NECK = 330/355ml | GARRAFA = 600ml | PET = 600ml/1L/2L
+RECIPIENTES = ['LONG NECK', 'LONGNECK', 'LATA', 'LATAO', 'LATÃO', 'GARRAFA', 'PET']
+
+TIPOS_CERVEJA = [
+    'PILSEN', 'PURO MALTE', 'ZERO ALCOOL', 'ZERO', 'BLACK', 'GOLD', 'PUREGOLD',
+    'IPA', 'LAGER', 'ALE', 'WEISS', 'PREMIUM', 'EXTRA', 'ORIGINAL', 'MALZBIER'
+]
+
+TIPOS_REFRI = ['ZERO', 'LIGHT', 'DIET', 'ORIGINAL', 'LARANJA', 'UVA', 'LIMAO', 'CITRUS']
+
+# Prioridade na ordenação do resultado: marcas > recipientes > tipos > outras
+PALAVRAS_PRIORITARIAS = MARCAS_CONHECIDAS + RECIPIENTES + TIPOS_CERVEJA + TIPOS_REFRI
+
+PALAVRAS_IRRELEVANTES = {
+    'THE', 'AND', 'FOR', 'COM', 'NET', 'IND', 'LTD', 'SAO', 'QUE', 'NAO', 'POR', 'UMA', 'DOS', 'DAS'
+}
+
+_RE_PALAVRA = re.compile(r'\b[A-Z]{3,}\b')
+_RE_VOLUME = re.compile(r'\b\d+\s*(?:ML|L|LT|G|KG)\b', re.IGNORECASE)
+_RE_MARCA = re.compile(r'\b(?:' + '|'.join(re.escape(m) for m in MARCAS_CONHECIDAS) + r')\b')
+
+
+# ============================================================
+# 🖼️ VARIANTES DE PRÉ-PROCESSAMENTO
+# ============================================================
+# Cada variante recebe um dict de contexto com o recorte em cinza e
+# guarda resultados intermediários nele, assim 'invertido' e 'dilatado'
+# reaproveitam o Otsu já calculado. Nada é gerado se não for usado.
+
+def _otsu(ctx):
+    if 'otsu' not in ctx:
+        blur = cv2.GaussianBlur(ctx['cinza'], (3, 3), 0)
+        _, ctx['otsu'] = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return ctx['otsu']
+
+
+def _adaptativo(ctx):
+    return cv2.adaptiveThreshold(
+        ctx['cinza'], 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY, 11, 2
+    )
+
+
+def _clahe(ctx):
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    enhanced = clahe.apply(ctx['cinza'])
+    _, thresh = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return thresh
+
+
+def _invertido(ctx):
+    return cv2.bitwise_not(_otsu(ctx))
+
+
+def _dilatado(ctx):
+    kernel = np.ones((2, 2), np.uint8)
+    return cv2.dilate(_otsu(ctx), kernel, iterations=1)
+
+
+def _cinza(ctx):
+    return ctx['cinza']
+
+
+VARIANTES = {
+    'adaptativo': _adaptativo,
+    'otsu': _otsu,
+    'clahe': _clahe,
+    'invertido': _invertido,
+    'dilatado': _dilatado,
+    'cinza': _cinza,
+}
+
+
+def preparar_recorte(bbox_img):
+    """
+    Redimensiona (mínimo 300px de altura) e converte para cinza
+
+    Returns:
+        dict: Contexto usado pelas funções de variante
+    """
+    h = bbox_img.shape[0]
+    if 0 < h < 300:
+        scale = 300 / h
+        bbox_img = cv2.resize(bbox_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+
+    if bbox_img.ndim == 3:
+        cinza = cv2.cvtColor(bbox_img, cv2.COLOR_BGR2GRAY)
+    else:
+        cinza = bbox_img
+    return {'cinza': cinza}
+
+
+def extrair_palavras(texto):
+    """Extrai palavras (3+ letras) e volumes (350ML, 2L...) de um texto OCR"""
+    texto = texto.upper()
+    palavras = set(_RE_PALAVRA.findall(texto))
+    palavras.update(v.upper().replace(' ', '') for v in _RE_VOLUME.findall(texto))
+    return palavras
+
+
+def ordenar_palavras(palavras):
+    """
+    Filtra palavras irrelevantes e ordena por prioridade
+    (marcas > recipientes > tipos > demais)
+
+    Returns:
+        list: Até MAX_PALAVRAS palavras
+    """
+    restantes = [p for p in palavras if p not in PALAVRAS_IRRELEVANTES and len(p) >= 3]
+    resultado = []
+    for prioridade in PALAVRAS_PRIORITARIAS:
+        if prioridade in restantes:
+            resultado.append(prioridade)
+            restantes.remove(prioridade)
+    resultado.extend(restantes)
+    return resultado[:MAX_PALAVRAS]
+
+
+# ============================================================
+# 🤖 MOTOR OCR
+# ============================================================
+
+class MotorOCR:
+    """
+    Pool de Tesseract persistente com seleção adaptativa de variantes.
+
+    Usa tesserocr (API C, sem subprocessos) quando instalado. Sem
+    tesserocr, cai para pytesseract — continua funcionando, mas cada
+    chamada abre um processo; a parada antecipada reduz esse custo.
+    """
+
+    def __init__(self, idioma=OCR_IDIOMA, workers=OCR_WORKERS, variantes=None,
+                 amostras_adaptativo=OCR_AMOSTRAS_ADAPTATIVO):
+        self.idioma = idioma
+        self.workers = max(1, int(workers))
+        self.variantes = [v for v in (variantes or OCR_VARIANTES) if v in VARIANTES]
+        self.amostras_adaptativo = amostras_adaptativo
+        self.backend = 'tesserocr' if TESSEROCR_DISPONIVEL else 'pytesseract'
+
+        self._apis = queue.Queue()
+        self._apis_criadas = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._stats = {}
+        self.resetar_estatisticas()
+
+    # ------------------------------------------------------------
+    # Pool de instâncias do Tesseract
+    # ------------------------------------------------------------
+
+    def _obter_api(self):
+        try:
+            return self._apis.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            criar = self._apis_criadas < self.workers
+            if criar:
+                self._apis_criadas += 1
+        if criar:
+            try:
+                return tesserocr.PyTessBaseAPI(lang=self.idioma, psm=tesserocr.PSM.SINGLE_BLOCK)
+            except Exception:
+                # Falhou ao criar (idioma ausente, tessdata): devolve a vaga
+                with self._lock:
+                    self._apis_criadas -= 1
+                raise
+        try:
+            return self._apis.get(timeout=OCR_ESPERA_API)
+        except queue.Empty:
+            raise TimeoutError(f"Nenhum Tesseract livre em {OCR_ESPERA_API}s") from None
+
+    def _reconhecer(self, img):
+        """Roda o Tesseract (PSM 6 = bloco uniforme de texto) em uma imagem"""
+        if self.backend == 'tesserocr':
+            api = self._obter_api()
+            try:
+                api.SetImage(Image.fromarray(img))
+                return api.GetUTF8Text()
+            finally:
+                self._apis.put(api)
+
+        if not PYTESSERACT_DISPONIVEL:
+            raise ImportError("Instale tesserocr ou pytesseract para usar o OCR")
+        return pytesseract.image_to_string(img, lang=self.idioma, config='--psm 6')
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix='verifik-ocr'
+                )
+            return self._executor
+
+    def encerrar(self):
+        """Libera threads e instâncias do Tesseract"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        while True:
+            try:
+                api = self._apis.get_nowait()
+            except queue.Empty:
+                break
+            api.End()
+        self._apis_criadas = 0
+
+    # ------------------------------------------------------------
+    # Seleção adaptativa
+    # ------------------------------------------------------------
+
+    def ordem_variantes(self):
+        """
+        Ordem em que as variantes serão tentadas.
+
+        Até a variante mais usada somar `amostras_adaptativo` execuções,
+        mantém a ordem configurada. Depois, tenta primeiro as que mais
+        acham marcas. A taxa é suavizada ((acertos + 1) / (execuções + 2))
+        para que variantes pouco testadas — as que a parada antecipada
+        quase nunca alcança — não fiquem com taxa zero para sempre.
+        """
+        with self._lock:
+            stats = {v: dict(self._stats[v]) for v in self.variantes}
+
+        if max((s['execucoes'] for s in stats.values()), default=0) < self.amostras_adaptativo:
+            return list(self.variantes)
+
+        return sorted(
+            self.variantes,
+            key=lambda v: (stats[v]['com_marca'] + 1) / (stats[v]['execucoes'] + 2),
+            reverse=True
+        )
+
+    def extrair(self, bbox_img):
+        """
+        OCR de um recorte, parando na primeira variante que encontra marca
+
+        Returns:
+            list: Palavras-chave ordenadas por prioridade (até 15)
+        """
+        if bbox_img is None or bbox_img.size == 0:
+            return []
+
+        try:
+            ctx = preparar_recorte(bbox_img)
+        except Exception as e:
+            print(f"Erro no OCR: {e}")
+            return []
+
+        todas_palavras = set()
+        for nome in self.ordem_variantes():
+            inicio = time.perf_counter()
+            try:
+                texto = self._reconhecer(VARIANTES[nome](ctx))
+            except ImportError:
+                raise
+            except Exception:
+                continue
+            duracao = time.perf_counter() - inicio
+
+            palavras = extrair_palavras(texto)
+            novas = palavras - todas_palavras
+            achou_marca = bool(_RE_MARCA.search(texto.upper()))
+            todas_palavras |= palavras
+
+            with self._lock:
+                s = self._stats[nome]
+                s['execucoes'] += 1
+                s['tempo_total'] += duracao
+                if palavras:
+                    s['com_texto'] += 1
+                if novas:
+                    s['palavras_novas'] += len(novas)
+                if achou_marca:
+                    s['com_marca'] += 1
+
+            if achou_marca:
+                with self._lock:
+                    self._stats[nome]['paradas'] += 1
+                break
+
+        return ordenar_palavras(todas_palavras)
+
+    def extrair_lote(self, recortes):
+        """
+        OCR de vários recortes em paralelo (ordem preservada)
+
+        Args:
+            recortes (list[np.ndarray]): Recortes BGR ou cinza
+
+        Returns:
+            list[list[str]]: Palavras de cada recorte, na mesma ordem
+        """
+        if not recortes:
+            return []
+        if len(recortes) == 1 or self.workers == 1:
+            return [self.extrair(r) for r in recortes]
+        return list(self._get_executor().map(self.extrair, recortes))
+
+    # ------------------------------------------------------------
+    # Estatísticas
+    # ------------------------------------------------------------
+
+    def resetar_estatisticas(self):
+        with self._lock:
+            self._stats = {
+                nome: {
+                    'execucoes': 0,
+                    'com_texto': 0,
+                    'com_marca': 0,
+                    'palavras_novas': 0,
+                    'paradas': 0,
+                    'tempo_total': 0.0,
+                }
+                for nome in VARIANTES
+            }
+
+    def estatisticas(self):
+        """
+        Taxas de acerto por variante (deste processo)
+
+        - taxa_marca: % das execuções em que a variante leu uma marca
+        - taxa_texto: % das execuções que produziram alguma palavra
+        - palavras_novas: palavras que só essa variante trouxe
+        - paradas: vezes em que essa variante encerrou o recorte
+        """
+        with self._lock:
+            stats = {nome: dict(s) for nome, s in self._stats.items()}
+
+        variantes = {}
+        for nome, s in stats.items():
+            execucoes = s['execucoes']
+            variantes[nome] = {
+                **s,
+                'habilitada': nome in self.variantes,
+                'taxa_marca': round(100 * s['com_marca'] / execucoes, 1) if execucoes else None,
+                'taxa_texto': round(100 * s['com_texto'] / execucoes, 1) if execucoes else None,
+                'tempo_medio_ms': round(1000 * s['tempo_total'] / execucoes, 1) if execucoes else None,
+                'tempo_total': round(s['tempo_total'], 3),
+            }
+
+        return {
+            'backend': self.backend,
+            'workers': self.workers,
+            'ordem_atual': self.ordem_variantes(),
+            'variantes': variantes,
+        }
+
+
+# ============================================================
+# 🔁 INSTÂNCIA COMPARTILHADA (uma por processo)
+# ============================================================
+
+_motor_ocr = None
+_motor_lock = threading.Lock()
+
+
+def get_motor_ocr():
+    """Retorna o MotorOCR do processo (criado na primeira chamada)"""
+    global _motor_ocr
+    if _motor_ocr is None:
+        with _motor_lock:
+            if _motor_ocr is None:
+                _motor_ocr = MotorOCR()
+    return _motor_ocr
@@ -0,0 +1,177 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║              POOL DE ANÁLISE POR BBOX - VERIFIK                  ║
+║     Código de barras + forma + OCR em paralelo entre as caixas   ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. O YOLO devolve N caixas; cada recorte é enviado para o pool
+2. Cada worker roda a parte pesada (OpenCV/zbar/Tesseract):
+   detectar_codigo_barras → classificar_forma_produto → OCR
+3. Os resultados voltam NA ORDEM ORIGINAL das caixas
+4. Se o orçamento de tempo da requisição estourar, devolve o que
+   ficou pronto (as demais caixas vêm como None) em vez de erro 500
+5. Caixa cuja análise levantou exceção vem como {'erro': '...'}
+   (falha_analise) - as outras seguem normalmente
+
+A sugestão de produto (sugerir_produto_ia) continua na thread da
+requisição: ela usa o ORM, e assim os workers não precisam de conexão
+com o banco.
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+VERIFIK_POOL_TIPO        = 'thread'  # 'thread', 'process' ou 'off'
+VERIFIK_POOL_WORKERS     = 8         # padrão: número de CPUs
+VERIFIK_TIMEOUT_ANALISE  = 20        # segundos por requisição
+
+'thread' é o padrão: OpenCV, zbar e Tesseract liberam o GIL.
+'process' usa o contexto 'spawn' (único disponível no Windows) e
+inicializa o Django em cada worker.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+import multiprocessing
+
+from django.conf import settings
+
+
+# ============================================================
+# 🔧 CONFIGURAÇÕES
+# ============================================================
+
+POOL_TIPO = getattr(settings, 'VERIFIK_POOL_TIPO', 'thread')
+
+POOL_WORKERS = getattr(settings, 'VERIFIK_POOL_WORKERS', os.cpu_count() or 1)
+
+TIMEOUT_ANALISE = getattr(settings, 'VERIFIK_TIMEOUT_ANALISE', 20)
+
+
+def falha_analise(erro):
+    """Marcador de caixa cuja análise falhou (diferente de None = sem tempo)"""
+    return {'erro': f'{type(erro).__name__}: {erro}'}
+
+
+# ============================================================
+# 🧩 TRABALHO DE CADA WORKER
+# ============================================================
+
+def _inicializar_worker():
+    """Prepara o Django em processos 'spawn' (não herdam o estado do pai)"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'logos.settings')
+    import django
+    django.setup()
+
+
+def analisar_recorte(bbox_img):
+    """
+    Análise pesada de um recorte (sem acesso ao banco)
+
+    Returns:
+        dict: codigo_barras, tipo_barcode, forma, ocr_texto
+    """
+    # Import tardio: views_coleta importa este módulo
+    from verifik.views_coleta import (
+        detectar_codigo_barras, classificar_forma_produto, extrair_texto_ocr
+    )
+
+    codigo_barras, tipo_barcode = detectar_codigo_barras(bbox_img)
+    forma = classificar_forma_produto(bbox_img)
+    texto_ocr = extrair_texto_ocr(bbox_img)
+
+    return {
+        'codigo_barras': codigo_barras,
+        'tipo_barcode': tipo_barcode,
+        'forma': forma,
+        'ocr_texto': texto_ocr,
+    }
+
+
+# ============================================================
+# 🔁 POOL COMPARTILHADO (um por processo web)
+# ============================================================
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Retorna o executor configurado (ou None se VERIFIK_POOL_TIPO='off')"""
+    global _pool
+    if POOL_TIPO == 'off':
+        return None
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers = max(1, int(POOL_WORKERS))
+                if POOL_TIPO == 'process':
+                    _pool = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_inicializar_worker,
+                    )
+                else:
+                    _pool = ThreadPoolExecutor(
+                        max_workers=workers, thread_name_prefix='verifik-bbox'
+                    )
+                print(f"✅ Pool de análise VerifiK: {POOL_TIPO} x{workers}")
+    return _pool
+
+
+def analisar_recortes(recortes, prazo=None):
+    """
+    Analisa vários recortes em paralelo, respeitando um prazo
+
+    Args:
+        recortes (list[np.ndarray]): Um recorte por caixa do YOLO
+        prazo (float): Instante (time.monotonic) limite. Padrão: agora +
+            VERIFIK_TIMEOUT_ANALISE
+
+    Returns:
+        tuple: (resultados, parcial)
+            resultados: lista na ordem dos recortes; None onde não deu
+                tempo, {'erro': ...} onde a análise falhou
+            parcial: True se alguma caixa ficou sem análise
+    """
+    if prazo is None:
+        prazo = time.monotonic() + TIMEOUT_ANALISE
+
+    pool = get_pool()
+    if pool is None or len(recortes) <= 1:
+        resultados = []
+        for recorte in recortes:
+            if time.monotonic() >= prazo:
+                resultados.append(None)
+                continue
+            try:
+                resultados.append(analisar_recorte(recorte))
+            except Exception as e:
+                print(f"Erro na análise do bbox: {e}")
+                resultados.append(falha_analise(e))
+        return resultados, any(r is None or 'erro' in r for r in resultados)
+
+    futuros = [pool.submit(analisar_recorte, recorte) for recorte in recortes]
+    wait(futuros, timeout=max(0.0, prazo - time.monotonic()))
+
+    resultados = []
+    for futuro in futuros:
+        if not futuro.done():
+            futuro.cancel()
+            resultados.append(None)
+            continue
+        try:
+            resultados.append(futuro.result())
+        except Exception as e:
+            print(f"Erro na análise do bbox: {e}")
+            resultados.append(falha_analise(e))
+
+    faltando = sum(1 for r in resultados if r is None)
+    if faltando:
+        print(f"⏱️ Prazo de análise estourado: {faltando}/{len(recortes)} bboxes sem análise")
+    parcial = any(r is None or 'erro' in r for r in resultados)
+
+    return resultados, parcial
@@ -0,0 +1,373 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║              NÚCLEO DE RASTREAMENTO (MOT) - VERIFIK              ║
+║   Matriz de custo numpy + atribuição ótima (Húngaro) por frame   ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. O estado dos tracks fica em ARRAYS (ids, bboxes, classes, frames
+   perdidos) e não em um dict por objeto
+2. A cada frame monta a matriz tracks × detecções de uma vez:
+       custo = peso_iou × (1 - IoU) + (1 - peso_iou) × distância / max_distancia
+   pares de classes diferentes ou mais longe que `max_distancia`
+   ficam com custo infinito (gating)
+3. Os pares válidos são separados em componentes conexos:
+   - componentes 1×1 (o caso comum) são atribuídos direto, em lote
+   - os demais são resolvidos com atribuição de custo mínimo
+     (enumeração nos pequenos, Húngaro/scipy nos maiores), então duas
+     detecções não "roubam" o mesmo track
+4. Tracks sem detecção somam um frame perdido e saem depois de
+   `max_perdidos`; detecções sem track viram tracks novos
+
+O núcleo não depende do Django: o MultiObjectTracker
+(verifik_multitracking_avancado.py) e o MOT do verifik_teste_passagem.py
+usam a mesma classe e guardam só o histórico/visual nos seus objetos.
+
+Benchmark: python manage.py benchmark_rastreamento --objetos 200 --fps 30
+
+🎯 USO:
+-------
+from verifik.services.rastreamento import NucleoRastreamento
+
+nucleo = NucleoRastreamento(max_distancia=100)
+ids, removidos = nucleo.atualizar(bboxes, classes)
+# ids[i] = track da detecção i (0 = não rastreada)
+"""
+
+import itertools
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_DISPONIVEL = True
+except ImportError:
+    SCIPY_DISPONIVEL = False
+
+
+# Substitui o "infinito" dentro da matriz passada ao Húngaro
+_CUSTO_PROIBIDO = 1e6
+
+# Componentes até este número de pares são resolvidos por enumeração
+# (2×2, 2×3, 3×3...: mais rápido que montar o Húngaro em numpy)
+_MAX_PARES_ENUMERACAO = 12
+
+
+# ============================================================
+# 🧮 ATRIBUIÇÃO ÓTIMA
+# ============================================================
+
+def _hungaro(custo):
+    """
+    Atribuição de custo mínimo (caminhos aumentantes mais curtos, O(n²·m))
+
+    Args:
+        custo (ndarray): matriz n × m com n <= m, sem infinitos
+
+    Returns:
+        ndarray: coluna atribuída a cada linha
+    """
+    n, m = custo.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)    # p[j] = linha (1-based) na coluna j
+    caminho = np.zeros(m + 1, dtype=np.int64)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        usado = np.zeros(m + 1, dtype=bool)
+
+        while True:
+            usado[j0] = True
+            i0 = p[j0]
+            livres = ~usado[1:]
+
+            reduzido = custo[i0 - 1] - u[i0] - v[1:]
+            melhora = livres & (reduzido < minv[1:])
+            minv[1:][melhora] = reduzido[melhora]
+            caminho[1:][melhora] = j0
+
+            candidatos = np.where(livres, minv[1:], np.inf)
+            j1 = int(np.argmin(candidatos)) + 1
+            delta = candidatos[j1 - 1]
+
+            u[p[usado]] += delta
+            v[usado] -= delta
+            minv[~usado] -= delta
+
+            j0 = j1
+            if p[j0] == 0:
+                break
+
+        while j0:
+            j1 = caminho[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    atribuicao = np.empty(n, dtype=np.int64)
+    colunas = np.nonzero(p[1:])[0]
+    atribuicao[p[1:][colunas] - 1] = colunas
+    return atribuicao
+
+
+def _atribuicao_pequena(custo):
+    """Enumera as atribuições de uma matriz pequena (n <= m, listas Python)"""
+    n, m = len(custo), len(custo[0])
+    melhor_chave, melhor = None, None
+    for colunas in itertools.permutations(range(m), n):
+        proibidos = 0
+        total = 0.0
+        for i, j in enumerate(colunas):
+            valor = custo[i][j]
+            if valor == float('inf'):
+                proibidos += 1
+            else:
+                total += valor
+        chave = (proibidos, total)
+        if melhor_chave is None or chave < melhor_chave:
+            melhor_chave, melhor = chave, colunas
+    return melhor
+
+
+def atribuicao_minima(custo):
+    """
+    Pares (linha, coluna) de custo total mínimo; pares infinitos são descartados
+
+    Usa o scipy quando instalado; senão, o Húngaro em numpy deste módulo.
+    """
+    custo = np.asarray(custo, dtype=np.float64)
+    if custo.size == 0:
+        vazio = np.empty(0, dtype=np.int64)
+        return vazio, vazio
+
+    # Uma linha ou uma coluna: o mínimo já é a atribuição ótima
+    if custo.shape[0] == 1 or custo.shape[1] == 1:
+        eixo = 1 if custo.shape[0] == 1 else 0
+        melhor = int(np.argmin(custo, axis=eixo)[0])
+        if not np.isfinite(custo.flat[melhor]):
+            vazio = np.empty(0, dtype=np.int64)
+            return vazio, vazio
+        par = (0, melhor) if eixo == 1 else (melhor, 0)
+        return np.array([par[0]]), np.array([par[1]])
+
+    proibido = ~np.isfinite(custo)
+
+    if custo.size <= _MAX_PARES_ENUMERACAO:
+        transposta = custo.shape[0] > custo.shape[1]
+        colunas = np.array(_atribuicao_pequena((custo.T if transposta else custo).tolist()))
+        linhas = np.arange(len(colunas))
+        if transposta:
+            linhas, colunas = colunas, linhas
+        manter = ~proibido[linhas, colunas]
+        return linhas[manter], colunas[manter]
+
+    finito = np.where(proibido, _CUSTO_PROIBIDO, custo)
+
+    if SCIPY_DISPONIVEL:
+        linhas, colunas = linear_sum_assignment(finito)
+    elif custo.shape[0] <= custo.shape[1]:
+        linhas = np.arange(custo.shape[0])
+        colunas = _hungaro(finito)
+    else:
+        colunas = np.arange(custo.shape[1])
+        linhas = _hungaro(finito.T)
+
+    manter = ~proibido[linhas, colunas]
+    return linhas[manter].astype(np.int64), colunas[manter].astype(np.int64)
+
+
+# ============================================================
+# 📐 CUSTO TRACKS × DETECÇÕES
+# ============================================================
+
+def matriz_iou(a, b):
+    """IoU de cada bbox de `a` (N×4) com cada bbox de `b` (M×4) → N×M"""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersecao = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    uniao = area_a[:, None] + area_b[None, :] - intersecao
+    return np.divide(intersecao, uniao, out=np.zeros_like(intersecao), where=uniao > 0)
+
+
+def matriz_distancia(a, b):
+    """Distância entre os centros de cada bbox de `a` e de `b` → N×M"""
+    ca = (a[:, :2] + a[:, 2:]) / 2
+    cb = (b[:, :2] + b[:, 2:]) / 2
+    return np.hypot(ca[:, None, 0] - cb[None, :, 0], ca[:, None, 1] - cb[None, :, 1])
+
+
+# ============================================================
+# 🎯 NÚCLEO DO RASTREADOR
+# ============================================================
+
+class NucleoRastreamento:
+    """
+    Estado e associação de tracks em arrays numpy.
+
+    Args:
+        max_distancia (float): distância máxima (px) entre centros para associar
+        max_perdidos (int): frames sem detecção antes de remover o track
+        peso_iou (float): peso do IoU no custo (o resto vai para a distância)
+        usar_classe (bool): só associa detecção e track da mesma classe
+    """
+
+    def __init__(self, max_distancia=100, max_perdidos=30, peso_iou=0.5, usar_classe=True):
+        self.max_distancia = max_distancia
+        self.max_perdidos = max_perdidos
+        self.peso_iou = peso_iou
+        self.usar_classe = usar_classe
+        self._codigos_classe = {}
+        self.limpar()
+
+    def limpar(self):
+        """Remove todos os tracks e reinicia a numeração"""
+        self.ids = np.empty(0, dtype=np.int64)
+        self.bboxes = np.empty((0, 4), dtype=np.float32)
+        self.classes = np.empty(0, dtype=np.int32)
+        self.perdidos = np.empty(0, dtype=np.int32)
+        self.proximo_id = 1
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ------------------------------------------------------------
+    # Associação
+    # ------------------------------------------------------------
+
+    def _codificar_classes(self, classes, quantidade):
+        if classes is None:
+            return np.zeros(quantidade, dtype=np.int32)
+        codigos = self._codigos_classe
+        return np.fromiter(
+            (codigos.setdefault(c, len(codigos)) for c in classes),
+            dtype=np.int32, count=quantidade,
+        )
+
+    def matriz_custo(self, bboxes, classes):
+        """Custo tracks × detecções (infinito = par proibido pelo gating)"""
+        distancia = matriz_distancia(self.bboxes, bboxes)
+        iou = matriz_iou(self.bboxes, bboxes)
+
+        custo = self.peso_iou * (1 - iou) + (1 - self.peso_iou) * distancia / self.max_distancia
+        proibido = distancia >= self.max_distancia
+        if self.usar_classe:
+            proibido |= self.classes[:, None] != classes[None, :]
+        custo[proibido] = np.inf
+        return custo
+
+    def associar(self, bboxes, classes):
+        """
+        Pares (índice do track, índice da detecção) de custo total mínimo
+
+        Returns:
+            tuple: (indices_tracks, indices_deteccoes)
+        """
+        vazio = np.empty(0, dtype=np.int64)
+        if len(self.ids) == 0 or len(bboxes) == 0:
+            return vazio, vazio
+
+        custo = self.matriz_custo(bboxes, classes)
+        valido = np.isfinite(custo)
+        por_track = valido.sum(axis=1)
+        por_deteccao = valido.sum(axis=0)
+
+        # Pares sem concorrência (1 candidato de cada lado): atribuição direta
+        unico = valido & (por_track[:, None] == 1) & (por_deteccao[None, :] == 1)
+        tracks, deteccoes = np.nonzero(unico)
+        pares_t = [tracks]
+        pares_d = [deteccoes]
+
+        # O resto é separado em componentes conexos (propagação do menor rótulo)
+        valido &= ~unico
+        if valido.any():
+            sem_rotulo = len(self.ids)
+            rotulo_t = np.arange(sem_rotulo)
+            while True:
+                rotulo_d = np.where(valido, rotulo_t[:, None], sem_rotulo).min(axis=0)
+                novo = np.minimum(rotulo_t, np.where(valido, rotulo_d[None, :], sem_rotulo).min(axis=1))
+                if np.array_equal(novo, rotulo_t):
+                    break
+                rotulo_t = novo
+
+            com_par = valido.any(axis=1)
+            for rotulo in np.unique(rotulo_t[com_par]):
+                linhas = np.nonzero(com_par & (rotulo_t == rotulo))[0]
+                colunas = np.nonzero(rotulo_d == rotulo)[0]
+                i, j = atribuicao_minima(custo[linhas][:, colunas])
+                pares_t.append(linhas[i])
+                pares_d.append(colunas[j])
+
+        return np.concatenate(pares_t), np.concatenate(pares_d)
+
+    # ------------------------------------------------------------
+    # Atualização por frame
+    # ------------------------------------------------------------
+
+    def atualizar(self, bboxes, classes=None, criar=None):
+        """
+        Associa as detecções de um frame e atualiza os tracks
+
+        Args:
+            bboxes: N × 4 ([x1, y1, x2, y2])
+            classes: N rótulos (qualquer valor hashable) ou None
+            criar: máscara N de detecções que podem abrir track novo (padrão: todas)
+
+        Returns:
+            tuple: (ids, removidos)
+                ids: ndarray N com o id do track de cada detecção (0 = nenhum)
+                removidos: ndarray com os ids dos tracks removidos neste frame
+        """
+        bboxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+        quantidade = len(bboxes)
+        classes = self._codificar_classes(classes, quantidade)
+
+        indices_t, indices_d = self.associar(bboxes, classes)
+
+        ids = np.zeros(quantidade, dtype=np.int64)
+        ids[indices_d] = self.ids[indices_t]
+        self.bboxes[indices_t] = bboxes[indices_d]
+        self.classes[indices_t] = classes[indices_d]
+        self.perdidos += 1
+        self.perdidos[indices_t] = 0
+
+        # Remover tracks perdidos (compacta os arrays)
+        expirados = self.perdidos > self.max_perdidos
+        removidos = self.ids[expirados]
+        if len(removidos):
+            self._manter(~expirados)
+
+        # Tracks novos para as detecções que sobraram
+        novos = np.ones(quantidade, dtype=bool)
+        novos[indices_d] = False
+        if criar is not None:
+            novos &= np.asarray(criar, dtype=bool)
+        total_novos = int(novos.sum())
+        if total_novos:
+            novos_ids = np.arange(self.proximo_id, self.proximo_id + total_novos, dtype=np.int64)
+            self.proximo_id += total_novos
+            ids[novos] = novos_ids
+            self.ids = np.concatenate([self.ids, novos_ids])
+            self.bboxes = np.concatenate([self.bboxes, bboxes[novos]])
+            self.classes = np.concatenate([self.classes, classes[novos]])
+            self.perdidos = np.concatenate([self.perdidos, np.zeros(total_novos, dtype=np.int32)])
+
+        return ids, removidos
+
+    def remover(self, ids):
+        """Remove tracks pelo id (ex.: tempo de vida esgotado)"""
+        if len(ids):
+            self._manter(~np.isin(self.ids, np.asarray(ids, dtype=np.int64)))
+
+    def _manter(self, mascara):
+        self.ids = self.ids[mascara]
+        self.bboxes = self.bboxes[mascara]
+        self.classes = self.classes[mascara]
+        self.perdidos = self.perdidos[mascara]
@@ -0,0 +1,370 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║               REGISTRO DE MODELOS YOLO - VERIFIK                 ║
+║    Uma instância por arquivo/versão, aquecida e trocada a quente ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. Todos os pontos de entrada pedem o modelo ao registro:
+   obter_modelo_yolo(caminhos) → instância YOLO compartilhada
+2. A chave é o caminho absoluto do .pt; a versão é (mtime, tamanho)
+3. Ao carregar, roda uma inferência de aquecimento (imagem preta),
+   assim a primeira requisição real não paga a inicialização do torch
+4. A cada VERIFIK_MODELO_VERIFICAR_SEG o arquivo é conferido: se um
+   novo verifik_yolov8.pt foi salvo, a nova versão é carregada e
+   trocada sem reiniciar (quem já pegou a instância antiga termina
+   com ela normalmente)
+5. O modelo padrão vem da tabela cameras.AIModel (is_default=True,
+   tipo detecção) quando o arquivo existe; senão, de YOLO_MODEL_PATH
+   ou verifik/verifik_yolov8.pt
+6. estatisticas() mostra tempo de carga, aquecimento e memória por modelo
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+VERIFIK_PRECARREGAR_MODELOS   = True   # carrega o modelo padrão no ready() do servidor web
+VERIFIK_MODELO_VERIFICAR_SEG  = 10     # intervalo para detectar arquivo novo
+VERIFIK_MODELO_AQUECER        = True   # inferência de aquecimento
+
+🎯 USO:
+-------
+from verifik.services.registro_modelos import obter_modelo_yolo, get_registro_modelos
+
+modelo = obter_modelo_yolo()                         # modelo padrão
+modelo = obter_modelo_yolo(['verifik/verifik_yolov8.pt', 'yolov8n.pt'])
+print(get_registro_modelos().estatisticas())
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from ultralytics import YOLO
+    YOLO_DISPONIVEL = True
+except ImportError:
+    YOLO_DISPONIVEL = False
+
+
+# Pasta do projeto (usada para resolver caminhos relativos do AIModel)
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+def _configuracao(nome, padrao):
+    """Lê do settings do Django, se configurado (o registro também roda fora do Django)"""
+    try:
+        from django.conf import settings
+        return getattr(settings, nome, padrao)
+    except Exception:
+        return padrao
+
+
+def _versao_arquivo(caminho):
+    """(mtime, tamanho) do arquivo, ou None se é um peso a baixar pelo ultralytics"""
+    try:
+        info = os.stat(caminho)
+        return (info.st_mtime_ns, info.st_size)
+    except OSError:
+        return None
+
+
+def _memoria_modelo(modelo):
+    """Bytes ocupados pelos pesos e buffers do modelo torch"""
+    try:
+        rede = modelo.model
+        total = sum(p.numel() * p.element_size() for p in rede.parameters())
+        total += sum(b.numel() * b.element_size() for b in rede.buffers())
+        return total
+    except Exception:
+        return None
+
+
+class RegistroModelos:
+    """
+    Instâncias YOLO compartilhadas por processo, chaveadas por caminho + versão.
+
+    Args:
+        intervalo_verificacao (float): segundos entre verificações do arquivo
+        aquecer (bool): roda uma inferência de aquecimento ao carregar
+    """
+
+    def __init__(self, intervalo_verificacao=10, aquecer=True):
+        self.intervalo_verificacao = intervalo_verificacao
+        self.aquecer = aquecer
+
+        self._modelos = {}   # caminho → entrada (dict)
+        self._locks = {}     # caminho → lock de carga
+        self._lock = threading.Lock()
+
+    def _lock_do(self, caminho):
+        with self._lock:
+            return self._locks.setdefault(caminho, threading.Lock())
+
+    # ------------------------------------------------------------
+    # Carga
+    # ------------------------------------------------------------
+
+    def _carregar(self, caminho, versao):
+        """Carrega (e aquece) uma versão do modelo; não mexe no registro"""
+        if not YOLO_DISPONIVEL:
+            raise ImportError("Ultralytics não instalado. Execute: pip install ultralytics")
+
+        inicio = time.perf_counter()
+        modelo = YOLO(caminho)
+        tempo_carga = time.perf_counter() - inicio
+
+        tempo_aquecimento = None
+        if self.aquecer:
+            inicio = time.perf_counter()
+            modelo(np.zeros((640, 640, 3), dtype=np.uint8), verbose=False)
+            tempo_aquecimento = time.perf_counter() - inicio
+
+        print(
+            f"✅ Modelo YOLO carregado: {caminho} "
+            f"({tempo_carga:.2f}s + aquecimento {tempo_aquecimento or 0:.2f}s)"
+        )
+
+        return {
+            'modelo': modelo,
+            'versao': versao,
+            'carregado_em': datetime.now(),
+            'tempo_carga': tempo_carga,
+            'tempo_aquecimento': tempo_aquecimento,
+            'memoria_bytes': _memoria_modelo(modelo),
+            'verificado_em': time.monotonic(),
+            'usos': 0,
+            'recargas': 0,
+        }
+
+    def _instalar(self, caminho, nova):
+        """Troca a entrada do registro pela nova versão (atômico)"""
+        with self._lock:
+            antiga = self._modelos.get(caminho)
+            if antiga is not None:
+                nova['recargas'] = antiga['recargas'] + 1
+                nova['usos'] = antiga['usos']
+            self._modelos[caminho] = nova
+        _registrar_ai_model(caminho, nova)
+        return nova
+
+    def obter(self, caminho):
+        """
+        Retorna a instância compartilhada do modelo em `caminho`
+
+        Carrega na primeira chamada; recarrega se o arquivo mudou no disco.
+        """
+        caminho = str(Path(caminho).resolve()) if Path(caminho).exists() else str(caminho)
+        entrada = self._modelos.get(caminho)
+
+        if entrada is not None:
+            agora = time.monotonic()
+            if agora - entrada['verificado_em'] >= self.intervalo_verificacao:
+                entrada['verificado_em'] = agora
+                versao = _versao_arquivo(caminho)
+                if versao is not None and versao != entrada['versao']:
+                    entrada = self._trocar(caminho, versao, entrada)
+            entrada['usos'] += 1
+            return entrada['modelo']
+
+        with self._lock_do(caminho):
+            entrada = self._modelos.get(caminho)
+            if entrada is None:
+                entrada = self._instalar(caminho, self._carregar(caminho, _versao_arquivo(caminho)))
+        entrada['usos'] += 1
+        return entrada['modelo']
+
+    def _trocar(self, caminho, versao, atual):
+        """Carrega a nova versão; só uma thread recarrega, as outras seguem com a atual"""
+        lock = self._lock_do(caminho)
+        if not lock.acquire(blocking=False):
+            return atual
+        try:
+            print(f"🔄 Nova versão do modelo detectada: {caminho}")
+            return self._instalar(caminho, self._carregar(caminho, versao))
+        except Exception as e:
+            # Arquivo ainda sendo gravado pelo treino, por exemplo
+            print(f"⚠️  Falha ao recarregar {caminho}, mantendo versão atual: {e}")
+            return atual
+        finally:
+            lock.release()
+
+    def recarregar(self, caminho=None):
+        """Força a recarga de um modelo (ou de todos os já carregados)"""
+        caminhos = [str(Path(caminho).resolve())] if caminho else list(self._modelos)
+        for c in caminhos:
+            with self._lock_do(c):
+                self._instalar(c, self._carregar(c, _versao_arquivo(c)))
+
+    # ------------------------------------------------------------
+    # Estatísticas
+    # ------------------------------------------------------------
+
+    def estatisticas(self):
+        with self._lock:
+            entradas = list(self._modelos.items())
+
+        modelos = []
+        for caminho, e in entradas:
+            memoria = e['memoria_bytes']
+            modelos.append({
+                'caminho': caminho,
+                'versao': (
+                    datetime.fromtimestamp(e['versao'][0] / 1e9).isoformat(timespec='seconds')
+                    if e['versao'] else None
+                ),
+                'carregado_em': e['carregado_em'].isoformat(timespec='seconds'),
+                'tempo_carga': round(e['tempo_carga'], 3),
+                'tempo_aquecimento': (
+                    round(e['tempo_aquecimento'], 3) if e['tempo_aquecimento'] is not None else None
+                ),
+                'memoria_mb': round(memoria / 1024 / 1024, 1) if memoria else None,
+                'classes': len(getattr(e['modelo'], 'names', None) or {}),
+                'usos': e['usos'],
+                'recargas': e['recargas'],
+                'ai_model_id': e.get('ai_model_id'),
+            })
+        return {'total': len(modelos), 'modelos': modelos}
+
+
+# ============================================================
+# 🗄️ INTEGRAÇÃO COM cameras.AIModel
+# ============================================================
+
+def _resolver_arquivo(model_file):
+    """Caminhos tentados para o campo AIModel.model_file (ex: 'yolov8n.pt')"""
+    for candidato in (
+        Path(model_file),
+        BASE_DIR / model_file,
+        BASE_DIR / 'models' / model_file,
+        BASE_DIR / 'verifik' / model_file,
+    ):
+        if candidato.exists():
+            return candidato
+    return None
+
+
+def _registrar_ai_model(caminho, entrada):
+    """Associa o modelo carregado ao AIModel correspondente e grava o tempo de inferência"""
+    try:
+        from cameras.models import AIModel
+
+        nome = Path(caminho).name
+        ai_model = AIModel.objects.filter(
+            model_file__in=[nome, caminho], is_active=True
+        ).order_by('-is_default').first()
+        if ai_model is None:
+            return
+
+        entrada['ai_model_id'] = ai_model.id
+        if entrada['tempo_aquecimento'] is not None:
+            AIModel.objects.filter(pk=ai_model.pk).update(
+                avg_inference_time=round(entrada['tempo_aquecimento'] * 1000, 1)
+            )
+    except Exception:
+        # Fora do Django ou banco indisponível (ex: durante migrate)
+        pass
+
+
+_ai_model_padrao = (None, 0.0)  # (arquivo, consultado_em)
+
+
+def _arquivo_ai_model_padrao():
+    """Arquivo do AIModel padrão de detecção (consulta o banco no máximo a cada intervalo)"""
+    global _ai_model_padrao
+    arquivo, consultado_em = _ai_model_padrao
+    if time.monotonic() - consultado_em < _configuracao('VERIFIK_MODELO_VERIFICAR_SEG', 10):
+        return arquivo
+
+    arquivo = None
+    try:
+        from cameras.models import AIModel
+
+        ai_model = AIModel.objects.filter(
+            is_active=True, is_default=True, model_type='detection'
+        ).first()
+        if ai_model:
+            arquivo = _resolver_arquivo(ai_model.model_file)
+            if arquivo is None:
+                print(f"⚠️  Arquivo do modelo padrão não encontrado: {ai_model.model_file}")
+    except Exception:
+        pass
+
+    _ai_model_padrao = (arquivo, time.monotonic())
+    return arquivo
+
+
+def candidatos_modelo_padrao():
+    """
+    Modelos de detecção padrão, em ordem de preferência
+
+    1. cameras.AIModel ativo, is_default=True, tipo 'detection' (se o arquivo existir)
+    2. settings.YOLO_MODEL_PATH
+    3. verifik/verifik_yolov8.pt (saída do treino)
+    4. models/verifik_yolov8.pt
+    """
+    candidatos = []
+    arquivo = _arquivo_ai_model_padrao()
+    if arquivo:
+        candidatos.append(arquivo)
+    caminho_settings = _configuracao('YOLO_MODEL_PATH', None)
+    if caminho_settings:
+        candidatos.append(caminho_settings)
+    candidatos.append(BASE_DIR / 'verifik' / 'verifik_yolov8.pt')
+    candidatos.append(BASE_DIR / 'models' / 'verifik_yolov8.pt')
+    return candidatos
+
+
+# ============================================================
+# 🔁 REGISTRO COMPARTILHADO (um por processo)
+# ============================================================
+
+_registro = None
+_registro_lock = threading.Lock()
+
+
+def get_registro_modelos():
+    """Retorna o registro do processo"""
+    global _registro
+    if _registro is None:
+        with _registro_lock:
+            if _registro is None:
+                _registro = RegistroModelos(
+                    intervalo_verificacao=_configuracao('VERIFIK_MODELO_VERIFICAR_SEG', 10),
+                    aquecer=_configuracao('VERIFIK_MODELO_AQUECER', True),
+                )
+    return _registro
+
+
+def obter_modelo_yolo(caminhos=None, fallback='yolov8n.pt'):
+    """
+    Modelo YOLO compartilhado
+
+    Args:
+        caminhos (list): candidatos em ordem de preferência; usa o primeiro
+            que existir. Padrão: candidatos_modelo_padrao()
+        fallback (str): peso base do ultralytics se nenhum candidato existir
+    """
+    if caminhos is None:
+        caminhos = candidatos_modelo_padrao()
+
+    for caminho in caminhos:
+        if Path(caminho).exists():
+            return get_registro_modelos().obter(caminho)
+
+    print(f"⚠️  Modelo não encontrado em {[str(c) for c in caminhos]}, usando {fallback}")
+    return get_registro_modelos().obter(fallback)
+
+
+def precarregar_modelos():
+    """Carrega o modelo padrão em segundo plano (chamado no AppConfig.ready)"""
+    def _precarregar():
+        try:
+            obter_modelo_yolo()
+        except Exception as e:
+            print(f"⚠️  Pré-carga do modelo YOLO falhou: {e}")
+
+    threading.Thread(target=_precarregar, name='verifik-precarga-yolo', daemon=True).start()
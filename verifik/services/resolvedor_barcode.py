@@ -0,0 +1,289 @@
+"""
+╔══════════════════════════════════════════════════════════════════╗
+║             RESOLVEDOR DE CÓDIGOS DE BARRAS - VERIFIK            ║
+║        Cache LRU/TTL + busca em lote (uma query por foto)        ║
+╚══════════════════════════════════════════════════════════════════╝
+
+📚 COMO FUNCIONA:
+-----------------
+1. resolver_varios(codigos) olha primeiro o cache em memória
+2. Os códigos que faltam vão para a FONTE em UMA chamada
+   (no Django: um único CodigoBarrasProdutoMae ... WHERE codigo IN (...))
+3. Códigos encontrados ficam no cache por `ttl` segundos
+4. Códigos DESCONHECIDOS também ficam (cache negativo, `ttl_negativo`),
+   assim um EAN que não está no banco não gera uma query por frame
+5. Cache limitado a `max_itens` (LRU: sai o menos usado)
+
+A classe ResolvedorCodigoBarras não depende do Django — os apps de
+streaming (tkinter) usam a mesma classe com a própria fonte de dados.
+
+⚙️ CONFIGURAÇÕES (settings.py):
+-------------------------------
+VERIFIK_BARCODE_CACHE_MAX      = 20000
+VERIFIK_BARCODE_TTL            = 3600   # segundos (encontrados)
+VERIFIK_BARCODE_TTL_NEGATIVO   = 300    # segundos (desconhecidos)
+VERIFIK_BARCODE_AQUECER        = True   # carrega os códigos do banco no 1º uso
+
+🎯 USO:
+-------
+from verifik.services.resolvedor_barcode import get_resolvedor_barcode
+
+resolvedor = get_resolvedor_barcode()
+produto = resolvedor.resolver('7891991000123')       # dict ou None
+produtos = resolvedor.resolver_varios(['789...', '789...'])
+print(resolvedor.estatisticas())
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+# Marca de "código desconhecido" dentro do cache (cache negativo)
+_DESCONHECIDO = object()
+
+
+class ResolvedorCodigoBarras:
+    """
+    Cache LRU com TTL (positivo e negativo) na frente de uma fonte em lote.
+
+    Args:
+        buscar_lote (callable): recebe uma lista de códigos e devolve
+            {codigo: produto} só com os encontrados
+        max_itens (int): limite de entradas (LRU)
+        ttl (float): validade, em segundos, de um código encontrado
+        ttl_negativo (float): validade, em segundos, de um código desconhecido
+    """
+
+    def __init__(self, buscar_lote, max_itens=20000, ttl=3600, ttl_negativo=300):
+        self.buscar_lote = buscar_lote
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+
+        self._cache = OrderedDict()  # codigo → (valor, expira_em)
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.resetar_estatisticas()
+
+    # ------------------------------------------------------------
+    # Cache
+    # ------------------------------------------------------------
+
+    def _ler_cache(self, codigo, agora):
+        """Retorna (achou_no_cache, valor). Chamar com o lock."""
+        entrada = self._cache.get(codigo)
+        if entrada is None:
+            return False, None
+        valor, expira_em = entrada
+        if expira_em <= agora:
+            del self._cache[codigo]
+            self._stats['expirados'] += 1
+            return False, None
+        self._cache.move_to_end(codigo)
+        return True, valor
+
+    def _gravar_cache(self, codigo, valor, agora):
+        """Grava uma entrada e aplica o limite LRU. Chamar com o lock."""
+        ttl = self.ttl_negativo if valor is _DESCONHECIDO else self.ttl
+        self._cache[codigo] = (valor, agora + ttl)
+        self._cache.move_to_end(codigo)
+        while len(self._cache) > self.max_itens:
+            self._cache.popitem(last=False)
+            self._stats['despejados'] += 1
+
+    def invalidar(self, codigo=None):
+        """Remove um código do cache (ou tudo, se codigo=None)"""
+        with self._lock:
+            if codigo is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(str(codigo).strip(), None)
+
+    def invalidar_se(self, condicao):
+        """Remove as entradas positivas cujo produto satisfaz `condicao(produto)`"""
+        with self._lock:
+            remover = [
+                codigo for codigo, (valor, _) in self._cache.items()
+                if valor is not _DESCONHECIDO and condicao(valor)
+            ]
+            for codigo in remover:
+                del self._cache[codigo]
+
+    def aquecer(self, produtos_por_codigo):
+        """
+        Pré-carrega o cache (ex.: todos os códigos do banco na inicialização)
+
+        Args:
+            produtos_por_codigo (dict): {codigo: produto}
+        """
+        agora = time.monotonic()
+        with self._lock:
+            for codigo, produto in produtos_por_codigo.items():
+                self._gravar_cache(codigo, produto, agora)
+            self._stats['aquecidos'] += len(produtos_por_codigo)
+
+    # ------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------
+
+    def resolver_varios(self, codigos):
+        """
+        Resolve vários códigos com no máximo UMA chamada à fonte
+
+        Returns:
+            dict: {codigo: produto ou None} para cada código pedido
+        """
+        codigos = [str(c).strip() for c in codigos if c]
+        resultado = {}
+        faltando = []
+        agora = time.monotonic()
+
+        with self._lock:
+            for codigo in dict.fromkeys(codigos):
+                achou, valor = self._ler_cache(codigo, agora)
+                if achou:
+                    if valor is _DESCONHECIDO:
+                        self._stats['acertos_negativos'] += 1
+                        resultado[codigo] = None
+                    else:
+                        self._stats['acertos'] += 1
+                        resultado[codigo] = valor
+                else:
+                    self._stats['faltas'] += 1
+                    faltando.append(codigo)
+
+        if faltando:
+            inicio = time.perf_counter()
+            encontrados = self.buscar_lote(faltando) or {}
+            duracao = time.perf_counter() - inicio
+
+            agora = time.monotonic()
+            with self._lock:
+                self._stats['consultas_fonte'] += 1
+                self._stats['tempo_fonte'] += duracao
+                for codigo in faltando:
+                    produto = encontrados.get(codigo)
+                    self._gravar_cache(codigo, produto if produto is not None else _DESCONHECIDO, agora)
+                    resultado[codigo] = produto
+
+        return resultado
+
+    def resolver(self, codigo):
+        """Resolve um único código (dict do produto ou None)"""
+        if not codigo:
+            return None
+        return self.resolver_varios([codigo]).get(str(codigo).strip())
+
+    # ------------------------------------------------------------
+    # Estatísticas
+    # ------------------------------------------------------------
+
+    def resetar_estatisticas(self):
+        with self._lock:
+            self._stats = {
+                'acertos': 0,
+                'acertos_negativos': 0,
+                'faltas': 0,
+                'expirados': 0,
+                'despejados': 0,
+                'aquecidos': 0,
+                'consultas_fonte': 0,
+                'tempo_fonte': 0.0,
+            }
+
+    def estatisticas(self):
+        with self._lock:
+            stats = dict(self._stats)
+            tamanho = len(self._cache)
+            negativos = sum(1 for valor, _ in self._cache.values() if valor is _DESCONHECIDO)
+
+        consultas = stats['acertos'] + stats['acertos_negativos'] + stats['faltas']
+        acertos = stats['acertos'] + stats['acertos_negativos']
+        return {
+            **stats,
+            'tempo_fonte': round(stats['tempo_fonte'], 3),
+            'consultas': consultas,
+            'taxa_acerto': round(100 * acertos / consultas, 1) if consultas else None,
+            'tamanho': tamanho,
+            'negativos_em_cache': negativos,
+            'max_itens': self.max_itens,
+        }
+
+
+# ============================================================
+# 🗄️ FONTE DJANGO (CodigoBarrasProdutoMae)
+# ============================================================
+
+def _produto_dict(codigo_obj):
+    produto = codigo_obj.produto_mae
+    return {
+        'produto_id': produto.id,
+        'descricao': produto.descricao_produto,
+        'marca': produto.marca or '',
+        'codigo_barras': codigo_obj.codigo,
+        'principal': codigo_obj.principal,
+    }
+
+
+def buscar_codigos_banco(codigos):
+    """Uma única query: CodigoBarrasProdutoMae WHERE codigo IN (...)"""
+    from verifik.models import CodigoBarrasProdutoMae
+
+    encontrados = CodigoBarrasProdutoMae.objects.filter(
+        codigo__in=codigos
+    ).select_related('produto_mae')
+    return {c.codigo: _produto_dict(c) for c in encontrados}
+
+
+def carregar_codigos_banco(limite):
+    """Os `limite` códigos mais recentes do banco (para aquecer o cache)"""
+    from verifik.models import CodigoBarrasProdutoMae
+
+    codigos = CodigoBarrasProdutoMae.objects.select_related('produto_mae').order_by('-id')[:limite]
+    return {c.codigo: _produto_dict(c) for c in codigos}
+
+
+# ============================================================
+# 🔁 RESOLVEDOR COMPARTILHADO (um por processo Django)
+# ============================================================
+
+_resolvedor = None
+_resolvedor_lock = threading.Lock()
+
+
+def get_resolvedor_barcode():
+    """Retorna o resolvedor do processo (aquecido a partir do banco no 1º uso)"""
+    global _resolvedor
+    if _resolvedor is not None:
+        return _resolvedor
+
+    with _resolvedor_lock:
+        if _resolvedor is None:
+            from django.conf import settings
+
+            resolvedor = ResolvedorCodigoBarras(
+                buscar_codigos_banco,
+                max_itens=getattr(settings, 'VERIFIK_BARCODE_CACHE_MAX', 20000),
+                ttl=getattr(settings, 'VERIFIK_BARCODE_TTL', 3600),
+                ttl_negativo=getattr(settings, 'VERIFIK_BARCODE_TTL_NEGATIVO', 300),
+            )
+            if getattr(settings, 'VERIFIK_BARCODE_AQUECER', True):
+                try:
+                    codigos = carregar_codigos_banco(resolvedor.max_itens)
+                    resolvedor.aquecer(codigos)
+                    print(f"✅ Cache de códigos de barras aquecido: {len(codigos)} códigos")
+                except Exception as e:
+                    print(f"⚠️  Não foi possível aquecer o cache de códigos de barras: {e}")
+            _resolvedor = resolvedor
+    return _resolvedor
+
+
+def invalidar_codigo(codigo=None, produto_id=None):
+    """Remove do cache um código, ou todos os códigos de um produto"""
+    if _resolvedor is None:
+        return
+    if codigo is not None:
+        _resolvedor.invalidar(codigo)
+    if produto_id is not None:
+        _resolvedor.invalidar_se(lambda produto: produto['produto_id'] == produto_id)
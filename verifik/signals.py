@@ -0,0 +1,46 @@
+"""
+Sinais do VerifiK
+
+Mantém os caches em memória (índice de produtos e códigos de barras)
+coerentes com o banco.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import CodigoBarrasProdutoMae, Marca, ProdutoMae
+from .services.indice_produtos import invalidar_indice_produtos
+from .services.resolvedor_barcode import invalidar_codigo
+
+
+@receiver(post_save, sender=ProdutoMae)
+@receiver(post_delete, sender=ProdutoMae)
+@receiver(post_save, sender=Marca)
+@receiver(post_delete, sender=Marca)
+def produto_alterado(sender, **kwargs):
+    """Produto ou marca mudou → índice de sugestão precisa ser reconstruído"""
+    invalidar_indice_produtos()
+    if sender is ProdutoMae:
+        invalidar_codigo(produto_id=kwargs['instance'].pk)
+
+
+@receiver(pre_save, sender=CodigoBarrasProdutoMae)
+def guardar_codigo_anterior(sender, instance, raw=False, **kwargs):
+    """Edição pode trocar o `codigo`: guarda o valor do banco para descartá-lo também"""
+    instance._codigo_anterior = None
+    if instance.pk is not None and not raw:
+        instance._codigo_anterior = (
+            sender.objects.filter(pk=instance.pk).values_list('codigo', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=CodigoBarrasProdutoMae)
+@receiver(post_delete, sender=CodigoBarrasProdutoMae)
+def codigo_barras_alterado(sender, instance, **kwargs):
+    """
+    Código cadastrado/editado/removido → descarta a entrada (inclusive
+    negativa) do cache; numa edição, o código antigo também
+    """
+    invalidar_codigo(codigo=instance.codigo)
+    anterior = getattr(instance, '_codigo_anterior', None)
+    if anterior and anterior != instance.codigo:
+        invalidar_codigo(codigo=anterior)
@@ -1,3 +1,53 @@
-from django.test import TestCase
+import io
+import zipfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from .services import deteccao_lote
+from .services.deteccao_lote import ZipGrandeDemais, _decodificar, fontes_zip, verificar_zip
+from .services.imagem_entrada import TAMANHO_MAX_IMAGEM
+
+
+def _zip(membros):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for nome, dados in membros:
+            zf.writestr(nome, dados)
+    return SimpleUploadedFile('fotos.zip', buffer.getvalue(), content_type='application/zip')
+
+
+# ============================================================
+# 📦 DETECÇÃO EM LOTE: LIMITES DO .ZIP
+# ============================================================
+
+class FontesZipTests(SimpleTestCase):
+
+    def test_membro_maior_que_o_limite_nao_e_descompactado(self):
+        # Zeros comprimem para poucos KB: o .zip é pequeno, o membro não
+        arquivo = _zip([('pequena.jpg', b'nao-e-jpeg'), ('bomba.jpg', bytes(TAMANHO_MAX_IMAGEM + 1))])
+        self.assertLess(arquivo.size, 1024 * 1024)
+
+        with mock.patch.object(zipfile.ZipFile, 'read', return_value=b'nao-e-jpeg') as ler:
+            fontes = list(fontes_zip(arquivo))
+        self.assertEqual([nome for nome, _ in fontes], ['pequena.jpg', 'bomba.jpg'])
+        self.assertEqual(ler.call_count, 1)
+
+        nome, img, _, erro = _decodificar(fontes[1])
+        self.assertEqual(nome, 'bomba.jpg')
+        self.assertIsNone(img)
+        self.assertIn('maior que o limite', erro)
+
+    def test_zip_com_imagens_demais_ou_grande_demais(self):
+        arquivo = _zip([(f'{i}.jpg', bytes(1000)) for i in range(3)])
+        with mock.patch.object(deteccao_lote, 'ZIP_MAX_IMAGENS', 2):
+            with self.assertRaises(ZipGrandeDemais):
+                verificar_zip(arquivo)
+        with mock.patch.object(deteccao_lote, 'ZIP_TAMANHO_MAX_TOTAL', 2500):
+            with self.assertRaises(ZipGrandeDemais):
+                verificar_zip(arquivo)
+            with self.assertRaises(ZipGrandeDemais):
+                list(fontes_zip(arquivo))
+        verificar_zip(arquivo)
+        self.assertEqual(len(list(fontes_zip(arquivo))), 3)
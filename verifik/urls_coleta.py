@@ -10,6 +10,8 @@ from .views_coleta import (
     aprovar_lote_completo,
     aprovar_produto_lote,
     detectar_produtos_api,
+    ocr_estatisticas_api,
+    modelos_status_api,
     revisar_desconhecidos,
     reclassificar_imagem,
     aprovar_bbox_api,
@@ -28,6 +30,8 @@ urlpatterns = [
     path('lote/<int:lote_id>/aprovar-tudo/', aprovar_lote_completo, name='aprovar_lote_completo'),
     path('lote/<int:lote_id>/aprovar-produto/<int:produto_id>/', aprovar_produto_lote, name='aprovar_produto_lote'),
     path('api/detectar-produtos/', detectar_produtos_api, name='detectar_produtos_api'),
+    path('api/ocr-estatisticas/', ocr_estatisticas_api, name='ocr_estatisticas_api'),
+    path('api/modelos-status/', modelos_status_api, name='modelos_status_api'),
     path('api/aprovar-bbox/', aprovar_bbox_api, name='aprovar_bbox_api'),
     path('processar-automatico/', processar_automatico, name='processar_automatico'),
     path('api/processar-automatico/', processar_automatico_api, name='processar_automatico_api'),
@@ -10,15 +10,20 @@ from verifik.models import ProdutoMae
 import os
 import shutil
 import json
+import time
 from pathlib import Path
 from PIL import Image
 import numpy as np
 import cv2
-from ultralytics import YOLO
 import pytesseract
-import re
 from pyzbar.pyzbar import decode as barcode_decode
-from verifik.models import CodigoBarrasProdutoMae
+from verifik.services.resolvedor_barcode import get_resolvedor_barcode
+from verifik.services.registro_modelos import get_registro_modelos, obter_modelo_yolo
+from verifik.services.ocr_engine import get_motor_ocr
+from verifik.services.pool_analise import analisar_recortes, TIMEOUT_ANALISE
+from verifik.services.indice_produtos import (
+    IndiceProdutos, get_indice_produtos
+)
 
 # Configurar caminho do Tesseract (Windows)
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
@@ -448,19 +453,9 @@ def aprovar_produto_lote(request, lote_id, produto_id):
     return redirect('detalhe_lote', lote_id=lote_id)
 
 
-# Carregar modelo YOLO uma única vez
-YOLO_MODEL = None
-
 def get_yolo_model():
-    """Carrega o modelo YOLO (singleton)"""
-    global YOLO_MODEL
-    if YOLO_MODEL is None:
-        model_path = Path(__file__).parent.parent / 'verifik' / 'verifik_yolov8.pt'
-        if not model_path.exists():
-            # Fallback para modelo genérico
-            model_path = Path(__file__).parent.parent / 'yolov8n.pt'
-        YOLO_MODEL = YOLO(str(model_path))
-    return YOLO_MODEL
+    """Modelo YOLO compartilhado (registro de modelos: aquecido e trocado a quente)"""
+    return obter_modelo_yolo(fallback=str(Path(__file__).parent.parent / 'yolov8n.pt'))
 
 
 def classificar_forma_produto(bbox_img):
@@ -582,143 +577,19 @@ def extrair_texto_ocr(bbox_img):
     """
     Extrai texto da região do produto usando OCR
     Retorna lista de palavras-chave encontradas
-    Usa múltiplas técnicas de pré-processamento para melhor resultado
+    Usa múltiplas técnicas de pré-processamento, parando assim que
+    uma marca conhecida é lida (ver verifik/services/ocr_engine.py)
     """
     try:
-        todas_palavras = set()
-        
-        # Redimensionar para melhor leitura (mínimo 300px de altura)
-        h, w = bbox_img.shape[:2]
-        if h < 300:
-            scale = 300 / h
-            bbox_img = cv2.resize(bbox_img, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
-        
-        gray = cv2.cvtColor(bbox_img, cv2.COLOR_BGR2GRAY)
-        
-        # TÉCNICA 1: Threshold adaptativo
-        thresh1 = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-            cv2.THRESH_BINARY, 11, 2
-        )
-        
-        # TÉCNICA 2: Otsu threshold com blur
-        blur = cv2.GaussianBlur(gray, (3, 3), 0)
-        _, thresh2 = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        
-        # TÉCNICA 3: CLAHE (Contrast Limited Adaptive Histogram Equalization)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-        enhanced = clahe.apply(gray)
-        _, thresh3 = cv2.threshold(enhanced, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        
-        # TÉCNICA 4: Inversão (para texto claro em fundo escuro)
-        thresh4 = cv2.bitwise_not(thresh2)
-        
-        # TÉCNICA 5: Dilatação para conectar letras quebradas
-        kernel = np.ones((2, 2), np.uint8)
-        thresh5 = cv2.dilate(thresh2, kernel, iterations=1)
-        
-        # Rodar OCR em cada versão
-        imagens_processar = [thresh1, thresh2, thresh3, thresh4, thresh5, gray]
-        
-        for img_proc in imagens_processar:
-            try:
-                # Config para melhor detecção: PSM 6 = bloco uniforme de texto
-                texto = pytesseract.image_to_string(img_proc, lang='por+eng', config='--psm 6')
-                texto = texto.upper()
-                
-                # Extrair palavras (3+ letras)
-                palavras = re.findall(r'\b[A-Z]{3,}\b', texto)
-                
-                # Extrair também números com letras (volumes como 350ML)
-                volumes = re.findall(r'\b\d+\s*(?:ML|L|LT|G|KG)\b', texto, re.IGNORECASE)
-                
-                todas_palavras.update(palavras)
-                todas_palavras.update([v.upper().replace(' ', '') for v in volumes])
-            except:
-                continue
-        
-        # Filtrar palavras comuns/irrelevantes
-        palavras_irrelevantes = {'THE', 'AND', 'FOR', 'COM', 'NET', 'IND', 'LTD', 'SAO', 'QUE', 'NAO', 'POR', 'UMA', 'DOS', 'DAS'}
-        palavras_filtradas = [p for p in todas_palavras if p not in palavras_irrelevantes and len(p) >= 3]
-        
-        # === MARCAS CONHECIDAS (Cervejas + Refrigerantes) ===
-        marcas_conhecidas = [
-            # Cervejas
-            'HEINEKEN', 'AMSTEL', 'STELLA', 'BUDWEISER', 'CORONA', 'BRAHMA', 'SKOL', 
-            'DEVASSA', 'EISENBAHN', 'LOKAL', 'ANTARCTICA', 'BOHEMIA', 'SPATEN', 'BECKS',
-            # Refrigerantes
-            'PEPSI', 'COCA COLA', 'GUARANA', 'FANTA', 'SPRITE', 'SCHWEPPES', 'SUKITA', 'KUAT', 'H2OH'
-        ]
-        
-        # === RECIPIENTES ===
-        # LATA = 350ml (padrão)
-        # LATÃO = 473ml, 550ml (lata grande, comum em cervejas)
-        # LONG NECK = 330ml, 355ml (garrafa pequena)
-        # GARRAFA = 600ml (vidro)
-        # PET = 600ml, 1L, 2L (plástico - refrigerantes)
-        recipientes = ['LONG NECK', 'LONGNECK', 'LATA', 'LATAO', 'LATÃO', 'GARRAFA', 'PET']
-        
-        # === TIPOS DE CERVEJA ===
-        tipos_cerveja = [
-            'PILSEN', 'PURO MALTE', 'ZERO ALCOOL', 'ZERO', 'BLACK', 'GOLD', 'PUREGOLD',
-            'IPA', 'LAGER', 'ALE', 'WEISS', 'PREMIUM', 'EXTRA', 'ORIGINAL', 'MALZBIER'
-        ]
-        
-        # === TIPOS DE REFRIGERANTE ===
-        tipos_refri = ['ZERO', 'LIGHT', 'DIET', 'ORIGINAL', 'LARANJA', 'UVA', 'LIMAO', 'CITRUS']
-        
-        # Lista de prioridade: marcas > recipientes > tipos
-        marcas_prioritarias = marcas_conhecidas + recipientes + tipos_cerveja + tipos_refri
-        
-        # Ordenar: marcas primeiro, depois recipientes, tipos e outras palavras
-        resultado = []
-        for marca in marcas_prioritarias:
-            if marca in palavras_filtradas:
-                resultado.append(marca)
-                palavras_filtradas.remove(marca)
-        resultado.extend(palavras_filtradas)
-        
-        print(f"📝 OCR extraiu: {resultado[:15]}")
-        return resultado[:15]  # Top 15 palavras
-        
+        resultado = get_motor_ocr().extrair(bbox_img)
+        print(f"📝 OCR extraiu: {resultado}")
+        return resultado
     except Exception as e:
         print(f"Erro no OCR: {e}")
         return []
 
 
-def calcular_similaridade(texto1, texto2):
-    """Calcula similaridade entre dois textos usando múltiplas técnicas"""
-    texto1 = texto1.upper().strip()
-    texto2 = texto2.upper().strip()
-    
-    if not texto1 or not texto2:
-        return 0
-    
-    # 1. Match exato
-    if texto1 == texto2:
-        return 100
-    
-    # 2. Contido um no outro
-    if texto1 in texto2 or texto2 in texto1:
-        return 80
-    
-    # 3. Calcular Jaccard (palavras em comum)
-    palavras1 = set(texto1.split())
-    palavras2 = set(texto2.split())
-    if palavras1 and palavras2:
-        intersecao = len(palavras1 & palavras2)
-        uniao = len(palavras1 | palavras2)
-        jaccard = (intersecao / uniao) * 100 if uniao > 0 else 0
-        if jaccard > 0:
-            return jaccard
-    
-    # 4. Calcular distância de caracteres (simples)
-    comum = sum(1 for c in texto1 if c in texto2)
-    max_len = max(len(texto1), len(texto2))
-    return (comum / max_len) * 60 if max_len > 0 else 0
-
-
-def sugerir_produto_ia(texto_ocr, forma, produtos_db, codigo_barras=None):
+def sugerir_produto_ia(texto_ocr, forma, produtos_db=None, codigo_barras=None):
     """
     Sugere produto baseado em código de barras + OCR + forma + banco de dados
     Retorna (produto_id, confianca, razao)
@@ -728,283 +599,31 @@ def sugerir_produto_ia(texto_ocr, forma, produtos_db, codigo_barras=None):
     2. OCR + Forma + Volume + Cor = 0-100% confiança (análise multi-critério)
     
     MELHORADO: Busca fuzzy, detecção de marcas parciais, análise de variações
+    
+    O catálogo fica indexado em memória (verifik/services/indice_produtos.py).
+    produtos_db só é necessário para restringir a busca a uma lista específica.
     """
     try:
         # 🔥 PRIORIDADE MÁXIMA: Código de barras
         if codigo_barras:
-            try:
-                codigo_obj = CodigoBarrasProdutoMae.objects.get(codigo=codigo_barras)
-                produto_mae = codigo_obj.produto_mae
-                print(f"🎯 MATCH PERFEITO! Código de barras: {codigo_barras} → {produto_mae.descricao_produto}")
-                return (produto_mae.id, 99.99, f"🔥 CÓDIGO DE BARRAS: {codigo_barras} (Match Exato)")
-            except CodigoBarrasProdutoMae.DoesNotExist:
-                print(f"⚠️ Código de barras {codigo_barras} não encontrado no banco")
-        
-        # ============================================================
-        # === MARCAS CONHECIDAS (Cervejas e Refrigerantes) ===
-        # ============================================================
-        marcas_aliases = {
-            # CERVEJAS
-            'HEINEKEN': ['HEINEKEN', 'HEIN', 'HNK', 'HEINEK'],
-            'AMSTEL': ['AMSTEL', 'AMST', 'AMSTERDAM'],
-            'STELLA': ['STELLA', 'ARTOIS', 'STELLA ARTOIS'],
-            'BUDWEISER': ['BUDWEISER', 'BUD', 'BUDW'],
-            'CORONA': ['CORONA', 'CORON'],
-            'BRAHMA': ['BRAHMA', 'BRAH'],
-            'SKOL': ['SKOL', 'SK'],
-            'LOKAL': ['LOKAL', 'LOCAL'],
-            'DEVASSA': ['DEVASSA', 'DEVAS'],
-            'EISENBAHN': ['EISENBAHN', 'EISEN'],
-            'ANTARCTICA': ['ANTARCTICA', 'ANTARTICA', 'ANTARTC'],
-            'BOHEMIA': ['BOHEMIA', 'BOHEM'],
-            'ORIGINAL': ['ORIGINAL'],
-            'SPATEN': ['SPATEN'],
-            'BECKS': ['BECKS', 'BECK'],
-            # REFRIGERANTES
-            'COCA COLA': ['COCA COLA', 'COCA', 'COLA', 'COCA-COLA', 'COCACOLA'],
-            'PEPSI': ['PEPSI', 'PEPS'],
-            'GUARANA': ['GUARANA', 'GUARANÁ', 'GUAR'],
-            'FANTA': ['FANTA', 'FANT'],
-            'SPRITE': ['SPRITE', 'SPRIT'],
-            'SCHWEPPES': ['SCHWEPPES', 'SCHWEP'],
-            'SUKITA': ['SUKITA'],
-            'KUAT': ['KUAT'],
-            'H2OH': ['H2OH', 'H2O'],
-        }
-        
-        # ============================================================
-        # === RECIPIENTES (com volumes associados) ===
-        # ============================================================
-        # CERVEJAS:
-        #   - LATA = 350ml (padrão)
-        #   - LATÃO = 473ml, 550ml (lata grande)
-        #   - LONG NECK = 330ml, 355ml (garrafa pequena)
-        #   - GARRAFA = 600ml, 1L (garrafa grande)
-        # 
-        # REFRIGERANTES:
-        #   - LATA = 350ml
-        #   - PET 600ML = 600ml
-        #   - PET 1L = 1000ml
-        #   - PET 2L = 2000ml
-        recipientes_aliases = {
-            'lata': ['LATA', 'LT', 'CAN', 'LATINHA', 'LATAS'],
-            'latao': ['LATAO', 'LATÃO', 'LATA GRANDE', 'LATONA'],
-            'long neck': ['LONG NECK', 'LONGNECK', 'LONG', 'NECK', 'LN'],
-            'garrafa': ['GARRAFA', 'GF', 'BOTTLE', 'GARR', 'VIDRO'],
-            'pet': ['PET', 'PLASTICO', 'PLÁSTICO', 'DESCARTAVEL', 'DESCARTÁVEL'],
-            'caixa': ['CAIXA', 'CX', 'PACK', 'BOX', 'FARDO', 'ENGRADADO'],
-            'ks': ['KS', 'GARRAFA KS'],  # Garrafa retornável pequena
-            'litrinho': ['LITRINHO', 'LITRÃO', 'LITRAO'],
-        }
-        
-        # ============================================================
-        # === TIPOS DE CERVEJA ===
-        # ============================================================
-        tipos_cerveja_aliases = {
-            'PILSEN': ['PILSEN', 'PILS', 'PILSNER'],
-            'PURO MALTE': ['PURO MALTE', 'PUROMALTE', 'PURE MALT'],
-            'ZERO ALCOOL': ['ZERO ALCOOL', 'ZERO ÁLCOOL', 'SEM ALCOOL', 'SEM ÁLCOOL', '0,0%', '0.0%', '0%'],
-            'ZERO': ['ZERO'],  # Pode ser Zero Açúcar (refri) ou Zero Álcool (cerveja)
-            'BLACK': ['BLACK', 'BLK', 'PRETA', 'ESCURA', 'DARK'],
-            'GOLD': ['GOLD', 'GOLDEN', 'DOURADA'],
-            'PUREGOLD': ['PUREGOLD', 'PURE GOLD'],
-            'IPA': ['IPA', 'INDIA PALE ALE'],
-            'LAGER': ['LAGER'],
-            'WEISS': ['WEISS', 'WEIZEN', 'TRIGO'],
-            'PREMIUM': ['PREMIUM', 'EXTRA', 'SPECIAL'],
-            'ORIGINAL': ['ORIGINAL', 'ORIG'],
-            'MALZBIER': ['MALZBIER', 'MALZ'],
-        }
-        
-        # ============================================================
-        # === TIPOS DE REFRIGERANTE ===
-        # ============================================================
-        tipos_refri_aliases = {
-            'ZERO': ['ZERO', 'ZERO AÇUCAR', 'ZERO ACUCAR', 'SEM AÇUCAR', 'SEM ACUCAR'],
-            'LIGHT': ['LIGHT', 'DIET', 'DIETA'],
-            'ORIGINAL': ['ORIGINAL', 'TRADICIONAL', 'NORMAL'],
-            'LARANJA': ['LARANJA', 'ORANGE'],
-            'UVA': ['UVA', 'GRAPE'],
-            'LIMAO': ['LIMAO', 'LIMÃO', 'LEMON', 'LIMA'],
-            'GUARANA': ['GUARANA', 'GUARANÁ'],
-            'CITRUS': ['CITRUS', 'CITRICO', 'CÍTRICO'],
-        }
-        
-        # ============================================================
-        # === VOLUMES CONHECIDOS ===
-        # ============================================================
-        volumes_conhecidos = [
-            # Latas
-            '269ML', '310ML', '350ML',
-            # Latão
-            '473ML', '550ML',
-            # Long Neck
-            '330ML', '355ML',
-            # Garrafas/PET
-            '600ML', 
-            '1L', '1LT', '1000ML', '1LITRO',
-            '2L', '2LT', '2000ML', '2LITROS', '2LTS',
-            '3L', '3LT', '3000ML',
-        ]
-        
-        # ============================================================
-        # === MAPEAMENTO VOLUME → RECIPIENTE ===
-        # ============================================================
-        volume_para_recipiente = {
-            # LATA (cerveja e refrigerante)
-            '269ML': 'lata',
-            '310ML': 'lata',
-            '350ML': 'lata',
-            # LATÃO (cerveja)
-            '473ML': 'latao',
-            '550ML': 'latao',
-            # LONG NECK (cerveja)
-            '330ML': 'long neck',
-            '355ML': 'long neck',
-            # PET/GARRAFA (refrigerante principalmente)
-            '600ML': 'pet',       # PET 600ml
-            '1L': 'pet',          # PET 1 Litro
-            '1LT': 'pet',
-            '1000ML': 'pet',
-            '1LITRO': 'pet',
-            '2L': 'pet',          # PET 2 Litros
-            '2LT': 'pet',
-            '2LTS': 'pet',
-            '2000ML': 'pet',
-            '2LITROS': 'pet',
-            '3L': 'pet',
-            '3LT': 'pet',
-            '3000ML': 'pet',
-        }
+            # Cache LRU/TTL (inclusive negativo) na frente de CodigoBarrasProdutoMae
+            produto_mae = get_resolvedor_barcode().resolver(codigo_barras)
+            if produto_mae:
+                print(f"🎯 MATCH PERFEITO! Código de barras: {codigo_barras} → {produto_mae['descricao']}")
+                return (produto_mae['produto_id'], 99.99, f"🔥 CÓDIGO DE BARRAS: {codigo_barras} (Match Exato)")
+            print(f"⚠️ Código de barras {codigo_barras} não encontrado no banco")
         
         # Análise multi-critério (se não houver código de barras)
-        melhor_match = None
-        melhor_score = 0
-        melhor_razao = ""
-        
-        # Concatenar todas as palavras OCR para busca mais fácil
-        texto_ocr_str = ' '.join(texto_ocr).upper()
-        print(f"📊 Analisando OCR: {texto_ocr_str}")
-        print(f"📊 Forma detectada: {forma}")
-        
-        # Detectar volume no OCR para inferir recipiente
-        volume_detectado = None
-        recipiente_inferido = None
-        for vol in volumes_conhecidos:
-            if vol in texto_ocr_str:
-                volume_detectado = vol
-                recipiente_inferido = volume_para_recipiente.get(vol)
-                print(f"📏 Volume detectado: {vol} → Recipiente inferido: {recipiente_inferido}")
-                break
-        
-        for produto in produtos_db:
-            score = 0
-            razoes = []
-            descricao = produto.descricao_produto.upper()
-            
-            # === 1. DETECÇÃO DE MARCA (PESO ALTO) ===
-            for marca_principal, aliases in marcas_aliases.items():
-                # Verifica se a marca está no OCR (qualquer alias)
-                marca_no_ocr = any(alias in texto_ocr_str for alias in aliases)
-                # Verifica se a marca está na descrição do produto
-                marca_no_produto = any(alias in descricao for alias in aliases)
-                
-                if marca_no_ocr and marca_no_produto:
-                    score += 35  # Peso alto para match de marca
-                    razoes.append(f"Marca: {marca_principal}")
-                    break
-            
-            # === 2. DETECÇÃO DE RECIPIENTE/EMBALAGEM (PESO ALTO) ===
-            # Usa recipiente inferido pelo volume OU a forma detectada pela visão
-            recipiente_usado = recipiente_inferido if recipiente_inferido else forma
-            if recipiente_usado:
-                aliases_forma = recipientes_aliases.get(recipiente_usado, [])
-                for alias in aliases_forma:
-                    if alias in descricao:
-                        score += 25  # Peso alto para recipiente
-                        if recipiente_usado == 'latao':
-                            razoes.append(f"Recipiente: LATÃO (473ml)")
-                        elif recipiente_usado == 'long neck':
-                            razoes.append(f"Recipiente: LONG NECK (330ml)")
-                        elif recipiente_usado == 'pet':
-                            razoes.append(f"Recipiente: PET")
-                        else:
-                            razoes.append(f"Recipiente: {recipiente_usado.upper()}")
-                        break
-            
-            # === 3. DETECÇÃO DE VOLUME (PESO MÉDIO-ALTO) ===
-            for vol in volumes_conhecidos:
-                vol_variantes = [vol, vol.replace('ML', ' ML'), vol.replace('L', ' L'), vol.replace('LT', ' LT')]
-                vol_no_ocr = any(v in texto_ocr_str for v in vol_variantes)
-                vol_no_produto = any(v in descricao for v in vol_variantes)
-                
-                if vol_no_ocr and vol_no_produto:
-                    score += 30  # Aumentado - volume é muito importante
-                    razoes.append(f"Volume: {vol}")
-                    break
-            
-            # === 4. DETECÇÃO DE TIPO DE CERVEJA (PESO MÉDIO) ===
-            for tipo_principal, aliases in tipos_cerveja_aliases.items():
-                tipo_no_ocr = any(alias in texto_ocr_str for alias in aliases)
-                tipo_no_produto = any(alias in descricao for alias in aliases)
-                
-                if tipo_no_ocr and tipo_no_produto:
-                    score += 20
-                    razoes.append(f"Tipo Cerveja: {tipo_principal}")
-                    break
-            
-            # === 5. DETECÇÃO DE TIPO DE REFRIGERANTE (PESO MÉDIO) ===
-            for tipo_principal, aliases in tipos_refri_aliases.items():
-                tipo_no_ocr = any(alias in texto_ocr_str for alias in aliases)
-                tipo_no_produto = any(alias in descricao for alias in aliases)
-                
-                if tipo_no_ocr and tipo_no_produto:
-                    score += 20
-                    razoes.append(f"Tipo Refri: {tipo_principal}")
-                    break
-            
-            # === 6. PALAVRAS OCR INDIVIDUAIS (PESO MÉDIO) ===
-            palavras_match = 0
-            for palavra in texto_ocr:
-                if len(palavra) >= 3:  # Ignorar palavras muito curtas
-                    # Match exato
-                    if palavra in descricao:
-                        palavras_match += 1
-                        score += 8
-                    # Match parcial (palavra contida na descrição)
-                    elif any(palavra in p or p in palavra for p in descricao.split()):
-                        palavras_match += 0.5
-                        score += 4
-            
-            if palavras_match > 0:
-                razoes.append(f"Palavras: {int(palavras_match)} matches")
-            
-            # === 7. SIMILARIDADE GERAL (FALLBACK) ===
-            if score < 20:  # Se não teve bons matches, tentar similaridade geral
-                similaridade = calcular_similaridade(texto_ocr_str, descricao)
-                if similaridade > 30:
-                    score += similaridade * 0.3
-                    razoes.append(f"Similaridade: {similaridade:.0f}%")
-            
-            # === 8. BONUS: Long Neck (recipiente específico) ===
-            if ('LONG' in texto_ocr_str or 'NECK' in texto_ocr_str) and ('LONG' in descricao or 'NECK' in descricao):
-                score += 10
-                if 'LONG NECK' not in ' '.join(razoes):
-                    razoes.append("Recipiente: LONG NECK")
-            
-            # Atualizar melhor match
-            if score > melhor_score:
-                melhor_score = score
-                melhor_match = produto.id
-                melhor_razao = " | ".join(razoes[:5]) if razoes else "Baixa correspondência"
+        if produtos_db is None:
+            indice = get_indice_produtos()
+        else:
+            indice = IndiceProdutos(produtos_db)
         
-        # Normalizar confiança (0-100%)
-        # Score máximo teórico: 35 (marca) + 25 (recipiente) + 30 (volume) + 20 (tipo cerveja) + 20 (tipo refri) + 24 (palavras) = ~154
-        confianca = min(95, (melhor_score / 100) * 100) if melhor_score > 0 else 0
+        melhor_match, confianca, melhor_razao = indice.sugerir(texto_ocr, forma)
         
-        print(f"🎯 Melhor match: score={melhor_score}, confianca={confianca:.1f}%, razao={melhor_razao}")
+        print(f"🎯 Melhor match: produto={melhor_match}, confianca={confianca:.1f}%, razao={melhor_razao}")
         
-        return (melhor_match, round(confianca, 2), melhor_razao)
+        return (melhor_match, confianca, melhor_razao)
         
     except Exception as e:
         print(f"Erro ao sugerir produto: {e}")
@@ -1023,6 +642,9 @@ def detectar_produtos_api(request):
     if 'image' not in request.FILES:
         return JsonResponse({'error': 'Nenhuma imagem enviada'}, status=400)
     
+    # Orçamento de tempo da requisição (YOLO + análise dos bboxes)
+    prazo = time.monotonic() + TIMEOUT_ANALISE
+    
     try:
         imagem = request.FILES['image']
         
@@ -1039,65 +661,79 @@ def detectar_produtos_api(request):
         model = get_yolo_model()
         results = model(img, conf=0.25, iou=0.45)
         
-        # Carregar produtos do banco para sugestão
-        produtos_db = list(ProdutoMae.objects.all())
-        
         # Extrair bboxes com análise inteligente
-        bboxes = []
+        caixas = []
         for result in results:
             boxes = result.boxes
             for box in boxes:
-                # Converter para formato normalizado (x_center, y_center, width, height)
                 x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
                 x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-                
-                # Extrair região do bbox
-                bbox_img = img[y1:y2, x1:x2]
-                
-                # 🔥 PRIORIDADE 1: Detectar código de barras
-                codigo_barras, tipo_barcode = detectar_codigo_barras(bbox_img)
-                
-                # Análise de forma
-                forma = classificar_forma_produto(bbox_img)
-                
-                # OCR na região
-                texto_ocr = extrair_texto_ocr(bbox_img)
+                confidence = float(box.conf[0].cpu().numpy())
+                caixas.append((x1, y1, x2, y2, confidence))
+        
+        # Extrair região de cada bbox
+        recortes = [img[y1:y2, x1:x2] for x1, y1, x2, y2, _ in caixas]
+        
+        # Código de barras + forma + OCR em paralelo (ordem preservada)
+        analises, parcial = analisar_recortes(recortes, prazo=prazo)
+        
+        # Todos os códigos de barras da foto resolvidos em UMA query
+        get_resolvedor_barcode().resolver_varios(
+            a['codigo_barras'] for a in analises if a and a.get('codigo_barras')
+        )
+        
+        bboxes = []
+        for (x1, y1, x2, y2, confidence), analise in zip(caixas, analises):
+            analisado = analise is not None and 'erro' not in analise
+            if not analisado:
+                # Sem tempo ou falha na análise: devolve só a caixa do YOLO
+                codigo_barras = tipo_barcode = forma = None
+                texto_ocr = []
+                if analise is None:
+                    razao = "Análise não concluída (tempo esgotado)"
+                else:
+                    razao = f"Análise falhou ({analise['erro']})"
+                produto_sugerido_id, confianca_sugestao = None, 0
+            else:
+                codigo_barras = analise['codigo_barras']
+                tipo_barcode = analise['tipo_barcode']
+                forma = analise['forma']
+                texto_ocr = analise['ocr_texto']
                 
                 # Sugestão de produto (com código de barras = 99.99% confiança)
                 produto_sugerido_id, confianca_sugestao, razao = sugerir_produto_ia(
-                    texto_ocr, forma, produtos_db, codigo_barras=codigo_barras
+                    texto_ocr, forma, codigo_barras=codigo_barras
                 )
-                
-                # Calcular centro e dimensões normalizadas
-                x_center = ((x1 + x2) / 2) / width
-                y_center = ((y1 + y2) / 2) / height
-                bbox_width = (x2 - x1) / width
-                bbox_height = (y2 - y1) / height
-                
-                confidence = float(box.conf[0].cpu().numpy())
-                
-                bbox_data = {
-                    'x': float(x_center),
-                    'y': float(y_center),
-                    'width': float(bbox_width),
-                    'height': float(bbox_height),
-                    'confidence': confidence,
-                    'codigo_barras': codigo_barras,  # 🔥 NOVO: Código de barras detectado
-                    'tipo_barcode': tipo_barcode,    # Tipo (EAN13, CODE128, etc.)
-                    'forma': forma,
-                    'ocr_texto': texto_ocr,
-                    'produto_sugerido_id': produto_sugerido_id,
-                    'confianca_sugestao': confianca_sugestao,
-                    'razao_sugestao': razao
-                }
-                
-                bboxes.append(bbox_data)
+            
+            # Converter para formato normalizado (x_center, y_center, width, height)
+            x_center = ((x1 + x2) / 2) / width
+            y_center = ((y1 + y2) / 2) / height
+            bbox_width = (x2 - x1) / width
+            bbox_height = (y2 - y1) / height
+            
+            bbox_data = {
+                'x': float(x_center),
+                'y': float(y_center),
+                'width': float(bbox_width),
+                'height': float(bbox_height),
+                'confidence': confidence,
+                'codigo_barras': codigo_barras,  # 🔥 NOVO: Código de barras detectado
+                'tipo_barcode': tipo_barcode,    # Tipo (EAN13, CODE128, etc.)
+                'forma': forma,
+                'ocr_texto': texto_ocr,
+                'produto_sugerido_id': produto_sugerido_id,
+                'confianca_sugestao': confianca_sugestao,
+                'razao_sugestao': razao,
+                'analisado': analisado
+            }
+            
+            bboxes.append(bbox_data)
         
         return JsonResponse({
             'success': True,
             'bboxes': bboxes,
             'count': len(bboxes),
-            'analise_completa': True
+            'analise_completa': not parcial
         })
         
     except Exception as e:
@@ -1106,6 +742,35 @@ def detectar_produtos_api(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
+@login_required
+def ocr_estatisticas_api(request):
+    """Taxa de acerto por variante de pré-processamento do OCR (GET) / zerar (POST)"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Acesso negado'}, status=403)
+    
+    motor = get_motor_ocr()
+    if request.method == 'POST':
+        motor.resetar_estatisticas()
+    
+    return JsonResponse(motor.estatisticas())
+
+
+@login_required
+def modelos_status_api(request):
+    """Modelos YOLO carregados: tempo de carga, memória, versão (GET) / forçar recarga (POST)"""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Acesso negado'}, status=403)
+    
+    registro = get_registro_modelos()
+    if request.method == 'POST':
+        try:
+            registro.recarregar()
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+    
+    return JsonResponse(registro.estatisticas())
+
+
 @login_required
 def revisar_desconhecidos(request):
     """Interface para revisar imagens sem produto associado correto COM BBOX"""
@@ -1276,8 +941,6 @@ def processar_automatico_api(request):
         pasta_files = data.get('pasta_files', [])
 
         resultados = []
-        produtos_db = list(ProdutoMae.objects.all())
-        produtos_ids = set(p.id for p in produtos_db)
 
         imagens = []
         # Se pasta_files foi enviado, processa arquivos locais
@@ -1321,10 +984,10 @@ def processar_automatico_api(request):
                         texto_ocr = extrair_texto_ocr(bbox_img)
                         # Sugestão (sempre do banco)
                         produto_id, confianca, razao = sugerir_produto_ia(
-                            texto_ocr, forma, produtos_db, codigo_barras=codigo_barras
+                            texto_ocr, forma, codigo_barras=codigo_barras
                         )
                         # Garantir que só produtos do banco sejam sugeridos
-                        if produto_id not in produtos_ids:
+                        if produto_id is None:
                             produto_id = ''
                             razao += ' [Produto não cadastrado]'
                         # Determinar método de detecção
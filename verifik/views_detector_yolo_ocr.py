@@ -20,6 +20,7 @@ import numpy as np
 try:
     from ultralytics import YOLO
     import easyocr
+    from .services.registro_modelos import obter_modelo_yolo
     LIBS_AVAILABLE = True
 except ImportError as e:
     print(f"⚠️ Bibliotecas não encontradas: {e}")
@@ -31,7 +32,7 @@ class DetectorYOLOOCR:
     """
     
     def __init__(self):
-        self.modelo_yolo = None
+        self._caminhos_yolo = None  # definido em inicializar_modelos()
         self.reader_ocr = None
         self.camera = None
         self.detectando = False
@@ -54,15 +55,9 @@ class DetectorYOLOOCR:
         try:
             print("🔥 Carregando modelo YOLOv8...")
             
-            # Tentar carregar modelo personalizado primeiro
-            modelo_personalizado = Path(__file__).parent / "verifik_yolov8.pt"
-            if modelo_personalizado.exists():
-                self.modelo_yolo = YOLO(str(modelo_personalizado))
-                print(f"✅ Modelo personalizado carregado: {modelo_personalizado}")
-            else:
-                # Fallback para modelo pré-treinado
-                self.modelo_yolo = YOLO('yolov8n.pt')
-                print("✅ Modelo YOLOv8n padrão carregado")
+            # Modelo personalizado primeiro; fallback para o YOLOv8n pré-treinado
+            self._caminhos_yolo = [Path(__file__).parent / "verifik_yolov8.pt"]
+            print(f"✅ Modelo carregado: {self.modelo_yolo.ckpt_path}")
             
             print("📖 Inicializando EasyOCR...")
             self.reader_ocr = easyocr.Reader(['pt', 'en'], gpu=False)
@@ -72,6 +67,13 @@ class DetectorYOLOOCR:
             print(f"❌ Erro ao inicializar modelos: {e}")
             raise e
     
+    @property
+    def modelo_yolo(self):
+        """Instância do registro de modelos (compartilhada e atualizada a quente)"""
+        if self._caminhos_yolo is None:
+            return None
+        return obter_modelo_yolo(self._caminhos_yolo, fallback='yolov8n.pt')
+    
     def iniciar_camera(self):
         """Inicia a câmera"""
         try:
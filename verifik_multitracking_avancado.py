@@ -24,6 +24,11 @@ import uuid
 from collections import defaultdict, deque
 import math
 
+from cameras.fonte_frames import FonteFramesIntelbras
+from verifik.services.agendador_deteccao import AgendadorDeteccao
+from verifik.services.rastreamento import NucleoRastreamento
+from verifik.services.registro_modelos import get_registro_modelos
+
 # Imports para detecção e rastreamento
 try:
     from ultralytics import YOLO
@@ -102,6 +107,11 @@ class TrackedObject:
         if len(self.historico_posicoes) >= 5:
             self.confirmado = True
     
+    def mover(self, bbox):
+        """Move a caixa sem nova detecção (frame propagado pelo agendador)"""
+        self.bbox = bbox
+        self.historico_posicoes.append(self._centro_bbox(bbox))
+    
     def perdeu_deteccao(self):
         """Marca que objeto não foi detectado neste frame"""
         self.frames_sem_deteccao += 1
@@ -162,85 +172,71 @@ class TrackedObject:
         self.passou_pela_camera = False
 
 class MultiObjectTracker:
-    """Rastreador de múltiplos objetos"""
+    """Rastreador de múltiplos objetos (associação pelo NucleoRastreamento)"""
     def __init__(self, max_distance=100):
         self.objetos_rastreados = {}
-        self.proximo_id = 1
-        self.max_distance = max_distance
+        self.nucleo = NucleoRastreamento(max_distancia=max_distance, max_perdidos=30)
     
-    def calcular_distancia(self, bbox1, bbox2):
-        """Calcula distância entre duas bboxes (centros)"""
-        def centro(bbox):
-            x1, y1, x2, y2 = bbox
-            return ((x1 + x2) / 2, (y1 + y2) / 2)
-        
-        c1 = centro(bbox1)
-        c2 = centro(bbox2)
-        
-        return math.sqrt((c1[0] - c2[0])**2 + (c1[1] - c2[1])**2)
+    @property
+    def max_distance(self):
+        return self.nucleo.max_distancia
+    
+    @max_distance.setter
+    def max_distance(self, valor):
+        self.nucleo.max_distancia = valor
     
     def atualizar(self, deteccoes):
         """
         Atualiza rastreamento com novas detecções
         deteccoes: lista de dicts com 'bbox', 'classe', 'confianca', 'tipo'
         """
-        # Marcar todos os objetos como perdidos inicialmente
-        for obj in self.objetos_rastreados.values():
-            obj.perdeu_deteccao()
-        
-        # Associar detecções com objetos existentes
-        deteccoes_nao_associadas = []
-        
-        for deteccao in deteccoes:
-            melhor_obj = None
-            menor_distancia = float('inf')
-            
-            # Encontrar objeto mais próximo da mesma classe
-            for obj_id, obj in self.objetos_rastreados.items():
-                if obj.classe == deteccao['classe']:
-                    distancia = self.calcular_distancia(obj.bbox, deteccao['bbox'])
-                    
-                    if distancia < self.max_distance and distancia < menor_distancia:
-                        melhor_obj = obj
-                        menor_distancia = distancia
+        # Matriz de custo + atribuição ótima para todas as detecções de uma vez
+        ids, removidos = self.nucleo.atualizar(
+            [deteccao['bbox'] for deteccao in deteccoes],
+            [deteccao['classe'] for deteccao in deteccoes],
+        )
+        
+        associados = set()
+        for deteccao, id_num in zip(deteccoes, ids.tolist()):
+            obj_id = f"obj_{id_num:04d}"
+            associados.add(obj_id)
+            texto_extra = deteccao.get('texto_adicional', '')
             
-            # Se encontrou objeto próximo, atualizar
-            if melhor_obj:
-                texto_extra = deteccao.get('texto_adicional', '')
-                melhor_obj.atualizar(deteccao['bbox'], deteccao['confianca'], texto_extra)
+            objeto = self.objetos_rastreados.get(obj_id)
+            if objeto:
+                objeto.atualizar(deteccao['bbox'], deteccao['confianca'], texto_extra)
             else:
-                # Nova detecção - adicionar à lista de não associadas
-                deteccoes_nao_associadas.append(deteccao)
-        
-        # Criar novos objetos para detecções não associadas
-        for deteccao in deteccoes_nao_associadas:
-            obj_id = f"obj_{self.proximo_id:04d}"
-            self.proximo_id += 1
-            
-            novo_objeto = TrackedObject(
-                obj_id, 
-                deteccao['bbox'], 
-                deteccao['classe'], 
-                deteccao['confianca'],
-                deteccao['tipo']
-            )
-            
-            if 'texto_adicional' in deteccao:
-                novo_objeto.texto_adicional = deteccao['texto_adicional']
-            
-            self.objetos_rastreados[obj_id] = novo_objeto
-        
-        # Remover objetos que perderam rastreamento
-        objetos_para_remover = []
+                novo_objeto = TrackedObject(
+                    obj_id, 
+                    deteccao['bbox'], 
+                    deteccao['classe'], 
+                    deteccao['confianca'],
+                    deteccao['tipo']
+                )
+                novo_objeto.texto_adicional = texto_extra
+                self.objetos_rastreados[obj_id] = novo_objeto
+        
+        # Objetos sem detecção neste frame
         for obj_id, obj in self.objetos_rastreados.items():
-            if obj.deve_remover():
-                objetos_para_remover.append(obj_id)
+            if obj_id not in associados:
+                obj.perdeu_deteccao()
         
-        for obj_id in objetos_para_remover:
-            del self.objetos_rastreados[obj_id]
+        # Remover objetos que perderam rastreamento
+        for id_num in removidos.tolist():
+            self.objetos_rastreados.pop(f"obj_{id_num:04d}", None)
         
         return list(self.objetos_rastreados.values())
     
+    def propagar(self, agendador, img_cv):
+        """Move os objetos para o frame atual sem rodar o detector (fluxo óptico)"""
+        if len(self.nucleo):
+            self.nucleo.bboxes = agendador.propagar(img_cv, self.nucleo.ids, self.nucleo.bboxes)
+            for id_num, bbox in zip(self.nucleo.ids.tolist(), self.nucleo.bboxes.astype(int).tolist()):
+                objeto = self.objetos_rastreados.get(f"obj_{id_num:04d}")
+                if objeto:
+                    objeto.mover(bbox)
+        return list(self.objetos_rastreados.values())
+    
     def obter_objetos_confirmados(self):
         """Retorna apenas objetos confirmados (detectados por vários frames)"""
         return [obj for obj in self.objetos_rastreados.values() if obj.confirmado]
@@ -248,7 +244,7 @@ class MultiObjectTracker:
     def limpar(self):
         """Limpa todos os objetos rastreados"""
         self.objetos_rastreados.clear()
-        self.proximo_id = 1
+        self.nucleo.limpar()
 
 class VerifiKMultiTracking:
     def __init__(self, root):
@@ -266,6 +262,9 @@ class VerifiKMultiTracking:
         self.snapshot_url = f"http://{self.camera_ip}/cgi-bin/snapshot.cgi"
         self.config_url = f"http://{self.camera_ip}/cgi-bin/configManager.cgi"
         
+        # Captura contínua (RTSP/MJPEG ou snapshot keep-alive) em thread própria
+        self.fonte = FonteFramesIntelbras(self.camera_ip, self.camera_user, self.camera_pass)
+        
         # Estado do sistema
         self.streaming = False
         self.rastreamento_ativo = False
@@ -277,6 +276,11 @@ class VerifiKMultiTracking:
         # Rastreador de objetos
         self.tracker = MultiObjectTracker(max_distance=80)
         
+        # Agendador do detector (por câmera): YOLO + barcode a cada N frames,
+        # antes se houver movimento brusco ou o fluxo óptico perder caixas
+        self.config_agendador = {'intervalo': 4, 'limiar_movimento': 8.0, 'limiar_incerteza': 0.3}
+        self.agendador = AgendadorDeteccao(**self.config_agendador)
+        
         # Controles da câmera
         self.brilho_atual = 50
         self.exposicao_atual = 50
@@ -536,7 +540,7 @@ class VerifiKMultiTracking:
         for path in modelo_paths:
             if os.path.exists(path):
                 try:
-                    self.modelo_yolo = YOLO(path)
+                    self.modelo_yolo = get_registro_modelos().obter(path)
                     print(f"✅ Modelo YOLO carregado: {path}")
                     return True
                 except Exception as e:
@@ -574,11 +578,16 @@ class VerifiKMultiTracking:
         self.btn_stream.config(text="⏸️ Pausar Stream")
         
         def streaming_thread():
+            self.fonte.iniciar()
+            ultimo_seq = 0
             while self.streaming:
                 try:
-                    frame_data = self.capturar_frame_camera()
+                    # Frame mais recente da fonte (sem esperar a rede)
+                    frame = self.fonte.ler(apos=ultimo_seq, timeout=2)
+                    frame_data = frame.jpeg if frame else None
                     
                     if frame_data:
+                        ultimo_seq = frame.seq
                         frame_processado = self.processar_frame_com_tracking(frame_data)
                         self.root.after(0, self.atualizar_display, frame_processado)
                         
@@ -594,13 +603,12 @@ class VerifiKMultiTracking:
                         self.root.after(0, lambda: self.status_conexao.config(text="🟢 Stream Ativo"))
                     else:
                         self.root.after(0, lambda: self.status_conexao.config(text="🔴 Erro Conexão"))
-                        time.sleep(2)
-                    
-                    time.sleep(0.2)  # ~5 FPS para melhor tracking
                     
                 except Exception as e:
                     print(f"Erro no streaming: {e}")
                     time.sleep(3)
+            
+            self.fonte.parar()
         
         thread = threading.Thread(target=streaming_thread, daemon=True)
         thread.start()
@@ -621,23 +629,22 @@ class VerifiKMultiTracking:
             self.btn_tracking.config(text="🎯 Ativar Tracking")
             self.status_tracking.config(text="⚪ Tracking: Inativo")
             self.tracker.limpar()
+            self.agendador.resetar()
     
     def limpar_rastreamento(self):
         """Limpa todos os objetos rastreados"""
         self.tracker.limpar()
+        self.agendador.resetar()
         self.objects_listbox.delete(0, tk.END)
         self.details_text.delete(1.0, tk.END)
         print("🧹 Rastreamento limpo")
     
     def capturar_frame_camera(self):
-        """Captura frame da câmera"""
-        try:
-            response = requests.get(self.snapshot_url, auth=self.auth, timeout=3)
-            if response.status_code == 200:
-                return response.content
-        except Exception:
-            pass
-        return None
+        """Captura frame da câmera (último frame do stream, ou snapshot keep-alive)"""
+        if self.fonte.ativa:
+            frame = self.fonte.ler(timeout=3)
+            return frame.jpeg if frame else None
+        return self.fonte.capturar_snapshot()
     
     def processar_frame_com_tracking(self, frame_data):
         """Processa frame com rastreamento de múltiplos objetos"""
@@ -649,16 +656,25 @@ class VerifiKMultiTracking:
             nparr = np.frombuffer(frame_data, np.uint8)
             img_cv = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
             
-            # Detectar objetos com YOLO
-            deteccoes = self.detectar_objetos_yolo(img_cv)
-            
-            # Detectar códigos de barras se habilitado
-            if self.usar_barcode:
-                deteccoes_barcode = self.detectar_barcodes_basico(img_cv)
-                deteccoes.extend(deteccoes_barcode)
-            
-            # Atualizar rastreamento
-            objetos_rastreados = self.tracker.atualizar(deteccoes)
+            # YOLO só nos frames escolhidos pelo agendador; nos demais as
+            # caixas seguem o fluxo óptico
+            detectar, _ = self.agendador.decidir(img_cv)
+            if detectar:
+                inicio = time.perf_counter()
+                deteccoes = self.detectar_objetos_yolo(img_cv)
+                
+                # Códigos de barras uma vez por objeto novo (ou com a cena vazia),
+                # não a cada frame
+                pendentes = self.agendador.identificar_pendentes(self.tracker.nucleo.ids)
+                if self.usar_barcode and (pendentes or not len(self.tracker.nucleo)):
+                    deteccoes_barcode = self.detectar_barcodes_basico(img_cv)
+                    deteccoes.extend(deteccoes_barcode)
+                
+                # Atualizar rastreamento
+                objetos_rastreados = self.tracker.atualizar(deteccoes)
+                self.agendador.registrar_deteccao(img_cv, time.perf_counter() - inicio, self.tracker.nucleo.ids)
+            else:
+                objetos_rastreados = self.tracker.propagar(self.agendador, img_cv)
             
             # Verificar passagem pela zona central
             altura, largura = img_cv.shape[:2]
@@ -947,7 +963,13 @@ Informações Adicionais:
         
         # Atualizar labels
         self.fps_label.config(text=f"FPS: {self.fps_atual:.1f}")
-        self.stats_frames.config(text=f"Frames: {self.total_frames}")
+        texto_frames = f"Frames: {self.total_frames}"
+        stats_agendador = self.agendador.estatisticas()
+        if stats_agendador['frames']:
+            # Quanto do streaming passou pelo YOLO e quanto tempo de detector foi poupado
+            texto_frames += (f" (YOLO em {stats_agendador['fracao_detectada']:.0%}, "
+                             f"-{stats_agendador['tempo_economizado']:.0f}s)")
+        self.stats_frames.config(text=texto_frames)
         self.stats_objetos_ativos.config(text=f"Objetos Ativos: {objetos_ativos}")
         self.stats_total_detectado.config(text=f"Total Detectado: {self.objetos_detectados_total}")
         
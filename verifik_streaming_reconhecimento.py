@@ -6,19 +6,17 @@ Sistema integrado: Câmera Intelbras + YOLO + OCR para detecção automática
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import requests
-from requests.auth import HTTPDigestAuth
 from PIL import Image, ImageTk, ImageDraw, ImageFont
 import sqlite3
 from datetime import datetime
 import os
-import io
 import threading
 import time
 import cv2
-import numpy as np
 from pathlib import Path
 
+from cameras.fonte_frames import FonteFramesIntelbras
+
 # Imports para detecção
 try:
     from ultralytics import YOLO
@@ -42,19 +40,14 @@ class VerifiKStreamingReconhecimento:
         self.camera_ip = "192.168.68.108"
         self.camera_user = "admin"
         self.camera_pass = "C@sa3863"
-        self.auth = HTTPDigestAuth(self.camera_user, self.camera_pass)
         
-        # URLs de captura (funciona com Digest Auth)
-        self.snapshot_urls = [
-            f"http://{self.camera_ip}/cgi-bin/snapshot.cgi",
-            f"http://{self.camera_ip}/cgi-bin/snapshot.cgi?channel=1&subtype=0",
-            f"http://{self.camera_ip}/cgi-bin/snapshot.cgi?channel=1&subtype=1"
-        ]
+        # Captura contínua (RTSP/MJPEG ou snapshot keep-alive) em thread própria
+        self.fonte = FonteFramesIntelbras(self.camera_ip, self.camera_user, self.camera_pass)
         
         # Variáveis de controle
         self.streaming = False
         self.reconhecimento_ativo = False
-        self.current_frame = None
+        self.current_frame = None  # Frame da fonte (imagem BGR; JPEG só ao salvar)
         self.deteccoes_atuais = []
         self.produtos_detectados = []
         self.produtos_database = []
@@ -302,17 +295,20 @@ class VerifiKStreamingReconhecimento:
         self.btn_stream.config(text="⏸️ Pausar Stream")
         
         def streaming_thread():
+            self.fonte.iniciar()
+            ultimo_seq = 0
             while self.streaming:
                 try:
-                    # Tentar capturar frame
-                    frame_data = self.capturar_frame_camera()
+                    # Frame mais recente da fonte (sem esperar a rede)
+                    frame = self.fonte.ler(apos=ultimo_seq, timeout=2)
                     
-                    if frame_data:
-                        # Processar frame
-                        frame_processado = self.processar_frame(frame_data)
+                    if frame is not None:
+                        ultimo_seq = frame.seq
+                        # Processar a imagem já decodificada (sem passar por JPEG)
+                        frame_processado = self.processar_frame(frame.imagem)
                         
                         # Atualizar UI na thread principal
-                        self.root.after(0, self.atualizar_display, frame_processado, frame_data)
+                        self.root.after(0, self.atualizar_display, frame_processado, frame)
                         
                         # Controle de FPS
                         self.total_frames += 1
@@ -327,42 +323,27 @@ class VerifiKStreamingReconhecimento:
                     
                     else:
                         self.root.after(0, lambda: self.status_conexao.config(text="🔴 Erro Conexão"))
-                        time.sleep(2)
-                    
-                    time.sleep(0.5)  # ~2 FPS
                     
                 except Exception as e:
                     print(f"Erro no streaming: {e}")
                     time.sleep(3)
+            
+            self.fonte.parar()
         
         # Iniciar thread
         thread = threading.Thread(target=streaming_thread, daemon=True)
         thread.start()
     
     def capturar_frame_camera(self):
-        """Captura um frame da câmera Intelbras"""
-        for url in self.snapshot_urls:
-            try:
-                response = requests.get(url, auth=self.auth, timeout=8)
-                
-                if response.status_code == 200 and len(response.content) > 5000:
-                    return response.content
-                    
-            except Exception:
-                continue
-        
-        return None
+        """Captura um frame da câmera Intelbras (sessão keep-alive, última URL que funcionou)"""
+        return self.fonte.capturar_snapshot()
     
-    def processar_frame(self, frame_data):
-        """Processa frame para reconhecimento se ativo"""
+    def processar_frame(self, img_cv):
+        """Processa frame (imagem BGR) para reconhecimento se ativo"""
         if not self.reconhecimento_ativo or not self.modelo_yolo:
-            return frame_data
+            return img_cv
         
         try:
-            # Converter para OpenCV
-            nparr = np.frombuffer(frame_data, np.uint8)
-            img_cv = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
             # Fazer predição YOLO
             results = self.modelo_yolo.predict(
                 img_cv,
@@ -402,16 +383,12 @@ class VerifiKStreamingReconhecimento:
             self.deteccoes_atuais = deteccoes_frame
             self.total_deteccoes += len(deteccoes_frame)
             
-            # Desenhar detecções no frame
-            img_com_deteccoes = self.desenhar_deteccoes(img_cv, deteccoes_frame)
-            
-            # Converter de volta para bytes
-            _, buffer = cv2.imencode('.jpg', img_com_deteccoes)
-            return buffer.tobytes()
+            # Desenhar detecções no frame (cópia: a imagem da fonte fica intacta)
+            return self.desenhar_deteccoes(img_cv, deteccoes_frame)
             
         except Exception as e:
             print(f"Erro no processamento: {e}")
-            return frame_data
+            return img_cv
     
     def extrair_texto_regiao(self, img_cv, bbox):
         """Extrai texto de uma região usando OCR"""
@@ -480,8 +457,8 @@ class VerifiKStreamingReconhecimento:
     def atualizar_display(self, frame_processado, frame_original):
         """Atualiza display com frame processado"""
         try:
-            # Converter para PIL
-            image = Image.open(io.BytesIO(frame_processado))
+            # Converter para PIL (BGR → RGB)
+            image = Image.fromarray(cv2.cvtColor(frame_processado, cv2.COLOR_BGR2RGB))
             image.thumbnail((800, 600), Image.Resampling.LANCZOS)
             photo = ImageTk.PhotoImage(image)
             
@@ -594,7 +571,7 @@ class VerifiKStreamingReconhecimento:
     
     def salvar_frame_produto(self, deteccao):
         """Salva frame com produto detectado"""
-        if not self.current_frame:
+        if self.current_frame is None:
             return None
         
         try:
@@ -605,7 +582,7 @@ class VerifiKStreamingReconhecimento:
             filepath = os.path.join("produtos_detectados_ia", filename)
             
             with open(filepath, 'wb') as f:
-                f.write(self.current_frame)
+                f.write(self.current_frame.jpeg)
             
             return filepath
             
@@ -615,7 +592,7 @@ class VerifiKStreamingReconhecimento:
     
     def capturar_manual(self):
         """Captura manual sem reconhecimento"""
-        if not self.current_frame:
+        if self.current_frame is None:
             messagebox.showwarning("Aviso", "Nenhum frame disponível!")
             return
         
@@ -627,7 +604,7 @@ class VerifiKStreamingReconhecimento:
             filepath = os.path.join("capturas_manuais", filename)
             
             with open(filepath, 'wb') as f:
-                f.write(self.current_frame)
+                f.write(self.current_frame.jpeg)
             
             messagebox.showinfo("Captura", f"Foto salva: {filename}")
             
@@ -15,6 +15,12 @@ import cv2
 import numpy as np
 import os
 
+from cameras.fonte_frames import FonteFramesIntelbras
+from verifik.services.agendador_deteccao import AgendadorDeteccao
+from verifik.services.rastreamento import NucleoRastreamento
+from verifik.services.registro_modelos import get_registro_modelos
+from verifik.services.resolvedor_barcode import ResolvedorCodigoBarras
+
 # Teste de YOLO e OCR
 try:
     from ultralytics import YOLO
@@ -52,6 +58,12 @@ except ImportError as e:
     BARCODE_DISPONIVEL = False
     print(f"❌ Dependências não encontradas: {e}")
 
+# Campos que o OCR/código de barras acrescenta a uma detecção e que o
+# track carrega para os frames seguintes
+CAMPOS_IDENTIFICACAO = ('classe', 'nome', 'fonte', 'codigo_barras', 'tipo_barcode',
+                        'produto_completo', 'marca_detectada')
+FONTES_IDENTIFICACAO = ('BARCODE', 'BARCODE-OCR', 'OCR+BASE')
+
 class ProductTracker:
     """Classe para rastrear um produto individual"""
     def __init__(self, track_id, deteccao_inicial, timestamp):
@@ -89,6 +101,9 @@ class ProductTracker:
         # Cor de rastreamento
         self.cor_track = None
         
+        # Identificação por OCR/código de barras (feita uma vez por track)
+        self.identificacao = {}
+        
         # Características do produto
         self.caracteristicas = {
             'area_media': 0,
@@ -122,6 +137,13 @@ class ProductTracker:
         # Atualizar características
         self.atualizar_caracteristicas()
     
+    def mover(self, bbox, timestamp):
+        """Move o track sem nova detecção (frame propagado pelo agendador)"""
+        self.bbox_atual = bbox
+        self.centro_atual = self.calcular_centro(bbox)
+        self.historico_centros.append(self.centro_atual)
+        self.timestamp_ultima_atualizacao = timestamp
+    
     def atualizar_caracteristicas(self):
         """Atualiza características do produto rastreado"""
         if len(self.historico_bbox) < 2:
@@ -222,6 +244,9 @@ class VerifiKTesteProdutos:
         self.auth = HTTPDigestAuth(self.camera_user, self.camera_pass)
         self.snapshot_url = f"http://{self.camera_ip}/cgi-bin/snapshot.cgi"
         
+        # Captura contínua (RTSP/MJPEG ou snapshot keep-alive) em thread própria
+        self.fonte = FonteFramesIntelbras(self.camera_ip, self.camera_user, self.camera_pass)
+        
         # Estado do sistema
         self.streaming = False
         self.deteccao_ativa = False
@@ -353,7 +378,10 @@ class VerifiKTesteProdutos:
         
         # CONFIGURAÇÕES DE CÓDIGO DE BARRAS
         self.usar_barcode = True
-        self.barcode_cache = {}  # Cache de códigos já processados
+        # Cache LRU/TTL de códigos (inclusive desconhecidos) + busca em lote por frame
+        self.resolvedor_barcode = ResolvedorCodigoBarras(
+            self.buscar_produtos_lote, max_itens=5000, ttl=3600, ttl_negativo=60
+        )
         self.produtos_nao_treinados = []  # Produtos encontrados por código de barras
         
         # BIBLIOTECAS EXTERNAS DE VAREJO
@@ -366,7 +394,6 @@ class VerifiKTesteProdutos:
         # SISTEMA MOT (MULTI-OBJECT TRACKING) AVANÇADO
         self.mot_ativo = True
         self.produtos_rastreados = {}  # {track_id: ProductTracker}
-        self.proximo_track_id = 1
         
         # SISTEMA DE MENSAGENS
         self.produtos_anunciados = set()  # Para evitar repetições
@@ -381,6 +408,14 @@ class VerifiKTesteProdutos:
         self.confianca_tracking_min = 0.4
         self.tempo_vida_track_max = 300  # segundos
         
+        # Associação track × detecção (matriz de custo + atribuição ótima);
+        # a classe não bloqueia a associação, produtos podem mudar de classe
+        self.nucleo_tracking = NucleoRastreamento(
+            max_distancia=self.max_distancia_tracking,
+            max_perdidos=self.frames_sem_deteccao_max,
+            usar_classe=False,
+        )
+        
         # MARCAÇÃO INTELIGENTE
         self.cores_tracking = [
             (255, 0, 0),    # Vermelho
@@ -395,6 +430,12 @@ class VerifiKTesteProdutos:
             (128, 128, 0)   # Olive
         ]
         
+        # AGENDADOR DO DETECTOR (por câmera): YOLO a cada N frames, caixas
+        # propagadas por fluxo óptico entre eles; OCR e código de barras só
+        # quando aparece um track novo
+        self.config_agendador = {'intervalo': 5, 'limiar_movimento': 8.0, 'limiar_incerteza': 0.3}
+        self.agendador = AgendadorDeteccao(**self.config_agendador)
+        
         # ESTATÍSTICAS DE RASTREAMENTO
         self.stats_mot = {
             'total_tracks': 0,
@@ -879,7 +920,7 @@ class VerifiKTesteProdutos:
         for modelo_path in modelos:
             if os.path.exists(modelo_path):
                 try:
-                    self.modelo_yolo = YOLO(modelo_path)
+                    self.modelo_yolo = get_registro_modelos().obter(modelo_path)
                     
                     # Mostrar informações sobre o modelo treinado
                     if hasattr(self.modelo_yolo, 'names') and self.modelo_yolo.names:
@@ -924,13 +965,16 @@ class VerifiKTesteProdutos:
     
     def streaming_thread(self):
         """Thread de streaming"""
+        self.fonte.iniciar()
+        ultimo_seq = 0
         while self.streaming:
             try:
-                # Capturar frame
-                response = requests.get(self.snapshot_url, auth=self.auth, timeout=3)
+                # Frame mais recente da fonte (sem esperar a rede)
+                frame = self.fonte.ler(apos=ultimo_seq, timeout=3)
                 
-                if response.status_code == 200:
-                    frame_data = response.content
+                if frame is not None:
+                    ultimo_seq = frame.seq
+                    frame_data = frame.jpeg
                     
                     # Processar se detecção ativa
                     if self.deteccao_ativa:
@@ -942,13 +986,13 @@ class VerifiKTesteProdutos:
                 else:
                     self.root.after(0, lambda: self.status_label.config(text="🔴 Erro de conexão"))
                 
-                time.sleep(0.5)  # 2 FPS
-                
             except Exception as e:
                 self.root.after(0, lambda: self.status_label.config(text=f"❌ Erro: {str(e)[:20]}"))
                 time.sleep(2)
+        
+        self.fonte.parar()
     
-    def processar_frame_hibrido(self, frame_data):
+    def processar_frame_hibrido(self, frame_data, forcar_deteccao=False):
         """Processa frame com YOLO + OCR + Base Treinada + Aprendizado"""
         try:
             # Converter para OpenCV
@@ -956,6 +1000,15 @@ class VerifiKTesteProdutos:
             img_cv = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
             altura_frame, largura_frame = img_cv.shape[:2]
             
+            # 0. AGENDADOR: fora dos frames de detecção os tracks seguem o fluxo óptico
+            detectar, _ = self.agendador.decidir(img_cv)
+            if self.mot_ativo and not (detectar or forcar_deteccao):
+                deteccoes_finais = self.propagar_tracks(img_cv)
+                img_resultado = self.desenhar_deteccoes_hibridas(img_cv, deteccoes_finais)
+                _, buffer = cv2.imencode('.jpg', img_resultado)
+                return buffer.tobytes()
+            
+            inicio_deteccao = time.perf_counter()
             deteccoes_finais = []
             
             # 1. DETECÇÃO YOLO (se disponível e habilitado)
@@ -964,17 +1017,24 @@ class VerifiKTesteProdutos:
                 deteccoes_yolo = self.detectar_com_yolo(img_cv)
                 print(f"🧠 YOLO detectou {len(deteccoes_yolo)} objetos")
             
+            # OCR e código de barras são caros: só rodam quando há track novo
+            # ainda não identificado (ou nenhum track), não a cada frame
+            identificar = (
+                forcar_deteccao or not self.mot_ativo or not self.produtos_rastreados
+                or bool(self.agendador.identificar_pendentes(self.produtos_rastreados.keys()))
+            )
+            
             # 2. RECONHECIMENTO OCR GLOBAL (se habilitado)
             texto_ocr_global = ""
             produtos_ocr = []
-            if self.usar_ocr:
+            if self.usar_ocr and identificar:
                 texto_ocr_global = self.extrair_texto_ocr(img_cv)
                 produtos_ocr = self.reconhecer_produtos_por_ocr(texto_ocr_global, img_cv)
                 print(f"🔍 OCR encontrou {len(produtos_ocr)} produtos")
             
             # 3. DETECÇÃO DE CÓDIGOS DE BARRAS (para produtos não treinados)
             produtos_barcode = []
-            if self.usar_barcode and BARCODE_DISPONIVEL:
+            if self.usar_barcode and BARCODE_DISPONIVEL and identificar:
                 produtos_barcode = self.detectar_produtos_por_barcode(img_cv)
                 print(f"📱 BARCODE encontrou {len(produtos_barcode)} produtos")
             
@@ -991,6 +1051,9 @@ class VerifiKTesteProdutos:
             # 7. APLICAR SISTEMA MOT (MULTI-OBJECT TRACKING)
             if self.mot_ativo:
                 deteccoes_finais = self.aplicar_mot(deteccoes_finais, img_cv)
+            self.agendador.registrar_deteccao(
+                img_cv, time.perf_counter() - inicio_deteccao, list(self.produtos_rastreados)
+            )
             
             # 8. ATUALIZAR LISTA DE PRODUTOS
             self.atualizar_produtos_detectados(deteccoes_finais)
@@ -1086,13 +1149,18 @@ class VerifiKTesteProdutos:
             gray = cv2.cvtColor(img_cv, cv2.COLOR_BGR2GRAY)
             barcodes = pyzbar.decode(gray)
             
+            # Todos os códigos do frame resolvidos de uma vez
+            produtos_por_codigo = self.obter_produtos_por_codigos(
+                barcode.data.decode('utf-8') for barcode in barcodes
+            )
+            
             for barcode in barcodes:
                 codigo_barras = barcode.data.decode('utf-8')
                 tipo_barcode = barcode.type
                 
                 print(f"📱 Código pyzbar: {codigo_barras} (Tipo: {tipo_barcode})")
                 
-                produto_info = self.obter_produto_por_codigo(codigo_barras)
+                produto_info = produtos_por_codigo.get(codigo_barras.strip())
                 if produto_info:
                     # Calcular bbox do código de barras
                     pontos = barcode.polygon
@@ -1142,11 +1210,12 @@ class VerifiKTesteProdutos:
             
             # Procurar padrões de código de barras
             codigos_encontrados = self.extrair_codigos_numericos(texto)
+            produtos_por_codigo = self.obter_produtos_por_codigos(codigos_encontrados)
             
             for codigo in codigos_encontrados:
                 print(f"📱 Código OCR: {codigo}")
                 
-                produto_info = self.obter_produto_por_codigo(codigo)
+                produto_info = produtos_por_codigo.get(codigo)
                 if produto_info:
                     altura_img, largura_img = img_cv.shape[:2]
                     
@@ -1195,125 +1264,100 @@ class VerifiKTesteProdutos:
     
     def obter_produto_por_codigo(self, codigo_barras):
         """Obtém produto por código - cache + busca + base conhecida"""
-        # Verificar cache primeiro
-        if codigo_barras in self.barcode_cache:
-            return self.barcode_cache[codigo_barras]
-        
-        # Buscar usando método melhorado
-        produto_info = self.buscar_produto_melhorado(codigo_barras)
+        return self.obter_produtos_por_codigos([codigo_barras]).get(str(codigo_barras).strip())
+    
+    def obter_produtos_por_codigos(self, codigos):
+        """Resolve vários códigos: cache primeiro, os que faltam em UMA busca"""
+        produtos = self.resolvedor_barcode.resolver_varios(codigos)
+        for produto_info in produtos.values():
+            if produto_info:
+                print(f"🎯 Produto encontrado: {produto_info['descricao'][:30]}")
+        return produtos
+    
+    def buscar_produtos_lote(self, codigos):
+        """Busca em lote usando todas as fontes disponíveis (fonte do resolvedor)"""
+        # 1. Banco local primeiro, numa única query para o lote todo
+        encontrados = self.buscar_produtos_local_lote(codigos)
         
-        if produto_info:
-            self.barcode_cache[codigo_barras] = produto_info
-            print(f"🎯 Produto encontrado: {produto_info['descricao'][:30]}")
+        for codigo_barras in codigos:
+            if codigo_barras in encontrados:
+                continue
+            produto = None
+            
+            # 2. OpenFoodFacts se habilitado
+            if self.usar_openfoodfacts:
+                produto = self.buscar_openfoodfacts(codigo_barras)
+            
+            # 3. Fallback para base conhecida local
+            if not produto:
+                produto = self.buscar_produto_online(codigo_barras)
+            
+            if produto:
+                encontrados[codigo_barras] = produto
         
-        return produto_info
+        return encontrados
     
     def buscar_produto_melhorado(self, codigo_barras):
         """Busca produto usando todas as fontes disponíveis"""
-        # 1. Buscar no banco local primeiro (mais rápido)
-        produto_local = self.buscar_produto_local(codigo_barras)
-        if produto_local:
-            return produto_local
-        
-        # 2. Buscar no OpenFoodFacts se habilitado
-        if self.usar_openfoodfacts:
-            produto_off = self.buscar_openfoodfacts(codigo_barras)
-            if produto_off:
-                return produto_off
-        
-        # 3. Fallback para base conhecida local
-        return self.buscar_produto_online(codigo_barras)
+        return self.buscar_produtos_lote([codigo_barras]).get(codigo_barras)
     
-    def buscar_produto_local(self, codigo_barras):
-        """Busca no banco de dados local"""
+    def buscar_produtos_local_lote(self, codigos, fonte_busca='BANCO_LOCAL'):
+        """
+        Busca vários códigos no banco local com uma única query
+        
+        A tabela produtos do mobile_simulator.db não tem coluna de código de
+        barras: o código é procurado dentro da descrição (LIKE '%codigo%').
+        """
+        codigos = [c for c in dict.fromkeys(codigos) if c]
+        if not codigos:
+            return {}
+        
         try:
             conn = sqlite3.connect('mobile_simulator.db')
-            cursor = conn.cursor()
-            
-            queries = [
-                "SELECT * FROM produtos WHERE descricao_produto LIKE ? OR descricao_produto = ?",
-                "SELECT * FROM produtos WHERE id = ? OR descricao_produto LIKE ?"
-            ]
-            
-            for query in queries:
-                cursor.execute(query, (f"%{codigo_barras}%", codigo_barras))
-                resultado = cursor.fetchone()
-                
-                if resultado:
-                    cursor.execute("PRAGMA table_info(produtos)")
-                    colunas = [col[1] for col in cursor.fetchall()]
-                    
-                    produto = {}
-                    for i, valor in enumerate(resultado):
-                        if i < len(colunas):
-                            produto[colunas[i]] = valor
-                    
-                    produto_padronizado = {
+            try:
+                cursor = conn.cursor()
+                filtro = " OR ".join(["descricao_produto LIKE ?"] * len(codigos))
+                cursor.execute(
+                    f"SELECT * FROM produtos WHERE {filtro}",
+                    [f"%{codigo}%" for codigo in codigos]
+                )
+                colunas = [col[0] for col in cursor.description]
+                linhas = [dict(zip(colunas, linha)) for linha in cursor.fetchall()]
+            finally:
+                conn.close()
+            
+            encontrados = {}
+            for codigo_barras in codigos:
+                produto = next(
+                    (p for p in linhas if codigo_barras in (p.get('descricao_produto') or '')), None
+                )
+                if produto:
+                    encontrados[codigo_barras] = {
                         'descricao': produto.get('descricao_produto', 'Produto Desconhecido'),
                         'categoria': produto.get('categoria', ''),
                         'marca': produto.get('marca', ''),
                         'id': produto.get('id', ''),
                         'codigo_barras': codigo_barras,
-                        'fonte_busca': 'BANCO_LOCAL'
+                        'fonte_busca': fonte_busca
                     }
-                    
-                    conn.close()
-                    return produto_padronizado
-            
-            conn.close()
-            return None
+            return encontrados
             
         except Exception as e:
             print(f"❌ Erro busca local: {e}")
-            return None
+            return {}
+    
+    def buscar_produto_local(self, codigo_barras):
+        """Busca no banco de dados local"""
+        return self.buscar_produtos_local_lote([codigo_barras]).get(codigo_barras)
     
     def buscar_produto_por_codigo(self, codigo_barras):
         """Busca produto no banco de dados pelo código de barras"""
-        try:
-            conn = sqlite3.connect('mobile_simulator.db')
-            cursor = conn.cursor()
-            
-            # Tentar diferentes campos que podem conter código de barras
-            queries = [
-                "SELECT * FROM produtos WHERE descricao_produto LIKE ? OR descricao_produto = ?",
-                "SELECT * FROM produtos WHERE id = ? OR descricao_produto LIKE ?"
-            ]
-            
-            for query in queries:
-                cursor.execute(query, (f"%{codigo_barras}%", codigo_barras))
-                resultado = cursor.fetchone()
-                
-                if resultado:
-                    # Verificar colunas disponíveis
-                    cursor.execute("PRAGMA table_info(produtos)")
-                    colunas = [col[1] for col in cursor.fetchall()]
-                    
-                    produto = {}
-                    for i, valor in enumerate(resultado):
-                        if i < len(colunas):
-                            produto[colunas[i]] = valor
-                    
-                    # Padronizar campos
-                    produto_padronizado = {
-                        'descricao': produto.get('descricao_produto', 'Produto Desconhecido'),
-                        'categoria': produto.get('categoria', ''),
-                        'marca': produto.get('marca', ''),
-                        'id': produto.get('id', ''),
-                        'codigo_barras': codigo_barras,
-                        'fonte_busca': 'BANCO_DADOS'
-                    }
-                    
-                    conn.close()
-                    return produto_padronizado
-            
-            # Se não encontrou no banco, tentar busca online (simulada)
-            produto_online = self.buscar_produto_online(codigo_barras)
-            conn.close()
-            return produto_online
-            
-        except Exception as e:
-            print(f"❌ Erro ao buscar produto por código: {e}")
-            return None
+        produto = self.buscar_produtos_local_lote([codigo_barras], fonte_busca='BANCO_DADOS').get(codigo_barras)
+        if produto:
+            return produto
+        
+        # Se não encontrou no banco, tentar busca online (simulada)
+        return self.buscar_produto_online(codigo_barras)
     
     def buscar_openfoodfacts(self, codigo_barras):
         """Busca produto no OpenFoodFacts"""
@@ -1498,7 +1542,7 @@ class VerifiKTesteProdutos:
     
     def processar_frame(self, frame_data):
         """Método de compatibilidade - redireciona para híbrido"""
-        return self.processar_frame_hibrido(frame_data)
+        return self.processar_frame_hibrido(frame_data, forcar_deteccao=True)
         try:
             # Converter para OpenCV
             nparr = np.frombuffer(frame_data, np.uint8)
@@ -1977,29 +2021,29 @@ class VerifiKTesteProdutos:
         if self.zona_passagem is None:
             self.definir_zona_passagem(largura_img, altura_img)
         
-        # 1. ASSOCIAR DETECÇÕES COM TRACKS EXISTENTES
+        # 1. ASSOCIAR DETECÇÕES COM TRACKS EXISTENTES (atribuição ótima)
         deteccoes_associadas = []
-        deteccoes_nao_associadas = deteccoes.copy()
+        track_ids, _ = self.nucleo_tracking.atualizar(
+            [deteccao['bbox'] for deteccao in deteccoes],
+            [deteccao['classe'] for deteccao in deteccoes],
+            criar=[deteccao['confianca'] >= self.confianca_tracking_min for deteccao in deteccoes],
+        )
         
-        for track_id, tracker in list(self.produtos_rastreados.items()):
-            melhor_deteccao = None
-            menor_distancia = float('inf')
-            
-            for deteccao in deteccoes_nao_associadas:
-                if tracker.compativel_com_deteccao(deteccao, self.max_distancia_tracking):
-                    distancia = tracker.calcular_distancia(deteccao)
-                    if distancia < menor_distancia:
-                        menor_distancia = distancia
-                        melhor_deteccao = deteccao
+        tracks_atualizados = set()
+        for deteccao, track_id in zip(deteccoes, track_ids.tolist()):
+            if not track_id:
+                continue
+            tracks_atualizados.add(track_id)
+            tracker = self.produtos_rastreados.get(track_id)
             
-            if melhor_deteccao:
+            if tracker:
                 # Associar detecção ao track existente
-                tracker.adicionar_deteccao(melhor_deteccao, timestamp_atual)
-                deteccoes_nao_associadas.remove(melhor_deteccao)
+                self.transferir_identificacao(tracker, deteccao)
+                tracker.adicionar_deteccao(deteccao, timestamp_atual)
                 
                 # Adicionar informações de tracking
-                melhor_deteccao['track_id'] = track_id
-                melhor_deteccao['track_info'] = {
+                deteccao['track_id'] = track_id
+                deteccao['track_info'] = {
                     'uuid': tracker.uuid,
                     'tempo_vida': timestamp_atual - tracker.timestamp_criacao,
                     'velocidade': tracker.caracteristicas['velocidade_media'],
@@ -2007,28 +2051,21 @@ class VerifiKTesteProdutos:
                     'passou_zona': tracker.passou_zona
                 }
                 
-                deteccoes_associadas.append(melhor_deteccao)
+                deteccoes_associadas.append(deteccao)
                 
                 # Verificar passagem pela zona
                 self.verificar_passagem_zona(tracker)
                 
             else:
-                # Track sem detecção - marcar como perdido
-                tracker.marcar_perdido()
-        
-        # 2. CRIAR NOVOS TRACKS PARA DETECÇÕES NÃO ASSOCIADAS
-        for deteccao in deteccoes_nao_associadas:
-            if deteccao['confianca'] >= self.confianca_tracking_min:
-                novo_track_id = self.proximo_track_id
-                self.proximo_track_id += 1
-                
-                novo_tracker = ProductTracker(novo_track_id, deteccao, timestamp_atual)
-                novo_tracker.cor_track = self.cores_tracking[novo_track_id % len(self.cores_tracking)]
+                # 2. NOVO TRACK PARA DETECÇÃO NÃO ASSOCIADA
+                novo_tracker = ProductTracker(track_id, deteccao, timestamp_atual)
+                novo_tracker.cor_track = self.cores_tracking[track_id % len(self.cores_tracking)]
+                self.transferir_identificacao(novo_tracker, deteccao)
                 
-                self.produtos_rastreados[novo_track_id] = novo_tracker
+                self.produtos_rastreados[track_id] = novo_tracker
                 
                 # Adicionar informações de tracking
-                deteccao['track_id'] = novo_track_id
+                deteccao['track_id'] = track_id
                 deteccao['track_info'] = {
                     'uuid': novo_tracker.uuid,
                     'tempo_vida': 0,
@@ -2040,7 +2077,12 @@ class VerifiKTesteProdutos:
                 deteccoes_associadas.append(deteccao)
                 
                 self.stats_mot['total_tracks'] += 1
-                print(f"🆕 Novo track criado: ID {novo_track_id} para {deteccao['classe'][:20]}")
+                print(f"🆕 Novo track criado: ID {track_id} para {deteccao['classe'][:20]}")
+        
+        # Tracks sem detecção - marcar como perdidos
+        for track_id, tracker in self.produtos_rastreados.items():
+            if track_id not in tracks_atualizados:
+                tracker.marcar_perdido()
         
         # 3. REMOVER TRACKS PERDIDOS
         self.limpar_tracks_perdidos()
@@ -2050,6 +2092,51 @@ class VerifiKTesteProdutos:
         
         return deteccoes_associadas
     
+    def transferir_identificacao(self, tracker, deteccao):
+        """Guarda no track o que OCR/código de barras identificou e reaplica nas detecções seguintes"""
+        if deteccao.get('fonte') in FONTES_IDENTIFICACAO:
+            tracker.identificacao = {campo: deteccao[campo] for campo in CAMPOS_IDENTIFICACAO if campo in deteccao}
+        elif tracker.identificacao:
+            deteccao.update(tracker.identificacao)
+    
+    def propagar_tracks(self, img_cv):
+        """Frame sem detector: move os tracks pelo fluxo óptico e monta as detecções para desenhar"""
+        nucleo = self.nucleo_tracking
+        if not len(nucleo):
+            return []
+        
+        nucleo.bboxes = self.agendador.propagar(img_cv, nucleo.ids, nucleo.bboxes)
+        timestamp_atual = time.time()
+        deteccoes = []
+        
+        for track_id, bbox in zip(nucleo.ids.tolist(), nucleo.bboxes.astype(int).tolist()):
+            tracker = self.produtos_rastreados.get(track_id)
+            if not tracker or tracker.frames_sem_deteccao:
+                continue  # só os tracks vistos na última detecção
+            
+            tracker.mover(bbox, timestamp_atual)
+            self.verificar_passagem_zona(tracker)
+            
+            deteccao = {
+                'fonte': tracker.fonte_deteccao,
+                'classe': tracker.classe,
+                'confianca': tracker.confianca_atual,
+                'bbox': bbox,
+                'validado': True,
+                'track_id': track_id,
+                'track_info': {
+                    'uuid': tracker.uuid,
+                    'tempo_vida': timestamp_atual - tracker.timestamp_criacao,
+                    'velocidade': tracker.caracteristicas['velocidade_media'],
+                    'direcao': tracker.caracteristicas['direcao_movimento'],
+                    'passou_zona': tracker.passou_zona
+                }
+            }
+            deteccao.update(tracker.identificacao)
+            deteccoes.append(deteccao)
+        
+        return deteccoes
+    
     def definir_zona_passagem(self, largura, altura):
         """Define zona de passagem central da imagem"""
         margem_x = largura // 4
@@ -2118,6 +2205,7 @@ class VerifiKTesteProdutos:
         
         for track_id in tracks_para_remover:
             del self.produtos_rastreados[track_id]
+        self.nucleo_tracking.remover(tracks_para_remover)
     
     def atualizar_estatisticas_mot(self):
         """Atualiza estatísticas do sistema MOT"""
@@ -2328,7 +2416,7 @@ class VerifiKTesteProdutos:
         
         # Fundo semi-transparente para estatísticas
         overlay = img.copy()
-        cv2.rectangle(overlay, (10, altura_img-120), (300, altura_img-10), (0, 0, 0), -1)
+        cv2.rectangle(overlay, (10, altura_img-140), (300, altura_img-10), (0, 0, 0), -1)
         cv2.addWeighted(overlay, 0.7, img, 0.3, 0, img)
         
         # Estatísticas
@@ -2337,11 +2425,13 @@ class VerifiKTesteProdutos:
             f"Tracks Ativos: {self.stats_mot['tracks_ativos']}",
             f"Total Tracks: {self.stats_mot['total_tracks']}",
             f"Passagens: {self.stats_mot['passagens_detectadas']}",
-            f"Produtos ID: {self.stats_mot['produtos_identificados']}"
+            f"Produtos ID: {self.stats_mot['produtos_identificados']}",
+            f"YOLO: {self.agendador.frames_detectados}/{self.agendador.frames} frames "
+            f"(-{self.agendador.estatisticas()['tempo_economizado']:.0f}s)"
         ]
         
         for i, text in enumerate(stats_text):
-            y_pos = altura_img - 100 + (i * 20)
+            y_pos = altura_img - 120 + (i * 20)
             cor_text = (0, 255, 255) if i == 0 else (255, 255, 255)
             cv2.putText(img, text, (15, y_pos), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, cor_text, 1)
@@ -2421,7 +2511,10 @@ class VerifiKTesteProdutos:
         
         # Atualizar informações
         if hasattr(self, 'info_base'):
-            total_cache = len(self.barcode_cache) if hasattr(self, 'barcode_cache') else 0
+            total_cache = 0
+            if hasattr(self, 'resolvedor_barcode'):
+                stats_barcode = self.resolvedor_barcode.estatisticas()
+                total_cache = stats_barcode['tamanho'] - stats_barcode['negativos_em_cache']
             self.info_base.config(text=f"Base: {len(self.produtos_treinados)}+{total_cache} produtos")
         
         if hasattr(self, 'info_aprendizado'):
@@ -2439,17 +2532,17 @@ class VerifiKTesteProdutos:
     def teste_foto(self):
         """Testa captura de foto"""
         try:
-            response = requests.get(self.snapshot_url, auth=self.auth, timeout=5)
-            if response.status_code == 200:
+            foto = self.fonte.capturar_snapshot()
+            if foto:
                 # Salvar foto de teste
                 filename = f"teste_foto_{int(time.time())}.jpg"
                 with open(filename, 'wb') as f:
-                    f.write(response.content)
+                    f.write(foto)
                 
                 messagebox.showinfo("Sucesso", f"Foto teste salva: {filename}")
                 print(f"📸 Foto teste salva: {filename}")
             else:
-                messagebox.showerror("Erro", f"Erro ao capturar: {response.status_code}")
+                messagebox.showerror("Erro", f"Erro ao capturar: {self.fonte.ultimo_erro}")
         except Exception as e:
             messagebox.showerror("Erro", f"Erro na captura: {e}")
 